@@ -23,6 +23,8 @@
 from __future__ import annotations
 
 from api.models.pc_products import PCProduct
+from api.services.facet_count_service import rebuild_facet_counts
+from api.utils.catalog_generation import bump_catalog_generation
 
 
 class ImportStock:
@@ -48,8 +50,16 @@ class ImportStock:
             Number of updated products.
         """
 
-        return PCProduct.objects.update(
+        updated = PCProduct.objects.update(
             is_active=True,
             stock_status="在庫なし",
         )
+
+        # queryset.update bypasses post_save; bump explicitly.
+        bump_catalog_generation()
+
+        # Bulk is_active flip: recount sidebar facets.
+        rebuild_facet_counts()
+
+        return updated
         
\ No newline at end of file
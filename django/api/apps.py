@@ -3,4 +3,8 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
-    verbose_name = '製品管理システム' # 管理画面での表示名
\ No newline at end of file
+    verbose_name = '製品管理システム' # 管理画面での表示名
+
+    def ready(self):
+        # カタログ世代カウンタ (finder cache 等の無効化)
+        from . import signals  # noqa: F401
\ No newline at end of file
@@ -5,6 +5,12 @@ import re
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from api.models import PCProduct, PCAttribute, AdultProduct, AdultAttribute
+from api.utils.attribute_tagger import (
+    MATCH_RAW,
+    AttributeTagger,
+    load_attribute_links,
+    sync_attribute_links,
+)
 
 
 class Command(BaseCommand):
@@ -47,11 +53,166 @@ class Command(BaseCommand):
         "pc_feature", "storage_type", "aspect_ratio"
     ]
 
+    # search_keywords の区切り
+    KEYWORD_SEPARATORS = r'[,\s、，\t\n]+'
+
+    CHUNK_SIZE = 500
+
+    # -------------------------
+    # keyword 前処理
+    # -------------------------
+    def keyword_allowed(self, attr, kw):
+        # CPU / GPU は型番 (数字入り 5 文字以上) だけで判定
+        if attr.attr_type in ["cpu", "gpu"]:
+            return len(kw) >= 5 and any(c.isdigit() for c in kw)
+        return True
+
+    def iter_chunks(self, products):
+        chunk = []
+        for product in products.order_by('id').iterator(chunk_size=self.CHUNK_SIZE):
+            chunk.append(product)
+            if len(chunk) >= self.CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
     # -------------------------
-    # 正規化
+    # 1 製品分の判定
     # -------------------------
-    def normalize(self, text):
-        return text.replace(" ", "").replace("-", "").lower()
+    def select_attributes(self, product, fields, tagger, existing_ids):
+
+        # -------------------------
+        # モニター判定（重要）
+        # -------------------------                   
+        product_name = (getattr(product, "name", "") or getattr(product, "title", "")).lower()
+
+        is_monitor = any([
+            "モニター" in product_name,
+            "monitor" in product_name,
+            "display" in product_name,
+            "ディスプレイ" in product_name
+        ])
+
+        if is_monitor:
+            # モニター専用処理だけやる
+            allowed_types = [
+                "monitor_size",
+                "resolution",
+                "refresh_rate",
+                "panel_type"
+            ]
+        else:
+            allowed_types = None
+
+        skip_cpu_gpu = is_monitor
+        skip_pc_tags = is_monitor
+
+        texts = []
+        for f in fields:
+            val = getattr(product, f, "")
+            if val:
+                texts.append(str(val))
+
+        target_text = " ".join(texts).lower()
+
+        if not target_text:
+            return []
+
+        best_match = {}
+
+        # -------------------------
+        # マッチング処理（1 pass scan / 判定順は属性マスター順）
+        # -------------------------
+        hits = tagger.scan(target_text)
+
+        for attr_id in sorted(hits, key=tagger.position.get):
+
+            match_kind = hits[attr_id][1]
+
+            attr = tagger.attributes[attr_id]
+            attr_type = attr.attr_type
+
+            if attr.id in existing_ids:
+                continue
+
+            # CPU / GPU → 型番一致 2 / その他 → RAW 1, NORM 2
+            if attr_type in ["cpu", "gpu"]:
+                score = 2
+            elif match_kind == MATCH_RAW:
+                score = 1
+            else:
+                score = 2
+
+            # -------------------------
+            # モニター制御
+            # -------------------------
+            if allowed_types is not None:
+                if attr_type not in allowed_types:
+                    continue
+
+            if attr_type in ["cpu", "gpu"]:
+                if skip_cpu_gpu:
+                    continue
+
+            if skip_pc_tags:
+                if attr_type in ["cpu", "gpu", "usage", "pc_feature"]:
+                    continue
+
+            # -------------------------
+            # priority
+            # -------------------------
+            if attr_type in ["cpu", "gpu"]:
+                priority = (attr.order or 0) * 1000 + (score * 10)
+            else:
+                priority = score
+
+            if "シリーズ" in attr.name:
+                priority -= 500
+                
+            if "世代" in attr.name:
+                priority -= 300
+            
+            if attr.name == "NPU搭載":
+                priority -= 100
+
+            # -------------------------
+            # SINGLE
+            # -------------------------
+            if attr_type in self.SINGLE_TYPES:
+
+                if attr_type not in best_match:
+                    best_match[attr_type] = {
+                        'attr': attr,
+                        'priority': priority
+                    }
+                else:
+                    if priority > best_match[attr_type]['priority']:
+                        best_match[attr_type] = {
+                            'attr': attr,
+                            'priority': priority
+                        }
+
+            # -------------------------
+            # MULTI
+            # -------------------------
+            elif attr_type in self.MULTI_TYPES:
+
+                if attr_type not in best_match:
+                    best_match[attr_type] = []
+
+                if len(best_match[attr_type]) < 5:
+                    best_match[attr_type].append(attr)
+
+        to_add = []
+
+        for v in best_match.values():
+            if isinstance(v, list):
+                to_add.extend(v)
+            else:
+                to_add.append(v['attr'])
+
+        return to_add
 
     # -------------------------
     # メイン処理
@@ -61,7 +222,8 @@ class Command(BaseCommand):
         targets = [
             {
                 'name': 'PC',
-                'products': PCProduct.objects.all().prefetch_related('attributes'),
+                'model': PCProduct,
+                'products': PCProduct.objects.all(),
                 'attributes': PCAttribute.objects.filter(is_adult=False),
                 'fields': [
                     'title', 'name', 'description', 'ai_summary',
@@ -70,7 +232,8 @@ class Command(BaseCommand):
             },
             {
                 'name': 'ADULT',
-                'products': AdultProduct.objects.all().prefetch_related('attributes'),
+                'model': AdultProduct,
+                'products': AdultProduct.objects.all(),
                 'attributes': AdultAttribute.objects.all(),
                 'fields': [
                     'title', 'product_description', 'rich_description',
@@ -84,224 +247,52 @@ class Command(BaseCommand):
         for target in targets:
             self.stdout.write(self.style.HTTP_INFO(f"🚀 {target['name']} 開始"))
 
-            attributes = list(target['attributes'])
-
             # -------------------------
-            # 属性前処理
+            # 属性前処理 (全 keyword を 1 つの automaton に compile)
             # -------------------------
-            prepared_attrs = []
-
-            for attr in attributes:
-                raw_keywords = attr.search_keywords or ""
-
-                keywords = [
-                    k.strip().lower()
-                    for k in re.split(r'[,\s、，\t\n]+', raw_keywords)
-                    if len(k.strip()) >= 2
-                ]
-
-                keywords.append(attr.name.lower())
-
-                prepared_attrs.append({
-                    'obj': attr,
-                    'keywords': keywords,
-                    'type': attr.attr_type
-                })
+            tagger = AttributeTagger(
+                target['attributes'],
+                separators=self.KEYWORD_SEPARATORS,
+                min_length=2,
+                name_first=False,
+                compact=True,
+                keyword_filter=self.keyword_allowed,
+            )
 
             # -------------------------
             # マッピング
             # -------------------------
             with transaction.atomic():
 
-                for product in target['products']:
+                for chunk in self.iter_chunks(target['products']):
 
-                    # -------------------------
-                    # モニター判定（重要）
-                    # -------------------------                   
-                    product_name = (getattr(product, "name", "") or getattr(product, "title", "")).lower()
-
-                    is_monitor = any([
-                        "モニター" in product_name,
-                        "monitor" in product_name,
-                        "display" in product_name,
-                        "ディスプレイ" in product_name
-                    ])
-                    
-                    
-                    if is_monitor:
-                        # モニター専用処理だけやる
-                        allowed_types = [
-                            "monitor_size",
-                            "resolution",
-                            "refresh_rate",
-                            "panel_type"
-                        ]
-                    else:
-                        allowed_types = None
-
-
-                    skip_cpu_gpu = is_monitor
-                    skip_pc_tags = is_monitor
-
-                    texts = []
-                    for f in target['fields']:
-                        val = getattr(product, f, "")
-                        if val:
-                            texts.append(str(val))
-
-                    target_text = " ".join(texts).lower()
-                    target_text_norm = self.normalize(target_text)
-
-                    if not target_text:
-                        continue
-
-                    existing_ids = set(product.attributes.values_list('id', flat=True))
-                    best_match = {}
+                    existing = load_attribute_links(
+                        [product.id for product in chunk],
+                        model=target['model'],
+                    )
 
-                    # -------------------------
-                    # マッチング処理（完全版）
-                    # -------------------------
-                    for attr_data in prepared_attrs:
-
-                        attr = attr_data['obj']
-                        attr_type = attr_data['type']
-
-                        if attr.id in existing_ids:
-                            continue
-
-                        score = 0
-                        matched = False
-                        match_type = ""
-
-                        for kw in attr_data['keywords']:
-                            kw = kw.strip().lower()
-                            if not kw:
-                                continue
-                            
-
-                            kw_norm = self.normalize(kw)
-
-                            # -------------------------
-                            # CPU / GPU → 正規表現
-                            # -------------------------
-                            if attr_type in ["cpu", "gpu"]:
-                                
-                                if len(kw) < 5:
-                                    continue
-                                
-                                if not any(c.isdigit() for c in kw):
-                                    continue
-                                                               
-                                pattern = re.escape(kw).replace(r"\ ", r"\s*")
-
-                                if re.search(pattern, target_text):
-                                    score += 2
-                                    matched = True
-                                    match_type = "REGEX"
-                                    break
-
-                            # -------------------------
-                            # その他 → 通常マッチ
-                            # -------------------------
-                            else:
-                                if kw in target_text:
-                                    score += 1
-                                    matched = True
-                                    match_type = "RAW"
-                                    break
-
-                                elif kw_norm in target_text_norm:
-                                    score += 2
-                                    matched = True
-                                    match_type = "NORM"
-                                    break
-
-                        # -------------------------
-                        # スキップ条件
-                        # -------------------------
-                        if not matched:
-                            continue
-
-                        # -------------------------
-                        # モニター制御
-                        # -------------------------
-                        if allowed_types is not None:
-                            if attr_type not in allowed_types:
-                                continue
-
-                        if attr_type in ["cpu", "gpu"]:
-                            if skip_cpu_gpu:
-                                continue
-
-                        if skip_pc_tags:
-                            if attr_type in ["cpu", "gpu", "usage", "pc_feature"]:
-                                continue
-
-                        # -------------------------
-                        # priority
-                        # -------------------------
-                        if attr_type in ["cpu", "gpu"]:
-                            priority = (attr.order or 0) * 1000 + (score * 10)
-                        else:
-                            priority = score
-
-                        if "シリーズ" in attr.name:
-                            priority -= 500
-                            
-                        if "世代" in attr.name:
-                            priority -= 300
-                        
-                        if attr.name == "NPU搭載":
-                            priority -= 100
-
-                        # -------------------------
-                        # SINGLE
-                        # -------------------------
-                        if attr_type in self.SINGLE_TYPES:
-
-                            if attr_type not in best_match:
-                                best_match[attr_type] = {
-                                    'attr': attr,
-                                    'priority': priority
-                                }
-                            else:
-                                if priority > best_match[attr_type]['priority']:
-                                    best_match[attr_type] = {
-                                        'attr': attr,
-                                        'priority': priority
-                                    }
-
-                        # -------------------------
-                        # MULTI
-                        # -------------------------
-                        elif attr_type in self.MULTI_TYPES:
-
-                            if attr_type not in best_match:
-                                best_match[attr_type] = []
-
-                            if len(best_match[attr_type]) < 5:
-                                best_match[attr_type].append(attr)
-
-                        # -------------------------
-                        # デバッグ
-                        # -------------------------
-                        # title = getattr(product, "title", None) or getattr(product, "name", "")
-                        # if "4070" in title:
-                        #     print(f"🔥 {match_type} MATCH | attr={attr.name} | title={title}")
-                    
-                    # -------------------------
-                    # 登録
-                    # -------------------------
-                    to_add = []
+                    targets_map = {}
+
+                    for product in chunk:
+                        to_add = self.select_attributes(
+                            product,
+                            target['fields'],
+                            tagger,
+                            set(existing.get(product.id, {})),
+                        )
 
-                    for v in best_match.values():
-                        if isinstance(v, list):
-                            to_add.extend(v)
-                        else:
-                            to_add.append(v['attr'])
+                        if to_add:
+                            targets_map[product.id] = {attr.id for attr in to_add}
 
-                    if to_add:
-                        product.attributes.add(*to_add)
-                        total_count += len(to_add)
+                    # -------------------------
+                    # 登録 (through table へ bulk insert)
+                    # -------------------------
+                    added, _ = sync_attribute_links(
+                        targets_map,
+                        prune=False,
+                        existing=existing,
+                        model=target['model'],
+                    )
+                    total_count += added
 
         self.stdout.write(self.style.SUCCESS(f'✅ 完了: {total_count} 件紐付け'))
\ No newline at end of file
@@ -1,6 +1,7 @@
 #  //home/maya/shin-dev/shin-vps/django/api/management/commands/auto_map_attributes_v2.py
 from django.core.management.base import ( BaseCommand, )
 from api.models import ( PCProduct, PCAttribute, )
+from api.utils.attribute_tagger import ( sync_attribute_links, )
 
 class Command(BaseCommand):
 
@@ -9,6 +10,8 @@ class Command(BaseCommand):
         "Attach semantic attributes from runtime"
     )
 
+    CHUNK_SIZE = 1000
+
     def handle(
 
         self,
@@ -22,87 +25,102 @@ class Command(BaseCommand):
         total = 0
         attached = 0
         errors = 0
+        removed = 0
+
+        attribute_ids = dict(
+
+            PCAttribute.objects.values_list(
+                "slug",
+                "id",
+            )
+        )
 
         products = (
             PCProduct.objects
             .all()
             .order_by("id")
+            .values_list(
+                "id",
+                "semantic_runtime",
+            )
         )
 
-        for product in products:
+        targets_map = {}
+
+        def flush():
+
+            nonlocal attached, removed, errors
 
             try:
 
-                runtime = (
-                    product.semantic_runtime
-                    or {}
+                added, dropped = sync_attribute_links(
+                    targets_map
                 )
 
-                attribute_slugs = (
+                attached += added
+                removed += dropped
 
-                    runtime.get(
-                        "semantic_attributes",
-                        []
-                    )
+                print({
 
-                )
+                    "products":
+                        len(targets_map),
 
-                product.attributes.clear()
+                    "added":
+                        added,
 
-                if not attribute_slugs:
+                    "removed":
+                        dropped,
 
-                    continue
+                })
 
-                attributes = (
+            except Exception as error:
 
-                    PCAttribute.objects
+                errors += len(targets_map)
 
-                    .filter(
-                        slug__in=attribute_slugs
-                    )
+                print({
 
-                )
+                    "products":
+                        list(targets_map)[:5],
 
-                if attributes.exists():
+                    "error":
+                        str(error),
 
-                    product.attributes.add(
-                        *attributes
-                    )
+                })
 
-                    attached += (
-                        attributes.count()
-                    )
+            targets_map.clear()
 
-                total += 1
+        for product_id, runtime in products.iterator(
+            chunk_size=self.CHUNK_SIZE
+        ):
 
-                print({
+            attribute_slugs = (
 
-                    "product_id":
-                        product.id,
+                (runtime or {}).get(
+                    "semantic_attributes",
+                    []
+                )
 
-                    "runtime_attributes":
-                        len(
-                            attribute_slugs
-                        ),
+            )
 
-                    "attached":
-                        attributes.count(),
+            # runtime に無い attribute は外す (clear + add と同じ結果)
+            targets_map[product_id] = {
 
-                })
+                attribute_ids[slug]
 
-            except Exception as error:
+                for slug in attribute_slugs
 
-                errors += 1
+                if slug in attribute_ids
+            }
 
-                print({
+            if attribute_slugs:
 
-                    "product_id":
-                        product.id,
+                total += 1
 
-                    "error":
-                        str(error),
+            if len(targets_map) >= self.CHUNK_SIZE:
 
-                })
+                flush()
+
+        flush()
 
         print()
         print("=" * 60)
@@ -117,6 +135,9 @@ class Command(BaseCommand):
             "attached":
                 attached,
 
+            "removed":
+                removed,
+
             "errors":
                 errors,
 
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# api/management/commands/build_ranking_snapshots.py
+
+from django.core.management.base import (
+    BaseCommand,
+)
+
+from api.services.ranking_snapshot_service import (
+    RANKING_SNAPSHOT_DEPTH,
+    build_ranking_snapshot,
+    get_active_ranking_snapshot,
+    is_ranking_snapshot_stale,
+)
+
+
+# ==========================================================
+# COMMAND
+# ==========================================================
+
+class Command(BaseCommand):
+
+    help = (
+        "Build ranking v2 snapshot "
+        "(全ランキングを 1 pass で計算して active 版を差し替える)"
+    )
+
+    # ======================================================
+    # ARGUMENTS
+    # ======================================================
+
+    def add_arguments(self, parser):
+
+        parser.add_argument(
+            "--if-stale",
+            action="store_true",
+            help="active 版が現在の catalog generation と同じなら何もしない (cron 用)",
+        )
+
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=RANKING_SNAPSHOT_DEPTH,
+            help="1 ランキングに保持する上位件数",
+        )
+
+    # ======================================================
+    # HANDLE
+    # ======================================================
+
+    def handle(
+
+        self,
+
+        *args,
+
+        **options,
+
+    ):
+
+        if options["if_stale"]:
+
+            active = get_active_ranking_snapshot(
+                build_if_missing=False
+            )
+
+            if not is_ranking_snapshot_stale(active):
+
+                self.stdout.write(
+                    f"RANKING SNAPSHOT: up to date ({active})"
+                )
+
+                return
+
+        snapshot = build_ranking_snapshot(
+            depth=options["depth"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"RANKING SNAPSHOT: {snapshot} "
+                f"products={snapshot.product_count} "
+                f"{snapshot.build_seconds}s"
+            )
+        )
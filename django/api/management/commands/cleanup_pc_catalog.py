@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 from django.core.management.base import BaseCommand
 from api.models.pc_products import PCProduct
+from api.services.facet_count_service import rebuild_facet_counts
+from api.utils.catalog_generation import bump_catalog_generation
 from django.utils import timezone
 from datetime import timedelta
 
@@ -38,6 +40,14 @@ class Command(BaseCommand):
             is_active=False
         ).update(is_active=True)
 
+        # queryset.update は signal を通らないため明示的に世代を進め、
+        # is_active を一括で切り替えたときは facet 件数も集計し直す
+        if expired_count or hidden_count or activated_count:
+            bump_catalog_generation()
+
+        if hidden_count or activated_count:
+            rebuild_facet_counts()
+
         self.stdout.write(self.style.SUCCESS(
             f"🧹 クリーンアップ完了:\n"
             f"   - 在庫切れに変更: {expired_count}件\n"
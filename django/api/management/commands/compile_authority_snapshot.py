@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+# api/management/commands/compile_authority_snapshot.py
+
+from django.core.management.base import (
+    BaseCommand,
+)
+
+from api.services.semantic.v2.authority.authority_registry import (
+    compile_authority_snapshot,
+    digest_files,
+    get_authority_settings,
+    read_authority_artifact,
+    write_authority_artifact,
+)
+
+from api.services.semantic.v2.authority.tsv_loader import (
+    DEFAULT_TSV_DIR,
+)
+
+
+# ==========================================================
+# COMMAND
+# ==========================================================
+
+class Command(BaseCommand):
+
+    help = (
+        "Compile authority TSVs into a pickle snapshot "
+        "for fast worker startup"
+    )
+
+    def add_arguments(self, parser):
+
+        parser.add_argument(
+            "--directory",
+            default=str(DEFAULT_TSV_DIR),
+            help="authority TSV directory",
+        )
+
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="artifact path (default: SEMANTIC_AUTHORITY['ARTIFACT'])",
+        )
+
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="artifact が TSV と一致しているかだけ確認",
+        )
+
+    # ======================================================
+    # HANDLE
+    # ======================================================
+
+    def handle(
+
+        self,
+
+        *args,
+
+        **options,
+
+    ):
+
+        directory = options["directory"]
+
+        artifact = (
+            options["output"]
+            or get_authority_settings()["artifact"]
+        )
+
+        digest = digest_files(
+            directory
+        )
+
+        # --------------------------------------------------
+        # CHECK
+        # --------------------------------------------------
+
+        if options["check"]:
+
+            snapshot = read_authority_artifact(
+                directory,
+                digest,
+                artifact=artifact,
+            )
+
+            if snapshot is None:
+
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"STALE: {artifact} ({digest})"
+                    )
+                )
+
+                return
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"UP TO DATE: {artifact} ({digest})"
+                )
+            )
+
+            return
+
+        # --------------------------------------------------
+        # COMPILE
+        # --------------------------------------------------
+
+        snapshot = compile_authority_snapshot(
+            directory,
+            digest=digest,
+        )
+
+        path = write_authority_artifact(
+            snapshot,
+            artifact=artifact,
+        )
+
+        for name, count in snapshot.stats().items():
+
+            self.stdout.write(
+                f"{name}: {count} rows"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"AUTHORITY SNAPSHOT: {path} ({digest})"
+            )
+        )
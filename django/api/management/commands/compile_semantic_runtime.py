@@ -27,7 +27,42 @@ from api.utils.semantic.runtime.compile_semantic_runtime import (
 )
 
 from api.utils.semantic.runtime.persist_runtime import (
-    persist_runtime,
+    build_persisted_fields,
+    project_runtime,
+)
+
+from api.utils.semantic.runtime.runtime_writer import (
+    RuntimeBulkWriter,
+)
+
+from api.utils.semantic.runtime.compile_pool import (
+    DEFAULT_CHUNK_SIZE,
+    run_compile_pool,
+)
+
+from api.utils.catalog_generation import (
+    bump_catalog_generation,
+    get_catalog_generation,
+)
+
+from api.services.semantic.runtime_builder import (
+    build_source_hash,
+    dirty_runtime_queryset,
+    enqueue_stale_runtimes,
+)
+
+from api.services.semantic.semantic_relation_store import (
+    rebuild_product_relations,
+    refresh_product_relations,
+)
+
+from api.services.ranking_snapshot_service import (
+    build_ranking_snapshot,
+)
+
+from api.services.facet_count_service import (
+    FACET_SEMANTIC_GROUP,
+    rebuild_facet_counts,
 )
 
 
@@ -62,10 +97,11 @@ class Command(BaseCommand):
 
             type=int,
 
-            default=10,
+            default=None,
 
             help=(
-                "Limit number of products"
+                "Limit number of products "
+                "(default 10, unlimited with --incremental)"
             ),
         )
 
@@ -99,6 +135,33 @@ class Command(BaseCommand):
             ),
         )
 
+        # =================================================
+        # INCREMENTAL
+        # =================================================
+
+        parser.add_argument(
+
+            "--incremental",
+
+            action="store_true",
+
+            help=(
+                "Compile only queued products whose source hash changed"
+            ),
+        )
+
+        parser.add_argument(
+
+            "--scan-hashes",
+
+            action="store_true",
+
+            help=(
+                "Re-hash the catalog and queue products changed "
+                "outside model save (bulk_update / version bump)"
+            ),
+        )
+
         # =================================================
         # MAKER
         # =================================================
@@ -146,6 +209,32 @@ class Command(BaseCommand):
             ),
         )
 
+        # =================================================
+        # RELATIONS
+        # =================================================
+
+        parser.add_argument(
+
+            "--rebuild-relations",
+
+            action="store_true",
+
+            help=(
+                "Recompute materialized related products for the whole catalog"
+            ),
+        )
+
+        parser.add_argument(
+
+            "--skip-relations",
+
+            action="store_true",
+
+            help=(
+                "Do not update materialized related products"
+            ),
+        )
+
         # =================================================
         # PARALLEL WORKERS
         # =================================================
@@ -163,6 +252,37 @@ class Command(BaseCommand):
             ),
         )
 
+        # =================================================
+        # PROCESS POOL
+        # =================================================
+
+        parser.add_argument(
+
+            "--processes",
+
+            type=int,
+
+            default=0,
+
+            help=(
+                "Compile in N worker processes with bulk writes "
+                "(0 = thread mode)"
+            ),
+        )
+
+        parser.add_argument(
+
+            "--chunk-size",
+
+            type=int,
+
+            default=DEFAULT_CHUNK_SIZE,
+
+            help=(
+                "Products per process chunk / bulk write flush"
+            ),
+        )
+
     # =====================================================
     # PRODUCT PROCESSOR
     # =====================================================
@@ -184,6 +304,8 @@ class Command(BaseCommand):
         trace_runtime,
 
         needs_runtime,
+
+        incremental=False,
     ):
 
         try:
@@ -232,9 +354,41 @@ class Command(BaseCommand):
             # SKIP
             # =============================================
 
+            source_hash = build_source_hash(
+                product
+            )
+
+            if (
+
+                incremental
+                and not force
+                and product.semantic_runtime_compiled
+                and product.semantic_source_hash == source_hash
+
+            ):
+
+                # 内容が変わっていない queue を外す
+                PCProduct.objects.filter(
+                    pk=product.pk
+                ).update(
+                    semantic_runtime_dirty=False
+                )
+
+                runtime_log(
+
+                    True,
+
+                    "UNCHANGED",
+
+                    product.name,
+                )
+
+                return None
+
             if (
 
-                product.semantic_runtime_compiled
+                not incremental
+                and product.semantic_runtime_compiled
                 and not force
                 and not needs_runtime
 
@@ -249,7 +403,7 @@ class Command(BaseCommand):
                     product.name,
                 )
 
-                return
+                return None
 
             # =============================================
             # COMPILE
@@ -267,21 +421,23 @@ class Command(BaseCommand):
             )
 
             # =============================================
-            # SAVE
+            # PROJECT (main thread が bulk write する)
             # =============================================
 
-            persist_runtime(
+            result = project_runtime(
 
-                product=product,
+                product,
 
-                semantic_runtime=runtime_result,
+                runtime_result,
+
+                source_hash=source_hash,
             )
 
             runtime_log(
 
                 True,
 
-                "RUNTIME SAVED",
+                "RUNTIME COMPILED",
 
                 {
 
@@ -314,6 +470,19 @@ class Command(BaseCommand):
                 },
             )
 
+            return (
+
+                product.id,
+
+                build_persisted_fields(
+                    product
+                ),
+
+                result[
+                    "semantic_attributes"
+                ],
+            )
+
         except Exception as e:
 
             runtime_log(
@@ -325,6 +494,236 @@ class Command(BaseCommand):
                 str(e),
             )
 
+            return None
+
+    # =====================================================
+    # THREAD MODE
+    # =====================================================
+
+    def compile_with_threads(
+
+        self,
+
+        queryset,
+
+        workers,
+
+        force,
+
+        skip_extraction,
+
+        trace_runtime,
+
+        needs_runtime,
+
+        incremental,
+
+        chunk_size,
+    ):
+
+        total = len(queryset)
+
+        writer = RuntimeBulkWriter(
+            chunk_size=chunk_size,
+        )
+
+        compiled_ids = []
+
+        with ThreadPoolExecutor(
+
+            max_workers=workers
+
+        ) as executor:
+
+            futures = []
+
+            for index, product in enumerate(
+
+                queryset,
+
+                start=1,
+            ):
+
+                future = executor.submit(
+
+                    self.process_product,
+
+                    product,
+
+                    total,
+
+                    index,
+
+                    force,
+
+                    skip_extraction,
+
+                    trace_runtime,
+
+                    needs_runtime,
+
+                    incremental,
+                )
+
+                futures.append(
+                    future
+                )
+
+            # =============================================
+            # WAIT
+            # =============================================
+
+            for future in as_completed(
+                futures
+            ):
+
+                try:
+
+                    compiled = future.result()
+
+                    if compiled is not None:
+
+                        product_id, fields, slugs = compiled
+
+                        writer.add(
+
+                            product_id,
+
+                            fields,
+
+                            slugs,
+                        )
+
+                        compiled_ids.append(
+                            product_id
+                        )
+
+                except Exception as e:
+
+                    runtime_log(
+
+                        True,
+
+                        "THREAD ERROR",
+
+                        str(e),
+                    )
+
+        writer.flush()
+
+        self.log_writer_stats(
+            writer.stats
+        )
+
+        return compiled_ids
+
+    # =====================================================
+    # WRITE STATS
+    # =====================================================
+
+    def log_writer_stats(
+
+        self,
+
+        stats,
+    ):
+
+        runtime_log(
+
+            True,
+
+            "RUNTIME BULK WRITE",
+
+            {
+
+                **stats,
+
+                "seconds":
+                    round(stats["seconds"], 3),
+            },
+        )
+
+    # =====================================================
+    # PROCESS MODE
+    # =====================================================
+
+    def compile_with_processes(
+
+        self,
+
+        ids,
+
+        processes,
+
+        chunk_size,
+
+        skip_unchanged,
+    ):
+
+        stats = run_compile_pool(
+
+            ids,
+
+            processes,
+
+            chunk_size=chunk_size,
+
+            skip_unchanged=skip_unchanged,
+
+            on_error=lambda product_id, message: runtime_log(
+
+                True,
+
+                "RUNTIME ERROR",
+
+                {
+
+                    "product_id":
+                        product_id,
+
+                    "error":
+                        message,
+                },
+            ),
+        )
+
+        runtime_log(
+
+            True,
+
+            "PROCESS COMPILE TIMINGS",
+
+            {
+
+                "compiled":
+                    len(stats["compiled_ids"]),
+
+                "unchanged":
+                    stats["unchanged"],
+
+                "errors":
+                    stats["errors"],
+
+                "parent":
+                    {
+                        stage: round(seconds, 3)
+                        for stage, seconds in stats["timings"].items()
+                    },
+
+                "worker_cpu":
+                    {
+                        stage: round(seconds, 3)
+                        for stage, seconds in stats["worker_timings"].items()
+                    },
+            },
+        )
+
+        self.log_writer_stats(
+            stats["writer"]
+        )
+
+        return stats["compiled_ids"]
+
     # =====================================================
     # HANDLE
     # =====================================================
@@ -366,13 +765,65 @@ class Command(BaseCommand):
             "workers"
         )
 
+        rebuild_relations = options.get(
+            "rebuild_relations"
+        )
+
+        skip_relations = options.get(
+            "skip_relations"
+        )
+
+        incremental = options.get(
+            "incremental"
+        )
+
+        processes = options.get(
+            "processes"
+        )
+
+        chunk_size = options.get(
+            "chunk_size"
+        )
+
+        scan_hashes = options.get(
+            "scan_hashes"
+        )
+
+        if limit is None and not incremental:
+
+            limit = 10
+
+        # =================================================
+        # HASH SCAN
+        # =================================================
+
+        if scan_hashes:
+
+            runtime_log(
+
+                True,
+
+                "STALE RUNTIMES QUEUED",
+
+                enqueue_stale_runtimes(),
+            )
+
         # =================================================
         # QUERYSET
+        # incremental: indexed dirty queue only
         # =================================================
 
-        queryset = (
-            PCProduct.objects.all()
-        )
+        if incremental:
+
+            queryset = (
+                dirty_runtime_queryset()
+            )
+
+        else:
+
+            queryset = (
+                PCProduct.objects.all()
+            )
 
         # =================================================
         # MAKER FILTER
@@ -401,13 +852,41 @@ class Command(BaseCommand):
         # LIMIT
         # =================================================
 
-        queryset = list(
-
-            queryset.order_by(
-                "-id"
-            )[:limit]
+        queryset = queryset.order_by(
+            "-id"
         )
 
+        # process mode は worker 側で skip 判定できないため先に絞る
+        if (
+            processes
+            and not incremental
+            and not force
+        ):
+
+            queryset = queryset.filter(
+                semantic_runtime_compiled=False
+            )
+
+        if limit is not None:
+
+            queryset = queryset[:limit]
+
+        if processes:
+
+            queryset = list(
+
+                queryset.values_list(
+                    "id",
+                    flat=True
+                )
+            )
+
+        else:
+
+            queryset = list(
+                queryset
+            )
+
         total = len(queryset)
 
         # =================================================
@@ -428,6 +907,12 @@ class Command(BaseCommand):
                 "workers":
                     workers,
 
+                "processes":
+                    processes,
+
+                "chunk_size":
+                    chunk_size,
+
                 "force":
                     force,
 
@@ -437,6 +922,9 @@ class Command(BaseCommand):
                 "needs_runtime":
                     needs_runtime,
 
+                "incremental":
+                    incremental,
+
                 "skip_extraction":
                     skip_extraction,
 
@@ -449,66 +937,117 @@ class Command(BaseCommand):
         # PARALLEL EXECUTION
         # =================================================
 
-        with ThreadPoolExecutor(
+        if processes:
 
-            max_workers=workers
+            compiled_ids = self.compile_with_processes(
 
-        ) as executor:
+                queryset,
 
-            futures = []
+                processes,
 
-            for index, product in enumerate(
+                chunk_size,
+
+                incremental and not force,
+            )
+
+        else:
+
+            compiled_ids = self.compile_with_threads(
 
                 queryset,
 
-                start=1,
-            ):
+                workers,
 
-                future = executor.submit(
+                force,
 
-                    self.process_product,
+                skip_extraction,
 
-                    product,
+                trace_runtime,
 
-                    total,
+                needs_runtime,
 
-                    index,
+                incremental,
 
-                    force,
+                chunk_size,
+            )
 
-                    skip_extraction,
+        # =================================================
+        # CATALOG GENERATION
+        # =================================================
 
-                    trace_runtime,
+        if compiled_ids or not incremental:
 
-                    needs_runtime,
-                )
+            generation = bump_catalog_generation()
 
-                futures.append(
-                    future
+        else:
+
+            generation = get_catalog_generation()
+
+        # =================================================
+        # MATERIALIZED RELATIONS
+        # changed runtime + neighbours only
+        # =================================================
+
+        if rebuild_relations:
+
+            relation_stats = (
+                rebuild_product_relations()
+            )
+
+        elif not skip_relations:
+
+            relation_stats = (
+                refresh_product_relations(
+                    compiled_ids
                 )
+            )
 
-            # =============================================
-            # WAIT
-            # =============================================
+        else:
 
-            for future in as_completed(
-                futures
-            ):
+            relation_stats = {}
 
-                try:
+        runtime_log(
 
-                    future.result()
+            True,
 
-                except Exception as e:
+            "SEMANTIC RELATIONS UPDATED",
 
-                    runtime_log(
+            relation_stats,
+        )
 
-                        True,
+        # =================================================
+        # SIDEBAR FACETS
+        # semantic_groups は runtime からしか分からない
+        # =================================================
 
-                        "THREAD ERROR",
+        if compiled_ids or not incremental:
 
-                        str(e),
-                    )
+            runtime_log(
+
+                True,
+
+                "SEMANTIC GROUP FACETS REBUILT",
+
+                rebuild_facet_counts(
+                    facets=(FACET_SEMANTIC_GROUP,)
+                ),
+            )
+
+            # =============================================
+            # RANKING SNAPSHOT
+            # ranking v2 は snapshot から配信する
+            # =============================================
+
+            snapshot = build_ranking_snapshot()
+
+            runtime_log(
+
+                True,
+
+                "RANKING SNAPSHOT BUILT",
+
+                str(snapshot),
+            )
 
         # =================================================
         # DONE
@@ -519,4 +1058,10 @@ class Command(BaseCommand):
             True,
 
             "SEMANTIC RUNTIME COMPLETED",
+
+            {
+
+                "catalog_generation":
+                    generation,
+            },
         )
\ No newline at end of file
@@ -5,13 +5,22 @@ import gzip
 import csv
 import logging
 import chardet  # 文字コード判定用
-from datetime import datetime
+from datetime import datetime, timezone as dt_timezone
 from typing import List, Dict, Any, Optional
 
 from django.core.management.base import BaseCommand
-from django.db import transaction
 from django.utils import timezone
-from api.models import PCProduct
+from api.models import LinkshareFeedFile, LinkshareFeedRow, PCProduct
+from api.services.feed.parsers.linkshare_stream import stream_ftp_rows
+from api.services.feed.services.linkshare_stream_import import (
+    FeedRowDelta,
+    StreamImportRun,
+    check_feed_manifest,
+    finish_feed_checkpoint,
+    open_feed_checkpoint,
+    touch_pc_products,
+    upsert_pc_products,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,8 +48,15 @@ class Command(BaseCommand):
         "24501": {"prefix": "trendmicro", "maker": "トレンドマイクロ"},
     }
 
+    BATCH_SIZE = 500
+
     def add_arguments(self, parser):
         parser.add_argument('--mid', type=str, help='Merchant ID', required=True)
+        parser.add_argument('--download', action='store_true', help='旧方式: /tmp にダウンロード・解凍してから取り込む')
+        parser.add_argument('--no-resume', action='store_true', help='前回の中断位置から再開しない')
+        parser.add_argument('--resume-rows', type=int, default=0, help='指定データ行数をスキップして取り込む')
+        parser.add_argument('--resume-bytes', type=int, default=0, help='解凍後の指定バイト位置までスキップして取り込む')
+        parser.add_argument('--full', action='store_true', help='manifest / 行ハッシュが前回と同じでも全件取り込む')
 
     def handle(self, *args, **options):
         target_mid = options['mid']
@@ -54,6 +70,14 @@ class Command(BaseCommand):
         ftp = self._connect_ftp()
         if not ftp: return
 
+        if not options['download']:
+            try:
+                self._stream_import(ftp, target_mid, site_info, options)
+            finally:
+                try: ftp.quit()
+                except: ftp.close()
+            return
+
         try:
             target_filename = f"{target_mid}_{self.SID}_mp.txt.gz"
             local_gz_path = os.path.join(self.DOWNLOAD_DIR, target_filename)
@@ -108,6 +132,89 @@ class Command(BaseCommand):
                 try: ftp.quit()
                 except: ftp.close()
 
+    def _stream_import(self, ftp: ftplib.FTP, mid: str, site_info: dict, options: dict) -> None:
+        """RETR の callback → gzip 解凍 → 行パース → バッチ upsert (/tmp に展開しない)"""
+        target_filename = f"{mid}_{self.SID}_mp.txt.gz"
+        remote_size, remote_mtime = self._remote_facts(ftp, target_filename)
+
+        # 前回完了時と size / mtime が同じなら RETR しない
+        manifest = None if options['full'] else check_feed_manifest(target_filename, remote_size, remote_mtime)
+        if manifest:
+            # 前回載っていた製品は今回も載っている → cleanup_pc_catalog に落とされないよう updated_at を進める
+            touched = touch_pc_products(site_info['prefix'], seen_since=manifest.started_at)
+            self.stdout.write(self.style.SUCCESS(f"⏭️ {site_info['maker']}: /{target_filename} は前回から変更なし (skip, touched {touched:,})"))
+            return
+
+        state, committed_bytes = open_feed_checkpoint(
+            target_filename, mid, remote_size, remote_mtime, resume=not options['no_resume']
+        )
+        skip_bytes = max(options['resume_bytes'], committed_bytes)
+        skip_rows = options['resume_rows']
+        if skip_bytes or skip_rows:
+            self.stdout.write(f"⏩ Resume: skip {skip_bytes:,} bytes / {skip_rows:,} rows")
+
+        self.stdout.write(f"📡 Streaming: /{target_filename}")
+        self.stdout.write(f"📂 Processing as: {site_info['maker']}")
+
+        def apply_rows(rows, stream) -> int:
+            products = [self._build_product(row, site_info) for row in rows if len(row) >= 18]
+            return self._bulk_upsert(products)
+
+        def on_batch(saved, stream) -> None:
+            self.stdout.write(f"  … {run.saved:,} rows ({stream.compressed_bytes:,} bytes, {stream.encoding})")
+
+        # --full でも行ハッシュは記録する
+        # 未変更の行も updated_at だけは進める (cleanup_pc_catalog は updated_at で掲載終了を判定する)
+        delta = FeedRowDelta(
+            LinkshareFeedRow.TARGET_PC_PRODUCT,
+            mid,
+            only_changed=not options['full'],
+            touch=lambda skus: touch_pc_products(site_info['prefix'], skus=skus),
+        )
+        run = StreamImportRun(state, apply_rows, on_batch=on_batch, delta=delta)
+
+        try:
+            stream = stream_ftp_rows(
+                ftp,
+                target_filename,
+                run,
+                batch_size=self.BATCH_SIZE,
+                # NEC特選街はCP932確定。他は先頭で自動判定
+                encoding='cp932' if mid == "2470" else None,
+                skip_rows=skip_rows,
+                skip_bytes=skip_bytes,
+            )
+        except ftplib.error_perm as e:
+            finish_feed_checkpoint(state, LinkshareFeedFile.STATUS_FAILED)
+            self.stderr.write(self.style.ERROR(f"❌ FTP File Not Found: {target_filename} ({e})"))
+            return
+        except Exception as e:
+            finish_feed_checkpoint(state, LinkshareFeedFile.STATUS_FAILED)
+            self.stderr.write(self.style.ERROR(f"❌ Error: {str(e)} (committed {state.rows_committed:,} rows, resumable)"))
+            import traceback
+            traceback.print_exc()
+            return
+
+        if finish_feed_checkpoint(state, content_digest=stream.content_digest):
+            self.stdout.write("ℹ️ Same content digest as last run")
+        self.stdout.write(f"ℹ️ Detected Encoding: {stream.encoding} for MID {mid}")
+        self.stdout.write(self.style.SUCCESS(f"✅ {site_info['maker']} 完了: {run.saved} 件 (unchanged rows: {delta.unchanged:,})"))
+
+    def _remote_facts(self, ftp: ftplib.FTP, filename: str):
+        """(size, mtime)。取得できないサーバーでは None"""
+        size = mtime = None
+        try:
+            ftp.voidcmd('TYPE I')
+            size = ftp.size(filename)
+        except ftplib.all_errors:
+            pass
+        try:
+            resp = ftp.voidcmd(f'MDTM {filename}')
+            mtime = datetime.strptime(resp.split()[-1][:14], '%Y%m%d%H%M%S').replace(tzinfo=dt_timezone.utc)
+        except (ftplib.all_errors, ValueError):
+            pass
+        return size, mtime
+
     def _parse_and_import(self, file_path: str, mid: str, site_info: dict) -> int:
         batch = []
         import_count = 0
@@ -123,48 +230,50 @@ class Command(BaseCommand):
                 if not row or row[0] in ['TRL', 'HDR'] or len(row) < 18:
                     continue
 
-                sku = row[2].strip()
-                name = row[1].strip()
-                raw_desc = row[9].strip() or row[10].strip() or ""
-
-                # スペック抽出
-                specs = self._extract_specs(name, raw_desc)
-                spec_parts = []
-                if specs['cpu']: spec_parts.append(specs['cpu'])
-                if specs['ram']: spec_parts.append(f"{specs['ram']}GB RAM")
-                if specs['ssd']: 
-                    cap = specs['ssd']
-                    s_str = f"{cap/1024}TB" if cap >= 1024 else f"{cap}GB"
-                    spec_parts.append(f"{s_str} SSD")
-                
-                parsed_spec_prefix = " / ".join(spec_parts)
-                full_description = f"{parsed_spec_prefix} | {raw_desc}" if parsed_spec_prefix else raw_desc
-
-                product = PCProduct(
-                    unique_id=f"{site_info['prefix']}_{sku}",
-                    site_prefix=site_info['prefix'],
-                    maker=maker_name,
-                    name=name,
-                    price=self._clean_price(row[13]),
-                    url=row[8].strip(),
-                    image_url=row[6].strip(),
-                    affiliate_url=row[5].strip(),
-                    description=full_description,
-                    raw_genre=row[17].strip(),
-                    unified_genre="PC",
-                    is_active=True,
-                    updated_at=timezone.now()
-                )
-                batch.append(product)
+                batch.append(self._build_product(row, site_info))
                 import_count += 1
                 
-                if len(batch) >= 100:
+                if len(batch) >= self.BATCH_SIZE:
                     self._bulk_upsert(batch)
                     batch = []
 
             if batch: self._bulk_upsert(batch)
         return import_count
 
+    def _build_product(self, row: List[str], site_info: dict) -> PCProduct:
+        sku = row[2].strip()
+        name = row[1].strip()
+        raw_desc = row[9].strip() or row[10].strip() or ""
+
+        # スペック抽出
+        specs = self._extract_specs(name, raw_desc)
+        spec_parts = []
+        if specs['cpu']: spec_parts.append(specs['cpu'])
+        if specs['ram']: spec_parts.append(f"{specs['ram']}GB RAM")
+        if specs['ssd']: 
+            cap = specs['ssd']
+            s_str = f"{cap/1024}TB" if cap >= 1024 else f"{cap}GB"
+            spec_parts.append(f"{s_str} SSD")
+        
+        parsed_spec_prefix = " / ".join(spec_parts)
+        full_description = f"{parsed_spec_prefix} | {raw_desc}" if parsed_spec_prefix else raw_desc
+
+        return PCProduct(
+            unique_id=f"{site_info['prefix']}_{sku}",
+            site_prefix=site_info['prefix'],
+            maker=site_info['maker'],
+            name=name,
+            price=self._clean_price(row[13]),
+            url=row[8].strip(),
+            image_url=row[6].strip(),
+            affiliate_url=row[5].strip(),
+            description=full_description,
+            raw_genre=row[17].strip(),
+            unified_genre="PC",
+            is_active=True,
+            updated_at=timezone.now()
+        )
+
     def _extract_specs(self, name: str, desc: str) -> Dict[str, Any]:
         text = f"{name} {desc}"
         cpu = re.search(r'(Core\s?i[3579]|Ryzen\s?[3579]|Ultra\s?\d|Snapdragon|Xeon|Celeron|Pentium)', text, re.I)
@@ -182,19 +291,9 @@ class Command(BaseCommand):
         try: return int(float(re.sub(r'[^\d.]', '', p_str)))
         except: return 0
 
-    def _bulk_upsert(self, batch: List[PCProduct]):
-        with transaction.atomic():
-            for item in batch:
-                PCProduct.objects.update_or_create(
-                    unique_id=item.unique_id,
-                    defaults={
-                        'site_prefix': item.site_prefix, 'maker': item.maker, 'name': item.name,
-                        'price': item.price, 'url': item.url, 'image_url': item.image_url,
-                        'affiliate_url': item.affiliate_url, 'description': item.description,
-                        'raw_genre': item.raw_genre, 'unified_genre': item.unified_genre,
-                        'is_active': item.is_active, 'updated_at': item.updated_at,
-                    }
-                )
+    def _bulk_upsert(self, batch: List[PCProduct]) -> int:
+        # INSERT ... ON CONFLICT (unique_id) DO UPDATE を 1 文で
+        return upsert_pc_products(batch)
 
     def _connect_ftp(self) -> Optional[ftplib.FTP]:
         try:
@@ -10,6 +10,10 @@ from api.models import (
     AdultAttribute,
 )
 
+from api.utils.attribute_tagger import (
+    retag_pc_catalog,
+)
+
 
 class Command(BaseCommand):
 
@@ -27,6 +31,12 @@ class Command(BaseCommand):
             type=str,
         )
 
+        parser.add_argument(
+            "--retag",
+            action="store_true",
+            help="インポート後に compiled tagger で PC 全製品を再タグ付け",
+        )
+
     def handle(
         self,
         *args,
@@ -375,6 +385,21 @@ class Command(BaseCommand):
             self.stdout.write("")
             self.stdout.write("=" * 60)
 
+            # =====================================================
+            # Retag
+            # 属性マスターを作り直すと紐付けも消えるため全件付け直す
+            # =====================================================
+
+            if options["retag"]:
+
+                stats = retag_pc_catalog()
+
+                self.stdout.write(
+                    f"Retag             : "
+                    f"{stats['products']} products / "
+                    f"{stats['added']} links"
+                )
+
         except Exception as e:
 
             self.stderr.write(
@@ -12,6 +12,7 @@ from typing import List, Tuple, Dict, Any, Optional, Set
 from decimal import Decimal, InvalidOperation
 import math 
 import logging 
+from contextlib import nullcontext
 from logging import Logger
 
 # ⭐ tqdmのインポート
@@ -23,6 +24,19 @@ from django.db import transaction, IntegrityError
 from django.utils import timezone
 from django.conf import settings 
 
+from api.models import LinkshareFeedFile, LinkshareFeedRow
+from api.services.feed.parsers.linkshare_stream import stream_ftp_rows
+from api.services.feed.services.linkshare_stream_import import (
+    LINKSHARE_UPSERT_FIELDS,
+    FeedRowDelta,
+    StreamImportRun,
+    check_feed_manifest,
+    finish_feed_checkpoint,
+    open_feed_checkpoint,
+    touch_linkshare_products,
+    upsert_linkshare_products,
+)
+
 # ==============================================================================
 # グローバル設定と初期化
 # ==============================================================================
@@ -646,6 +660,72 @@ def download_file(ftp_client: ftplib.FTP, filename: str, local_path_gz: str, loc
         return False, 0
 
 
+# ==============================================================================
+# ストリーミング取り込み (ダウンロード/解凍ファイルを作らない)
+# ==============================================================================
+
+# upsert で書き込むフィールド (C4 description 等モデルに無いキーは落とす)
+STREAM_RECORD_FIELDS = set(LINKSHARE_UPSERT_FIELDS) | {'merchant_id', 'sku'}
+
+
+def stream_and_process_file(ftp_client: ftplib.FTP, filename: str, mid: str, file_size: int, mtime_dt: Optional[datetime], resume: bool = True, skip_rows: int = 0, skip_bytes: int = 0, full: bool = False) -> Tuple[bool, int]:
+    """RETR の callback → gzip 解凍 → 行ハッシュ比較 → 変わった行だけパース → バッチ upsert。バッチごとに commit し再開位置を記録する。"""
+
+    state, committed_bytes = open_feed_checkpoint(filename, mid, file_size, mtime_dt, resume=resume)
+    skip_bytes = max(skip_bytes, committed_bytes)
+
+    if skip_bytes or skip_rows:
+        logger.info(f"⏩ [MID: {mid}] 再開: 解凍後 {human_readable_size(skip_bytes)} / {skip_rows:,} 行目までスキップ")
+
+    def apply_rows(rows: List[List[str]], stream) -> int:
+        records = []
+        for row in rows:
+            if len(row) != EXPECTED_COLUMNS_COUNT:
+                continue
+            record = _parse_single_row(row, mid, stream.advertiser_name or 'N/A')
+            if not record or not record.get('sku') or record.get('price') is None:
+                continue
+            records.append({k: v for k, v in record.items() if k in STREAM_RECORD_FIELDS})
+        return upsert_linkshare_products(records)
+
+    with tqdm(total=file_size, unit='B', unit_scale=True, desc=f"📦 Streaming MID {mid}", file=sys.stdout, leave=True) as progress_bar:
+
+        def on_batch(saved: int, stream) -> None:
+            progress_bar.update(stream.compressed_bytes - progress_bar.n)
+            progress_bar.set_postfix_str(f"DB Save: {run.saved:,} rows")
+
+        # --full でも行ハッシュは記録する (次回から差分に戻れるように)
+        # 未変更の行も updated_at は進める (更新日時 = 最後にフィードで見た日時)
+        delta = FeedRowDelta(
+            LinkshareFeedRow.TARGET_LINKSHARE,
+            mid,
+            only_changed=not full,
+            touch=lambda skus: touch_linkshare_products(mid, skus=skus),
+        )
+        run = StreamImportRun(state, apply_rows, on_batch=on_batch, delta=delta)
+
+        try:
+            stream = stream_ftp_rows(
+                ftp_client,
+                filename,
+                run,
+                batch_size=BATCH_SIZE,
+                encoding='utf-8',
+                skip_rows=skip_rows,
+                skip_bytes=skip_bytes,
+            )
+        except Exception as e:
+            finish_feed_checkpoint(state, LinkshareFeedFile.STATUS_FAILED)
+            logger.error(f"❌ [MID: {mid}] ストリーミング取り込み中にエラー (確定済み {state.rows_committed:,} 行から再開可能): {e}", exc_info=True)
+            return False, run.saved
+
+    same_content = finish_feed_checkpoint(state, content_digest=stream.content_digest)
+    if same_content:
+        logger.info(f"ℹ️ [MID: {mid}] 圧縮ファイルの内容は前回と同一 (digest 一致)")
+    logger.info(f"✅ [MID: {mid}] ストリーミング完了。読込: {stream.rows_read:,} 行 (スキップ {stream.rows_skipped:,} / 未変更 {delta.unchanged:,}) / 保存: {run.saved:,} 件")
+    return True, run.saved
+
+
 # ==============================================================================
 # Django Management Command の定義
 # ==============================================================================
@@ -666,6 +746,33 @@ class Command(BaseCommand):
             help='処理するファイルの最大数。デバッグやテスト時に便利です。',
             default=None
         )
+        parser.add_argument(
+            '--download',
+            action='store_true',
+            help='旧方式: /tmp にダウンロード・解凍してからパースします (ファイル単位の一括トランザクション)。',
+        )
+        parser.add_argument(
+            '--no-resume',
+            action='store_true',
+            help='前回中断位置からの再開を行わず、ファイル先頭から取り込みます。',
+        )
+        parser.add_argument(
+            '--resume-rows',
+            type=int,
+            default=0,
+            help='指定したデータ行数をスキップしてから取り込みます (--mid と併用)。',
+        )
+        parser.add_argument(
+            '--resume-bytes',
+            type=int,
+            default=0,
+            help='解凍後の指定バイト位置までスキップしてから取り込みます (--mid と併用)。',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='manifest / 行ハッシュが前回と同じでも全件取り込みます。',
+        )
         # verbosityはBaseCommandにデフォルトで定義されています (0=ERROR, 1=INFO, 2=DEBUG, 3=TRACE)
 
     def handle(self, *args, **options):
@@ -798,39 +905,66 @@ class Command(BaseCommand):
                     results.append(result)
                     continue # 次のファイルへスキップ
                     
+                # 前回完了時と size / mtime が同じファイルは取得しない
+                if not options['download'] and not options['full']:
+                    manifest = check_feed_manifest(filename, file_size, mtime_dt)
+                    if manifest:
+                        # 前回載っていた商品 (前回の開始以降に更新された行) は今回も載っている
+                        touched = touch_linkshare_products(mid, seen_since=manifest.started_at)
+                        logger.info(f"⏭️ [MID: {mid}] 前回取り込み ({manifest.finished_at:%Y-%m-%d %H:%M}) から変更なし。スキップしました。(updated_at 更新 {touched:,} 件)")
+                        result.update({'result': '✅', 'reason': '変更なし (スキップ)'})
+                        results.append(result)
+                        continue
+
                 # ローカルパスの決定
                 local_gz_path = os.path.join(DOWNLOAD_DIR, filename)
                 local_txt_path = local_gz_path.replace('.gz', '.txt')
 
                 # トランザクション処理 (Atomic: 失敗時ロールバック)
-                with transaction.atomic():
+                # ストリーミングはバッチ単位で commit するためファイル単位の atomic は張らない
+                with (transaction.atomic() if options['download'] else nullcontext()):
                     success = False
                     current_saved_rows = 0
                     reason_msg = ""
                     try:
-                        # 1. ダウンロードと解凍 (tqdm対応)
-                        is_downloaded, downloaded_size = download_file(
-                            ftp_client, 
-                            filename, 
-                            local_gz_path, 
-                            local_txt_path, 
-                            mid, 
-                            file_size
-                        )
+                        if not options['download']:
+                            success, current_saved_rows = stream_and_process_file(
+                                ftp_client,
+                                filename,
+                                mid,
+                                file_size,
+                                mtime_dt,
+                                resume=not options['no_resume'],
+                                skip_rows=options['resume_rows'],
+                                skip_bytes=options['resume_bytes'],
+                                full=options['full'],
+                            )
+                            if not success:
+                                reason_msg = "ストリーミング取り込み失敗 (再実行で中断位置から再開)"
+                        else:
+                            # 1. ダウンロードと解凍 (tqdm対応)
+                            is_downloaded, downloaded_size = download_file(
+                                ftp_client, 
+                                filename, 
+                                local_gz_path, 
+                                local_txt_path, 
+                                mid, 
+                                file_size
+                            )
                         
-                        if is_downloaded:
-                            # 2. パースと保存 (tqdm対応)
-                            success, current_saved_rows = parse_and_process_file(local_txt_path, mid) 
+                            if is_downloaded:
+                                # 2. パースと保存 (tqdm対応)
+                                success, current_saved_rows = parse_and_process_file(local_txt_path, mid) 
                             
-                            # 3. 処理済みTXTファイルのクリーンアップ
-                            if os.path.exists(local_txt_path):
-                                os.remove(local_txt_path)
-                                logger.info(f"🧹 [MID: {mid}] 処理済みファイル {os.path.basename(local_txt_path)} を削除しました。") 
+                                # 3. 処理済みTXTファイルのクリーンアップ
+                                if os.path.exists(local_txt_path):
+                                    os.remove(local_txt_path)
+                                    logger.info(f"🧹 [MID: {mid}] 処理済みファイル {os.path.basename(local_txt_path)} を削除しました。") 
                             
-                            if not success:
-                                reason_msg = "パース/DB保存処理失敗"
-                        else:
-                            reason_msg = "FTPダウンロード失敗"
+                                if not success:
+                                    reason_msg = "パース/DB保存処理失敗"
+                            else:
+                                reason_msg = "FTPダウンロード失敗"
                         
                     except Exception as e:
                         # 処理中の致命的なエラーを捕捉し、ロールバック
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+# api/management/commands/rebuild_facet_counts.py
+
+from django.core.management.base import (
+    BaseCommand,
+)
+
+from api.services.facet_count_service import (
+    FACETS,
+    rebuild_facet_counts,
+)
+
+
+# ==========================================================
+# COMMAND
+# ==========================================================
+
+class Command(BaseCommand):
+
+    help = (
+        "Rebuild PCFacetCount from attribute links / semantic runtime "
+        "(差分更新を通らない一括変更の後に実行)"
+    )
+
+    # ======================================================
+    # ARGUMENTS
+    # ======================================================
+
+    def add_arguments(self, parser):
+
+        parser.add_argument(
+            "--facet",
+            action="append",
+            choices=FACETS,
+            help="対象 facet (複数指定可 / 省略時は全 facet)",
+        )
+
+    # ======================================================
+    # HANDLE
+    # ======================================================
+
+    def handle(
+
+        self,
+
+        *args,
+
+        **options,
+
+    ):
+
+        stats = rebuild_facet_counts(
+            facets=options.get("facet") or FACETS
+        )
+
+        for facet, rows in stats.items():
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"FACET COUNTS: {facet} {rows} rows"
+                )
+            )
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+# api/management/commands/rebuild_search_documents.py
+
+from django.core.management.base import (
+    BaseCommand,
+)
+
+from api.models import (
+    PCProduct,
+)
+
+from api.utils.catalog_generation import (
+    bump_catalog_generation,
+)
+
+from api.utils.search_text import (
+    SEARCH_DOCUMENT_FIELDS,
+    build_search_document,
+)
+
+
+# ==========================================================
+# COMMAND
+# ==========================================================
+
+class Command(BaseCommand):
+
+    help = (
+        "Rebuild PCProduct.search_document "
+        "(queryset.update 等 save() を通らない更新の後に実行)"
+    )
+
+    CHUNK_SIZE = 2000
+
+    # ======================================================
+    # HANDLE
+    # ======================================================
+
+    def handle(
+
+        self,
+
+        *args,
+
+        **options,
+
+    ):
+
+        scanned = 0
+
+        updated = 0
+
+        batch = []
+
+        for product in (
+
+            PCProduct.objects
+
+            .order_by("id")
+
+            .only(
+                "id",
+                "search_document",
+                *SEARCH_DOCUMENT_FIELDS
+            )
+
+            .iterator(
+                chunk_size=self.CHUNK_SIZE
+            )
+        ):
+
+            scanned += 1
+
+            document = build_search_document(
+                product
+            )
+
+            if document == product.search_document:
+                continue
+
+            product.search_document = document
+
+            batch.append(product)
+
+            if len(batch) >= self.CHUNK_SIZE:
+
+                updated += self.flush(batch)
+
+                batch = []
+
+        updated += self.flush(batch)
+
+        # in-memory n-gram index を作り直させる
+        if updated:
+
+            bump_catalog_generation()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"SEARCH DOCUMENT: {updated} / {scanned} updated"
+            )
+        )
+
+    def flush(self, batch):
+
+        if not batch:
+            return 0
+
+        PCProduct.objects.bulk_update(
+            batch,
+            ["search_document"],
+        )
+
+        return len(batch)
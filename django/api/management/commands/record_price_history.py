@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 from django.core.management.base import BaseCommand
-from api.models.pc_products import PCProduct, PriceHistory
-from django.utils.timezone import now
+from api.models.pc_products import PCProduct
+from api.services.price_history_service import (
+    rebuild_monthly_rollup,
+    record_price_changes,
+)
 
 class Command(BaseCommand):
     help = '現在の製品価格をPriceHistoryに記録します（価格変動がある場合のみ）'
@@ -9,10 +12,17 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--maker', type=str, help='特定のメーカーのみ実行')
         parser.add_argument('--all', action='store_true', help='全製品を対象に実行')
+        parser.add_argument('--rebuild-rollup', action='store_true', help='PriceHistory 全件から月次ロールアップを作り直す')
 
     def handle(self, *args, **options):
+        if options['rebuild_rollup']:
+            written = rebuild_monthly_rollup()
+            self.stdout.write(self.style.SUCCESS(f"✅ 月次ロールアップを再構築しました: {written} 行"))
+            if not options['maker'] and not options['all']:
+                return
+
         products = PCProduct.objects.filter(is_active=True)
-        
+
         if options['maker']:
             products = products.filter(maker=options['maker'])
             self.stdout.write(f"🔎 メーカー指定: {options['maker']}")
@@ -20,24 +30,9 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR("❌ --maker [name] または --all を指定してください"))
             return
 
-        count = 0
-        skipped = 0
-
-        for product in products:
-            # 最新の履歴を取得
-            last_history = PriceHistory.objects.filter(product=product).order_by('-recorded_at').first()
-
-            # 履歴がない、または最新履歴と価格が異なる場合のみ保存
-            if not last_history or last_history.price != product.price:
-                PriceHistory.objects.create(
-                    product=product,
-                    price=product.price,
-                    recorded_at=now()
-                )
-                count += 1
-            else:
-                skipped += 1
+        # 現在価格 1 query + 直近履歴 1 query → 差分だけ bulk_create
+        stats = record_price_changes(products)
 
         self.stdout.write(self.style.SUCCESS(
-            f"✅ 完了: {count} 件の価格変更を記録しました（変動なし: {skipped} 件）"
-        ))
\ No newline at end of file
+            f"✅ 完了: {stats['recorded']} 件の価格変更を記録しました（変動なし: {stats['unchanged']} 件）"
+        ))
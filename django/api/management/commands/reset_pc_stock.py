@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
 from api.models.pc_products import PCProduct
+from api.services.facet_count_service import rebuild_facet_counts
+from api.utils.catalog_generation import bump_catalog_generation
 
 
 class Command(BaseCommand):
@@ -11,6 +13,12 @@ class Command(BaseCommand):
             stock_status="在庫なし"
         )
 
+        # queryset.update は signal を通らないため明示的に世代を進める
+        bump_catalog_generation()
+
+        # is_active を一括で倒すので facet 件数も集計し直す
+        rebuild_facet_counts()
+
         self.stdout.write(
             self.style.SUCCESS(f"✅ Reset stock: {updated} items")
         )
\ No newline at end of file
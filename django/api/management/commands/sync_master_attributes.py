@@ -18,6 +18,20 @@ class Command(BaseCommand):
         '安全同期します'
     )
 
+    def add_arguments(self, parser):
+
+        parser.add_argument(
+            '--retag',
+            action='store_true',
+            help='同期後に compiled tagger で PC 全製品を再タグ付け',
+        )
+
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='--retag 時、ヒットしなくなった属性の紐付けを外す',
+        )
+
     # =====================================================
     # MAIN
     # =====================================================
@@ -415,6 +429,12 @@ class Command(BaseCommand):
                 )
             )
 
+            if options['retag']:
+
+                self.retag(
+                    options['prune']
+                )
+
         except Exception as e:
 
             self.stdout.write(
@@ -425,4 +445,27 @@ class Command(BaseCommand):
                     f"{str(e)}"
 
                 )
-            )
\ No newline at end of file
+            )
+
+    # =====================================================
+    # RETAG
+    # =====================================================
+    def retag(self, prune):
+
+        from api.utils.attribute_tagger import (
+            retag_pc_catalog
+        )
+
+        stats = retag_pc_catalog(
+            prune=prune
+        )
+
+        self.stdout.write(
+
+            self.style.SUCCESS(
+
+                f"🏷️ retag: "
+                f"{stats['products']} products / "
+                f"+{stats['added']} -{stats['removed']} links"
+            )
+        )
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.1 on 2026-10-17 15:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_catalog_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PCProductRelation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='順位')),
+                ('score', models.FloatField(default=0, verbose_name='エッジスコア')),
+                ('edge_type', models.CharField(default='', max_length=50, verbose_name='エッジ種別')),
+                ('workflow_relation', models.CharField(default='', max_length=50, verbose_name='ワークフロー関係')),
+                ('explanations', models.JSONField(blank=True, default=list, verbose_name='エッジ説明')),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='計算日時')),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='semantic_relations', to='api.pcproduct', verbose_name='起点製品')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.pcproduct', verbose_name='関連製品')),
+            ],
+            options={
+                'verbose_name': '関連製品エッジ',
+                'verbose_name_plural': '関連製品エッジ一覧',
+                'ordering': ['source', 'rank'],
+                'indexes': [models.Index(fields=['source', 'rank'], name='pcrelation_source_rank_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pcproductrelation',
+            constraint=models.UniqueConstraint(fields=('source', 'target'), name='uniq_pcproductrelation_source_target'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.1 on 2026-10-17 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_pcproductrelation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pcproduct',
+            name='semantic_runtime_dirty',
+            field=models.BooleanField(db_index=True, default=True, verbose_name='Semantic Runtime Dirty'),
+        ),
+        migrations.AddField(
+            model_name='pcproduct',
+            name='semantic_source_hash',
+            field=models.CharField(blank=True, default='', max_length=40, verbose_name='Semantic Source Hash'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.1 on 2026-10-17 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_semantic_source_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkshareFeedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255, unique=True, verbose_name='FTPファイル名')),
+                ('merchant_id', models.CharField(db_index=True, max_length=32, verbose_name='マーチャントID (MID)')),
+                ('remote_size', models.BigIntegerField(blank=True, null=True, verbose_name='リモートサイズ')),
+                ('remote_mtime', models.DateTimeField(blank=True, null=True, verbose_name='リモート更新日時')),
+                ('status', models.CharField(choices=[('running', '取り込み中'), ('done', '完了'), ('failed', '失敗')], default='running', max_length=20, verbose_name='状態')),
+                ('rows_committed', models.BigIntegerField(default=0, verbose_name='確定済み行数')),
+                ('bytes_committed', models.BigIntegerField(default=0, verbose_name='確定済み解凍後バイト位置')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='開始日時')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完了日時')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新日時')),
+            ],
+            options={
+                'verbose_name': 'LinkShareフィード取り込み状態',
+                'verbose_name_plural': 'LinkShareフィード取り込み状態一覧',
+                'db_table': 'linkshare_feed_files',
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.1 on 2026-10-17 15:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_linkshare_feed_file'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkshareFeedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(max_length=20, verbose_name='取り込み先')),
+                ('merchant_id', models.CharField(max_length=32, verbose_name='マーチャントID (MID)')),
+                ('sku', models.CharField(max_length=256, verbose_name='SKU')),
+                ('row_hash', models.CharField(max_length=40, verbose_name='行 SHA1')),
+            ],
+            options={
+                'verbose_name': 'LinkShareフィード行ハッシュ',
+                'verbose_name_plural': 'LinkShareフィード行ハッシュ一覧',
+                'db_table': 'linkshare_feed_rows',
+            },
+        ),
+        migrations.AddField(
+            model_name='linksharefeedfile',
+            name='checked_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='最終確認日時'),
+        ),
+        migrations.AddField(
+            model_name='linksharefeedfile',
+            name='content_digest',
+            field=models.CharField(blank=True, default='', max_length=40, verbose_name='圧縮ファイル SHA1'),
+        ),
+        migrations.AddField(
+            model_name='linksharefeedfile',
+            name='rows_changed',
+            field=models.BigIntegerField(default=0, verbose_name='変更行数'),
+        ),
+        migrations.AddField(
+            model_name='linksharefeedfile',
+            name='rows_unchanged',
+            field=models.BigIntegerField(default=0, verbose_name='未変更行数'),
+        ),
+        migrations.AddConstraint(
+            model_name='linksharefeedrow',
+            constraint=models.UniqueConstraint(fields=('target', 'merchant_id', 'sku'), name='unique_feed_row_target_mid_sku'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.1 on 2026-10-17 16:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+PRICE_HISTORY_INDEX = "price_hist_prod_rec_idx"
+
+
+def price_history_index(schema_editor):
+    # INCLUDE (covering index) は PostgreSQL のみ。他の backend は (product, -recorded_at) だけ
+    include = ("price",) if schema_editor.connection.vendor == "postgresql" else ()
+
+    return models.Index(
+        fields=["product", "-recorded_at"],
+        include=include,
+        name=PRICE_HISTORY_INDEX,
+    )
+
+
+def create_price_history_index(apps, schema_editor):
+    schema_editor.add_index(
+        apps.get_model("api", "PriceHistory"),
+        price_history_index(schema_editor),
+    )
+
+
+def drop_price_history_index(apps, schema_editor):
+    schema_editor.remove_index(
+        apps.get_model("api", "PriceHistory"),
+        price_history_index(schema_editor),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_linkshare_feed_manifest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceHistoryMonthly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='対象月 (1日)')),
+                ('open_price', models.IntegerField(verbose_name='月初価格')),
+                ('close_price', models.IntegerField(verbose_name='月末価格')),
+                ('min_price', models.IntegerField(verbose_name='最安値')),
+                ('max_price', models.IntegerField(verbose_name='最高値')),
+                ('samples', models.IntegerField(default=0, verbose_name='記録件数')),
+                ('last_recorded_at', models.DateTimeField(verbose_name='最終記録日時')),
+            ],
+            options={
+                'verbose_name': '価格履歴 (月次)',
+                'verbose_name_plural': '価格履歴 (月次) 一覧',
+            },
+        ),
+        # state は plain index / DB 側は PostgreSQL のときだけ price を INCLUDE
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='pricehistory',
+                    index=models.Index(fields=['product', '-recorded_at'], name=PRICE_HISTORY_INDEX),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_price_history_index, drop_price_history_index),
+            ],
+        ),
+        migrations.AddField(
+            model_name='pricehistorymonthly',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history_monthly', to='api.pcproduct', verbose_name='対象製品'),
+        ),
+        migrations.AddConstraint(
+            model_name='pricehistorymonthly',
+            constraint=models.UniqueConstraint(fields=('product', 'month'), name='unique_price_monthly_product_month'),
+        ),
+    ]
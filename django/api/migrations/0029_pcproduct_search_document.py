@@ -0,0 +1,68 @@
+# Generated by Django 4.2.1 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+from api.utils.search_text import (
+    SEARCH_DOCUMENT_FIELDS,
+    build_search_document,
+)
+
+
+TRGM_INDEX = "pcproduct_search_doc_trgm"
+
+
+def backfill_search_document(apps, schema_editor):
+    PCProduct = apps.get_model("api", "PCProduct")
+
+    batch = []
+
+    for product in (
+        PCProduct.objects
+        .only("id", *SEARCH_DOCUMENT_FIELDS)
+        .iterator(chunk_size=2000)
+    ):
+        product.search_document = build_search_document(product)
+        batch.append(product)
+
+        if len(batch) >= 2000:
+            PCProduct.objects.bulk_update(batch, ["search_document"])
+            batch = []
+
+    if batch:
+        PCProduct.objects.bulk_update(batch, ["search_document"])
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm は PostgreSQL のみ (SQLite では in-memory n-gram index を使う)
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {TRGM_INDEX} "
+        f"ON api_pcproduct USING gin (search_document gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(f"DROP INDEX IF EXISTS {TRGM_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_price_history_timeseries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pcproduct',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, help_text='name / maker / series / cpu_model 等を正規化して連結 (pg_trgm index)', verbose_name='検索用ドキュメント'),
+        ),
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
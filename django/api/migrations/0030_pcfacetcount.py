@@ -0,0 +1,34 @@
+# Generated by Django 4.2.1 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_pcproduct_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PCFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('attribute', 'PC属性'), ('semantic_group', 'Semantic Group')], max_length=20, verbose_name='facet 種別')),
+                ('key', models.CharField(help_text='attribute id / group slug', max_length=100, verbose_name='facet キー')),
+                ('unified_genre', models.CharField(blank=True, default='', max_length=50, verbose_name='統合ジャンル')),
+                ('is_active', models.BooleanField(default=True, verbose_name='掲載中')),
+                ('product_count', models.IntegerField(default=0, verbose_name='製品数')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新日時')),
+            ],
+            options={
+                'verbose_name': 'facet 件数',
+                'verbose_name_plural': 'facet 件数一覧',
+                'indexes': [models.Index(fields=['facet', 'is_active'], name='pcfacet_facet_active_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pcfacetcount',
+            constraint=models.UniqueConstraint(fields=('facet', 'key', 'unified_genre', 'is_active'), name='uniq_pcfacetcount_facet_key_genre_active'),
+        ),
+    ]
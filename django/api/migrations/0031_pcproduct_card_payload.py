@@ -0,0 +1,44 @@
+# Generated by Django 4.2.1 on 2026-10-17 17:10
+
+from django.db import migrations, models
+
+from api.utils.pc_projection import (
+    build_card_payload,
+)
+
+
+def backfill_card_payload(apps, schema_editor):
+    PCProduct = apps.get_model("api", "PCProduct")
+
+    batch = []
+
+    for product in (
+        PCProduct.objects
+        .only("id", "semantic_runtime")
+        .iterator(chunk_size=2000)
+    ):
+        product.card_payload = build_card_payload(product.semantic_runtime)
+        batch.append(product)
+
+        if len(batch) >= 2000:
+            PCProduct.objects.bulk_update(batch, ["card_payload"])
+            batch = []
+
+    if batch:
+        PCProduct.objects.bulk_update(batch, ["card_payload"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_pcfacetcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pcproduct',
+            name='card_payload',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='semantic_runtime から compile 時に生成 (一覧は semantic_runtime を読まない)', verbose_name='カード表示用 payload'),
+        ),
+        migrations.RunPython(backfill_card_payload, migrations.RunPython.noop),
+    ]
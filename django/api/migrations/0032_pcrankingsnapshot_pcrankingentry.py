@@ -0,0 +1,52 @@
+# Generated by Django 4.2.1 on 2026-10-17 17:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_pcproduct_card_payload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PCRankingSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(db_index=True, default=False, verbose_name='配信中')),
+                ('catalog_generation', models.PositiveIntegerField(default=0, verbose_name='build 時の catalog generation')),
+                ('product_count', models.IntegerField(default=0, verbose_name='対象製品数')),
+                ('ranking_count', models.IntegerField(default=0, verbose_name='ランキング数')),
+                ('topology', models.JSONField(blank=True, default=list, verbose_name='ranking topology (categories)')),
+                ('build_seconds', models.FloatField(default=0, verbose_name='build 時間(秒)')),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='build 日時')),
+            ],
+            options={
+                'verbose_name': 'ランキングスナップショット',
+                'verbose_name_plural': 'ランキングスナップショット一覧',
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PCRankingEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ranking_key', models.CharField(help_text='all / genre:PC / group:<slug> / attribute:<slug> / workflow:<slug>', max_length=150, verbose_name='ランキングキー')),
+                ('product_ids', models.JSONField(blank=True, default=list, verbose_name='順位順 product id')),
+                ('scores', models.JSONField(blank=True, default=list, verbose_name='順位順 score')),
+                ('product_count', models.IntegerField(default=0, verbose_name='該当製品数 (切り詰め前)')),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='api.pcrankingsnapshot', verbose_name='スナップショット')),
+            ],
+            options={
+                'verbose_name': 'ランキングエントリ',
+                'verbose_name_plural': 'ランキングエントリ一覧',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pcrankingentry',
+            constraint=models.UniqueConstraint(fields=('snapshot', 'ranking_key'), name='uniq_pcrankingentry_snapshot_key'),
+        ),
+    ]
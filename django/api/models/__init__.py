@@ -34,7 +34,11 @@ from .adult_products import (
 # ==============================================================================
 # 3. アフィリエイト・API連携関連（Linkshare / ValueCommerce）
 # ==============================================================================
-from .linkshare_products import LinkshareProduct         # 基本製品
+from .linkshare_products import (
+    LinkshareProduct,       # 基本製品
+    LinkshareFeedFile,      # フィード取り込み状態 (streaming 再開位置 / manifest)
+    LinkshareFeedRow,       # フィード行ハッシュ (差分取り込み)
+)
 from .linkshare_api_product import LinkshareApiProduct   # API直接取得データ
 from .bc_linkshare_products import BcLinkshareProduct    # Bic-v2 拡張用
 
@@ -44,7 +48,12 @@ from .bc_linkshare_products import BcLinkshareProduct    # Bic-v2 拡張用
 from .pc_products import (
     PCProduct,      # PC本体
     PCAttribute,    # PCスペック属性
-    PriceHistory    # 価格推移履歴
+    PriceHistory,   # 価格推移履歴
+    PriceHistoryMonthly,   # 価格推移 月次ロールアップ
+    PCProductRelation,  # 関連製品エッジ (materialized)
+    PCFacetCount,   # サイドバー facet 件数 (materialized)
+    PCRankingSnapshot,  # ranking v2 スナップショット
+    PCRankingEntry,     # スナップショット内のランキング
 )
 
 # ==============================================================================
@@ -75,7 +84,8 @@ from .product import Product
 # 9. Runtime Infrastructure
 # ==============================================================================
 from .runtime_models import (
-    ImageAudit,     # Image Runtime Audit Ledger
+    ImageAudit,         # Image Runtime Audit Ledger
+    CatalogGeneration,  # Catalog Cache Generation Counter
 )
 
 from .fanza_sample_movie import (
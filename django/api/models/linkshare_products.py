@@ -104,4 +104,83 @@ class LinkshareProduct(models.Model):
         indexes = [
             models.Index(fields=['merchant_id', 'updated_at'], name='normal_prod_merchan_f783d0_idx'),
             models.Index(fields=['sku'], name='normal_prod_sku_idx'), # SKU単体での検索も高速化
-        ]
\ No newline at end of file
+        ]
+
+
+# ==========================================================================
+# LinkShare フィードファイル取り込み状態 (LinkshareFeedFile)
+# - streaming import の再開位置 (row / 解凍後 byte offset)
+# - 1 ファイル 1 行。remote の size / mtime が変わったら位置は無効
+# - 前回完了時の size / mtime / digest (フィード manifest)。一致すれば取得自体を省く
+# ==========================================================================
+
+class LinkshareFeedFile(models.Model):
+
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, '取り込み中'),
+        (STATUS_DONE, '完了'),
+        (STATUS_FAILED, '失敗'),
+    ]
+
+    filename = models.CharField(max_length=255, unique=True, verbose_name="FTPファイル名")
+    merchant_id = models.CharField(max_length=32, db_index=True, verbose_name="マーチャントID (MID)")
+
+    remote_size = models.BigIntegerField(null=True, blank=True, verbose_name="リモートサイズ")
+    remote_mtime = models.DateTimeField(null=True, blank=True, verbose_name="リモート更新日時")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING, verbose_name="状態")
+    rows_committed = models.BigIntegerField(default=0, verbose_name="確定済み行数")
+    bytes_committed = models.BigIntegerField(default=0, verbose_name="確定済み解凍後バイト位置")
+
+    content_digest = models.CharField(max_length=40, blank=True, default='', verbose_name="圧縮ファイル SHA1")
+    rows_changed = models.BigIntegerField(default=0, verbose_name="変更行数")
+    rows_unchanged = models.BigIntegerField(default=0, verbose_name="未変更行数")
+    checked_at = models.DateTimeField(null=True, blank=True, verbose_name="最終確認日時")
+
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="開始日時")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="完了日時")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新日時")
+
+    def __str__(self):
+        return f"{self.filename} [{self.status}] rows={self.rows_committed}"
+
+    class Meta:
+        db_table = 'linkshare_feed_files'
+        verbose_name = 'LinkShareフィード取り込み状態'
+        verbose_name_plural = 'LinkShareフィード取り込み状態一覧'
+
+
+# ==========================================================================
+# LinkShare フィード行ハッシュ (LinkshareFeedRow)
+# - (取り込み先, MID, SKU) ごとの最終適用行の SHA1
+# - 変更のない行はパース・upsert を省く
+# ==========================================================================
+
+class LinkshareFeedRow(models.Model):
+
+    TARGET_LINKSHARE = 'linkshare'
+    TARGET_PC_PRODUCT = 'pc_product'
+
+    target = models.CharField(max_length=20, verbose_name="取り込み先")
+    merchant_id = models.CharField(max_length=32, verbose_name="マーチャントID (MID)")
+    sku = models.CharField(max_length=256, verbose_name="SKU")
+    row_hash = models.CharField(max_length=40, verbose_name="行 SHA1")
+
+    def __str__(self):
+        return f"{self.target}:{self.merchant_id}-{self.sku}"
+
+    class Meta:
+        db_table = 'linkshare_feed_rows'
+        verbose_name = 'LinkShareフィード行ハッシュ'
+        verbose_name_plural = 'LinkShareフィード行ハッシュ一覧'
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=['target', 'merchant_id', 'sku'],
+                name='unique_feed_row_target_mid_sku'
+            )
+        ]
@@ -2,6 +2,9 @@
 from django.db import models
 from django.utils.timezone import now
 
+from api.utils.pc_projection import build_card_payload
+from api.utils.search_text import SEARCH_DOCUMENT_FIELDS, build_search_document
+
 class PCAttribute(models.Model):
 
     """
@@ -373,6 +376,23 @@ class PCProduct(models.Model):
         verbose_name="Semantic Updated At"
     )
 
+    # compile 時の source text + extractor / normalizer version の hash
+    semantic_source_hash = models.CharField(
+
+        max_length=40,
+        blank=True,
+        default="",
+        verbose_name="Semantic Source Hash"
+    )
+
+    # incremental compile の queue
+    semantic_runtime_dirty = models.BooleanField(
+
+        default=True,
+        db_index=True,
+        verbose_name="Semantic Runtime Dirty"
+    )
+
     workflow_tags = models.JSONField(
 
         default=list,
@@ -444,6 +464,30 @@ class PCProduct(models.Model):
         blank=True,
         verbose_name="スペック解析実行日"
     )
+
+    # ==========================================================
+    # Search
+    # ==========================================================
+
+    search_document = models.TextField(
+        default="",
+        blank=True,
+        editable=False,
+        verbose_name="検索用ドキュメント",
+        help_text="name / maker / series / cpu_model 等を正規化して連結 (pg_trgm index)"
+    )
+
+    # ==========================================================
+    # Projection
+    # ==========================================================
+
+    card_payload = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="カード表示用 payload",
+        help_text="semantic_runtime から compile 時に生成 (一覧は semantic_runtime を読まない)"
+    )
     
     class Meta:
         verbose_name = "PC製品"
@@ -453,7 +497,43 @@ class PCProduct(models.Model):
     def __str__(self):
         return f"[{self.maker}] {self.name[:30]}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # facet 件数の差分更新用 (読み込み時の genre / is_active)
+        instance._facet_state = (
+            instance.__dict__.get("unified_genre"),
+            instance.__dict__.get("is_active"),
+        )
+        return instance
+
     def save(self, *args, **kwargs):
+        self.apply_derived_fields()
+
+        # update_fields 指定時も派生列を一緒に書く (search_document / card_payload が古くならないように)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            derived = self.derived_field_sources()
+            for field, sources in derived.items():
+                if update_fields.intersection(sources):
+                    update_fields.add(field)
+            kwargs["update_fields"] = update_fields
+
+        super().save(*args, **kwargs)
+
+    def derived_field_sources(self):
+        """{派生列: 元の列} (defer 中で組み直さなかった派生列は含めない)"""
+        deferred = self.get_deferred_fields()
+        sources = {}
+        if not deferred.intersection(SEARCH_DOCUMENT_FIELDS):
+            sources["search_document"] = SEARCH_DOCUMENT_FIELDS
+        if "semantic_runtime" not in deferred:
+            sources["card_payload"] = ("semantic_runtime",)
+        return sources
+
+    def apply_derived_fields(self):
+        """save() 時の派生フィールド。bulk_create 経路からも呼ぶ"""
         if not self.unified_genre and self.raw_genre:
             self.unified_genre = self.raw_genre
         
@@ -475,7 +555,14 @@ class PCProduct(models.Model):
             if "ダウンロード" in self.name or "DL版" in self.name:
                 self.is_download = True
 
-        super().save(*args, **kwargs)
+        # defer 中の列は読み込まない (列ごとの追加 query を避ける)
+        deferred = self.get_deferred_fields()
+
+        if not deferred.intersection(SEARCH_DOCUMENT_FIELDS):
+            self.search_document = build_search_document(self)
+
+        if "semantic_runtime" not in deferred:
+            self.card_payload = build_card_payload(self.semantic_runtime)
 
 
 class PriceHistory(models.Model):
@@ -495,6 +582,188 @@ class PriceHistory(models.Model):
         verbose_name = "価格履歴"
         verbose_name_plural = "価格履歴一覧"
         ordering = ['-recorded_at']
+        indexes = [
+            # 製品ごとの最新価格 / 直近 N 件
+            # PostgreSQL では migration 0028 が price を INCLUDE した covering index として作る
+            models.Index(
+                fields=['product', '-recorded_at'],
+                name='price_hist_prod_rec_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name[:20]} - {self.price}円 ({self.recorded_at.strftime('%Y/%m/%d')})"
+
+
+class PriceHistoryMonthly(models.Model):
+    """
+    PriceHistory の月次ロールアップ (製品 x 月で 1 行)
+    価格変動のあった月だけ持ち、変動のない月はチャート側で前月 close を引き継ぐ
+    """
+    product = models.ForeignKey(
+        PCProduct,
+        on_delete=models.CASCADE,
+        related_name='price_history_monthly',
+        verbose_name="対象製品"
+    )
+    month = models.DateField(verbose_name="対象月 (1日)")
+
+    open_price = models.IntegerField(verbose_name="月初価格")
+    close_price = models.IntegerField(verbose_name="月末価格")
+    min_price = models.IntegerField(verbose_name="最安値")
+    max_price = models.IntegerField(verbose_name="最高値")
+    samples = models.IntegerField(default=0, verbose_name="記録件数")
+
+    last_recorded_at = models.DateTimeField(verbose_name="最終記録日時")
+
+    class Meta:
+        verbose_name = "価格履歴 (月次)"
+        verbose_name_plural = "価格履歴 (月次) 一覧"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'month'],
+                name='unique_price_monthly_product_month'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.month:%Y-%m} {self.min_price}-{self.max_price}円"
+
+
+
+class PCProductRelation(models.Model):
+    """
+    semantic graph の上位エッジを保持する materialized テーブル
+    compile_semantic_runtime が runtime 変更分と近傍だけを更新する
+    """
+    source = models.ForeignKey(
+        PCProduct,
+        on_delete=models.CASCADE,
+        related_name='semantic_relations',
+        verbose_name="起点製品"
+    )
+    target = models.ForeignKey(
+        PCProduct,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="関連製品"
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name="順位")
+    score = models.FloatField(default=0, verbose_name="エッジスコア")
+    edge_type = models.CharField(max_length=50, default="", verbose_name="エッジ種別")
+    workflow_relation = models.CharField(max_length=50, default="", verbose_name="ワークフロー関係")
+    explanations = models.JSONField(default=list, blank=True, verbose_name="エッジ説明")
+    computed_at = models.DateTimeField(default=now, verbose_name="計算日時")
+
+    class Meta:
+        verbose_name = "関連製品エッジ"
+        verbose_name_plural = "関連製品エッジ一覧"
+        ordering = ['source', 'rank']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source', 'target'],
+                name='uniq_pcproductrelation_source_target',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['source', 'rank'],
+                name='pcrelation_source_rank_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.source_id} -> {self.target_id} ({self.edge_type}: {self.score})"
+
+
+class PCFacetCount(models.Model):
+    """
+    サイドバー facet 件数の materialized テーブル
+    (facet, key, unified_genre, is_active) ごとの製品数を保持し、
+    link 追加 / 削除や製品の掲載状態変更で差分更新する
+    """
+    FACET_ATTRIBUTE = "attribute"
+    FACET_SEMANTIC_GROUP = "semantic_group"
+
+    FACET_CHOICES = [
+        (FACET_ATTRIBUTE, "PC属性"),
+        (FACET_SEMANTIC_GROUP, "Semantic Group"),
+    ]
+
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES, verbose_name="facet 種別")
+    key = models.CharField(max_length=100, verbose_name="facet キー", help_text="attribute id / group slug")
+    unified_genre = models.CharField(max_length=50, default="", blank=True, verbose_name="統合ジャンル")
+    is_active = models.BooleanField(default=True, verbose_name="掲載中")
+    product_count = models.IntegerField(default=0, verbose_name="製品数")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新日時")
+
+    class Meta:
+        verbose_name = "facet 件数"
+        verbose_name_plural = "facet 件数一覧"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['facet', 'key', 'unified_genre', 'is_active'],
+                name='uniq_pcfacetcount_facet_key_genre_active',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['facet', 'is_active'],
+                name='pcfacet_facet_active_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.facet}:{self.key} [{self.unified_genre or '-'}/{int(self.is_active)}] {self.product_count}"
+
+
+class PCRankingSnapshot(models.Model):
+    """
+    ranking v2 の事前計算スナップショット (1 回の build = 1 行)
+    is_active の付け替えで新しい版へ切り替える (読み手は常に完成済みの版を見る)
+    """
+    is_active = models.BooleanField(default=False, db_index=True, verbose_name="配信中")
+    catalog_generation = models.PositiveIntegerField(default=0, verbose_name="build 時の catalog generation")
+    product_count = models.IntegerField(default=0, verbose_name="対象製品数")
+    ranking_count = models.IntegerField(default=0, verbose_name="ランキング数")
+    topology = models.JSONField(default=list, blank=True, verbose_name="ranking topology (categories)")
+    build_seconds = models.FloatField(default=0, verbose_name="build 時間(秒)")
+    built_at = models.DateTimeField(default=now, verbose_name="build 日時")
+
+    class Meta:
+        verbose_name = "ランキングスナップショット"
+        verbose_name_plural = "ランキングスナップショット一覧"
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"#{self.id} gen={self.catalog_generation} rankings={self.ranking_count}{' (active)' if self.is_active else ''}"
+
+
+class PCRankingEntry(models.Model):
+    """
+    スナップショット内の 1 ランキング (genre / group / attribute / workflow ごと)
+    上位 product id と score を順位順に保持する
+    """
+    snapshot = models.ForeignKey(
+        PCRankingSnapshot,
+        on_delete=models.CASCADE,
+        related_name='entries',
+        verbose_name="スナップショット"
+    )
+    ranking_key = models.CharField(max_length=150, verbose_name="ランキングキー", help_text="all / genre:PC / group:<slug> / attribute:<slug> / workflow:<slug>")
+    product_ids = models.JSONField(default=list, blank=True, verbose_name="順位順 product id")
+    scores = models.JSONField(default=list, blank=True, verbose_name="順位順 score")
+    product_count = models.IntegerField(default=0, verbose_name="該当製品数 (切り詰め前)")
+
+    class Meta:
+        verbose_name = "ランキングエントリ"
+        verbose_name_plural = "ランキングエントリ一覧"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['snapshot', 'ranking_key'],
+                name='uniq_pcrankingentry_snapshot_key',
+            ),
+        ]
 
     def __str__(self):
-        return f"{self.product.name[:20]} - {self.price}円 ({self.recorded_at.strftime('%Y/%m/%d')})"
\ No newline at end of file
+        return f"#{self.snapshot_id} {self.ranking_key} ({self.product_count})"
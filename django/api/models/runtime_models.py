@@ -179,4 +179,38 @@ class ImageAudit(models.Model):
         return (
             f"{self.product_id_unique} "
             f"[{self.image_status}]"
-        )
\ No newline at end of file
+        )
+
+class CatalogGeneration(models.Model):
+    """
+    SHIN CORE LINX Catalog Generation
+
+    カタログ内容が変わるたびに進む世代カウンタ。
+
+    import / semantic runtime 再コンパイル時に bump され、
+    finder などのプロセス外キャッシュはこの世代を
+    キーに含めることで古い結果を返さない。
+    """
+
+    key = models.CharField(
+        max_length=50,
+        unique=True,
+        help_text="pc_catalog 等"
+    )
+
+    generation = models.BigIntegerField(
+        default=0,
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+    )
+
+    class Meta:
+        db_table = "catalog_generations"
+
+    def __str__(self):
+        return (
+            f"{self.key} "
+            f"[{self.generation}]"
+        )
@@ -222,15 +222,35 @@ class PCProductSerializer(
         obj
     ):
 
-        try:
+        # 1 obj につき 1 回だけ組む (semantic_related の query を繰り返さない)
+        cache = self.__dict__.setdefault(
+            "_semantic_payload_cache",
+            {}
+        )
 
-            return build_semantic_product_payload(
-                obj
-            )
+        # 一覧 view は PCProductRelation から組んだ related を context で渡す
+        related = self.context.get(
+            "semantic_related"
+        )
+
+        if obj.pk not in cache:
+
+            try:
+
+                cache[obj.pk] = build_semantic_product_payload(
+                    obj,
+                    related=(
+                        related.get(obj.pk, [])
+                        if related is not None
+                        else None
+                    ),
+                )
+
+            except Exception:
 
-        except Exception:
+                cache[obj.pk] = {}
 
-            return {}
+        return cache[obj.pk]
 
     # =====================================
     # Semantic Runtime
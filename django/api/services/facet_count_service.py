@@ -0,0 +1,550 @@
+# -*- coding: utf-8 -*-
+# api/services/facet_count_service.py
+
+"""
+Sidebar facet counts
+
+PCFacetCount (facet, key, unified_genre, is_active) → product_count
+↓
+link 追加 / 削除・掲載状態変更で差分更新 (F() 加算)
+↓
+reader は PC_FACETS generation ごとに process 内 cache
+
+rebuild_facet_counts で through table / semantic_runtime から全件作り直し
+"""
+
+import threading
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from api.models import (
+    PCFacetCount,
+    PCProduct,
+)
+
+from api.utils.catalog_generation import (
+    PC_FACETS,
+    bump_catalog_generation,
+    get_catalog_generation,
+    schedule_catalog_generation_bump,
+)
+
+# ==========================================================
+# CONSTANTS
+# ==========================================================
+
+FACET_ATTRIBUTE = PCFacetCount.FACET_ATTRIBUTE
+
+FACET_SEMANTIC_GROUP = PCFacetCount.FACET_SEMANTIC_GROUP
+
+FACETS = (
+    FACET_ATTRIBUTE,
+    FACET_SEMANTIC_GROUP,
+)
+
+FACET_BATCH_SIZE = 1000
+
+
+# ==========================================================
+# DELTA
+# ==========================================================
+
+def apply_facet_delta(delta):
+
+    """
+    delta: Counter {(facet, key, unified_genre, is_active): +n / -n}
+
+    行を 0 件で確保してから同じ増減量ごとに F() で加算する
+    (並行 writer がいても件数は失われない)
+    """
+
+    delta = {
+        dim: n
+        for dim, n in delta.items()
+        if n
+    }
+
+    if not delta:
+        return 0
+
+    with transaction.atomic():
+
+        PCFacetCount.objects.bulk_create(
+
+            [
+                PCFacetCount(
+                    facet=facet,
+                    key=str(key),
+                    unified_genre=genre or "",
+                    is_active=bool(active),
+                    product_count=0,
+                )
+                for facet, key, genre, active in delta
+            ],
+
+            ignore_conflicts=True,
+
+            batch_size=FACET_BATCH_SIZE,
+        )
+
+        grouped = {}
+
+        for (facet, key, genre, active), n in delta.items():
+
+            grouped.setdefault(
+                (facet, genre or "", bool(active), n),
+                []
+            ).append(str(key))
+
+        for (facet, genre, active, n), keys in grouped.items():
+
+            PCFacetCount.objects.filter(
+                facet=facet,
+                unified_genre=genre,
+                is_active=active,
+                key__in=keys,
+            ).update(
+                product_count=F("product_count") + n
+            )
+
+    schedule_catalog_generation_bump(
+        PC_FACETS
+    )
+
+    return len(delta)
+
+
+def product_states(product_ids):
+
+    """
+    return: {product_id: (unified_genre, is_active)}
+    """
+
+    return {
+
+        product_id: (genre or "", active)
+
+        for product_id, genre, active in (
+
+            PCProduct.objects
+
+            .filter(id__in=list(product_ids))
+
+            .values_list(
+                "id",
+                "unified_genre",
+                "is_active",
+            )
+        )
+    }
+
+
+def apply_link_changes(
+
+    added=(),
+
+    removed=(),
+):
+
+    """
+    added / removed: [(product_id, attribute_id)]
+
+    PCProduct.attributes の through 行が増減したときに呼ぶ
+    """
+
+    added = list(added)
+
+    removed = list(removed)
+
+    if not added and not removed:
+        return 0
+
+    states = product_states({
+        product_id
+        for product_id, _ in added + removed
+    })
+
+    delta = Counter()
+
+    for pairs, sign in (
+        (added, 1),
+        (removed, -1),
+    ):
+
+        for product_id, attribute_id in pairs:
+
+            state = states.get(product_id)
+
+            if state is None:
+                continue
+
+            delta[(
+                FACET_ATTRIBUTE,
+                attribute_id,
+                *state,
+            )] += sign
+
+    return apply_facet_delta(delta)
+
+
+def product_facet_keys(product_ids):
+
+    """
+    return: {product_id: [(facet, key), ...]}
+    """
+
+    through = PCProduct.attributes.through
+
+    keys = {}
+
+    for product_id, attribute_id in (
+
+        through.objects
+
+        .filter(pcproduct_id__in=list(product_ids))
+
+        .values_list(
+            "pcproduct_id",
+            "pcattribute_id",
+        )
+    ):
+
+        keys.setdefault(
+            product_id,
+            []
+        ).append(
+            (FACET_ATTRIBUTE, attribute_id)
+        )
+
+    for product_id, groups in (
+
+        PCProduct.objects
+
+        .filter(id__in=list(product_ids))
+
+        .values_list(
+            "id",
+            "semantic_runtime__semantic_groups",
+        )
+    ):
+
+        for group_slug in set(groups or []):
+
+            keys.setdefault(
+                product_id,
+                []
+            ).append(
+                (FACET_SEMANTIC_GROUP, group_slug)
+            )
+
+    return keys
+
+
+def apply_state_changes(changes):
+
+    """
+    changes: {product_id: (old_state, new_state)}
+    state: (unified_genre, is_active) / None (存在しない)
+
+    製品の掲載状態 / ジャンル変更・削除で件数を付け替える
+    """
+
+    changes = {
+
+        product_id: (old, new)
+
+        for product_id, (old, new) in changes.items()
+
+        if old != new
+    }
+
+    if not changes:
+        return 0
+
+    delta = Counter()
+
+    for product_id, facet_keys in product_facet_keys(
+        changes
+    ).items():
+
+        old, new = changes[product_id]
+
+        for facet, key in facet_keys:
+
+            if old is not None:
+
+                delta[(facet, key, *old)] -= 1
+
+            if new is not None:
+
+                delta[(facet, key, *new)] += 1
+
+    return apply_facet_delta(delta)
+
+
+# ==========================================================
+# REBUILD
+# ==========================================================
+
+def count_attribute_facets():
+
+    through = PCProduct.attributes.through
+
+    return Counter({
+
+        (
+            FACET_ATTRIBUTE,
+            row["pcattribute_id"],
+            row["pcproduct__unified_genre"] or "",
+            row["pcproduct__is_active"],
+        ): row["product_count"]
+
+        for row in (
+
+            through.objects
+
+            .values(
+                "pcattribute_id",
+                "pcproduct__unified_genre",
+                "pcproduct__is_active",
+            )
+
+            .annotate(
+                product_count=Count("id")
+            )
+
+            .order_by()
+        )
+    })
+
+
+def count_semantic_group_facets():
+
+    counts = Counter()
+
+    for groups, genre, active in (
+
+        PCProduct.objects
+
+        .order_by()
+
+        .values_list(
+            "semantic_runtime__semantic_groups",
+            "unified_genre",
+            "is_active",
+        )
+
+        .iterator(chunk_size=FACET_BATCH_SIZE)
+    ):
+
+        for group_slug in set(groups or []):
+
+            counts[(
+                FACET_SEMANTIC_GROUP,
+                group_slug,
+                genre or "",
+                active,
+            )] += 1
+
+    return counts
+
+
+FACET_COUNTERS = {
+
+    FACET_ATTRIBUTE:
+        count_attribute_facets,
+
+    FACET_SEMANTIC_GROUP:
+        count_semantic_group_facets,
+}
+
+
+def rebuild_facet_counts(facets=FACETS):
+
+    """
+    facet ごとに全件集計して差し替える
+    return: {facet: 行数}
+    """
+
+    stats = {}
+
+    with transaction.atomic():
+
+        for facet in facets:
+
+            counts = FACET_COUNTERS[facet]()
+
+            PCFacetCount.objects.filter(
+                facet=facet
+            ).delete()
+
+            PCFacetCount.objects.bulk_create(
+
+                [
+                    PCFacetCount(
+                        facet=facet,
+                        key=str(key),
+                        unified_genre=genre,
+                        is_active=active,
+                        product_count=count,
+                    )
+                    for (_, key, genre, active), count in counts.items()
+                    if count > 0
+                ],
+
+                batch_size=FACET_BATCH_SIZE,
+            )
+
+            stats[facet] = len(counts)
+
+    bump_catalog_generation(
+        PC_FACETS
+    )
+
+    return stats
+
+
+# ==========================================================
+# READ
+# ==========================================================
+
+_CACHE_LOCK = threading.Lock()
+
+# {(facet, unified_genre, is_active): (generation, counts)}
+_FACET_CACHE = {}
+
+
+def get_facet_counts(
+
+    facet,
+
+    unified_genre=None,
+
+    is_active=None,
+):
+
+    """
+    return: {key: product_count} (0 件は含まない)
+
+    unified_genre / is_active が None ならその軸は合算
+    """
+
+    generation = get_catalog_generation(
+        PC_FACETS
+    )
+
+    # 一度も集計されていない (migration 直後)
+    if not generation:
+
+        with _CACHE_LOCK:
+
+            generation = get_catalog_generation(
+                PC_FACETS
+            )
+
+            if not generation:
+
+                rebuild_facet_counts()
+
+                generation = get_catalog_generation(
+                    PC_FACETS
+                )
+
+    cache_key = (
+        facet,
+        unified_genre,
+        is_active,
+    )
+
+    cached = _FACET_CACHE.get(
+        cache_key
+    )
+
+    if cached and cached[0] == generation:
+
+        return cached[1]
+
+    rows = PCFacetCount.objects.filter(
+        facet=facet
+    )
+
+    if unified_genre is not None:
+
+        rows = rows.filter(
+            unified_genre=unified_genre
+        )
+
+    if is_active is not None:
+
+        rows = rows.filter(
+            is_active=is_active
+        )
+
+    counts = Counter()
+
+    for key, count in rows.values_list(
+        "key",
+        "product_count",
+    ):
+
+        counts[key] += count
+
+    counts = {
+
+        key: count
+
+        for key, count in counts.items()
+
+        if count > 0
+    }
+
+    _FACET_CACHE[cache_key] = (
+        generation,
+        counts,
+    )
+
+    return counts
+
+
+def get_attribute_counts(
+
+    unified_genre=None,
+
+    is_active=None,
+):
+
+    """
+    return: {attribute_id: product_count}
+    """
+
+    return {
+
+        int(key): count
+
+        for key, count in get_facet_counts(
+            FACET_ATTRIBUTE,
+            unified_genre=unified_genre,
+            is_active=is_active,
+        ).items()
+    }
+
+
+def get_semantic_group_counts(
+
+    unified_genre=None,
+
+    is_active=True,
+):
+
+    """
+    return: {group_slug: product_count}
+    """
+
+    return get_facet_counts(
+        FACET_SEMANTIC_GROUP,
+        unified_genre=unified_genre,
+        is_active=is_active,
+    )
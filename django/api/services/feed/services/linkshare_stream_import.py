@@ -0,0 +1,828 @@
+# =========================================================
+# FILE:
+# api/services/feed/services/linkshare_stream_import.py
+# =========================================================
+
+"""
+LinkShare streaming import
+
+manifest (size / mtime 一致なら取得しない)
+↓
+stream rows (linkshare_stream)
+↓
+row hash 比較 (変わった行だけ残す)
+↓
+parse (caller)
+↓
+bulk_create(update_conflicts=True) per batch
+↓
+LinkshareFeedFile checkpoint + LinkshareFeedRow (同じ transaction)
+
+batch ごとに commit するため、途中で落ちても
+確定済みの解凍後 byte offset から再開できる
+"""
+
+import hashlib
+
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import (
+    LinkshareFeedFile,
+    LinkshareFeedRow,
+    LinkshareProduct,
+    PCProduct,
+)
+
+from api.services.facet_count_service import (
+    apply_state_changes,
+)
+
+from api.utils.catalog_generation import (
+    schedule_catalog_generation_bump,
+)
+
+
+# =========================================================
+# UPSERT FIELDS
+# =========================================================
+
+LINKSHARE_UPSERT_FIELDS = [
+
+    "price",
+
+    "in_stock",
+
+    "is_active",
+
+    "product_url",
+
+    "affiliate_url",
+
+    "raw_csv_data",
+
+    "updated_at",
+
+    "merchant_name",
+
+    "product_name",
+]
+
+PC_FEED_UPSERT_FIELDS = [
+
+    "site_prefix",
+
+    "maker",
+
+    "name",
+
+    "price",
+
+    "url",
+
+    "image_url",
+
+    "affiliate_url",
+
+    "description",
+
+    "raw_genre",
+
+    "unified_genre",
+
+    "is_active",
+
+    "updated_at",
+
+    # apply_derived_fields で name / maker から作り直す
+    "search_document",
+
+    # 内容が変わっていなければ compile 側で UNCHANGED になる
+    "semantic_runtime_dirty",
+]
+
+
+# SKU 列 (C3)
+FEED_ROW_KEY_INDEX = 2
+
+
+# =========================================================
+# MANIFEST
+# =========================================================
+
+def check_feed_manifest(
+
+    filename,
+
+    remote_size=None,
+
+    remote_mtime=None,
+):
+
+    """
+    前回完了時と remote の size / mtime が同じなら state を返す (skip 対象)
+
+    size / mtime が取れないサーバーでは常に None
+    """
+
+    if remote_size is None or remote_mtime is None:
+        return None
+
+    state = LinkshareFeedFile.objects.filter(
+
+        filename=filename,
+
+        status=LinkshareFeedFile.STATUS_DONE,
+
+        remote_size=remote_size,
+
+        remote_mtime=remote_mtime,
+
+    ).first()
+
+    if state is None:
+        return None
+
+    state.checked_at = timezone.now()
+
+    state.save(
+
+        update_fields=[
+            "checked_at",
+            "updated_at",
+        ]
+    )
+
+    return state
+
+
+# =========================================================
+# CHECKPOINT
+# =========================================================
+
+def open_feed_checkpoint(
+
+    filename,
+
+    merchant_id,
+
+    remote_size=None,
+
+    remote_mtime=None,
+
+    resume=True,
+):
+
+    """
+    return: (state, skip_bytes)
+
+    remote の size / mtime が前回と同じ未完了ファイルだけ再開する
+    """
+
+    state, _ = LinkshareFeedFile.objects.get_or_create(
+
+        filename=filename,
+
+        defaults={
+            "merchant_id": str(merchant_id),
+        },
+    )
+
+    same_file = (
+        state.remote_size == remote_size
+        and state.remote_mtime == remote_mtime
+    )
+
+    resumable = (
+        resume
+        and same_file
+        and state.status != LinkshareFeedFile.STATUS_DONE
+        and state.bytes_committed > 0
+    )
+
+    if not resumable:
+
+        state.rows_committed = 0
+
+        state.bytes_committed = 0
+
+        state.rows_changed = 0
+
+        state.rows_unchanged = 0
+
+    state.merchant_id = str(merchant_id)
+
+    state.remote_size = remote_size
+
+    state.remote_mtime = remote_mtime
+
+    state.status = LinkshareFeedFile.STATUS_RUNNING
+
+    state.started_at = timezone.now()
+
+    state.finished_at = None
+
+    state.checked_at = state.started_at
+
+    state.save()
+
+    return state, state.bytes_committed
+
+
+def commit_feed_checkpoint(
+
+    state,
+
+    rows,
+
+    end_offset,
+
+    unchanged=0,
+):
+
+    state.rows_committed += rows
+
+    state.bytes_committed = end_offset
+
+    state.rows_changed += rows - unchanged
+
+    state.rows_unchanged += unchanged
+
+    LinkshareFeedFile.objects.filter(
+        pk=state.pk
+    ).update(
+
+        rows_committed=state.rows_committed,
+
+        bytes_committed=state.bytes_committed,
+
+        rows_changed=state.rows_changed,
+
+        rows_unchanged=state.rows_unchanged,
+
+        updated_at=timezone.now(),
+    )
+
+
+def finish_feed_checkpoint(
+
+    state,
+
+    status=LinkshareFeedFile.STATUS_DONE,
+
+    content_digest=None,
+):
+
+    """
+    return: 前回完了時と圧縮ファイルの中身が同じか (mtime だけ変わったケース)
+    """
+
+    same_content = bool(
+        content_digest
+        and content_digest == state.content_digest
+    )
+
+    state.status = status
+
+    state.finished_at = timezone.now()
+
+    update_fields = [
+        "status",
+        "finished_at",
+        "updated_at",
+    ]
+
+    # 途中失敗の digest は部分的なので残さない
+    if content_digest and status == LinkshareFeedFile.STATUS_DONE:
+
+        state.content_digest = content_digest
+
+        update_fields.append(
+            "content_digest"
+        )
+
+    state.save(
+        update_fields=update_fields
+    )
+
+    return same_content
+
+
+# =========================================================
+# ROW DELTA
+# =========================================================
+
+def feed_row_hash(row):
+
+    return hashlib.sha1(
+
+        "\x1f".join(row).encode(
+            "utf-8",
+            errors="replace",
+        )
+
+    ).hexdigest()
+
+
+class FeedRowDelta:
+
+    """
+    rows = delta.split(rows)  -> 前回と hash が違う行だけ
+    delta.commit()            -> 今回の hash を保存 (batch と同じ transaction)
+
+    only_changed=False でも hash は記録する (--full 再取り込み用)
+
+    touch(keys) があれば未変更の行も commit() で渡す
+    (updated_at を「フィードに載っていた日時」として進め、cleanup の対象から外す)
+    """
+
+    def __init__(
+
+        self,
+
+        target,
+
+        merchant_id,
+
+        key_index=FEED_ROW_KEY_INDEX,
+
+        only_changed=True,
+
+        touch=None,
+    ):
+
+        self.target = target
+
+        self.merchant_id = str(merchant_id)
+
+        self.key_index = key_index
+
+        self.only_changed = only_changed
+
+        self.touch = touch
+
+        self.pending = {}
+
+        self.seen = []
+
+        self.unchanged = 0
+
+    def split(self, rows):
+
+        keyed = []
+
+        for row in rows:
+
+            key = None
+
+            if len(row) > self.key_index:
+
+                key = row[self.key_index].strip()[:256] or None
+
+            keyed.append(
+                (
+                    row,
+                    key,
+                    feed_row_hash(row) if key else None,
+                )
+            )
+
+        keys = {
+            key
+            for _, key, _ in keyed
+            if key
+        }
+
+        known = {}
+
+        if keys and self.only_changed:
+
+            known = dict(
+
+                LinkshareFeedRow.objects
+
+                .filter(
+
+                    target=self.target,
+
+                    merchant_id=self.merchant_id,
+
+                    sku__in=list(keys),
+                )
+
+                .values_list(
+                    "sku",
+                    "row_hash",
+                )
+            )
+
+        # 同一 batch 内の重複 SKU は後勝ち (upsert と同じ)
+        last = {
+            key: position
+            for position, (_, key, _) in enumerate(keyed)
+            if key
+        }
+
+        changed = []
+
+        for position, (row, key, row_hash) in enumerate(keyed):
+
+            if key and last[key] != position:
+                continue
+
+            if key and known.get(key) == row_hash:
+
+                self.unchanged += 1
+
+                self.seen.append(
+                    key
+                )
+
+                continue
+
+            changed.append(
+                row
+            )
+
+            if key:
+
+                self.pending[key] = row_hash
+
+        return changed
+
+    def commit(self):
+
+        if self.seen and self.touch:
+
+            self.touch(
+                self.seen
+            )
+
+        self.seen = []
+
+        if not self.pending:
+            return
+
+        pending = self.pending
+
+        self.pending = {}
+
+        LinkshareFeedRow.objects.bulk_create(
+
+            [
+
+                LinkshareFeedRow(
+
+                    target=self.target,
+
+                    merchant_id=self.merchant_id,
+
+                    sku=key,
+
+                    row_hash=row_hash,
+                )
+
+                for key, row_hash in pending.items()
+            ],
+
+            update_conflicts=True,
+
+            unique_fields=[
+                "target",
+                "merchant_id",
+                "sku",
+            ],
+
+            update_fields=[
+                "row_hash",
+            ],
+        )
+
+
+# =========================================================
+# TOUCH (未変更の行 / skip したファイル)
+# =========================================================
+
+def touch_linkshare_products(
+
+    merchant_id,
+
+    skus=None,
+
+    seen_since=None,
+):
+
+    """
+    skus: 今回のフィードで未変更だった SKU
+    seen_since: manifest skip 時は前回取り込みの started_at (前回載っていた行 = それ以降に更新された行)
+    return: 更新件数
+    """
+
+    queryset = LinkshareProduct.objects.filter(
+        merchant_id=merchant_id
+    )
+
+    if skus is not None:
+
+        queryset = queryset.filter(
+            sku__in=list(skus)
+        )
+
+    if seen_since is not None:
+
+        queryset = queryset.filter(
+            updated_at__gte=seen_since
+        )
+
+    return queryset.update(
+        updated_at=timezone.now()
+    )
+
+
+def touch_pc_products(
+
+    site_prefix,
+
+    skus=None,
+
+    seen_since=None,
+):
+
+    """
+    unique_id = f"{site_prefix}_{sku}" (import_bc_mid_ftp と同じ)
+
+    updated_at だけ進める (掲載状態は変わらないので facet / generation は触らない)
+    """
+
+    queryset = PCProduct.objects.filter(
+        site_prefix=site_prefix
+    )
+
+    if skus is not None:
+
+        queryset = queryset.filter(
+
+            unique_id__in=[
+                f"{site_prefix}_{sku}"
+                for sku in skus
+            ]
+        )
+
+    if seen_since is not None:
+
+        queryset = queryset.filter(
+            updated_at__gte=seen_since
+        )
+
+    return queryset.update(
+        updated_at=timezone.now()
+    )
+
+
+# =========================================================
+# BATCH RUNNER
+# =========================================================
+
+class StreamImportRun:
+
+    """
+    handle_batch(rows, end_offset, stream) として
+    stream_ftp_rows / stream_local_rows に渡す
+
+    apply_rows(rows, stream) -> saved 件数
+    delta (FeedRowDelta) があれば変わった行だけ apply_rows へ渡す
+    """
+
+    def __init__(
+
+        self,
+
+        state,
+
+        apply_rows,
+
+        on_batch=None,
+
+        delta=None,
+    ):
+
+        self.state = state
+
+        self.apply_rows = apply_rows
+
+        self.on_batch = on_batch
+
+        self.delta = delta
+
+        self.saved = 0
+
+        self.batches = 0
+
+    def __call__(
+
+        self,
+
+        rows,
+
+        end_offset,
+
+        stream,
+    ):
+
+        with transaction.atomic():
+
+            changed = rows
+
+            unchanged = 0
+
+            if self.delta:
+
+                changed = self.delta.split(
+                    rows
+                )
+
+                unchanged = len(rows) - len(changed)
+
+            saved = 0
+
+            if changed:
+
+                saved = self.apply_rows(
+
+                    changed,
+
+                    stream,
+                )
+
+            if self.delta:
+
+                self.delta.commit()
+
+            commit_feed_checkpoint(
+
+                self.state,
+
+                len(rows),
+
+                end_offset,
+
+                unchanged=unchanged,
+            )
+
+        self.saved += saved
+
+        self.batches += 1
+
+        if self.on_batch:
+
+            self.on_batch(
+                saved,
+                stream,
+            )
+
+
+# =========================================================
+# LINKSHARE PRODUCT UPSERT
+# =========================================================
+
+def upsert_linkshare_products(records):
+
+    """
+    records: [{field: value}, ...] (merchant_id + sku 必須)
+    return: upsert 件数
+    """
+
+    # 同一 statement 内の重複 key は ON CONFLICT で失敗するため後勝ち
+    unique = {}
+
+    for record in records:
+
+        unique[
+            (record["merchant_id"], record["sku"])
+        ] = record
+
+    if not unique:
+        return 0
+
+    LinkshareProduct.objects.bulk_create(
+
+        [
+
+            LinkshareProduct(
+                **record
+            )
+
+            for record in unique.values()
+        ],
+
+        update_conflicts=True,
+
+        unique_fields=[
+            "merchant_id",
+            "sku",
+        ],
+
+        update_fields=LINKSHARE_UPSERT_FIELDS,
+    )
+
+    return len(unique)
+
+
+# =========================================================
+# PC PRODUCT UPSERT
+# =========================================================
+
+def upsert_pc_products(products):
+
+    """
+    products: 未保存の PCProduct (unique_id 必須)
+
+    save() を通らないため派生フィールドは apply_derived_fields で補い、
+    True にしか倒さないフラグ (is_ai_pc / is_download) は別 UPDATE
+    """
+
+    unique = {}
+
+    for product in products:
+
+        product.apply_derived_fields()
+
+        unique[
+            product.unique_id
+        ] = product
+
+    if not unique:
+        return 0
+
+    # facet 件数の付け替え用 (既存製品の掲載状態 / ジャンル)
+    previous = {
+
+        unique_id: (product_id, (genre or "", active))
+
+        for unique_id, product_id, genre, active in (
+
+            PCProduct.objects
+
+            .filter(unique_id__in=list(unique))
+
+            .values_list(
+                "unique_id",
+                "id",
+                "unified_genre",
+                "is_active",
+            )
+        )
+    }
+
+    PCProduct.objects.bulk_create(
+
+        list(unique.values()),
+
+        update_conflicts=True,
+
+        unique_fields=[
+            "unique_id",
+        ],
+
+        update_fields=PC_FEED_UPSERT_FIELDS,
+    )
+
+    for flag in (
+        "is_ai_pc",
+        "is_download",
+    ):
+
+        flagged = [
+
+            unique_id
+
+            for unique_id, product in unique.items()
+
+            if getattr(product, flag)
+        ]
+
+        if flagged:
+
+            PCProduct.objects.filter(
+
+                unique_id__in=flagged
+
+            ).exclude(
+                **{flag: True}
+            ).update(
+                **{flag: True}
+            )
+
+    apply_state_changes({
+
+        product_id: (
+            state,
+            (unique[unique_id].unified_genre or "", unique[unique_id].is_active),
+        )
+
+        for unique_id, (product_id, state) in previous.items()
+    })
+
+    schedule_catalog_generation_bump()
+
+    return len(unique)
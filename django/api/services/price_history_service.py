@@ -0,0 +1,592 @@
+# -*- coding: utf-8 -*-
+# api/services/price_history_service.py
+
+"""
+PriceHistory set-based recorder
+
+current prices (1 query)
+↓
+latest history per product (DISTINCT ON / window 1 query)
+↓
+in-memory diff
+↓
+bulk_create (変動分のみ)
+↓
+PriceHistoryMonthly rollup (当月行だけ差分更新)
+"""
+
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from api.models import (
+    PriceHistory,
+    PriceHistoryMonthly,
+)
+
+# ==========================================================
+# CONSTANTS
+# ==========================================================
+
+PRICE_HISTORY_BATCH_SIZE = 1000
+
+ROLLUP_REBUILD_CHUNK_SIZE = 5000
+
+# ?months= の既定値 / 上限 (1..PRICE_CHART_MAX_MONTHS に丸める)
+PRICE_CHART_MONTHS = 12
+
+PRICE_CHART_MAX_MONTHS = 60
+
+
+# ==========================================================
+# LATEST
+# ==========================================================
+
+def latest_prices(products=None):
+
+    """
+    return: {product_id: 直近の記録価格}
+
+    products: PCProduct queryset (None なら全件)
+    """
+
+    histories = PriceHistory.objects.all()
+
+    if products is not None:
+
+        histories = histories.filter(
+            product__in=products.values("id")
+        )
+
+    # (product, -recorded_at) index をそのまま辿る
+    if connection.vendor == "postgresql":
+
+        rows = (
+
+            histories
+
+            .order_by(
+                "product_id",
+                "-recorded_at",
+                "-id",
+            )
+
+            .distinct(
+                "product_id"
+            )
+
+            .values_list(
+                "product_id",
+                "price",
+            )
+        )
+
+    else:
+
+        rows = (
+
+            histories
+
+            .annotate(
+
+                position=Window(
+
+                    expression=RowNumber(),
+
+                    partition_by=[
+                        F("product_id")
+                    ],
+
+                    order_by=[
+                        F("recorded_at").desc(),
+                        F("id").desc(),
+                    ],
+                )
+            )
+
+            .filter(
+                position=1
+            )
+
+            .values_list(
+                "product_id",
+                "price",
+            )
+        )
+
+    return dict(
+        rows
+    )
+
+
+# ==========================================================
+# RECORD
+# ==========================================================
+
+def record_price_changes(
+
+    products,
+
+    recorded_at=None,
+):
+
+    """
+    products の現在価格と直近履歴を比べ、変動分だけ記録する
+    """
+
+    recorded_at = (
+        recorded_at
+        or timezone.now()
+    )
+
+    current = dict(
+
+        products
+
+        .order_by()
+
+        .values_list(
+            "id",
+            "price",
+        )
+    )
+
+    previous = latest_prices(
+        products
+    )
+
+    changes = [
+
+        (
+            product_id,
+            previous.get(product_id),
+            price,
+        )
+
+        for product_id, price in current.items()
+
+        if price is not None
+        and previous.get(product_id) != price
+    ]
+
+    with transaction.atomic():
+
+        PriceHistory.objects.bulk_create(
+
+            [
+
+                PriceHistory(
+
+                    product_id=product_id,
+
+                    price=price,
+
+                    recorded_at=recorded_at,
+                )
+
+                for product_id, _, price in changes
+            ],
+
+            batch_size=PRICE_HISTORY_BATCH_SIZE,
+        )
+
+        update_monthly_rollup(
+
+            changes,
+
+            recorded_at,
+        )
+
+    return {
+
+        "checked":
+            len(current),
+
+        "recorded":
+            len(changes),
+
+        "unchanged":
+            len(current) - len(changes),
+    }
+
+
+# ==========================================================
+# ROLLUP
+# ==========================================================
+
+def month_of(recorded_at):
+
+    local = timezone.localtime(
+        recorded_at
+    )
+
+    return date(
+        local.year,
+        local.month,
+        1,
+    )
+
+
+def update_monthly_rollup(
+
+    changes,
+
+    recorded_at,
+):
+
+    """
+    changes: [(product_id, previous_price, price), ...]
+
+    当月行があれば close / min / max を更新、なければ前回価格を open にして作る
+    """
+
+    if not changes:
+        return
+
+    month = month_of(
+        recorded_at
+    )
+
+    existing = {
+
+        rollup.product_id: rollup
+
+        for rollup in PriceHistoryMonthly.objects.filter(
+
+            product_id__in=[
+                product_id
+                for product_id, _, _ in changes
+            ],
+
+            month=month,
+        )
+    }
+
+    created = []
+
+    updated = []
+
+    for product_id, previous_price, price in changes:
+
+        rollup = existing.get(
+            product_id
+        )
+
+        if rollup is None:
+
+            open_price = (
+                price
+                if previous_price is None
+                else previous_price
+            )
+
+            created.append(
+
+                PriceHistoryMonthly(
+
+                    product_id=product_id,
+
+                    month=month,
+
+                    open_price=open_price,
+
+                    close_price=price,
+
+                    min_price=min(open_price, price),
+
+                    max_price=max(open_price, price),
+
+                    samples=1,
+
+                    last_recorded_at=recorded_at,
+                )
+            )
+
+            continue
+
+        rollup.close_price = price
+
+        rollup.min_price = min(rollup.min_price, price)
+
+        rollup.max_price = max(rollup.max_price, price)
+
+        rollup.samples += 1
+
+        rollup.last_recorded_at = recorded_at
+
+        updated.append(
+            rollup
+        )
+
+    PriceHistoryMonthly.objects.bulk_create(
+
+        created,
+
+        batch_size=PRICE_HISTORY_BATCH_SIZE,
+    )
+
+    PriceHistoryMonthly.objects.bulk_update(
+
+        updated,
+
+        [
+            "close_price",
+            "min_price",
+            "max_price",
+            "samples",
+            "last_recorded_at",
+        ],
+
+        batch_size=PRICE_HISTORY_BATCH_SIZE,
+    )
+
+
+def rebuild_monthly_rollup():
+
+    """
+    PriceHistory 全件から月次ロールアップを作り直す (初回 / 不整合時)
+    """
+
+    rollups = []
+
+    written = 0
+
+    current = None
+
+    previous_price = None
+
+    previous_product = None
+
+    with transaction.atomic():
+
+        PriceHistoryMonthly.objects.all().delete()
+
+        for product_id, price, recorded_at in (
+
+            PriceHistory.objects
+
+            .order_by(
+                "product_id",
+                "recorded_at",
+                "id",
+            )
+
+            .values_list(
+                "product_id",
+                "price",
+                "recorded_at",
+            )
+
+            .iterator(
+                chunk_size=ROLLUP_REBUILD_CHUNK_SIZE
+            )
+        ):
+
+            if product_id != previous_product:
+
+                previous_price = None
+
+                previous_product = product_id
+
+            month = month_of(
+                recorded_at
+            )
+
+            if (
+                current is None
+                or current.product_id != product_id
+                or current.month != month
+            ):
+
+                open_price = (
+                    price
+                    if previous_price is None
+                    else previous_price
+                )
+
+                current = PriceHistoryMonthly(
+
+                    product_id=product_id,
+
+                    month=month,
+
+                    open_price=open_price,
+
+                    close_price=price,
+
+                    min_price=min(open_price, price),
+
+                    max_price=max(open_price, price),
+
+                    samples=0,
+
+                    last_recorded_at=recorded_at,
+                )
+
+                rollups.append(
+                    current
+                )
+
+            current.close_price = price
+
+            current.min_price = min(current.min_price, price)
+
+            current.max_price = max(current.max_price, price)
+
+            current.samples += 1
+
+            current.last_recorded_at = recorded_at
+
+            previous_price = price
+
+            # 最後の 1 行はまだ更新され得るので残す
+            if len(rollups) > ROLLUP_REBUILD_CHUNK_SIZE:
+
+                PriceHistoryMonthly.objects.bulk_create(
+                    rollups[:-1]
+                )
+
+                written += len(rollups) - 1
+
+                rollups = rollups[-1:]
+
+        PriceHistoryMonthly.objects.bulk_create(
+            rollups
+        )
+
+    return written + len(rollups)
+
+
+# ==========================================================
+# READ
+# ==========================================================
+
+def shift_month(month, offset):
+
+    index = month.year * 12 + month.month - 1 + offset
+
+    return date(
+        index // 12,
+        index % 12 + 1,
+        1,
+    )
+
+
+def load_price_chart(
+
+    product_id,
+
+    months=PRICE_CHART_MONTHS,
+):
+
+    """
+    直近 months ヶ月の月次 open / close / min / max
+
+    raw の PriceHistory は読まない。変動のない月は前月 close を引き継ぐ
+    """
+
+    end = month_of(
+        timezone.now()
+    )
+
+    start = shift_month(
+        end,
+        -(months - 1)
+    )
+
+    rollups = {
+
+        rollup.month: rollup
+
+        for rollup in PriceHistoryMonthly.objects.filter(
+
+            product_id=product_id,
+
+            month__gte=start,
+        )
+    }
+
+    carry = (
+
+        PriceHistoryMonthly.objects
+
+        .filter(
+            product_id=product_id,
+            month__lt=start,
+        )
+
+        .order_by(
+            "-month"
+        )
+
+        .values_list(
+            "close_price",
+            flat=True,
+        )
+
+        .first()
+    )
+
+    points = []
+
+    for offset in range(months):
+
+        month = shift_month(
+            start,
+            offset
+        )
+
+        rollup = rollups.get(
+            month
+        )
+
+        if rollup is not None:
+
+            points.append({
+
+                "month":
+                    month.strftime("%Y-%m"),
+
+                "open":
+                    rollup.open_price,
+
+                "close":
+                    rollup.close_price,
+
+                "min":
+                    rollup.min_price,
+
+                "max":
+                    rollup.max_price,
+            })
+
+            carry = rollup.close_price
+
+            continue
+
+        # 記録開始前の月は出さない
+        if carry is None:
+            continue
+
+        points.append({
+
+            "month":
+                month.strftime("%Y-%m"),
+
+            "open":
+                carry,
+
+            "close":
+                carry,
+
+            "min":
+                carry,
+
+            "max":
+                carry,
+        })
+
+    return points
@@ -0,0 +1,720 @@
+# -*- coding: utf-8 -*-
+# api/services/ranking_snapshot_service.py
+
+"""
+Ranking snapshot
+
+catalog を 1 回だけ走査
+↓
+製品ごとに所属ランキング (all / genre / group / attribute / workflow) へ振り分け
+↓
+score 順に並べて上位 RANKING_SNAPSHOT_DEPTH 件を PCRankingEntry へ
+↓
+is_active を付け替えて新しい版へ切り替え (読み手は完成済みの版だけを見る)
+
+ranking v2 はリクエストごとに traversal を組まず、
+active snapshot の id 列から表示分の製品だけを読む
+"""
+
+import base64
+import json
+import threading
+import time
+
+from collections import defaultdict
+
+from django.db import transaction
+
+from api.models import (
+    CatalogGeneration,
+    PCProduct,
+    PCRankingEntry,
+    PCRankingSnapshot,
+)
+
+from api.services.semantic.v2.ranking.ranking_topology_runtime import (
+    build_ranking_topology_runtime,
+)
+
+from api.services.semantic.v2.traversal.traversal_builder import (
+    build_product_traversal,
+)
+
+from api.utils.catalog_generation import (
+    get_catalog_generation,
+)
+
+# ==========================================================
+# CONSTANTS
+# ==========================================================
+
+RANKING_ALL = "all"
+
+KIND_GENRE = "genre"
+
+KIND_GROUP = "group"
+
+KIND_ATTRIBUTE = "attribute"
+
+KIND_WORKFLOW = "workflow"
+
+# 1 ランキングに保持する上位件数
+RANKING_SNAPSHOT_DEPTH = 500
+
+# swap 後も残す旧版の数 (配信中リクエストの読み途中を壊さない)
+RANKING_SNAPSHOT_KEEP = 1
+
+RANKING_BATCH_SIZE = 500
+
+# 初回 build の排他用 row (CatalogGeneration.key)
+# 同時に snapshot 無しを見た request / worker が並行に全件 build しない
+RANKING_BUILD_LOCK_KEY = "ranking_snapshot_build"
+
+# 表示用 traversal に必要な列
+TRAVERSAL_FIELDS = (
+
+    "id",
+
+    "unique_id",
+
+    "name",
+
+    "maker",
+
+    "price",
+
+    "image_url",
+
+    "cpu_model",
+
+    "gpu_model",
+
+    "memory_gb",
+
+    "storage_gb",
+
+    "display_info",
+
+    "is_ai_pc",
+
+    "semantic_runtime",
+)
+
+
+def ranking_key(
+
+    kind,
+
+    slug,
+):
+
+    return f"{kind}:{slug}"
+
+
+# ==========================================================
+# SCORE
+# ==========================================================
+
+def snapshot_product_score(runtime):
+
+    # ranking v2 の既存基準: 所属 semantic group 数
+    return len(
+
+        runtime.get(
+            "semantic_groups",
+            []
+        )
+    )
+
+
+def product_ranking_keys(
+
+    unified_genre,
+
+    runtime,
+):
+
+    keys = {RANKING_ALL}
+
+    if unified_genre:
+
+        keys.add(
+            ranking_key(KIND_GENRE, unified_genre)
+        )
+
+    for kind, values in (
+
+        (KIND_GROUP, runtime.get("semantic_groups")),
+
+        (KIND_ATTRIBUTE, runtime.get("semantic_attributes")),
+
+        (KIND_WORKFLOW, runtime.get("workflow_tags")),
+    ):
+
+        for slug in values or []:
+
+            if slug:
+
+                keys.add(
+                    ranking_key(kind, slug)
+                )
+
+    return keys
+
+
+# ==========================================================
+# BUILD
+# ==========================================================
+
+def build_ranking_snapshot(
+
+    depth=RANKING_SNAPSHOT_DEPTH,
+
+    keep=RANKING_SNAPSHOT_KEEP,
+):
+
+    """
+    全ランキングを 1 pass で計算して新しい active snapshot にする
+    return: PCRankingSnapshot
+    """
+
+    started = time.perf_counter()
+
+    generation = get_catalog_generation()
+
+    # key → [(score, position, product_id)]
+    members = defaultdict(list)
+
+    topology_products = []
+
+    position = 0
+
+    # 既存 ranking と同じく -updated_at 順を同点時の順位にする
+    for product_id, unique_id, genre, runtime in (
+
+        PCProduct.objects
+
+        .filter(
+            is_active=True
+        )
+
+        .order_by(
+            "-updated_at",
+            "-id",
+        )
+
+        .values_list(
+            "id",
+            "unique_id",
+            "unified_genre",
+            "semantic_runtime",
+        )
+
+        .iterator(chunk_size=1000)
+    ):
+
+        if not runtime:
+            continue
+
+        score = snapshot_product_score(
+            runtime
+        )
+
+        for key in product_ranking_keys(
+            genre,
+            runtime,
+        ):
+
+            members[key].append(
+                (score, position, product_id)
+            )
+
+        topology_products.append({
+
+            "unique_id":
+                unique_id,
+
+            "matched_groups":
+                runtime.get(
+                    "semantic_groups",
+                    []
+                ),
+        })
+
+        position += 1
+
+    topology = build_ranking_topology_runtime(
+        products=topology_products
+    ).get(
+        "categories",
+        []
+    )
+
+    entries = []
+
+    for key, rows in members.items():
+
+        rows.sort(
+            key=lambda row: (-row[0], row[1])
+        )
+
+        top = rows[:depth]
+
+        entries.append(
+            PCRankingEntry(
+
+                ranking_key=key,
+
+                product_ids=[
+                    product_id
+                    for _, _, product_id in top
+                ],
+
+                scores=[
+                    score
+                    for score, _, _ in top
+                ],
+
+                product_count=len(rows),
+            )
+        )
+
+    with transaction.atomic():
+
+        snapshot = PCRankingSnapshot.objects.create(
+
+            catalog_generation=generation,
+
+            product_count=position,
+
+            ranking_count=len(entries),
+
+            topology=topology,
+        )
+
+        for entry in entries:
+
+            entry.snapshot = snapshot
+
+        PCRankingEntry.objects.bulk_create(
+
+            entries,
+
+            batch_size=RANKING_BATCH_SIZE,
+        )
+
+        # ---------------------------------------------
+        # atomic swap
+        # ---------------------------------------------
+
+        PCRankingSnapshot.objects.filter(
+            is_active=True
+        ).update(
+            is_active=False
+        )
+
+        snapshot.is_active = True
+
+        snapshot.build_seconds = round(
+            time.perf_counter() - started,
+            3
+        )
+
+        snapshot.save(
+            update_fields=[
+                "is_active",
+                "build_seconds",
+            ]
+        )
+
+        retired = list(
+
+            PCRankingSnapshot.objects
+
+            .exclude(
+                id=snapshot.id
+            )
+
+            .order_by("-id")
+
+            .values_list(
+                "id",
+                flat=True
+            )[keep:]
+        )
+
+        if retired:
+
+            PCRankingSnapshot.objects.filter(
+                id__in=retired
+            ).delete()
+
+    clear_ranking_cache()
+
+    return snapshot
+
+
+# ==========================================================
+# READ
+# ==========================================================
+
+_CACHE_LOCK = threading.Lock()
+
+# {"snapshot_id": id, "entries": {key: (ids, scores, count)}}
+_ENTRY_CACHE = {
+    "snapshot_id": None,
+    "entries": {},
+}
+
+
+def clear_ranking_cache():
+
+    with _CACHE_LOCK:
+
+        _ENTRY_CACHE["snapshot_id"] = None
+
+        _ENTRY_CACHE["entries"] = {}
+
+
+def find_active_ranking_snapshot():
+
+    return (
+
+        PCRankingSnapshot.objects
+
+        .filter(
+            is_active=True
+        )
+
+        .defer(
+            "topology"
+        )
+
+        .order_by("-id")
+
+        .first()
+    )
+
+
+def build_missing_ranking_snapshot():
+
+    """
+    migration 直後など 1 度も build されていないときだけ build
+
+    lock row を select_for_update で取り、取れたら再確認してから build
+    (待っていた側は先行 build の結果をそのまま使う)
+    """
+
+    CatalogGeneration.objects.get_or_create(
+
+        key=RANKING_BUILD_LOCK_KEY,
+
+        defaults={
+            "generation": 0,
+        },
+    )
+
+    with transaction.atomic():
+
+        (
+            CatalogGeneration.objects
+            .select_for_update()
+            .get(key=RANKING_BUILD_LOCK_KEY)
+        )
+
+        snapshot = find_active_ranking_snapshot()
+
+        if snapshot is None:
+
+            build_ranking_snapshot()
+
+            snapshot = find_active_ranking_snapshot()
+
+    return snapshot
+
+
+def get_active_ranking_snapshot(
+    build_if_missing=True,
+):
+
+    snapshot = find_active_ranking_snapshot()
+
+    if snapshot is None and build_if_missing:
+
+        snapshot = build_missing_ranking_snapshot()
+
+    return snapshot
+
+
+def is_ranking_snapshot_stale(snapshot):
+
+    return (
+        snapshot is None
+        or snapshot.catalog_generation
+        != get_catalog_generation()
+    )
+
+
+def get_ranking_entry(
+
+    snapshot,
+
+    key,
+):
+
+    """
+    return: (product_ids, scores, product_count)
+    """
+
+    with _CACHE_LOCK:
+
+        if _ENTRY_CACHE["snapshot_id"] != snapshot.id:
+
+            _ENTRY_CACHE["snapshot_id"] = snapshot.id
+
+            _ENTRY_CACHE["entries"] = {}
+
+        cached = _ENTRY_CACHE["entries"].get(
+            key
+        )
+
+    if cached is not None:
+
+        return cached
+
+    row = (
+
+        PCRankingEntry.objects
+
+        .filter(
+            snapshot_id=snapshot.id,
+            ranking_key=key,
+        )
+
+        .values_list(
+            "product_ids",
+            "scores",
+            "product_count",
+        )
+
+        .first()
+    )
+
+    entry = (
+        tuple(row)
+        if row
+        else ([], [], 0)
+    )
+
+    with _CACHE_LOCK:
+
+        if _ENTRY_CACHE["snapshot_id"] == snapshot.id:
+
+            _ENTRY_CACHE["entries"][key] = entry
+
+    return entry
+
+
+def get_ranking_topology(snapshot):
+
+    return (
+
+        PCRankingSnapshot.objects
+
+        .filter(
+            id=snapshot.id
+        )
+
+        .values_list(
+            "topology",
+            flat=True
+        )
+
+        .first()
+
+        or []
+    )
+
+
+# ==========================================================
+# CURSOR
+# ==========================================================
+
+def encode_rank_cursor(
+
+    snapshot_id,
+
+    offset,
+):
+
+    payload = json.dumps(
+        {"s": snapshot_id, "r": offset},
+        separators=(",", ":"),
+    )
+
+    return base64.urlsafe_b64encode(
+        payload.encode("ascii")
+    ).decode("ascii").rstrip("=")
+
+
+def decode_rank_cursor(
+
+    cursor,
+
+    snapshot_id,
+):
+
+    """
+    別 snapshot の cursor (rebuild を跨いだ) は 0 から
+    """
+
+    if not cursor:
+        return 0
+
+    try:
+
+        payload = json.loads(
+            base64.urlsafe_b64decode(
+                (cursor + "=" * (-len(cursor) % 4)).encode("ascii")
+            )
+        )
+
+        if payload.get("s") != snapshot_id:
+            return 0
+
+        return max(int(payload.get("r", 0)), 0)
+
+    except Exception:
+
+        return 0
+
+
+# ==========================================================
+# PAGE
+# ==========================================================
+
+def load_ranking_page(
+
+    key,
+
+    limit,
+
+    cursor=None,
+):
+
+    """
+    return: {
+        "snapshot": PCRankingSnapshot / None,
+        "products": [traversal dict],
+        "scores": [...],
+        "total_count": int,
+        "next_cursor": str / None,
+    }
+    """
+
+    limit = max(
+        int(limit),
+        0
+    )
+
+    snapshot = get_active_ranking_snapshot()
+
+    if snapshot is None:
+
+        return {
+            "snapshot": None,
+            "products": [],
+            "scores": [],
+            "total_count": 0,
+            "next_cursor": None,
+        }
+
+    ids, scores, total_count = get_ranking_entry(
+        snapshot,
+        key,
+    )
+
+    offset = decode_rank_cursor(
+        cursor,
+        snapshot.id,
+    )
+
+    products = []
+
+    page_scores = []
+
+    end = offset
+
+    # snapshot 後に削除 / 非掲載になった製品は飛ばし、
+    # 足りない分は snapshot の続きから埋める
+    while len(products) < limit and end < len(ids):
+
+        chunk_ids = ids[end:end + limit - len(products)]
+
+        chunk_scores = scores[end:end + len(chunk_ids)]
+
+        product_map = (
+
+            PCProduct.objects
+
+            .filter(
+                is_active=True
+            )
+
+            .only(
+                *TRAVERSAL_FIELDS
+            )
+
+            .in_bulk(
+                chunk_ids
+            )
+        )
+
+        for product_id, score in zip(
+            chunk_ids,
+            chunk_scores,
+        ):
+
+            end += 1
+
+            product = product_map.get(
+                product_id
+            )
+
+            if product is None or not product.semantic_runtime:
+                continue
+
+            products.append(
+                build_product_traversal(
+                    product=product,
+                    runtime=product.semantic_runtime,
+                )
+            )
+
+            page_scores.append(
+                score
+            )
+
+    return {
+
+        "snapshot":
+            snapshot,
+
+        "products":
+            products,
+
+        "scores":
+            page_scores,
+
+        "total_count":
+            total_count,
+
+        "next_cursor": (
+            encode_rank_cursor(
+                snapshot.id,
+                end,
+            )
+            if end < len(ids)
+            else None
+        ),
+    }
@@ -20,8 +20,12 @@ adaptive runtime
 persistent semantic universe object
 """
 
+import hashlib
+
 from datetime import datetime
 
+from api.models import PCProduct
+
 # ==========================================================
 # SEMANTIC RUNTIME
 # ==========================================================
@@ -74,9 +78,14 @@ from api.services.semantic.semantic_graph import (
 # ==========================================================
 
 from api.utils.semantic.extraction.extract_pc_specs import (
+    SEMANTIC_EXTRACTOR_VERSION,
     extract_pc_specs,
 )
 
+from api.utils.semantic.authority.normalization import (
+    SEMANTIC_NORMALIZER_VERSION,
+)
+
 from api.services.semantic.semantic_runtime import (
     calculate_semantic_score,
 )
@@ -96,6 +105,25 @@ TEXT_SOURCE_FIELDS = [
     "ai_content",
 ]
 
+# extract_pc_specs が直接読む spec field
+SPEC_SOURCE_FIELDS = [
+
+    "cpu_model",
+
+    "gpu_model",
+
+    "display_info",
+
+    "memory_gb",
+
+    "storage_gb",
+]
+
+SOURCE_HASH_FIELDS = (
+    TEXT_SOURCE_FIELDS
+    + SPEC_SOURCE_FIELDS
+)
+
 
 # ==========================================================
 # RUNTIME CONSTANTS
@@ -185,6 +213,50 @@ def build_source_text(product):
     return "\n".join(parts)
 
 
+# ==========================================================
+# SOURCE HASH
+# ==========================================================
+
+def build_source_hash(product):
+
+    """
+    source text + spec fields + extractor / normalizer version
+    これが変わらない限り compile 結果も変わらない
+    """
+
+    parts = [
+
+        SEMANTIC_EXTRACTOR_VERSION,
+
+        SEMANTIC_NORMALIZER_VERSION,
+
+        build_source_text(
+            product
+        ),
+    ]
+
+    for field in SPEC_SOURCE_FIELDS:
+
+        parts.append(
+
+            safe_text(
+                getattr(
+                    product,
+                    field,
+                    None
+                )
+            )
+        )
+
+    return hashlib.sha1(
+
+        "\x1f".join(parts).encode(
+            "utf-8"
+        )
+
+    ).hexdigest()
+
+
 # ==========================================================
 # RUNTIME VALIDATION
 # IMPORTANT:
@@ -641,7 +713,7 @@ def apply_runtime_to_product(
 def requires_runtime_rebuild(product):
 
     """
-    future incremental rebuild support
+    incremental rebuild 判定
     """
 
     runtime = getattr(
@@ -688,6 +760,18 @@ def requires_runtime_rebuild(product):
 
         return True
 
+    # ------------------------------------------------------
+    # Source Changed
+    # ------------------------------------------------------
+
+    if getattr(
+        product,
+        "semantic_source_hash",
+        ""
+    ) != build_source_hash(product):
+
+        return True
+
     return False
 
 
@@ -726,9 +810,89 @@ def mark_runtime_dirty(
 
     product.semantic_runtime = runtime
 
+    product.semantic_runtime_dirty = True
+
     return product
 
 
+# ==========================================================
+# DIRTY QUEUE
+# ==========================================================
+
+def dirty_runtime_queryset():
+
+    """
+    semantic_runtime_dirty (indexed) から引く compile 対象
+    """
+
+    return PCProduct.objects.filter(
+        semantic_runtime_dirty=True
+    )
+
+
+def enqueue_stale_runtimes(
+
+    chunk_size=1000,
+):
+
+    """
+    signal を通らない書き込み (bulk_update / queryset.update) や
+    version 更新で hash がずれた product を queue に積む
+    """
+
+    rows = (
+
+        PCProduct.objects
+
+        .filter(
+            semantic_runtime_dirty=False
+        )
+
+        .only(
+            "id",
+            "semantic_source_hash",
+            *SOURCE_HASH_FIELDS
+        )
+
+        .order_by()
+    )
+
+    stale_ids = []
+
+    for product in rows.iterator(
+        chunk_size=chunk_size
+    ):
+
+        if product.semantic_source_hash != build_source_hash(
+            product
+        ):
+
+            stale_ids.append(
+                product.id
+            )
+
+    for offset in range(
+
+        0,
+
+        len(stale_ids),
+
+        chunk_size,
+    ):
+
+        PCProduct.objects.filter(
+
+            id__in=stale_ids[
+                offset:offset + chunk_size
+            ]
+
+        ).update(
+            semantic_runtime_dirty=True
+        )
+
+    return len(stale_ids)
+
+
 # ==========================================================
 # RUNTIME SUMMARY
 # ==========================================================
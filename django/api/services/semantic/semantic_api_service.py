@@ -14,8 +14,14 @@ adaptive cinematic runtime
 human exploration payload
 """
 
+import threading
+
 from api.models import PCProduct
 
+from api.utils.catalog_generation import (
+    get_catalog_generation,
+)
+
 # ==========================================================
 # SEMANTIC GRAPH
 # ==========================================================
@@ -24,12 +30,29 @@ from api.services.semantic.semantic_graph import (
     build_semantic_graph,
 )
 
+from api.services.semantic.semantic_graph_index import (
+    find_semantic_graph_candidates,
+    get_semantic_graph_index,
+)
+
+# ==========================================================
+# PROJECTION
+# ==========================================================
+
+from api.utils.pc_projection import (
+    frontend_render_hints,
+    lightweight_runtime,
+    serialize_card_product,
+)
+
 # ==========================================================
 # SEMANTIC SHELVES
 # ==========================================================
 
 from api.services.semantic.semantic_shelves import (
-    build_semantic_shelves,
+    SHELF_RUNTIME_KEYS,
+    assemble_semantic_shelves,
+    rank_shelf_products,
 )
 
 # ==========================================================
@@ -42,7 +65,17 @@ SEMANTIC_AUTHORITY = "backend"
 
 DEFAULT_RELATED_LIMIT = 12
 
-DEFAULT_DISCOVERY_LIMIT = 500
+SHELF_SCAN_CHUNK_SIZE = 2000
+
+# shelf 表示に必要な列 (勝ち残った製品だけ読む)
+SHELF_PRODUCT_FIELDS = (
+    "id",
+    "unique_id",
+    "name",
+    "image_url",
+    "price",
+    "semantic_runtime",
+)
 
 
 # ==========================================================
@@ -83,256 +116,256 @@ def safe_int(value):
         return 0
 
 
-def lightweight_runtime(runtime):
+# ==========================================================
+# SEMANTIC RELATED
+# IMPORTANT:
+# lightweight traversal nodes only
+# non-recursive frontend-safe payload
+# ==========================================================
 
-    """
-    lightweight semantic payload
-    ranking / shelf / hover preview
-    """
+RELATED_PRODUCT_FIELDS = (
 
-    return {
+    "id",
 
-        "product_type":
-            runtime.get(
-                "product_type"
-            ),
+    "unique_id",
 
-        "semantic_score":
-            runtime.get(
-                "semantic_score",
-                0
-            ),
+    "name",
 
-        "workflow_score":
-            runtime.get(
-                "workflow_score",
-                0
-            ),
+    "image_url",
 
-        "semantic_labels":
-            runtime.get(
-                "semantic_labels",
-                []
-            )[:3],
+    "price",
 
-        "workflow_tags":
-            runtime.get(
-                "workflow_tags",
-                []
-            )[:3],
+    "maker",
 
-        "adaptive_runtime":
-            runtime.get(
-                "adaptive_runtime",
-                {}
-            ),
-    }
+    "semantic_runtime",
 
+    "semantic_labels",
+)
 
-def frontend_render_hints(runtime):
 
-    """
-    backend-driven frontend UX authority
-    """
+def related_candidate_queryset():
 
-    product_type = runtime.get(
-        "product_type",
-        "pc"
+    return PCProduct.objects.only(
+        *RELATED_PRODUCT_FIELDS
     )
 
-    primary_workflow = runtime.get(
-        "primary_workflow"
-    )
 
-    # ======================================================
-    # Gaming
-    # ======================================================
-
-    if product_type == "gaming_pc":
+def load_related_candidates(
 
-        return {
+    candidate_ids,
 
-            "ui_mode":
-                "immersive",
+    chunk_size=1000,
+):
 
-            "card_style":
-                "gaming",
+    """
+    candidate id → product (必要カラムのみ)
+    """
 
-            "render_priority": [
+    candidate_ids = list(
+        dict.fromkeys(candidate_ids)
+    )
 
-                "gpu",
+    candidate_map = {}
 
-                "refresh_rate",
+    for offset in range(
 
-                "workflow",
-            ],
+        0,
 
-            "animation_hint":
-                "competitive",
+        len(candidate_ids),
 
-            "focus":
-                "gaming",
-        }
+        chunk_size,
+    ):
 
-    # ======================================================
-    # Creator
-    # ======================================================
+        candidate_map.update(
 
-    if product_type == "creator_pc":
+            related_candidate_queryset().in_bulk(
 
-        return {
+                candidate_ids[
+                    offset:offset + chunk_size
+                ]
+            )
+        )
 
-            "ui_mode":
-                "workflow",
+    return candidate_map
 
-            "card_style":
-                "creator",
 
-            "render_priority": [
+def build_related_product_node(
 
-                "memory",
+    edge,
 
-                "storage",
+    target_product,
+):
 
-                "workflow",
-            ],
+    target_runtime = safe_runtime(
+        target_product
+    )
 
-            "animation_hint":
-                "creative",
+    # ======================================================
+    # Lightweight Semantic Labels
+    # ======================================================
 
-            "focus":
-                "creator",
-        }
+    semantic_labels = (
+        target_runtime.get(
+            "semantic_labels",
+            []
+        )[:3]
+    )
 
     # ======================================================
-    # AI
+    # Edge Payload
     # ======================================================
 
-    if product_type == "ai_workstation":
+    semantic_edge = {
 
-        return {
+        "edge_type":
+            edge.get(
+                "edge_type"
+            ),
 
-            "ui_mode":
-                "intelligence",
+        "similarity_score":
+            edge.get(
+                "similarity_score",
+                0
+            ),
 
-            "card_style":
-                "ai",
+        "reason":
+            edge.get(
+                "reason"
+            ),
 
-            "render_priority": [
+        "workflow_relation":
+            edge.get(
+                "workflow_relation"
+            ),
+    }
 
-                "gpu",
+    # ======================================================
+    # Frontend-safe Node
+    # IMPORTANT:
+    # no nested semantic universe
+    # ======================================================
 
-                "memory",
+    return {
 
-                "workflow",
-            ],
+        # ==================================================
+        # Product
+        # ==================================================
+        "id":
+            target_product.id,
 
-            "animation_hint":
-                "generation",
+        "unique_id":
+            target_product.unique_id,
 
-            "focus":
-                "ai",
-        }
+        "name":
+            target_product.name,
 
-    # ======================================================
-    # Monitor
-    # ======================================================
+        "image_url":
+            target_product.image_url,
 
-    if product_type in [
+        "price":
+            target_product.price,
 
-        "immersive_monitor",
+        "maker":
+            getattr(
+                target_product,
+                "maker",
+                None
+            ),
 
-        "creator_monitor",
+        # ==================================================
+        # Lightweight Semantic
+        # ==================================================
+        "product_type":
+            target_runtime.get(
+                "product_type"
+            ),
 
-        "monitor",
-    ]:
+        "semantic_score":
+            target_runtime.get(
+                "semantic_score",
+                0
+            ),
 
-        return {
+        "semantic_labels":
+            semantic_labels,
 
-            "ui_mode":
-                "cinematic",
+        # ==================================================
+        # Traversal Edge
+        # ==================================================
+        "edge":
+            semantic_edge,
+    }
+
+
+def build_related_from_candidates(
+
+    product,
 
-            "card_style":
-                "display",
+    candidate_ids,
 
-            "render_priority": [
+    candidate_map,
 
-                "display",
+    limit=DEFAULT_RELATED_LIMIT,
+):
 
-                "refresh_rate",
+    candidates = [
 
-                "workflow",
-            ],
+        candidate_map[candidate_id]
 
-            "animation_hint":
-                "visual",
+        for candidate_id in candidate_ids
 
-            "focus":
-                "display",
-        }
+        if candidate_id in candidate_map
+    ]
 
     # ======================================================
-    # Mobility
+    # Semantic Graph
     # ======================================================
 
-    if product_type == "mobility_pc":
-
-        return {
+    edges = build_semantic_graph(
 
-            "ui_mode":
-                "lightweight",
+        source_product=product,
 
-            "card_style":
-                "portable",
+        candidate_products=candidates,
 
-            "render_priority": [
+        limit=limit,
+    )
 
-                "mobility",
+    related_products = []
 
-                "battery",
+    for edge in edges:
 
-                "workflow",
-            ],
+        # ==================================================
+        # Reuse Candidate (no per-edge query)
+        # ==================================================
 
-            "animation_hint":
-                "mobility",
+        target_product = candidate_map.get(
 
-            "focus":
-                "portable",
-        }
+            edge.get(
+                "target_id"
+            )
+        )
 
-    # ======================================================
-    # Fallback
-    # ======================================================
+        if target_product is None:
+            continue
 
-    return {
+        try:
 
-        "ui_mode":
-            "general",
+            related_products.append(
 
-        "card_style":
-            "default",
+                build_related_product_node(
 
-        "render_priority": [
+                    edge,
 
-            "workflow",
+                    target_product,
+                )
+            )
 
-            "semantic",
-        ],
+        except Exception:
 
-        "animation_hint":
-            "exploration",
+            continue
 
-        "focus":
-            primary_workflow or "general",
-    }
+    return related_products
 
-# ==========================================================
-# SEMANTIC RELATED
-# IMPORTANT:
-# lightweight traversal nodes only
-# non-recursive frontend-safe payload
-# ==========================================================
 
 def build_semantic_related_products(
 
@@ -349,147 +382,113 @@ def build_semantic_related_products(
         return []
 
     # ======================================================
-    # Candidate Query
+    # Candidate Pruning
+    # IMPORTANT:
+    # catalog 全体の inverted index から上位候補のみ取得
     # ======================================================
 
-    candidates = PCProduct.objects.exclude(
-        id=product.id
-    ).exclude(
-        semantic_runtime__isnull=True
-    )[:200]
+    candidate_ids = find_semantic_graph_candidates(
 
-    # ======================================================
-    # Semantic Graph
-    # ======================================================
+        product,
 
-    edges = build_semantic_graph(
+        limit=limit,
+    )
 
-        source_product=product,
+    candidate_map = load_related_candidates(
+        candidate_ids
+    )
 
-        candidate_products=candidates,
+    return build_related_from_candidates(
+
+        product,
+
+        candidate_ids,
+
+        candidate_map,
 
         limit=limit,
     )
 
-    related_products = []
 
-    for edge in edges:
+# ==========================================================
+# SEMANTIC RELATED (BULK)
+# IMPORTANT:
+# related 一覧の事前計算用
+# index 取得と候補ロードを全 source で 1 回にまとめる
+# ==========================================================
 
-        target_id = edge.get(
-            "target_id"
-        )
+def build_semantic_related_products_bulk(
 
-        try:
+    products,
 
-            target_product = PCProduct.objects.get(
-                id=target_id
-            )
+    limit=DEFAULT_RELATED_LIMIT,
+):
 
-            target_runtime = safe_runtime(
-                target_product
-            )
+    """
+    {product.id: related_products}
+    """
 
-            # ==================================================
-            # Lightweight Semantic Labels
-            # ==================================================
+    products = list(products)
 
-            semantic_labels = (
-                target_runtime.get(
-                    "semantic_labels",
-                    []
-                )[:3]
-            )
+    index = get_semantic_graph_index()
 
-            # ==================================================
-            # Edge Payload
-            # ==================================================
+    candidate_ids_map = {}
 
-            semantic_edge = {
+    for product in products:
 
-                "edge_type":
-                    edge.get(
-                        "edge_type"
-                    ),
+        if not safe_runtime(product):
 
-                "similarity_score":
-                    edge.get(
-                        "similarity_score",
-                        0
-                    ),
+            candidate_ids_map[product.id] = []
 
-                "reason":
-                    edge.get(
-                        "reason"
-                    ),
+            continue
 
-                "workflow_relation":
-                    edge.get(
-                        "workflow_relation"
-                    ),
-            }
+        candidate_ids_map[product.id] = (
 
-            # ==================================================
-            # Frontend-safe Node
-            # IMPORTANT:
-            # no nested semantic universe
-            # ==================================================
+            find_semantic_graph_candidates(
 
-            related_products.append({
+                product,
 
-                # ==============================================
-                # Product
-                # ==============================================
-                "id":
-                    target_product.id,
+                limit=limit,
 
-                "unique_id":
-                    target_product.unique_id,
+                index=index,
+            )
+        )
 
-                "name":
-                    target_product.name,
+    # ======================================================
+    # One Candidate Load
+    # ======================================================
 
-                "image_url":
-                    target_product.image_url,
+    candidate_map = load_related_candidates(
 
-                "price":
-                    target_product.price,
+        candidate_id
 
-                "maker":
-                    getattr(
-                        target_product,
-                        "maker",
-                        None
-                    ),
+        for candidate_ids in candidate_ids_map.values()
 
-                # ==============================================
-                # Lightweight Semantic
-                # ==============================================
-                "product_type":
-                    target_runtime.get(
-                        "product_type"
-                    ),
+        for candidate_id in candidate_ids
+    )
 
-                "semantic_score":
-                    target_runtime.get(
-                        "semantic_score",
-                        0
-                    ),
+    related_map = {}
 
-                "semantic_labels":
-                    semantic_labels,
+    for product in products:
 
-                # ==============================================
-                # Traversal Edge
-                # ==============================================
-                "edge":
-                    semantic_edge,
-            })
+        related_map[product.id] = (
 
-        except Exception:
+            build_related_from_candidates(
 
-            continue
+                product,
 
-    return related_products
+                candidate_ids_map.get(
+                    product.id,
+                    []
+                ),
+
+                candidate_map,
+
+                limit=limit,
+            )
+        )
+
+    return related_map
 
 
 
@@ -499,9 +498,15 @@ def build_semantic_related_products(
 # ==========================================================
 
 def build_semantic_product_payload(
-    product
+    product,
+    related=None,
 ):
 
+    """
+    related: 組み済みの semantic_related (一覧は PCProductRelation から渡す)
+    None なら graph index から組む (詳細ページ用)
+    """
+
     runtime = safe_runtime(
         product
     )
@@ -641,7 +646,9 @@ def build_semantic_product_payload(
         "semantic_related":
             build_semantic_related_products(
                 product
-            ),
+            )
+            if related is None
+            else related,
     }
 
 
@@ -649,14 +656,80 @@ def build_semantic_product_payload(
 # SHELF PAYLOAD
 # ==========================================================
 
-def build_semantic_shelf_payload():
+def scan_shelf_rows():
 
-    products = PCProduct.objects.exclude(
-        semantic_runtime__isnull=True
-    )[:DEFAULT_DISCOVERY_LIMIT]
+    """
+    yield: (product_id, {shelf 判定用 runtime key: value})
+
+    semantic_runtime 全体は読まず、判定に使う key だけを取り出す
+    """
 
-    shelves = build_semantic_shelves(
-        products
+    lookups = [
+
+        f"semantic_runtime__{key}"
+
+        for key in SHELF_RUNTIME_KEYS
+    ]
+
+    for product_id, *values in (
+
+        PCProduct.objects
+
+        .exclude(
+            semantic_runtime__isnull=True
+        )
+
+        .order_by(
+            "-updated_at",
+            "-id",
+        )
+
+        .values_list(
+            "id",
+            *lookups
+        )
+
+        .iterator(
+            chunk_size=SHELF_SCAN_CHUNK_SIZE
+        )
+    ):
+
+        yield product_id, dict(
+            zip(
+                SHELF_RUNTIME_KEYS,
+                values,
+            )
+        )
+
+
+def compute_semantic_shelf_payload():
+
+    # catalog 1 pass → shelf ごとの top-k id
+    shelf_ids = rank_shelf_products(
+        scan_shelf_rows()
+    )
+
+    product_map = (
+
+        PCProduct.objects
+
+        .only(
+            *SHELF_PRODUCT_FIELDS
+        )
+
+        .in_bulk({
+
+            product_id
+
+            for product_ids in shelf_ids.values()
+
+            for product_id in product_ids
+        })
+    )
+
+    shelves = assemble_semantic_shelves(
+        shelf_ids,
+        product_map,
     )
 
     payload = []
@@ -772,6 +845,48 @@ def build_semantic_shelf_payload():
     return payload
 
 
+_SHELF_CACHE_LOCK = threading.Lock()
+
+# (generation, payload)
+_SHELF_CACHE = {}
+
+
+def build_semantic_shelf_payload():
+
+    """
+    catalog generation が変わるまで同じ payload を返す
+    """
+
+    generation = get_catalog_generation()
+
+    cached = _SHELF_CACHE.get(
+        "payload"
+    )
+
+    if cached and cached[0] == generation:
+
+        return cached[1]
+
+    with _SHELF_CACHE_LOCK:
+
+        cached = _SHELF_CACHE.get(
+            "payload"
+        )
+
+        if cached and cached[0] == generation:
+
+            return cached[1]
+
+        payload = compute_semantic_shelf_payload()
+
+        _SHELF_CACHE["payload"] = (
+            generation,
+            payload,
+        )
+
+    return payload
+
+
 # ==========================================================
 # DISCOVERY PAYLOAD
 # ==========================================================
@@ -819,59 +934,16 @@ def build_semantic_ranking_payload(
     products
 ):
 
-    payload = []
-
-    for product in products:
+    # card projection (card_payload) で組む
+    # semantic_runtime 本体は読まない
+    payload = [
 
-        runtime = safe_runtime(
+        serialize_card_product(
             product
         )
 
-        payload.append({
-
-            # ==============================================
-            # Product
-            # ==============================================
-            "id":
-                product.id,
-
-            "unique_id":
-                product.unique_id,
-
-            "name":
-                product.name,
-
-            "image_url":
-                product.image_url,
-
-            "price":
-                product.price,
-
-            # ==============================================
-            # Lightweight Runtime
-            # ==============================================
-            "semantic_runtime":
-                lightweight_runtime(
-                    runtime
-                ),
-
-            # ==============================================
-            # Human Labels
-            # ==============================================
-            "semantic_labels":
-                runtime.get(
-                    "semantic_labels",
-                    []
-                )[:3],
-
-            # ==============================================
-            # Frontend
-            # ==============================================
-            "render_hints":
-                frontend_render_hints(
-                    runtime
-                ),
-        })
+        for product in products
+    ]
 
     return {
 
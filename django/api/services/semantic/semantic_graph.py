@@ -16,6 +16,8 @@ exploration edges
 human intent navigation
 """
 
+import heapq
+
 # ==========================================================
 # UTIL
 # ==========================================================
@@ -123,6 +125,75 @@ def valid_runtime(runtime):
     return True
 
 
+# ==========================================================
+# EDGE RULES
+# ==========================================================
+
+WORKFLOW_EVOLUTION_SCORES = {
+
+    # --------------------------------------------------
+    # Creator
+    # --------------------------------------------------
+    ("creator", "streaming"): 15,
+    ("streaming", "creator"): 15,
+
+    # --------------------------------------------------
+    # Gaming → AI
+    # --------------------------------------------------
+    ("gaming", "ai"): 20,
+    ("ai", "gaming"): 10,
+
+    # --------------------------------------------------
+    # Mobility → Business
+    # --------------------------------------------------
+    ("mobility", "business"): 10,
+    ("business", "mobility"): 10,
+}
+
+
+PRODUCT_TYPE_CONTINUITY_SCORES = {
+
+    # --------------------------------------------------
+    # Gaming
+    # --------------------------------------------------
+    (
+        "gaming_pc",
+        "immersive_monitor"
+    ): 30,
+
+    # --------------------------------------------------
+    # Creator
+    # --------------------------------------------------
+    (
+        "creator_pc",
+        "creator_monitor"
+    ): 35,
+
+    # --------------------------------------------------
+    # AI
+    # --------------------------------------------------
+    (
+        "gaming_pc",
+        "ai_workstation"
+    ): 20,
+
+    # --------------------------------------------------
+    # Mobility
+    # --------------------------------------------------
+    (
+        "mobility_pc",
+        "creator_monitor"
+    ): 10,
+}
+
+
+OLED_FAMILY = [
+
+    "OLED",
+    "QD-OLED",
+]
+
+
 # ==========================================================
 # WORKFLOW EDGE
 # ==========================================================
@@ -159,30 +230,9 @@ def calculate_workflow_edge_score(
     # Workflow Evolution
     # ======================================================
 
-    workflow_edges = {
-
-        # --------------------------------------------------
-        # Creator
-        # --------------------------------------------------
-        ("creator", "streaming"): 15,
-        ("streaming", "creator"): 15,
-
-        # --------------------------------------------------
-        # Gaming → AI
-        # --------------------------------------------------
-        ("gaming", "ai"): 20,
-        ("ai", "gaming"): 10,
-
-        # --------------------------------------------------
-        # Mobility → Business
-        # --------------------------------------------------
-        ("mobility", "business"): 10,
-        ("business", "mobility"): 10,
-    }
-
     for edge_pair, edge_score in (
 
-        workflow_edges.items()
+        WORKFLOW_EVOLUTION_SCORES.items()
 
     ):
 
@@ -303,42 +353,7 @@ def calculate_product_type_edge_score(
     # Semantic Continuity
     # ======================================================
 
-    continuity_rules = {
-
-        # --------------------------------------------------
-        # Gaming
-        # --------------------------------------------------
-        (
-            "gaming_pc",
-            "immersive_monitor"
-        ): 30,
-
-        # --------------------------------------------------
-        # Creator
-        # --------------------------------------------------
-        (
-            "creator_pc",
-            "creator_monitor"
-        ): 35,
-
-        # --------------------------------------------------
-        # AI
-        # --------------------------------------------------
-        (
-            "gaming_pc",
-            "ai_workstation"
-        ): 20,
-
-        # --------------------------------------------------
-        # Mobility
-        # --------------------------------------------------
-        (
-            "mobility_pc",
-            "creator_monitor"
-        ): 10,
-    }
-
-    edge_score = continuity_rules.get(
+    edge_score = PRODUCT_TYPE_CONTINUITY_SCORES.get(
 
         (
             source_type,
@@ -447,16 +462,10 @@ def calculate_display_edge_score(
     # OLED Family
     # ======================================================
 
-    oled_family = [
-
-        "OLED",
-        "QD-OLED",
-    ]
-
     if (
-        source_display in oled_family
+        source_display in OLED_FAMILY
         and
-        candidate_display in oled_family
+        candidate_display in OLED_FAMILY
     ):
 
         return 15
@@ -649,6 +658,382 @@ def calculate_semantic_edge_score(
     return score
 
 
+# ==========================================================
+# COMPILED FEATURES
+# IMPORTANT:
+# runtime JSON は product ごとに 1 回だけ解釈する
+# score_semantic_features は
+# calculate_semantic_edge_score と同じ結果を返す
+# ==========================================================
+
+WORKFLOW_BITS = {}
+
+
+def workflow_bit(workflow):
+
+    bit = WORKFLOW_BITS.get(
+        workflow
+    )
+
+    if bit is None:
+
+        bit = WORKFLOW_BITS.setdefault(
+
+            workflow,
+
+            1 << len(WORKFLOW_BITS),
+        )
+
+    return bit
+
+
+def workflow_bitset(workflows):
+
+    bits = 0
+
+    for workflow in workflows:
+
+        bits |= workflow_bit(
+            workflow
+        )
+
+    return bits
+
+
+class SemanticFeatures:
+
+    """
+    compact edge-scoring vector
+    """
+
+    __slots__ = (
+
+        "product_id",
+
+        "workflow_bits",
+
+        "gpu",
+
+        "gpu_tier",
+
+        "gpu_series",
+
+        "product_type",
+
+        "display_type",
+
+        "memory_gb",
+
+        "labels",
+    )
+
+    def __init__(
+
+        self,
+
+        product_id,
+
+        runtime,
+    ):
+
+        self.product_id = product_id
+
+        # --------------------------------------------------
+        # Workflow
+        # --------------------------------------------------
+
+        self.workflow_bits = workflow_bitset(
+
+            normalize_workflows(
+                runtime
+            )
+        )
+
+        # --------------------------------------------------
+        # GPU
+        # --------------------------------------------------
+
+        self.gpu = str(
+
+            runtime.get(
+                "gpu_model",
+                ""
+            )
+        ).upper()
+
+        if "RTX" in self.gpu:
+
+            self.gpu_tier = "RTX"
+
+        elif "GTX" in self.gpu:
+
+            self.gpu_tier = "GTX"
+
+        else:
+
+            self.gpu_tier = None
+
+        self.gpu_series = self.gpu[-2:]
+
+        # --------------------------------------------------
+        # Identity
+        # --------------------------------------------------
+
+        self.product_type = runtime.get(
+            "product_type"
+        )
+
+        self.display_type = runtime.get(
+            "display_type"
+        )
+
+        # --------------------------------------------------
+        # Memory Bucket
+        # --------------------------------------------------
+
+        self.memory_gb = safe_int(
+
+            runtime.get(
+                "memory_gb"
+            )
+        )
+
+        # --------------------------------------------------
+        # Labels
+        # --------------------------------------------------
+
+        self.labels = frozenset(
+
+            safe_list(
+
+                runtime.get(
+                    "semantic_labels",
+                    []
+                )
+            )
+        )
+
+    @property
+    def high_memory(self):
+
+        return self.memory_gb >= 32
+
+    def has_workflow(
+
+        self,
+
+        workflow,
+    ):
+
+        bit = WORKFLOW_BITS.get(
+            workflow
+        )
+
+        return bool(
+
+            bit
+            and
+            self.workflow_bits & bit
+        )
+
+
+def compile_semantic_features(product):
+
+    """
+    valid runtime のみ feature 化する
+    (invalid / 壊れた runtime は None)
+    """
+
+    runtime = getattr(
+
+        product,
+
+        "semantic_runtime",
+
+        {}
+    ) or {}
+
+    return compile_runtime_features(
+
+        getattr(
+            product,
+            "id",
+            None
+        ),
+
+        runtime,
+    )
+
+
+def compile_runtime_features(
+
+    product_id,
+
+    runtime,
+):
+
+    try:
+
+        if not valid_runtime(runtime):
+            return None
+
+        return SemanticFeatures(
+
+            product_id,
+
+            runtime,
+        )
+
+    except Exception:
+
+        return None
+
+
+def score_semantic_features(
+
+    source,
+    candidate,
+):
+
+    # ======================================================
+    # Workflow
+    # ======================================================
+
+    score = (
+
+        source.workflow_bits
+        &
+        candidate.workflow_bits
+
+    ).bit_count() * 30
+
+    for (source_workflow, target_workflow), edge_score in (
+
+        WORKFLOW_EVOLUTION_SCORES.items()
+
+    ):
+
+        if (
+            source.has_workflow(source_workflow)
+            and
+            candidate.has_workflow(target_workflow)
+        ):
+
+            score += edge_score
+
+    # ======================================================
+    # GPU
+    # ======================================================
+
+    if source.gpu and candidate.gpu:
+
+        if (
+            "RTX" in source.gpu
+            and
+            "RTX" in candidate.gpu
+        ):
+
+            score += 20
+
+            if source.gpu_series == candidate.gpu_series:
+
+                score += 10
+
+        elif (
+            "GTX" in source.gpu
+            and
+            "GTX" in candidate.gpu
+        ):
+
+            score += 15
+
+    # ======================================================
+    # Product Type
+    # ======================================================
+
+    if source.product_type and candidate.product_type:
+
+        if source.product_type == candidate.product_type:
+
+            score += 20
+
+        else:
+
+            score += PRODUCT_TYPE_CONTINUITY_SCORES.get(
+
+                (
+                    source.product_type,
+                    candidate.product_type,
+                ),
+
+                0
+            )
+
+    # ======================================================
+    # Creator / AI
+    # ======================================================
+
+    if (
+        source.has_workflow("creator")
+        and
+        candidate.has_workflow("creator")
+    ):
+
+        score += 25
+
+    if (
+        source.has_workflow("ai")
+        and
+        candidate.has_workflow("ai")
+    ):
+
+        score += 30
+
+    # ======================================================
+    # Display
+    # ======================================================
+
+    if source.display_type and candidate.display_type:
+
+        if source.display_type == candidate.display_type:
+
+            score += 20
+
+        elif (
+            source.display_type in OLED_FAMILY
+            and
+            candidate.display_type in OLED_FAMILY
+        ):
+
+            score += 15
+
+    # ======================================================
+    # Memory
+    # ======================================================
+
+    if (
+        source.memory_gb > 0
+        and
+        candidate.memory_gb > 0
+        and
+        source.high_memory
+        and
+        candidate.high_memory
+    ):
+
+        score += 15
+
+    # ======================================================
+    # Semantic Labels
+    # ======================================================
+
+    score += len(
+        source.labels & candidate.labels
+    ) * 5
+
+    return score
+
+
 # ==========================================================
 # EDGE TYPE
 # ==========================================================
@@ -1014,75 +1399,133 @@ def build_semantic_edge(
 # BUILD GRAPH
 # ==========================================================
 
-def build_semantic_graph(
+def rank_semantic_candidates(
+
+    source_features,
+
+    candidates,
 
-    source_product,
-    candidate_products,
     limit=12,
 ):
 
-    edges = []
+    """
+    candidates: (candidate, features) の列
+    score 上位 limit 件を (score, candidate) で返す
+    同点時は入力順を維持
+    """
 
-    source_id = getattr(
-        source_product,
-        "id",
-        None
-    )
+    scored = []
 
-    for candidate_product in candidate_products:
+    source_id = source_features.product_id
 
-        candidate_id = getattr(
-            candidate_product,
-            "id",
-            None
-        )
+    for position, (candidate, features) in enumerate(
+        candidates
+    ):
 
-        # ==================================================
-        # Self Skip
-        # ==================================================
+        if features is None:
+            continue
 
-        if source_id == candidate_id:
+        if features.product_id == source_id:
+            continue
+
+        score = score_semantic_features(
+
+            source_features,
+
+            features,
+        )
 
+        if score <= 0:
             continue
 
-        try:
+        scored.append(
+            (score, position, candidate)
+        )
 
-            edge = build_semantic_edge(
+    top = heapq.nsmallest(
 
-                source_product,
+        limit,
 
-                candidate_product,
-            )
+        scored,
 
-            if edge:
+        key=lambda x: (
+            -x[0],
+            x[1],
+        ),
+    )
 
-                edges.append(
-                    edge
-                )
+    return [
 
-        except Exception:
+        (score, candidate)
 
-            continue
+        for score, _, candidate in top
+    ]
+
+
+def build_semantic_graph(
+
+    source_product,
+    candidate_products,
+    limit=12,
+):
+
+    source_features = compile_semantic_features(
+        source_product
+    )
+
+    if source_features is None:
+        return []
 
     # ======================================================
-    # Sort
+    # Score (compiled features)
     # ======================================================
 
-    edges = sorted(
+    ranked = rank_semantic_candidates(
+
+        source_features,
 
-        edges,
+        (
+
+            (
+                candidate_product,
+
+                compile_semantic_features(
+                    candidate_product
+                ),
+            )
 
-        key=lambda x: x.get(
-            "score",
-            0
+            for candidate_product in candidate_products
         ),
 
-        reverse=True
+        limit=limit,
     )
 
     # ======================================================
-    # Limit
+    # Winners Only
+    # edge explanation は上位候補のみ構築
     # ======================================================
 
-    return edges[:limit]
+    edges = []
+
+    for _, candidate_product in ranked:
+
+        try:
+
+            edge = build_semantic_edge(
+
+                source_product,
+
+                candidate_product,
+            )
+
+            if edge:
+
+                edges.append(
+                    edge
+                )
+
+        except Exception:
+
+            continue
 
+    return edges
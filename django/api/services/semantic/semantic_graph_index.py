@@ -0,0 +1,575 @@
+# -*- coding: utf-8 -*-
+# api/services/semantic/semantic_graph_index.py
+
+"""
+SHIN CORE LINX
+Semantic Graph Candidate Index
+
+catalog runtime
+↓
+compiled feature vectors
+↓
+inverted index (workflow / gpu / type / display / memory / label)
+↓
+candidate pruning
+↓
+top-k semantic edges
+"""
+
+import threading
+
+from django.db.models import Count, Max
+
+from api.models import PCProduct
+
+from api.utils.catalog_generation import (
+    get_catalog_generation,
+)
+
+from api.services.semantic.semantic_graph import (
+    OLED_FAMILY,
+    PRODUCT_TYPE_CONTINUITY_SCORES,
+    WORKFLOW_BITS,
+    WORKFLOW_EVOLUTION_SCORES,
+    compile_runtime_features,
+    compile_semantic_features,
+    rank_semantic_candidates,
+)
+
+
+# ==========================================================
+# POSTING KEYS
+# IMPORTANT:
+# score > 0 になり得る候補は必ずいずれかの
+# posting を source と共有する
+# ==========================================================
+
+def feature_postings(features):
+
+    keys = []
+
+    for workflow, bit in feature_workflows(features):
+
+        keys.append(
+            ("workflow", workflow)
+        )
+
+    if features.gpu_tier:
+
+        keys.append(
+            ("gpu", features.gpu_tier)
+        )
+
+    if features.product_type:
+
+        keys.append(
+            ("type", features.product_type)
+        )
+
+    if features.display_type:
+
+        keys.append(
+            ("display", features.display_type)
+        )
+
+        if features.display_type in OLED_FAMILY:
+
+            keys.append(
+                ("display", "oled_family")
+            )
+
+    if features.high_memory:
+
+        keys.append(
+            ("memory", "high")
+        )
+
+    for label in features.labels:
+
+        keys.append(
+            ("label", label)
+        )
+
+    return keys
+
+
+def query_postings(features):
+
+    """
+    source 側から引く posting
+    (continuity / evolution の相手側も含む)
+    """
+
+    keys = feature_postings(
+        features
+    )
+
+    for (source_workflow, target_workflow) in (
+        WORKFLOW_EVOLUTION_SCORES
+    ):
+
+        if features.has_workflow(source_workflow):
+
+            keys.append(
+                ("workflow", target_workflow)
+            )
+
+    for (source_type, target_type) in (
+        PRODUCT_TYPE_CONTINUITY_SCORES
+    ):
+
+        if features.product_type == source_type:
+
+            keys.append(
+                ("type", target_type)
+            )
+
+    return keys
+
+
+def feature_workflows(features):
+
+    return [
+
+        (workflow, bit)
+
+        for workflow, bit in WORKFLOW_BITS.items()
+
+        if features.workflow_bits & bit
+    ]
+
+
+# ==========================================================
+# INDEX
+# ==========================================================
+
+class SemanticGraphIndex:
+
+    """
+    catalog 全体の compiled feature と inverted index
+    行順は candidate queryset の既定順 (-updated_at)
+    """
+
+    def __init__(self):
+
+        self.features = {}
+
+        self.order = {}
+
+        self.postings = {}
+
+        self.signature = None
+
+    # ======================================================
+    # BUILD
+    # ======================================================
+
+    def rebuild(self):
+
+        rows = (
+
+            candidate_queryset()
+
+            .values_list(
+                "id",
+                "semantic_runtime",
+            )
+        )
+
+        self.features = {}
+
+        self.order = {}
+
+        self.postings = {}
+
+        for position, (product_id, runtime) in enumerate(
+            rows.iterator(chunk_size=1000)
+        ):
+
+            self.order[product_id] = position
+
+            self.put(
+                product_id,
+                runtime,
+            )
+
+    # ======================================================
+    # INCREMENTAL
+    # ======================================================
+
+    def refresh(
+
+        self,
+
+        since,
+    ):
+
+        """
+        since 以降に updated_at が進んだ行だけ差し替える
+        """
+
+        rows = (
+
+            PCProduct.objects
+
+            .filter(
+                updated_at__gte=since
+            )
+
+            .order_by(
+                "updated_at"
+            )
+
+            .values_list(
+                "id",
+                "semantic_runtime",
+            )
+        )
+
+        front = min(
+            self.order.values(),
+            default=0,
+        )
+
+        for product_id, runtime in rows.iterator(
+            chunk_size=1000
+        ):
+
+            self.drop(
+                product_id
+            )
+
+            if runtime is None:
+                continue
+
+            # 最新更新は -updated_at 順の先頭
+            front -= 1
+
+            self.order[product_id] = front
+
+            self.put(
+                product_id,
+                runtime,
+            )
+
+    def put(
+
+        self,
+
+        product_id,
+
+        runtime,
+    ):
+
+        features = compile_runtime_features(
+
+            product_id,
+
+            runtime or {},
+        )
+
+        if features is None:
+            return
+
+        self.features[product_id] = features
+
+        for key in feature_postings(features):
+
+            self.postings.setdefault(
+                key,
+                set()
+            ).add(
+                product_id
+            )
+
+    def drop(
+
+        self,
+
+        product_id,
+    ):
+
+        self.order.pop(
+            product_id,
+            None
+        )
+
+        features = self.features.pop(
+            product_id,
+            None
+        )
+
+        if features is None:
+            return
+
+        for key in feature_postings(features):
+
+            posting = self.postings.get(key)
+
+            if posting is not None:
+
+                posting.discard(
+                    product_id
+                )
+
+    def size(self):
+
+        return len(self.order)
+
+    # ======================================================
+    # QUERY
+    # ======================================================
+
+    def candidate_ids(
+
+        self,
+
+        source_features,
+    ):
+
+        ids = set()
+
+        for key in query_postings(
+            source_features
+        ):
+
+            ids |= self.postings.get(
+                key,
+                set()
+            )
+
+        ids.discard(
+            source_features.product_id
+        )
+
+        return sorted(
+
+            ids,
+
+            key=lambda product_id: self.order.get(
+                product_id,
+                0
+            ),
+        )
+
+    def top_candidates(
+
+        self,
+
+        source_features,
+
+        limit=12,
+    ):
+
+        """
+        [(score, product_id), ...]
+        """
+
+        return rank_semantic_candidates(
+
+            source_features,
+
+            (
+
+                (
+                    product_id,
+
+                    self.features[product_id],
+                )
+
+                for product_id in self.candidate_ids(
+                    source_features
+                )
+            ),
+
+            limit=limit,
+        )
+
+
+# ==========================================================
+# CANDIDATE QUERYSET
+# ==========================================================
+
+def candidate_queryset():
+
+    return PCProduct.objects.exclude(
+        semantic_runtime__isnull=True
+    )
+
+
+def index_signature():
+
+    signature = candidate_queryset().aggregate(
+
+        total=Count("id"),
+
+        latest=Max("updated_at"),
+    )
+
+    signature["generation"] = (
+        get_catalog_generation()
+    )
+
+    return signature
+
+
+# ==========================================================
+# REGISTRY
+# ==========================================================
+
+_INDEX_LOCK = threading.Lock()
+
+_INDEX = None
+
+
+def is_index_current(
+
+    index,
+
+    generation,
+):
+
+    return (
+        index.signature is not None
+        and index.signature.get("generation") == generation
+    )
+
+
+def get_semantic_graph_index():
+
+    """
+    catalog generation が前回と同じなら集計せずにそのまま返す
+    (request 経路で COUNT / MAX を走らせない)
+
+    世代が進んでいたら lock 内で index_signature を取り、
+    updated_at が進んだ行だけ差分で取り込み、
+    updated_at を伴わない runtime 更新
+    (update_fields / bulk_update) で世代だけ進んだ場合や
+    件数が合わない場合は全件再構築する
+    """
+
+    global _INDEX
+
+    generation = get_catalog_generation()
+
+    index = _INDEX
+
+    if index is not None and is_index_current(
+        index,
+        generation,
+    ):
+
+        return index
+
+    with _INDEX_LOCK:
+
+        index = _INDEX
+
+        # 待っている間に他スレッドが更新済み
+        if index is not None and is_index_current(
+            index,
+            generation,
+        ):
+
+            return index
+
+        signature = index_signature()
+
+        previous = (
+            index.signature
+            if index is not None
+            else {}
+        )
+
+        bypassed_updated_at = (
+            previous.get("latest") == signature["latest"]
+            and previous.get("generation") != signature["generation"]
+        )
+
+        fresh = SemanticGraphIndex()
+
+        if (
+            index is not None
+            and previous.get("latest")
+            and not bypassed_updated_at
+        ):
+
+            # copy-on-write
+            fresh.features = dict(index.features)
+
+            fresh.order = dict(index.order)
+
+            fresh.postings = {
+
+                key: set(ids)
+
+                for key, ids in index.postings.items()
+            }
+
+            fresh.refresh(
+                previous["latest"]
+            )
+
+        if (
+            not fresh.order
+            or fresh.size() != signature["total"]
+        ):
+
+            fresh.rebuild()
+
+        fresh.signature = signature
+
+        _INDEX = fresh
+
+        return fresh
+
+
+def invalidate_semantic_graph_index():
+
+    global _INDEX
+
+    with _INDEX_LOCK:
+
+        _INDEX = None
+
+
+# ==========================================================
+# TOP-K
+# ==========================================================
+
+def find_semantic_graph_candidates(
+
+    source_product,
+
+    limit=12,
+
+    index=None,
+):
+
+    """
+    catalog 全体から source の上位候補 id を返す
+    (bulk 処理では取得済みの index を渡す)
+    """
+
+    source_features = compile_semantic_features(
+        source_product
+    )
+
+    if source_features is None:
+        return []
+
+    if index is None:
+
+        index = get_semantic_graph_index()
+
+    return [
+
+        product_id
+
+        for _, product_id in index.top_candidates(
+
+            source_features,
+
+            limit=limit,
+        )
+    ]
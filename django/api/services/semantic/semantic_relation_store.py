@@ -0,0 +1,760 @@
+# -*- coding: utf-8 -*-
+# api/services/semantic/semantic_relation_store.py
+
+"""
+SHIN CORE LINX
+Materialized Semantic Relations
+
+compiled runtime
+↓
+semantic graph index
+↓
+top-N edges per product
+↓
+PCProductRelation
+↓
+single indexed read on request path
+"""
+
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from api.models import (
+    PCProduct,
+    PCProductRelation,
+)
+
+from api.services.semantic.semantic_graph import (
+    PRODUCT_TYPE_CONTINUITY_SCORES,
+    WORKFLOW_EVOLUTION_SCORES,
+    build_semantic_graph,
+    score_semantic_features,
+)
+
+from api.services.semantic.semantic_graph_index import (
+    feature_postings,
+    find_semantic_graph_candidates,
+    get_semantic_graph_index,
+)
+
+from api.services.semantic.semantic_api_service import (
+    load_related_candidates,
+    related_candidate_queryset,
+)
+
+# ==========================================================
+# CONSTANTS
+# ==========================================================
+
+RELATION_TOP_N = 20
+
+RELATION_CHUNK_SIZE = 500
+
+# request 側で読む relation 列 (computed_at は読まない)
+RELATION_FIELDS = (
+
+    "id",
+
+    "source",
+
+    "target",
+
+    "rank",
+
+    "score",
+
+    "edge_type",
+
+    "workflow_relation",
+
+    "explanations",
+)
+
+# request 側で読む target 列 (raw_html / description 等の重い列は読まない)
+RELATION_TARGET_FIELDS = (
+
+    "id",
+
+    "unique_id",
+
+    "name",
+
+    "maker",
+
+    "brand",
+
+    "series",
+
+    "product_type",
+
+    "unified_genre",
+
+    "price",
+
+    "url",
+
+    "image_url",
+
+    "cpu_model",
+
+    "gpu_model",
+
+    "memory_gb",
+
+    "storage_gb",
+
+    "spec_score",
+
+    "semantic_score",
+
+    "is_active",
+
+    "updated_at",
+
+    "semantic_runtime",
+)
+
+
+# ==========================================================
+# COMPUTE
+# ==========================================================
+
+def compute_relation_rows(
+
+    sources,
+
+    index,
+
+    limit=RELATION_TOP_N,
+):
+
+    """
+    sources の top-N エッジを PCProductRelation 行にする
+    """
+
+    candidate_ids_map = {
+
+        source.id:
+
+            find_semantic_graph_candidates(
+
+                source,
+
+                limit=limit,
+
+                index=index,
+            )
+
+        for source in sources
+    }
+
+    candidate_map = load_related_candidates(
+
+        candidate_id
+
+        for candidate_ids in candidate_ids_map.values()
+
+        for candidate_id in candidate_ids
+    )
+
+    computed_at = timezone.now()
+
+    rows = []
+
+    for source in sources:
+
+        candidates = [
+
+            candidate_map[candidate_id]
+
+            for candidate_id in candidate_ids_map[source.id]
+
+            if candidate_id in candidate_map
+        ]
+
+        edges = build_semantic_graph(
+
+            source_product=source,
+
+            candidate_products=candidates,
+
+            limit=limit,
+        )
+
+        for rank, edge in enumerate(
+
+            edges,
+
+            start=1,
+        ):
+
+            rows.append(
+
+                PCProductRelation(
+
+                    source_id=source.id,
+
+                    target_id=edge["target_id"],
+
+                    rank=rank,
+
+                    score=edge.get(
+                        "score",
+                        0
+                    ),
+
+                    edge_type=edge.get(
+                        "edge_type"
+                    ) or "",
+
+                    workflow_relation=edge.get(
+                        "workflow_relation"
+                    ) or "",
+
+                    explanations=edge.get(
+                        "explanations",
+                        []
+                    ),
+
+                    computed_at=computed_at,
+                )
+            )
+
+    return rows
+
+
+# ==========================================================
+# WRITE
+# ==========================================================
+
+def write_relations(
+
+    source_ids,
+
+    index,
+
+    limit=RELATION_TOP_N,
+):
+
+    source_ids = list(
+        source_ids
+    )
+
+    written = 0
+
+    for offset in range(
+
+        0,
+
+        len(source_ids),
+
+        RELATION_CHUNK_SIZE,
+    ):
+
+        chunk_ids = source_ids[
+            offset:offset + RELATION_CHUNK_SIZE
+        ]
+
+        sources = list(
+
+            related_candidate_queryset()
+
+            .filter(
+                id__in=chunk_ids
+            )
+        )
+
+        rows = compute_relation_rows(
+
+            sources,
+
+            index,
+
+            limit=limit,
+        )
+
+        with transaction.atomic():
+
+            PCProductRelation.objects.filter(
+                source_id__in=chunk_ids
+            ).delete()
+
+            PCProductRelation.objects.bulk_create(
+                rows
+            )
+
+        written += len(rows)
+
+    return written
+
+
+def rebuild_product_relations(
+
+    limit=RELATION_TOP_N,
+):
+
+    """
+    全件再計算
+    """
+
+    index = get_semantic_graph_index()
+
+    source_ids = list(
+
+        PCProduct.objects
+
+        .exclude(
+            semantic_runtime__isnull=True
+        )
+
+        .values_list(
+            "id",
+            flat=True
+        )
+    )
+
+    written = write_relations(
+
+        source_ids,
+
+        index,
+
+        limit=limit,
+    )
+
+    # runtime が無くなった source の残骸
+    PCProductRelation.objects.exclude(
+        source_id__in=PCProduct.objects.exclude(
+            semantic_runtime__isnull=True
+        ).values("id")
+    ).delete()
+
+    return {
+
+        "sources":
+            len(source_ids),
+
+        "relations":
+            written,
+    }
+
+
+# ==========================================================
+# INCREMENTAL
+# ==========================================================
+
+def reverse_postings(features):
+
+    """
+    features を候補として引き得る source 側の posting
+    """
+
+    keys = feature_postings(
+        features
+    )
+
+    for (source_workflow, target_workflow) in (
+        WORKFLOW_EVOLUTION_SCORES
+    ):
+
+        if features.has_workflow(target_workflow):
+
+            keys.append(
+                ("workflow", source_workflow)
+            )
+
+    for (source_type, target_type) in (
+        PRODUCT_TYPE_CONTINUITY_SCORES
+    ):
+
+        if features.product_type == target_type:
+
+            keys.append(
+                ("type", source_type)
+            )
+
+    return keys
+
+
+def find_relation_neighbours(
+
+    changed_ids,
+
+    index,
+
+    limit=RELATION_TOP_N,
+):
+
+    """
+    changed_ids の runtime 変更で top-N が変わり得る source
+
+    - 既に changed を関連に持つ source
+    - changed とのスコアが現在の N 位を上回る source
+    """
+
+    changed_ids = set(
+        changed_ids
+    )
+
+    affected = set(
+
+        PCProductRelation.objects
+
+        .filter(
+            target_id__in=changed_ids
+        )
+
+        .values_list(
+            "source_id",
+            flat=True
+        )
+    )
+
+    # ------------------------------------------------------
+    # reverse candidates
+    # ------------------------------------------------------
+
+    reverse = {}
+
+    for changed_id in changed_ids:
+
+        changed_features = index.features.get(
+            changed_id
+        )
+
+        if changed_features is None:
+            continue
+
+        for key in reverse_postings(
+            changed_features
+        ):
+
+            for source_id in index.postings.get(
+                key,
+                ()
+            ):
+
+                if source_id in changed_ids:
+                    continue
+
+                score = score_semantic_features(
+
+                    index.features[source_id],
+
+                    changed_features,
+                )
+
+                if score > reverse.get(
+                    source_id,
+                    0
+                ):
+
+                    reverse[source_id] = score
+
+    if not reverse:
+
+        return affected
+
+    # ------------------------------------------------------
+    # current N-th score
+    # ------------------------------------------------------
+
+    floors = {}
+
+    reverse_ids = list(
+        reverse
+    )
+
+    for offset in range(
+
+        0,
+
+        len(reverse_ids),
+
+        RELATION_CHUNK_SIZE,
+    ):
+
+        for row in (
+
+            PCProductRelation.objects
+
+            .filter(
+                source_id__in=reverse_ids[
+                    offset:offset + RELATION_CHUNK_SIZE
+                ]
+            )
+
+            .values(
+                "source_id"
+            )
+
+            .annotate(
+                count=Count("id"),
+                floor=Min("score"),
+            )
+        ):
+
+            floors[row["source_id"]] = (
+
+                row["floor"]
+
+                if row["count"] >= limit
+
+                else 0
+            )
+
+    for source_id, score in reverse.items():
+
+        if score >= floors.get(
+            source_id,
+            0
+        ):
+
+            affected.add(
+                source_id
+            )
+
+    return affected
+
+
+def refresh_product_relations(
+
+    changed_ids,
+
+    limit=RELATION_TOP_N,
+):
+
+    """
+    runtime が変わった product と近傍だけ再計算
+    """
+
+    changed_ids = set(
+        changed_ids
+    )
+
+    if not changed_ids:
+
+        return {
+
+            "sources":
+                0,
+
+            "relations":
+                0,
+        }
+
+    index = get_semantic_graph_index()
+
+    affected = find_relation_neighbours(
+
+        changed_ids,
+
+        index,
+
+        limit=limit,
+    )
+
+    source_ids = changed_ids | affected
+
+    written = write_relations(
+
+        source_ids,
+
+        index,
+
+        limit=limit,
+    )
+
+    return {
+
+        "sources":
+            len(source_ids),
+
+        "neighbours":
+            len(affected),
+
+        "relations":
+            written,
+    }
+
+
+# ==========================================================
+# READ
+# ==========================================================
+
+def load_product_relations(
+
+    source,
+
+    limit=RELATION_TOP_N,
+):
+
+    """
+    single indexed query (source, rank) + target join
+
+    非掲載の target は slice 前に除く (limit 件まで埋める)
+    target は RELATION_TARGET_FIELDS だけ読む
+    """
+
+    return list(
+
+        PCProductRelation.objects
+
+        .filter(
+            source=source,
+            target__is_active=True,
+        )
+
+        .select_related(
+            "target"
+        )
+
+        .only(
+
+            *RELATION_FIELDS,
+
+            *(
+                f"target__{field}"
+                for field in RELATION_TARGET_FIELDS
+            ),
+        )
+
+        .order_by(
+            "rank"
+        )[:limit]
+    )
+
+
+def load_relations_by_source(
+
+    source_ids,
+
+    limit=RELATION_TOP_N,
+):
+
+    """
+    一覧 (?view=full) 用: page 内の全 source を 1 query で読む
+
+    return: {source_id: [relation, ...]} (rank 順 / 非掲載 target は除く)
+    """
+
+    grouped = {}
+
+    source_ids = list(
+        source_ids
+    )
+
+    if not source_ids:
+        return grouped
+
+    for relation in (
+
+        PCProductRelation.objects
+
+        .filter(
+            source_id__in=source_ids,
+            target__is_active=True,
+        )
+
+        .select_related(
+            "target"
+        )
+
+        .only(
+
+            *RELATION_FIELDS,
+
+            *(
+                f"target__{field}"
+                for field in RELATION_TARGET_FIELDS
+            ),
+        )
+
+        .order_by(
+            "source_id",
+            "rank",
+        )
+    ):
+
+        relations = grouped.setdefault(
+            relation.source_id,
+            [],
+        )
+
+        if len(relations) < limit:
+
+            relations.append(
+                relation
+            )
+
+    return grouped
+
+
+def build_relation_edge(relation):
+
+    return {
+
+        "edge_type":
+            relation.edge_type,
+
+        "score":
+            relation.score,
+
+        "workflow_relation":
+            relation.workflow_relation,
+
+        "explanations":
+            relation.explanations,
+    }
+
+
+def build_relation_node(relation):
+
+    """
+    product detail 用 lightweight node
+    """
+
+    target = relation.target
+
+    runtime = (
+        target.semantic_runtime
+        or {}
+    )
+
+    return {
+
+        "id":
+            target.id,
+
+        "unique_id":
+            target.unique_id,
+
+        "name":
+            target.name,
+
+        "image_url":
+            target.image_url,
+
+        "price":
+            target.price,
+
+        "maker":
+            target.maker,
+
+        "product_type":
+            runtime.get(
+                "product_type"
+            ),
+
+        "semantic_labels":
+            runtime.get(
+                "semantic_labels",
+                []
+            )[:3],
+
+        "edge":
+            build_relation_edge(
+                relation
+            ),
+    }
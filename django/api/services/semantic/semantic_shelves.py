@@ -16,6 +16,8 @@ cinematic exploration rails
 human discovery orchestration
 """
 
+import heapq
+
 # ==========================================================
 # UTIL
 # ==========================================================
@@ -72,68 +74,23 @@ def workflow_names(runtime):
     return names
 
 
-def unique_products(products):
-
-    seen = set()
-
-    result = []
-
-    for product in products:
-
-        product_id = getattr(
-            product,
-            "id",
-            None
-        )
-
-        if not product_id:
-            continue
-
-        if product_id in seen:
-            continue
-
-        seen.add(product_id)
-
-        result.append(product)
-
-    return result
+def shelf_score(runtime):
 
+    return (
 
-def sort_products(products):
-
-    def score(product):
-
-        runtime = getattr(
-            product,
-            "semantic_runtime",
-            {}
-        ) or {}
-
-        semantic_score = safe_int(
+        safe_int(
             runtime.get(
                 "semantic_score"
             )
         )
 
-        workflow_score = safe_int(
+        +
+
+        safe_int(
             runtime.get(
                 "workflow_score"
             )
         )
-
-        return (
-            semantic_score
-            +
-            workflow_score
-        )
-
-    return sorted(
-
-        products,
-
-        key=score,
-
-        reverse=True
     )
 
 
@@ -174,13 +131,10 @@ EXCLUDED_PRODUCT_TYPES = [
 MIN_SEMANTIC_SCORE = 10
 
 
-def valid_runtime(product):
+def valid_shelf_runtime(runtime):
 
-    runtime = getattr(
-        product,
-        "semantic_runtime",
-        {}
-    ) or {}
+    if not isinstance(runtime, dict):
+        return False
 
     product_type = runtime.get(
         "product_type"
@@ -360,373 +314,328 @@ SHELF_RULES = {
 
 
 # ==========================================================
-# SHELF BASE
+# SHELF FEATURES
+# IMPORTANT:
+# runtime は product ごとに 1 回だけ解釈して bitset にし、
+# shelf 判定は mask 比較だけで行う
 # ==========================================================
 
-def build_shelf_payload(
+SHELF_PRODUCT_LIMIT = 12
 
-    shelf_type,
-    products,
-):
+# workflow bitset
+WORKFLOW_AI = 1 << 0
 
-    if not products:
-        return None
+WORKFLOW_CREATOR = 1 << 1
 
-    products = unique_products(
-        products
-    )
+WORKFLOW_GAMING = 1 << 2
 
-    products = sort_products(
-        products
-    )
+WORKFLOW_MOBILITY = 1 << 3
 
-    rule = SHELF_RULES.get(
-        shelf_type,
-        {}
-    )
-
-    return {
+SHELF_WORKFLOW_BITS = {
 
-        "shelf_type":
-            shelf_type,
+    "ai":
+        WORKFLOW_AI,
 
-        "title":
-            rule.get(
-                "title"
-            ),
+    "creator":
+        WORKFLOW_CREATOR,
 
-        "description":
-            rule.get(
-                "description"
-            ),
+    "gaming":
+        WORKFLOW_GAMING,
 
-        "priority":
-            rule.get(
-                "priority",
-                0
-            ),
+    "mobility":
+        WORKFLOW_MOBILITY,
+}
 
-        "ui_mode":
-            rule.get(
-                "ui_mode",
-                "general"
-            ),
+# label bitset
+LABEL_GPU = 1 << 8
 
-        "products":
-            products[:12],
-    }
+LABEL_OLED = 1 << 9
 
+LABEL_HIGH_REFRESH = 1 << 10
 
-# ==========================================================
-# AI SHELF
-# ==========================================================
+LABEL_SEMANTIC_RICH = 1 << 11
 
-def build_ai_workflow_shelf(products):
+LABEL_EVOLUTION_TYPE = 1 << 12
 
-    shelf_products = []
+OLED_DISPLAY_TYPES = [
 
-    for product in products:
+    "OLED",
 
-        if not valid_runtime(product):
-            continue
+    "QD-OLED",
+]
 
-        runtime = getattr(
-            product,
-            "semantic_runtime",
-            {}
-        ) or {}
+HIGH_REFRESH_RATE = 240
 
-        workflows = workflow_names(
-            runtime
-        )
+SEMANTIC_RICH_SCORE = 70
 
-        if "ai" not in workflows:
-            continue
+EVOLUTION_PRODUCT_TYPES = [
 
-        shelf_products.append(
-            product
-        )
+    "gaming_pc",
 
-    return build_shelf_payload(
+    "creator_pc",
 
-        "ai_workflow",
+    "ai_workstation",
+]
 
-        shelf_products,
-    )
+# shelf_type → mask 候補 (どれか 1 つを全 bit 満たせば所属)
+SHELF_MASKS = {
 
+    "ai_workflow": (
+        WORKFLOW_AI,
+    ),
 
-# ==========================================================
-# CREATOR SHELF
-# ==========================================================
+    "creator_workflow": (
+        WORKFLOW_CREATOR,
+    ),
 
-def build_creator_workflow_shelf(products):
+    "gaming_setup": (
+        WORKFLOW_GAMING | LABEL_GPU,
+    ),
 
-    shelf_products = []
+    "immersive_display": (
+        LABEL_OLED,
+        LABEL_HIGH_REFRESH,
+    ),
 
-    for product in products:
+    "mobility_workflow": (
+        WORKFLOW_MOBILITY,
+    ),
 
-        if not valid_runtime(product):
-            continue
+    "semantic_richness": (
+        LABEL_SEMANTIC_RICH,
+    ),
 
-        runtime = getattr(
-            product,
-            "semantic_runtime",
-            {}
-        ) or {}
+    "workflow_evolution": (
+        LABEL_EVOLUTION_TYPE,
+    ),
+}
 
-        workflows = workflow_names(
-            runtime
-        )
+# shelf 判定に使う runtime key
+# (scan 時は semantic_runtime 全体ではなくこれだけを読む)
+SHELF_RUNTIME_KEYS = (
 
-        if "creator" not in workflows:
-            continue
+    "product_type",
 
-        shelf_products.append(
-            product
-        )
+    "semantic_score",
 
-    return build_shelf_payload(
+    "workflow_score",
 
-        "creator_workflow",
+    "workflows",
 
-        shelf_products,
-    )
+    "gpu_model",
 
+    "display_type",
 
-# ==========================================================
-# GAMING SHELF
-# ==========================================================
+    "refresh_rate",
+)
 
-def build_gaming_shelf(products):
 
-    shelf_products = []
+def compile_shelf_features(runtime):
 
-    for product in products:
+    """
+    return: workflow | label bitset
+    """
 
-        if not valid_runtime(product):
-            continue
+    bits = 0
 
-        runtime = getattr(
-            product,
-            "semantic_runtime",
-            {}
-        ) or {}
+    for workflow in workflow_names(runtime):
 
-        workflows = workflow_names(
-            runtime
+        bits |= SHELF_WORKFLOW_BITS.get(
+            workflow,
+            0
         )
 
-        gpu_model = runtime.get(
-            "gpu_model"
-        )
+    if runtime.get("gpu_model"):
 
-        if "gaming" not in workflows:
-            continue
+        bits |= LABEL_GPU
 
-        if not gpu_model:
-            continue
+    if runtime.get("display_type") in OLED_DISPLAY_TYPES:
+
+        bits |= LABEL_OLED
 
-        shelf_products.append(
-            product
+    if safe_int(
+        runtime.get(
+            "refresh_rate"
         )
+    ) >= HIGH_REFRESH_RATE:
 
-    return build_shelf_payload(
+        bits |= LABEL_HIGH_REFRESH
 
-        "gaming_setup",
+    if safe_int(
+        runtime.get(
+            "semantic_score"
+        )
+    ) >= SEMANTIC_RICH_SCORE:
 
-        shelf_products,
-    )
+        bits |= LABEL_SEMANTIC_RICH
 
+    if runtime.get("product_type") in EVOLUTION_PRODUCT_TYPES:
 
-# ==========================================================
-# IMMERSIVE SHELF
-# ==========================================================
+        bits |= LABEL_EVOLUTION_TYPE
 
-def build_immersive_display_shelf(products):
+    return bits
 
-    shelf_products = []
 
-    for product in products:
+def classify_shelves(features):
 
-        if not valid_runtime(product):
-            continue
+    return [
 
-        runtime = getattr(
-            product,
-            "semantic_runtime",
-            {}
-        ) or {}
+        shelf_type
 
-        display_type = runtime.get(
-            "display_type"
-        )
-
-        refresh_rate = safe_int(
+        for shelf_type, masks in SHELF_MASKS.items()
 
-            runtime.get(
-                "refresh_rate"
-            )
+        if any(
+            features & mask == mask
+            for mask in masks
         )
+    ]
 
-        # ==================================================
-        # OLED
-        # ==================================================
-
-        if display_type in [
-
-            "OLED",
-
-            "QD-OLED",
-        ]:
-
-            shelf_products.append(
-                product
-            )
 
-            continue
+# ==========================================================
+# SINGLE PASS ENGINE
+# ==========================================================
 
-        # ==================================================
-        # High Refresh
-        # ==================================================
+def rank_shelf_products(
 
-        if refresh_rate >= 240:
+    rows,
 
-            shelf_products.append(
-                product
-            )
+    limit=SHELF_PRODUCT_LIMIT,
+):
 
-    return build_shelf_payload(
+    """
+    rows: iterable of (product_id, runtime)
 
-        "immersive_display",
+    catalog を 1 回だけ走査し、shelf ごとに
+    上位 limit 件だけを min-heap で保持する
+    (score 同点は走査順が先のものを上位にする)
 
-        shelf_products,
-    )
+    return: {shelf_type: [product_id, ...]} (score 順)
+    """
 
+    heaps = {
+        shelf_type: []
+        for shelf_type in SHELF_MASKS
+    }
 
-# ==========================================================
-# MOBILITY SHELF
-# ==========================================================
+    seen = set()
 
-def build_mobility_shelf(products):
+    for position, (product_id, runtime) in enumerate(rows):
 
-    shelf_products = []
+        if not product_id or product_id in seen:
+            continue
 
-    for product in products:
+        seen.add(product_id)
 
-        if not valid_runtime(product):
+        if not valid_shelf_runtime(runtime):
             continue
 
-        runtime = getattr(
-            product,
-            "semantic_runtime",
-            {}
-        ) or {}
+        shelf_types = classify_shelves(
 
-        workflows = workflow_names(
-            runtime
+            compile_shelf_features(
+                runtime
+            )
         )
 
-        if "mobility" not in workflows:
+        if not shelf_types:
             continue
 
-        shelf_products.append(
-            product
-        )
+        entry = (
 
-    return build_shelf_payload(
-
-        "mobility_workflow",
-
-        shelf_products,
-    )
+            shelf_score(
+                runtime
+            ),
 
+            -position,
 
-# ==========================================================
-# SEMANTIC RICHNESS SHELF
-# ==========================================================
+            product_id,
+        )
 
-def build_semantic_richness_shelf(products):
+        for shelf_type in shelf_types:
 
-    shelf_products = []
+            heap = heaps[shelf_type]
 
-    for product in products:
+            if len(heap) < limit:
 
-        if not valid_runtime(product):
-            continue
+                heapq.heappush(
+                    heap,
+                    entry
+                )
 
-        runtime = getattr(
-            product,
-            "semantic_runtime",
-            {}
-        ) or {}
+            elif entry > heap[0]:
 
-        semantic_score = safe_int(
+                heapq.heapreplace(
+                    heap,
+                    entry
+                )
 
-            runtime.get(
-                "semantic_score"
-            )
-        )
+    return {
 
-        if semantic_score < 70:
-            continue
+        shelf_type: [
 
-        shelf_products.append(
-            product
-        )
+            product_id
 
-    return build_shelf_payload(
+            for _, _, product_id in sorted(
+                heap,
+                reverse=True
+            )
+        ]
 
-        "semantic_richness",
+        for shelf_type, heap in heaps.items()
 
-        shelf_products,
-    )
+        if heap
+    }
 
 
 # ==========================================================
-# EVOLUTION SHELF
+# SHELF BASE
 # ==========================================================
 
-def build_workflow_evolution_shelf(products):
-
-    shelf_products = []
-
-    evolution_types = [
+def build_shelf_payload(
 
-        "gaming_pc",
+    shelf_type,
+    products,
+):
 
-        "creator_pc",
+    if not products:
+        return None
 
-        "ai_workstation",
-    ]
+    rule = SHELF_RULES.get(
+        shelf_type,
+        {}
+    )
 
-    for product in products:
+    return {
 
-        if not valid_runtime(product):
-            continue
+        "shelf_type":
+            shelf_type,
 
-        runtime = getattr(
-            product,
-            "semantic_runtime",
-            {}
-        ) or {}
+        "title":
+            rule.get(
+                "title"
+            ),
 
-        product_type = runtime.get(
-            "product_type"
-        )
+        "description":
+            rule.get(
+                "description"
+            ),
 
-        if product_type not in evolution_types:
-            continue
+        "priority":
+            rule.get(
+                "priority",
+                0
+            ),
 
-        shelf_products.append(
-            product
-        )
+        "ui_mode":
+            rule.get(
+                "ui_mode",
+                "general"
+            ),
 
-    return build_shelf_payload(
+        "products":
+            products[:SHELF_PRODUCT_LIMIT],
+    }
 
-        "workflow_evolution",
 
-        shelf_products,
-    )
 # ==========================================================
 # SHELF CONNECTIONS
 # ==========================================================
@@ -802,98 +711,95 @@ def sort_shelves(shelves):
 # MAIN
 # ==========================================================
 
-def build_semantic_shelves(products):
+def assemble_semantic_shelves(
+
+    shelf_ids,
+
+    product_map,
+):
 
     """
-    semantic cinematic exploration rails
+    shelf_ids: rank_shelf_products の結果
+    product_map: {product_id: product}
     """
 
     shelves = []
-    
-    connections = build_shelf_connections()
-
-    shelf_builders = [
-
-        # ==================================================
-        # AI
-        # ==================================================
 
-        build_ai_workflow_shelf,
-
-        # ==================================================
-        # Creator
-        # ==================================================
-
-        build_creator_workflow_shelf,
-
-        # ==================================================
-        # Gaming
-        # ==================================================
+    connections = build_shelf_connections()
 
-        build_gaming_shelf,
+    for shelf_type, product_ids in shelf_ids.items():
 
-        # ==================================================
-        # Immersive
-        # ==================================================
+        shelf = build_shelf_payload(
 
-        build_immersive_display_shelf,
+            shelf_type,
 
-        # ==================================================
-        # Mobility
-        # ==================================================
+            [
+                product_map[product_id]
+                for product_id in product_ids
+                if product_id in product_map
+            ],
+        )
 
-        build_mobility_shelf,
+        if not shelf:
+            continue
 
-        # ==================================================
-        # Rich Semantic
-        # ==================================================
+        shelf["next_shelves"] = (
 
-        build_semantic_richness_shelf,
+            connections.get(
+                shelf_type,
+                []
+            )
+        )
 
-        # ==================================================
-        # Evolution
-        # ==================================================
+        shelves.append(
+            shelf
+        )
 
-        build_workflow_evolution_shelf,
-    ]
+    # ======================================================
+    # Sort
+    # ======================================================
 
-    for shelf_builder in shelf_builders:
+    return sort_shelves(
+        shelves
+    )
 
-        try:
 
-            shelf = shelf_builder(
-                products
-            )
-            
-            if shelf:
+def build_semantic_shelves(products):
 
-                shelf["next_shelves"] = (
+    """
+    semantic cinematic exploration rails
 
-                    connections.get(
+    products (loaded instances) から 1 pass で組む
+    """
 
-                        shelf.get(
-                            "shelf_type"
-                        ),
+    products = list(products)
 
-                        []
-                    )
-                )
+    shelf_ids = rank_shelf_products(
 
-                shelves.append(
-                    shelf
-                )
+        (
+            getattr(
+                product,
+                "id",
+                None
+            ),
 
+            getattr(
+                product,
+                "semantic_runtime",
+                {}
+            ),
+        )
 
-        except Exception:
+        for product in products
+    )
 
-            continue
+    return assemble_semantic_shelves(
 
-    # ======================================================
-    # Sort
-    # ======================================================
+        shelf_ids,
 
-    shelves = sort_shelves(
-        shelves
+        {
+            product.id: product
+            for product in products
+            if getattr(product, "id", None)
+        },
     )
-
-    return shelves
\ No newline at end of file
@@ -0,0 +1,741 @@
+# -*- coding: utf-8 -*-
+# /home/maya/shin-vps/django/api/services/semantic/v2/authority/authority_registry.py
+
+"""
+SHIN CORE LINX
+
+Authority Registry (process snapshot)
+
+Authority TSV
+↓
+AuthoritySnapshot (1 回だけ parse / slug・group・alias index)
+↓
+process 内で共有
+
+TSV の mtime / size が変わったら hash を取り直し、
+内容が変わっていれば snapshot を丸ごと作り直して差し替える。
+
+compile_authority_snapshot が書き出す pickle があれば
+worker 起動時の TSV parse を省略する。
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+from pathlib import Path
+
+from .tsv_loader import (
+    DEFAULT_TSV_DIR,
+    load_tsv,
+)
+
+
+# ==========================================================
+# CONSTANTS
+# ==========================================================
+
+SNAPSHOT_FORMAT = 1
+
+DEFAULT_ARTIFACT = (
+    DEFAULT_TSV_DIR
+    / ".compiled"
+    / "semantic_authority.pickle"
+)
+
+DEFAULT_CHECK_INTERVAL = 2.0
+
+ATTRIBUTES_TABLE = "semantic_attributes"
+
+GROUPS_TABLE = "semantic_groups"
+
+GROUP_MAPPINGS_TABLE = "semantic_group_mappings"
+
+ALIASES_TABLE = "semantic_aliases"
+
+INTENT_ALIASES_TABLE = "intent_aliases"
+
+SLUG_METADATA_TABLE = "semantic_slug_metadata"
+
+# semantic_slug_metadata.tsv は header の下に説明行が 3 行ある
+SLUG_METADATA_HEADER_ROWS = 3
+
+
+# ==========================================================
+# SETTINGS
+# ==========================================================
+
+def get_authority_settings():
+
+    try:
+
+        from django.conf import settings
+
+        options = getattr(
+            settings,
+            "SEMANTIC_AUTHORITY",
+            {}
+        )
+
+    except Exception:
+
+        # DEBUG (__main__) 実行時は settings 無し
+        options = {}
+
+    return {
+
+        "artifact":
+            Path(
+                options.get("ARTIFACT")
+                or DEFAULT_ARTIFACT
+            ),
+
+        "check_interval":
+            float(
+                options.get(
+                    "CHECK_INTERVAL",
+                    DEFAULT_CHECK_INTERVAL,
+                )
+            ),
+    }
+
+
+# ==========================================================
+# FILE STATE
+# ==========================================================
+
+def tsv_files(directory):
+
+    return sorted(
+        Path(directory).glob("*.tsv")
+    )
+
+
+def scan_fingerprint(directory):
+
+    """
+    stat だけで取れる変更検知用の値
+    """
+
+    fingerprint = []
+
+    for file in tsv_files(directory):
+
+        stat = file.stat()
+
+        fingerprint.append((
+            file.name,
+            stat.st_mtime_ns,
+            stat.st_size,
+        ))
+
+    return tuple(fingerprint)
+
+
+def digest_files(directory):
+
+    """
+    TSV 内容の hash (touch だけなら作り直さない)
+    """
+
+    digest = hashlib.sha1()
+
+    for file in tsv_files(directory):
+
+        digest.update(
+            file.name.encode("utf-8")
+        )
+
+        digest.update(b"\0")
+
+        digest.update(
+            file.read_bytes()
+        )
+
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+# ==========================================================
+# SNAPSHOT
+# ==========================================================
+
+class AuthoritySnapshot:
+
+    """
+    immutable authority snapshot
+
+    table は呼び出しごとに shallow copy を返す。
+    row (dict) は全 request で共有するので書き換えないこと。
+    """
+
+    def __init__(
+
+        self,
+
+        tables,
+
+        digest,
+
+        directory,
+    ):
+
+        self.tables = {
+
+            name: tuple(rows)
+
+            for name, rows in tables.items()
+        }
+
+        self.digest = digest
+
+        self.directory = str(directory)
+
+        self.loaded_at = time.time()
+
+        self.build_indexes()
+
+    # ======================================================
+    # INDEX
+    # ======================================================
+
+    def build_indexes(self):
+
+        self.attributes_by_slug = {
+
+            row.get("slug"): row
+
+            for row in self.tables.get(
+                ATTRIBUTES_TABLE,
+                ()
+            )
+
+            if row.get("slug")
+        }
+
+        self.groups_by_slug = {
+
+            row.get("group_slug"): row
+
+            for row in self.tables.get(
+                GROUPS_TABLE,
+                ()
+            )
+
+            if row.get("group_slug")
+        }
+
+        self.metadata_by_slug = {
+
+            row.get("slug"): row
+
+            for row in self.tables.get(
+                SLUG_METADATA_TABLE,
+                ()
+            )[SLUG_METADATA_HEADER_ROWS:]
+
+            if row.get("slug")
+        }
+
+        group_attributes = {}
+
+        attribute_groups = {}
+
+        for row in self.tables.get(
+            GROUP_MAPPINGS_TABLE,
+            ()
+        ):
+
+            group_slug = row.get("group_slug")
+
+            attribute_slug = row.get("attribute_slug")
+
+            if not group_slug or not attribute_slug:
+                continue
+
+            group_attributes.setdefault(
+                group_slug,
+                []
+            ).append(attribute_slug)
+
+            attribute_groups.setdefault(
+                attribute_slug,
+                []
+            ).append(group_slug)
+
+        self.group_attributes = {
+
+            slug: tuple(members)
+
+            for slug, members in group_attributes.items()
+        }
+
+        self.attribute_groups = {
+
+            slug: tuple(groups)
+
+            for slug, groups in attribute_groups.items()
+        }
+
+        self.aliases_by_alias = self.index_aliases(
+            ALIASES_TABLE
+        )
+
+        self.intent_aliases_by_alias = self.index_aliases(
+            INTENT_ALIASES_TABLE
+        )
+
+    def index_aliases(self, table):
+
+        index = {}
+
+        for row in self.tables.get(
+            table,
+            ()
+        ):
+
+            alias = (
+                row.get("alias")
+                or ""
+            ).strip().lower()
+
+            if not alias:
+                continue
+
+            index.setdefault(
+                alias,
+                []
+            ).append(row)
+
+        return {
+
+            alias: tuple(rows)
+
+            for alias, rows in index.items()
+        }
+
+    # ======================================================
+    # LOOKUP
+    # ======================================================
+
+    def table(self, name):
+
+        return list(
+            self.tables.get(
+                name,
+                ()
+            )
+        )
+
+    def table_names(self):
+
+        return sorted(
+            self.tables
+        )
+
+    def attribute(self, slug):
+
+        return self.attributes_by_slug.get(
+            slug
+        )
+
+    def group(self, group_slug):
+
+        return self.groups_by_slug.get(
+            group_slug
+        )
+
+    def metadata(self, slug):
+
+        return self.metadata_by_slug.get(
+            slug
+        )
+
+    def attributes_of_group(self, group_slug):
+
+        return self.group_attributes.get(
+            group_slug,
+            ()
+        )
+
+    def groups_of_attribute(self, attribute_slug):
+
+        return self.attribute_groups.get(
+            attribute_slug,
+            ()
+        )
+
+    def aliases(self, alias):
+
+        return self.aliases_by_alias.get(
+            (alias or "").strip().lower(),
+            ()
+        )
+
+    def intent_aliases(self, alias):
+
+        return self.intent_aliases_by_alias.get(
+            (alias or "").strip().lower(),
+            ()
+        )
+
+    def stats(self):
+
+        return {
+
+            name: len(rows)
+
+            for name, rows in sorted(
+                self.tables.items()
+            )
+        }
+
+    # ======================================================
+    # ARTIFACT
+    # ======================================================
+
+    def to_artifact(self):
+
+        return {
+
+            "format":
+                SNAPSHOT_FORMAT,
+
+            "digest":
+                self.digest,
+
+            "directory":
+                self.directory,
+
+            "tables": {
+
+                name: list(rows)
+
+                for name, rows in self.tables.items()
+            },
+        }
+
+    @classmethod
+    def from_artifact(cls, payload):
+
+        return cls(
+            payload["tables"],
+            payload["digest"],
+            payload["directory"],
+        )
+
+
+# ==========================================================
+# COMPILE
+# ==========================================================
+
+def compile_authority_snapshot(
+
+    directory=DEFAULT_TSV_DIR,
+
+    digest=None,
+):
+
+    directory = Path(directory)
+
+    if not directory.exists():
+
+        raise FileNotFoundError(
+
+            f"Directory not found: {directory}"
+        )
+
+    if digest is None:
+
+        digest = digest_files(
+            directory
+        )
+
+    tables = {
+
+        file.stem: load_tsv(file)
+
+        for file in tsv_files(directory)
+    }
+
+    return AuthoritySnapshot(
+        tables,
+        digest,
+        directory,
+    )
+
+
+def write_authority_artifact(
+
+    snapshot,
+
+    artifact=None,
+):
+
+    """
+    tmp に書いてから rename (読み手は旧 / 新どちらかしか見ない)
+    """
+
+    artifact = Path(
+        artifact
+        or get_authority_settings()["artifact"]
+    )
+
+    artifact.parent.mkdir(
+        parents=True,
+        exist_ok=True,
+    )
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=artifact.parent,
+        prefix=f".{artifact.name}.",
+    )
+
+    try:
+
+        with os.fdopen(fd, "wb") as fp:
+
+            pickle.dump(
+                snapshot.to_artifact(),
+                fp,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+        os.replace(
+            tmp_path,
+            artifact,
+        )
+
+    except BaseException:
+
+        if os.path.exists(tmp_path):
+
+            os.unlink(tmp_path)
+
+        raise
+
+    return artifact
+
+
+def read_authority_artifact(
+
+    directory,
+
+    digest,
+
+    artifact=None,
+):
+
+    """
+    digest / directory が一致する artifact だけ使う
+    """
+
+    artifact = Path(
+        artifact
+        or get_authority_settings()["artifact"]
+    )
+
+    if not artifact.exists():
+        return None
+
+    try:
+
+        with open(artifact, "rb") as fp:
+
+            payload = pickle.load(fp)
+
+    except Exception as e:
+
+        print(
+            f"SKIP AUTHORITY ARTIFACT "
+            f"{artifact}: {e}"
+        )
+
+        return None
+
+    if (
+        payload.get("format") != SNAPSHOT_FORMAT
+        or payload.get("digest") != digest
+        or payload.get("directory") != str(directory)
+    ):
+
+        return None
+
+    return AuthoritySnapshot.from_artifact(
+        payload
+    )
+
+
+# ==========================================================
+# PROCESS REGISTRY
+# ==========================================================
+
+_LOCK = threading.Lock()
+
+# {directory: (snapshot, fingerprint, checked_at)}
+_STATE = {}
+
+
+def get_authority_snapshot(
+
+    directory=DEFAULT_TSV_DIR,
+):
+
+    """
+    process 内の snapshot を返す
+
+    CHECK_INTERVAL 以内は stat もしない。
+    mtime / size が変わっても hash が同じなら snapshot はそのまま。
+    """
+
+    key = str(directory)
+
+    now = time.monotonic()
+
+    interval = get_authority_settings()[
+        "check_interval"
+    ]
+
+    state = _STATE.get(key)
+
+    if state and now - state[2] < interval:
+
+        return state[0]
+
+    with _LOCK:
+
+        state = _STATE.get(key)
+
+        if state and now - state[2] < interval:
+
+            return state[0]
+
+        fingerprint = scan_fingerprint(
+            directory
+        )
+
+        if state and state[1] == fingerprint:
+
+            _STATE[key] = (
+                state[0],
+                fingerprint,
+                now,
+            )
+
+            return state[0]
+
+        digest = digest_files(
+            directory
+        )
+
+        snapshot = None
+
+        if state and state[0].digest == digest:
+
+            snapshot = state[0]
+
+        if snapshot is None:
+
+            snapshot = read_authority_artifact(
+                directory,
+                digest,
+            )
+
+        if snapshot is None:
+
+            snapshot = compile_authority_snapshot(
+                directory,
+                digest=digest,
+            )
+
+        # 参照の差し替えだけ (読み手は lock 不要)
+        _STATE[key] = (
+            snapshot,
+            fingerprint,
+            now,
+        )
+
+        return snapshot
+
+
+def reload_authority_snapshot(
+
+    directory=DEFAULT_TSV_DIR,
+):
+
+    clear_authority_snapshot(
+        directory
+    )
+
+    return get_authority_snapshot(
+        directory
+    )
+
+
+def clear_authority_snapshot(
+
+    directory=None,
+):
+
+    with _LOCK:
+
+        if directory is None:
+
+            _STATE.clear()
+
+        else:
+
+            _STATE.pop(
+                str(directory),
+                None
+            )
+
+
+# ==========================================================
+# SHORTCUTS
+# ==========================================================
+
+def get_authority_tables():
+
+    snapshot = get_authority_snapshot()
+
+    return {
+
+        name: snapshot.table(name)
+
+        for name in snapshot.table_names()
+    }
+
+
+def get_authority_table(name):
+
+    return get_authority_snapshot().table(
+        name
+    )
+
+
+# ==========================================================
+# DEBUG
+# ==========================================================
+
+if __name__ == "__main__":
+
+    snapshot = get_authority_snapshot()
+
+    print()
+
+    print("=" * 50)
+    print("Authority Snapshot")
+    print("=" * 50)
+
+    print("digest:", snapshot.digest)
+
+    for name, count in snapshot.stats().items():
+
+        print(
+            f"{name}: {count} rows"
+        )
@@ -16,8 +16,8 @@ No Shelf Logic
 No Workflow Logic
 """
 
-from .tsv_loader import (
-    load_all_tsvs,
+from .authority_registry import (
+    get_authority_snapshot,
 )
 
 
@@ -57,7 +57,8 @@ UNIVERSES_FILE = (
 
 def build_semantic_registry():
 
-    raw = load_all_tsvs()
+    # process 内 snapshot (TSV 変更時のみ再 parse)
+    raw = get_authority_snapshot()
 
     registry = {
 
@@ -65,57 +66,48 @@ def build_semantic_registry():
         # Raw Authority
         # ------------------------------------------
         "universes":
-            raw.get(
-                UNIVERSES_FILE,
-                []
+            raw.table(
+                UNIVERSES_FILE
             ),
 
         "groups":
-            raw.get(
-                GROUPS_FILE,
-                []
+            raw.table(
+                GROUPS_FILE
             ),
 
         "attributes":
-            raw.get(
-                ATTRIBUTES_FILE,
-                []
+            raw.table(
+                ATTRIBUTES_FILE
             ),
 
         "group_mappings":
-            raw.get(
-                GROUP_MAPPINGS_FILE,
-                []
+            raw.table(
+                GROUP_MAPPINGS_FILE
             ),
 
         "aliases":
-            raw.get(
-                ALIASES_FILE,
-                []
+            raw.table(
+                ALIASES_FILE
             ),
 
         "negative_aliases":
-            raw.get(
-                NEGATIVE_ALIASES_FILE,
-                []
+            raw.table(
+                NEGATIVE_ALIASES_FILE
             ),
 
         "normalization_rules":
-            raw.get(
-                NORMALIZATION_RULES_FILE,
-                []
+            raw.table(
+                NORMALIZATION_RULES_FILE
             ),
                
         "slug_metadata":
-            raw.get(
-                SLUG_METADATA_FILE,
-                []
+            raw.table(
+                SLUG_METADATA_FILE
             ),
         
         "workflow_mappings":
-            raw.get(
-                WORKFLOW_MAPPINGS_FILE,
-                []
+            raw.table(
+                WORKFLOW_MAPPINGS_FILE
             ),
 
         # ------------------------------------------
@@ -19,37 +19,20 @@ No business logic.
 No workflow.
 """
 
-from api.services.semantic.v2.authority.tsv_loader import (
-    load_named_tsv,
+from api.services.semantic.v2.authority.authority_registry import (
+    clear_authority_snapshot,
+    get_authority_snapshot,
 )
 
-# ==========================================================
-# CACHE
-# ==========================================================
-
-_slug_metadata = None
-
 
 # ==========================================================
 # LOAD
+# process 内 snapshot の slug index (TSV 変更時は自動で差し替わる)
 # ==========================================================
 
 def get_slug_metadata():
 
-    global _slug_metadata
-
-    if _slug_metadata is None:
-
-        rows = load_named_tsv(
-            "semantic_slug_metadata"
-        )[3:]
-
-        _slug_metadata = {
-            row["slug"]: row
-            for row in rows
-        }
-
-    return _slug_metadata
+    return get_authority_snapshot().metadata_by_slug
 
 
 # ==========================================================
@@ -58,7 +41,7 @@ def get_slug_metadata():
 
 def get_slug(slug):
 
-    return get_slug_metadata().get(slug)
+    return get_authority_snapshot().metadata(slug)
 
 
 # ==========================================================
@@ -67,6 +50,4 @@ def get_slug(slug):
 
 def clear_slug_metadata_cache():
 
-    global _slug_metadata
-
-    _slug_metadata = None
\ No newline at end of file
+    clear_authority_snapshot()
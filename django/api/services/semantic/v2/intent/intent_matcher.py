@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# api/services/semantic/v2/intent/intent_matcher.py
+
+"""
+Intent Matcher
+
+Responsibility:
+- intent_aliases を 1 つの automaton に compile
+- message を 1 pass scan して matched slug を返す
+- slug metadata を dict で引く
+
+Authority snapshot の digest が変わったら作り直す。
+
+No scoring logic.
+No unknown term logging.
+"""
+
+import threading
+
+from api.services.semantic.v2.authority.authority_registry import (
+    INTENT_ALIASES_TABLE,
+    SLUG_METADATA_TABLE,
+    get_authority_snapshot,
+)
+
+from api.utils.keyword_automaton import (
+    KeywordAutomaton,
+)
+
+
+# ==========================================================
+# MATCHER
+# ==========================================================
+
+class IntentMatcher:
+
+    """
+    matcher = IntentMatcher(alias_rows, metadata_rows)
+    matcher.match(normalized) -> [slug, ...] (alias row 順)
+
+    semantic_negative_aliases は製品 scoring の penalty なので
+    ここでは扱わない (query の veto ではない)
+    """
+
+    def __init__(
+
+        self,
+
+        alias_rows,
+
+        metadata_rows=(),
+
+        digest=None,
+    ):
+
+        self.digest = digest
+
+        self.automaton = KeywordAutomaton()
+
+        for position, row in enumerate(alias_rows):
+
+            slug = row.get(
+                "slug"
+            )
+
+            keyword = (
+                row.get(
+                    "alias",
+                    ""
+                )
+                .lower()
+                .strip()
+            )
+
+            if not slug or not keyword:
+                continue
+
+            self.automaton.add(
+                keyword,
+                (position, slug),
+            )
+
+        self.automaton.build()
+
+        # find_intent_metadata と同じく先頭の row を採用
+        self.metadata = {}
+
+        for row in metadata_rows:
+
+            self.metadata.setdefault(
+                row.get("slug"),
+                row
+            )
+
+    # ======================================================
+    # MATCH
+    # ======================================================
+
+    def scan(self, normalized):
+
+        """
+        return: {slug: 最初に出現する alias row の位置}
+        """
+
+        positions = {}
+
+        for position, slug in self.automaton.scan(
+            normalized
+        ):
+
+            if position < positions.get(
+                slug,
+                position + 1
+            ):
+
+                positions[slug] = position
+
+        return positions
+
+    def match(self, normalized):
+
+        positions = self.scan(
+            normalized
+        )
+
+        return sorted(
+            positions,
+            key=positions.get,
+        )
+
+    def find_metadata(self, slug):
+
+        return self.metadata.get(
+            slug
+        )
+
+
+# ==========================================================
+# CACHE
+# ==========================================================
+
+_LOCK = threading.Lock()
+
+_MATCHER = None
+
+
+def get_intent_matcher():
+
+    """
+    process 内の compiled matcher
+
+    authority snapshot が差し替わったら (digest 変化) compile し直す
+    """
+
+    global _MATCHER
+
+    snapshot = get_authority_snapshot()
+
+    matcher = _MATCHER
+
+    if matcher is not None and matcher.digest == snapshot.digest:
+
+        return matcher
+
+    with _LOCK:
+
+        matcher = _MATCHER
+
+        if matcher is not None and matcher.digest == snapshot.digest:
+
+            return matcher
+
+        matcher = IntentMatcher(
+
+            snapshot.table(
+                INTENT_ALIASES_TABLE
+            ),
+
+            snapshot.table(
+                SLUG_METADATA_TABLE
+            ),
+
+            digest=snapshot.digest,
+        )
+
+        _MATCHER = matcher
+
+        return matcher
+
+
+def clear_intent_matcher():
+
+    global _MATCHER
+
+    _MATCHER = None
@@ -1,9 +1,8 @@
 # -*- coding: utf-8 -*-
 # api/services/semantic/v2/intent/intent_resolver.py
 
-from api.services.semantic.v2.intent.intent_sources import (
-    get_intent_aliases,
-    get_intent_slug_metadata,
+from api.services.semantic.v2.intent.intent_matcher import (
+    get_intent_matcher,
 )
 
 from api.services.semantic.v2.intent.unknown_logger import (
@@ -26,27 +25,6 @@ def normalize_message(
     )
 
 
-# ==========================================================
-# INTENT METADATA LOOKUP
-# ==========================================================
-
-def find_intent_metadata(
-    slug,
-    metadata_rows,
-):
-
-    for row in metadata_rows:
-
-        if (
-            row.get("slug")
-            == slug
-        ):
-
-            return row
-
-    return None
-
-
 # ==========================================================
 # RESOLVE
 # ==========================================================
@@ -63,49 +41,20 @@ def resolve_intent(
         )
     )
 
-    aliases = (
-        get_intent_aliases()
-    )
-
-    slug_metadata = (
-        get_intent_slug_metadata()
+    matcher = (
+        get_intent_matcher()
     )
 
-    matched_groups = []
-
     # ------------------------------------------------------
     # Alias Match
+    # 全 alias を 1 pass scan (alias row 順)
     # ------------------------------------------------------
 
-    for alias in aliases:
-
-        slug = alias.get(
-            "slug"
-        )
-
-        if not slug:
-            continue
-
-        keyword = (
-            alias.get(
-                "alias",
-                ""
-            )
-            .lower()
-            .strip()
+    matched_groups = (
+        matcher.match(
+            normalized
         )
-
-        if (
-            keyword
-            and
-            keyword in normalized
-        ):
-
-            if slug not in matched_groups:
-
-                matched_groups.append(
-                    slug
-                )
+    )
 
     # ------------------------------------------------------
     # Resolve
@@ -118,9 +67,8 @@ def resolve_intent(
         )
 
         intent_metadata = (
-            find_intent_metadata(
-                slug=intent,
-                metadata_rows=slug_metadata,
+            matcher.find_metadata(
+                intent
             )
         )
 
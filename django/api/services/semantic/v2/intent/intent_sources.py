@@ -13,8 +13,8 @@ No matching logic.
 No scoring logic.
 """
 
-from api.services.semantic.v2.authority.tsv_loader import (
-    load_all_tsvs,
+from api.services.semantic.v2.authority.authority_registry import (
+    get_authority_snapshot,
 )
 
 
@@ -25,12 +25,11 @@ from api.services.semantic.v2.authority.tsv_loader import (
 def get_intent_aliases():
 
     registry = (
-        load_all_tsvs()
+        get_authority_snapshot()
     )
 
-    return registry.get(
-        "intent_aliases",
-        []
+    return registry.table(
+        "intent_aliases"
     )
 
 
@@ -41,10 +40,9 @@ def get_intent_aliases():
 def get_intent_slug_metadata():
 
     registry = (
-        load_all_tsvs()
+        get_authority_snapshot()
     )
 
-    return registry.get(
-        "semantic_slug_metadata",
-        []
+    return registry.table(
+        "semantic_slug_metadata"
     )
\ No newline at end of file
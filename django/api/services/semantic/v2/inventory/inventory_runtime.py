@@ -33,6 +33,20 @@ from api.services.semantic.v2.inventory.inventory_sort import (
     apply_inventory_sort,
 )
 
+from api.utils.keyset_pagination import (
+    CURSOR_ERRORS,
+    InvalidCursor,
+    StaleCursor,
+    cached_count,
+    paginate_keyset,
+)
+
+from api.utils.pc_projection import (
+    PROJECTION_LIST,
+    apply_projection,
+    serialize_list_product,
+)
+
 
 # ==========================================================
 # INVENTORY
@@ -49,8 +63,23 @@ def build_inventory_runtime(
     search=None,
 
     filters=None,
+
+    cursor=None,
+
+    with_count=None,
 ):
 
+    """
+    page 指定 (旧 API) は OFFSET、それ以外は keyset (cursor) で返す
+
+    with_count:
+        None  → cursor なしの 1 ページ目だけ数える
+        True  → 毎回数える (catalog generation ごとに cache)
+        False → 数えない
+
+    不正な cursor は InvalidCursor
+    """
+
     # ------------------------------------------------------
     # AUTHORITY
     # ------------------------------------------------------
@@ -79,6 +108,12 @@ def build_inventory_runtime(
     # PARAMETER
     # ------------------------------------------------------
 
+    # page 未指定 / cursor 指定は keyset
+    use_keyset = (
+        bool(cursor)
+        or page in (None, "")
+    )
+
     try:
         page = int(page)
     except Exception:
@@ -140,71 +175,107 @@ def build_inventory_runtime(
     )
 
     # ------------------------------------------------------
-    # PAGINATION
+    # COUNT
     # ------------------------------------------------------
 
-    total_count = queryset.count()
+    if with_count is None:
 
-    start = (
-        (page - 1)
-        * page_size
-    )
+        with_count = (
+            not use_keyset
+            or not cursor
+        )
+
+    total_count = (
+
+        cached_count(
+            queryset
+        )
 
-    end = (
-        start
-        + page_size
+        if with_count
+        else None
     )
 
     # ------------------------------------------------------
-    # PRODUCTS
+    # PAGINATION
     # ------------------------------------------------------
 
-    products = []
+    queryset = apply_projection(
+        queryset,
+        PROJECTION_LIST,
+    )
+
+    next_cursor = None
+
+    if use_keyset:
 
-    for product in queryset[start:end]:
-        
-        products.append({
+        try:
 
-            "unique_id":
-                product.unique_id,
+            result = paginate_keyset(
 
-            "name":
-                product.name,
+                queryset,
 
-            "maker":
-                product.maker,
+                page_size,
+
+                cursor=cursor,
+            )
+
+        except StaleCursor:
+
+            # 並び替え後の古い cursor は 1 ページ目から
+            result = paginate_keyset(
+
+                queryset,
+
+                page_size,
+            )
+
+        except CURSOR_ERRORS as e:
+
+            if not cursor:
+                raise
+
+            # 壊れた / 改ざんされた cursor は呼び出し側で 400
+            raise InvalidCursor(
+                "invalid cursor"
+            ) from e
+
+        rows = result["rows"]
 
-            "brand":
-                product.brand,
+        has_next = result["has_next"]
 
-            "series":
-                product.series,
+        next_cursor = result["next_cursor"]
 
-            "cpu_model":
-                product.cpu_model,
+        # cursor ページは番号を持たない
+        page = None if cursor else 1
 
-            "gpu_model":
-                product.gpu_model,
+    else:
 
-            "memory_gb":
-                product.memory_gb,
+        start = (
+            (page - 1)
+            * page_size
+        )
 
-            "storage_gb":
-                product.storage_gb,
+        rows = list(
+            queryset[start:start + page_size + 1]
+        )
 
-            "price":
-                product.price,
+        has_next = len(rows) > page_size
 
-            "image_url":
-                product.image_url,
+        rows = rows[:page_size]
 
-            "url":
-                product.url,
+    # ------------------------------------------------------
+    # PRODUCTS
+    # ------------------------------------------------------
 
-            "updated_at":
-                product.updated_at,
-        })
+    # list projection: spec 列だけ読む (semantic_runtime / raw_html は読まない)
+    products = [
 
+        serialize_list_product(
+            product
+        )
+
+        for product in rows
+    ]
 
     # ------------------------------------------------------
     # SEO
@@ -217,8 +288,14 @@ def build_inventory_runtime(
             meaning=
                 meaning,
 
-            product_count=
-                total_count,
+            # cursor ページは catalog 全体の件数 (cache) で代用
+            product_count=(
+                total_count
+                if total_count is not None
+                else cached_count(
+                    build_inventory_queryset()
+                )
+            ),
         )
     )
 
@@ -271,7 +348,13 @@ def build_inventory_runtime(
                 search,
 
             "has_next":
-                end < total_count,
+                has_next,
+
+            "cursor":
+                cursor,
+
+            "next_cursor":
+                next_cursor,
 
             "products":
                 products,
@@ -1,31 +1,335 @@
 # -*- coding: utf-8 -*-
 # api/services/semantic/v2/inventory/inventory_search.py
 
+"""
+Inventory Search
+
+search query
+↓
+search_tokens (NFKC / 文字種境界で分割)
+↓
+PostgreSQL: search_document LIKE (pg_trgm GIN) + TrigramSimilarity
+その他:     in-memory n-gram index (catalog generation ごとに作り直す)
+↓
+search_rank 付き queryset
+"""
+
+import threading
+
+from django.db import (
+    connection,
+)
+
 from django.db.models import (
-    Q,
+    Case,
+    FloatField,
+    Value,
+    When,
+)
+
+from api.models import (
+    PCProduct,
+)
+
+from api.utils.catalog_generation import (
+    get_catalog_generation,
+)
+
+from api.utils.search_text import (
+    NGRAM_SIZE,
+    normalize_search_text,
+    search_tokens,
+    text_ngrams,
 )
 
 
 # ==========================================================
-# INVENTORY SEARCH
+# CONSTANTS
 # ==========================================================
 
-SEARCH_FIELDS = (
+SEARCH_RANK = "search_rank"
 
-    "name",
+# in-memory fallback で rank を付ける上限
+NGRAM_MAX_RESULTS = 1000
 
-    "maker",
 
-    "category",
+# ==========================================================
+# IN-MEMORY N-GRAM INDEX
+# ==========================================================
 
-    "series",
+class NgramSearchIndex:
 
-    "cpu",
+    """
+    index = NgramSearchIndex(rows)   # rows: [(id, search_document)]
+    index.search(tokens) -> {id: score}
+
+    token の n-gram posting を積集合して候補を絞り、
+    substring 確認後 document 内の出現位置と長さで score を付ける
+    """
 
-    "gpu",
+    def __init__(self, rows):
 
-)
+        self.documents = {}
+
+        self.postings = {}
+
+        for product_id, document in rows:
+
+            document = document or ""
+
+            self.documents[product_id] = document
+
+            for gram in text_ngrams(document):
+
+                self.postings.setdefault(
+                    gram,
+                    set()
+                ).add(product_id)
+
+    def candidates(self, token):
+
+        # 1 文字 token は n-gram を持たないので全件 substring
+        if len(token) < NGRAM_SIZE:
+
+            return {
+
+                product_id
+
+                for product_id, document in self.documents.items()
+
+                if token in document
+            }
+
+        grams = text_ngrams(token)
+
+        if not grams:
+            return set()
+
+        postings = sorted(
+
+            (
+                self.postings.get(gram, set())
+                for gram in grams
+            ),
 
+            key=len,
+        )
+
+        result = set(postings[0])
+
+        for posting in postings[1:]:
+
+            result &= posting
+
+            if not result:
+                break
+
+        return result
+
+    def search(self, tokens):
+
+        if not tokens:
+            return {}
+
+        candidates = None
+
+        for token in sorted(tokens, key=len, reverse=True):
+
+            found = self.candidates(token)
+
+            candidates = (
+                found
+                if candidates is None
+                else candidates & found
+            )
+
+            if not candidates:
+                return {}
+
+        scores = {}
+
+        for product_id in candidates:
+
+            document = self.documents[product_id]
+
+            positions = []
+
+            for token in tokens:
+
+                position = document.find(token)
+
+                if position < 0:
+                    break
+
+                positions.append(position)
+
+            else:
+
+                # 前方で当たるほど / document が短いほど高い
+                scores[product_id] = (
+
+                    sum(
+                        1.0 / (1 + position)
+                        for position in positions
+                    )
+
+                    + len("".join(tokens)) / max(len(document), 1)
+                )
+
+        return scores
+
+
+_INDEX_LOCK = threading.Lock()
+
+# (generation, index)
+_NGRAM_INDEX = None
+
+
+def get_ngram_index():
+
+    """
+    process 内 n-gram index (PC_CATALOG generation が進んだら作り直す)
+    """
+
+    global _NGRAM_INDEX
+
+    generation = get_catalog_generation()
+
+    cached = _NGRAM_INDEX
+
+    if cached and cached[0] == generation:
+
+        return cached[1]
+
+    with _INDEX_LOCK:
+
+        cached = _NGRAM_INDEX
+
+        if cached and cached[0] == generation:
+
+            return cached[1]
+
+        index = NgramSearchIndex(
+
+            PCProduct.objects
+
+            .filter(is_active=True)
+
+            .order_by()
+
+            .values_list(
+                "id",
+                "search_document",
+            )
+
+            .iterator(chunk_size=2000)
+        )
+
+        _NGRAM_INDEX = (
+            generation,
+            index,
+        )
+
+        return index
+
+
+# ==========================================================
+# BACKENDS
+# ==========================================================
+
+def search_postgresql(
+
+    queryset,
+
+    tokens,
+
+    normalized,
+):
+
+    from django.contrib.postgres.search import (
+        TrigramSimilarity,
+    )
+
+    # search_document は lower 済み → LIKE (gin_trgm_ops が効く)
+    for token in tokens:
+
+        queryset = queryset.filter(
+            search_document__contains=token
+        )
+
+    return queryset.annotate(
+
+        **{
+            SEARCH_RANK:
+                TrigramSimilarity(
+                    "search_document",
+                    normalized,
+                )
+        }
+    )
+
+
+def search_ngram(
+
+    queryset,
+
+    tokens,
+):
+
+    scores = get_ngram_index().search(
+        tokens
+    )
+
+    if not scores:
+
+        return queryset.none().annotate(
+            **{
+                SEARCH_RANK:
+                    Value(0.0, output_field=FloatField())
+            }
+        )
+
+    ranked = sorted(
+
+        scores.items(),
+
+        key=lambda item: item[1],
+
+        reverse=True,
+    )[:NGRAM_MAX_RESULTS]
+
+    return queryset.filter(
+
+        id__in=[
+            product_id
+            for product_id, _ in ranked
+        ]
+
+    ).annotate(
+
+        **{
+            SEARCH_RANK:
+                Case(
+
+                    *[
+                        When(
+                            id=product_id,
+                            then=Value(score),
+                        )
+                        for product_id, score in ranked
+                    ],
+
+                    default=Value(0.0),
+
+                    output_field=FloatField(),
+                )
+        }
+    )
+
+
+# ==========================================================
+# INVENTORY SEARCH
+# ==========================================================
 
 def apply_inventory_search(
 
@@ -39,6 +343,8 @@ def apply_inventory_search(
 
     Responsibility:
         Apply keyword search only.
+        Matched rows are annotated with search_rank
+        (sort=relevance で使う)
 
     Notes:
         Semantic translation is handled separately
@@ -48,19 +354,27 @@ def apply_inventory_search(
     if not search:
         return queryset
 
-    search = str(search).strip()
+    tokens = search_tokens(
+        search
+    )
 
-    if not search:
+    if not tokens:
         return queryset
 
-    query = Q()
+    if connection.vendor == "postgresql":
 
-    for field in SEARCH_FIELDS:
+        return search_postgresql(
 
-        query |= Q(
-            **{
-                f"{field}__icontains": search
-            }
+            queryset,
+
+            tokens,
+
+            normalize_search_text(
+                search
+            ),
         )
 
-    return queryset.filter(query)
\ No newline at end of file
+    return search_ngram(
+        queryset,
+        tokens,
+    )
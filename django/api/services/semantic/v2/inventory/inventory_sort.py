@@ -13,6 +13,17 @@ def apply_inventory_sort(
 
 ):
 
+    # search_rank は apply_inventory_search が付ける
+    if (
+        sort == "relevance"
+        and "search_rank" in queryset.query.annotations
+    ):
+
+        return queryset.order_by(
+            "-search_rank",
+            "-updated_at",
+        )
+
     if sort == "price_low":
 
         return queryset.order_by(
@@ -4,40 +4,14 @@ from api.services.semantic.v2.topology.topology_runtime import (
     build_topology_runtime,
 )
 
-from api.services.semantic.v2.traversal.traversal_builder import (
-    build_traversal_runtime,
+from api.services.facet_count_service import (
+    get_semantic_group_counts,
 )
 
 from .navigation_rules import (
     is_primary_group,
 )
 
-# ==========================================================
-# COUNT
-# ==========================================================
-
-def calculate_product_count(
-
-    products,
-
-    group_slug,
-):
-
-    return len([
-
-        product
-
-        for product in products
-
-        if group_slug in
-
-        product.get(
-            "matched_groups",
-            []
-        )
-    ])
-
-
 # ==========================================================
 # NAVIGATION
 # ==========================================================
@@ -48,15 +22,10 @@ def build_navigation_runtime():
         build_topology_runtime()
     )
 
-    traversal = (
-        build_traversal_runtime()
-    )
-
-    products = (
-
-        traversal.get(
-            "products",
-            []
+    # 掲載中製品の group 件数 (PCFacetCount / PC_FACETS generation cache)
+    group_counts = (
+        get_semantic_group_counts(
+            is_active=True
         )
     )
 
@@ -92,13 +61,13 @@ def build_navigation_runtime():
 
         product_count = (
 
-            calculate_product_count(
-
-                products,
+            group_counts.get(
 
                 group.get(
                     "slug"
                 ),
+
+                0
             )
         )
 
@@ -23,6 +23,11 @@ from api.services.semantic.v2.product.product_breadcrumb_runtime import (
     build_product_breadcrumbs,
 )
 
+from api.services.semantic.semantic_relation_store import (
+    build_relation_node,
+    load_product_relations,
+)
+
 
 # ==========================================================
 # PRODUCT DETAIL
@@ -196,6 +201,19 @@ def build_product_detail_runtime(
 
     )
 
+    # ------------------------------------------------------
+    # RELATED (MATERIALIZED)
+    # ------------------------------------------------------
+
+    related_products = [
+
+        build_relation_node(relation)
+
+        for relation in load_product_relations(
+            product
+        )
+    ]
+
     # ------------------------------------------------------
     # RESPONSE
     # ------------------------------------------------------
@@ -218,6 +236,8 @@ def build_product_detail_runtime(
                 product_semantic_runtime
             ),
 
+            "related_products": related_products,
+
         },
 
         "semantic_schema_version": (
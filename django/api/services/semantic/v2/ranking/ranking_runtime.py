@@ -1,18 +1,18 @@
 # -*- coding: utf-8 -*-
 # api/services/semantic/v2/ranking/ranking_runtime.py
 
-from api.services.semantic.v2.ranking.ranking_topology_runtime import (
-    build_ranking_topology_runtime,
+from api.services.ranking_snapshot_service import (
+    KIND_GROUP,
+    RANKING_ALL,
+    get_ranking_topology,
+    load_ranking_page,
+    ranking_key,
 )
 
 from api.services.semantic.v2.authority.authority_runtime import (
     build_authority_runtime,
 )
 
-from api.services.semantic.v2.traversal.traversal_builder import (
-    build_traversal_runtime,
-)
-
 from api.services.semantic.v2.meaning.meaning_runtime import (
     build_ranking_meaning,
 )
@@ -26,23 +26,6 @@ from api.services.semantic.v2.seo.seo_runtime import (
 )
 
 
-# ==========================================================
-# SCORE
-# ==========================================================
-
-def calculate_product_score(
-    product,
-):
-
-    return len(
-
-        product.get(
-            "matched_groups",
-            []
-        )
-    )
-
-
 # ==========================================================
 # RANKING
 # ==========================================================
@@ -53,8 +36,15 @@ def build_ranking_runtime(
 
     limit=100,
 
+    cursor=None,
+
 ):
 
+    """
+    active ranking snapshot から表示分だけ読む
+    (snapshot は build_ranking_snapshots / compile_semantic_runtime が作る)
+    """
+
     # ------------------------------------------------------
     # AUTHORITY
     # ------------------------------------------------------
@@ -73,19 +63,8 @@ def build_ranking_runtime(
         )
     )
 
-    traversal = (
-        build_traversal_runtime()
-    )
-
-    ranking_topology = (
-        build_ranking_topology_runtime()
-    )
-
-    products = []
-    
-    
     # ------------------------------------------------------
-    # ALL
+    # SNAPSHOT
     # ------------------------------------------------------
 
     if (
@@ -98,104 +77,35 @@ def build_ranking_runtime(
 
     ):
 
-        products = (
-
-            traversal.get(
-                "products",
-                []
-            )
-        )
-
-    # ------------------------------------------------------
-    # GROUP
-    # ------------------------------------------------------
+        key = RANKING_ALL
 
     else:
 
-        for product in (
-
-            traversal.get(
-                "products",
-                []
-            )
-        ):
-
-            groups = set(
-
-                product.get(
-                    "matched_groups",
-                    []
-                )
-            )
-
-            # ==================================================
-            # DEBUG
-            # ==================================================
-
-            if product.get("primary_workflow") == "usage-creator":
-
-                print()
-                print("=" * 80)
-                print("CREATOR DEBUG")
-                print("=" * 80)
-
-                print(
-                    "unique_id       :",
-                    product.get("unique_id")
-                )
-
-                print(
-                    "name            :",
-                    product.get("name")
-                )
-
-                print(
-                    "primary_workflow:",
-                    product.get("primary_workflow")
-                )
-
-                print(
-                    "matched_groups  :",
-                    product.get("matched_groups")
-                )
-
-                print(
-                    "workflow_tags   :",
-                    product.get("workflow_tags")
-                )
+        key = ranking_key(
+            KIND_GROUP,
+            group_slug,
+        )
 
-                print(
-                    "workflows       :",
-                    product.get("workflows")
-                )
+    page = load_ranking_page(
 
-                print(
-                    "semantic_labels :",
-                    product.get("semantic_labels")
-                )
+        key,
 
-                print(
-                    "semantic_attrs  :",
-                    product.get("semantic_attributes")
-                )
+        limit,
 
-                print(
-                    "score           :",
-                    product.get("semantic_score")
-                )
+        cursor=cursor,
+    )
 
-                print("=" * 80)
-                print()
+    products = page["products"]
 
-            # ==================================================
-            # GROUP MATCH
-            # ==================================================
+    ranking_topology = (
 
-            if group_slug in groups:
+        get_ranking_topology(
+            page["snapshot"]
+        )
 
-                products.append(
-                    product
-                )
+        if page["snapshot"]
+        else []
+    )
 
     # ------------------------------------------------------
     # GROUP NAME
@@ -235,24 +145,6 @@ def build_ranking_runtime(
             "All Products"
         )
 
-    # ------------------------------------------------------
-    # SORT
-    # ------------------------------------------------------
-
-    products = sorted(
-
-        products,
-
-        key=lambda product:
-
-            calculate_product_score(
-                product
-            ),
-
-        reverse=True,
-    )[:limit]
-
-    
     # ------------------------------------------------------
     # SEO
     # ------------------------------------------------------
@@ -303,10 +195,7 @@ def build_ranking_runtime(
         # ----------------------------------------------
 
         "categories":
-            ranking_topology.get(
-                "categories",
-                []
-            ),
+            ranking_topology,
 
         # ----------------------------------------------
         # Reality
@@ -323,6 +212,13 @@ def build_ranking_runtime(
             "product_count":
                 len(products),
 
+            # snapshot 内の該当製品数 (上位切り詰め前)
+            "total_count":
+                page["total_count"],
+
+            "next_cursor":
+                page["next_cursor"],
+
             "products":
                 products,
         },
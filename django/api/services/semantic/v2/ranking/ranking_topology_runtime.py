@@ -40,7 +40,14 @@ from api.services.semantic.v2.authority.authority_runtime import (
 # RANKING TOPOLOGY
 # ==========================================================
 
-def build_ranking_topology_runtime():
+def build_ranking_topology_runtime(
+    products=None,
+):
+
+    """
+    products: [{"unique_id", "matched_groups"}]
+    ranking snapshot builder が走査済みの製品を渡す (None なら traversal を組む)
+    """
 
     # ==========================================================
     # Universe Authority
@@ -92,9 +99,15 @@ def build_ranking_topology_runtime():
     
        
     
-    traversal = (
-        build_traversal_runtime()
-    )
+    if products is None:
+
+        products = (
+            build_traversal_runtime()
+            .get(
+                "products",
+                [],
+            )
+        )
 
     # ------------------------------------------------------
     # Product Count Index
@@ -109,10 +122,7 @@ def build_ranking_topology_runtime():
     
     parent_products = defaultdict(set)
 
-    for product in traversal.get(
-        "products",
-        [],
-    ):
+    for product in products:
 
         seen_parent = set()
 
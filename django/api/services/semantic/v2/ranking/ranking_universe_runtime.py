@@ -5,10 +5,6 @@ from api.services.semantic.v2.authority.authority_runtime import (
     build_authority_runtime,
 )
 
-from api.services.semantic.v2.ranking.ranking_topology_runtime import (
-    build_ranking_topology_runtime,
-)
-
 from api.services.semantic.v2.ranking.ranking_runtime import (
     build_ranking_runtime,
 )
@@ -32,10 +28,6 @@ def build_ranking_universe_runtime():
         build_authority_runtime()
     )
 
-    topology = (
-        build_ranking_topology_runtime()
-    )
-
     ranking = (
         build_ranking_runtime(
             group_slug="all",
@@ -43,6 +35,15 @@ def build_ranking_universe_runtime():
         )
     )
 
+    # categories は ranking snapshot の topology をそのまま使う
+    topology = {
+        "categories":
+            ranking.get(
+                "categories",
+                []
+            ),
+    }
+
     meaning = (
         build_ranking_meaning()
     )
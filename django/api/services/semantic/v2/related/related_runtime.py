@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 # api/services/semantic/v2/related/related_runtime.py
 
+import logging
+
 from api.models import (
     PCProduct,
 )
@@ -21,30 +23,42 @@ from api.services.semantic.v2.presentation.presentation_runtime import (
     build_related_presentation,
 )
 
+from api.services.semantic.semantic_relation_store import (
+    build_relation_edge,
+    load_product_relations,
+)
+
+logger = logging.getLogger(__name__)
+
 
 # ==========================================================
-# SCORE
+# PRODUCT DATA
 # ==========================================================
 
-def calculate_related_score(
+def model_to_data(product):
 
-    source_groups,
+    """
+    読み込み済みの列だけ dict にする
+    (.only() で defer された列を 1 列ずつ query しない)
+    """
 
-    target_groups,
-):
+    deferred = product.get_deferred_fields()
 
-    return len(
+    product_data = {}
 
-        set(
-            source_groups
-        )
+    for field in product._meta.fields:
 
-        &
+        if field.attname in deferred:
+            continue
 
-        set(
-            target_groups
+        product_data[
+            field.name
+        ] = getattr(
+            product,
+            field.name
         )
-    )
+
+    return product_data
 
 
 # ==========================================================
@@ -119,100 +133,54 @@ def build_related_runtime(
         or {}
     )
 
-    source_groups = (
-
-        source_runtime.get(
-            "semantic_groups",
-            []
-        )
-    )
-
     # ------------------------------------------------------
-    # RELATED SEARCH
+    # RELATED (MATERIALIZED)
+    # compile_semantic_runtime が保持する top-N エッジ
     # ------------------------------------------------------
 
     related_products = []
 
-    for product in (
-
-        PCProduct.objects
+    for relation in load_product_relations(
 
-        .filter(
-            is_active=True
-        )
+        source_product,
 
-        .exclude(
-            id=source_product.id
-        )
+        limit=limit,
     ):
 
-        runtime = (
-            product.semantic_runtime
-            or {}
-        )
-
-        groups = (
-
-            runtime.get(
-                "semantic_groups",
-                []
-            )
-        )
-
-        score = (
-
-            calculate_related_score(
-
-                source_groups,
-
-                groups,
-            )
-        )
-
-        if score <= 0:
-            continue
-
-        product_data = {}
-
-        for field in product._meta.fields:
-
-            product_data[
-                field.name
-            ] = getattr(
-                product,
-                field.name
-            )
+        product = relation.target
 
         related_products.append({
 
             "score":
-                score,
+                relation.score,
 
             "product":
-                product_data,
+                model_to_data(
+                    product
+                ),
 
             "semantic_runtime":
-                runtime,
+                product.semantic_runtime
+                or {},
+
+            "edge":
+                build_relation_edge(
+                    relation
+                ),
         })
 
     # ------------------------------------------------------
-    # SORT
+    # MISSING
+    # request 中に全件 scan はしない
+    # (compile_semantic_runtime が次回 relations を埋める)
     # ------------------------------------------------------
 
-    related_products = sorted(
-
-        related_products,
-
-        key=lambda x:
+    if not related_products:
 
-            x["score"],
-
-        reverse=True,
-    )
-
-    related_products = (
-        related_products[:limit]
-    )
+        logger.info(
+            "related: no materialized relations for %s",
+            unique_id,
+        )
 
     # ------------------------------------------------------
     # SEO
@@ -14,8 +14,8 @@ No scoring logic.
 No Gemini processing.
 """
 
-from api.services.semantic.v2.authority.tsv_loader import (
-    load_all_tsvs,
+from api.services.semantic.v2.authority.authority_registry import (
+    get_authority_snapshot,
 )
 
 
@@ -37,11 +37,10 @@ PC_PARENT_GROUPS = {
 
 def get_requirement_groups():
 
-    registry = load_all_tsvs()
+    registry = get_authority_snapshot()
 
-    groups = registry.get(
-        "semantic_groups",
-        []
+    groups = registry.table(
+        "semantic_groups"
     )
 
     return [
@@ -9,8 +9,8 @@ from api.services.semantic.v2.authority.authority_runtime import (
     build_authority_runtime,
 )
 
-from api.services.semantic.v2.traversal.traversal_builder import (
-    build_traversal_runtime,
+from api.services.facet_count_service import (
+    get_semantic_group_counts,
 )
 
 from api.services.semantic.v2.navigation.navigation_rules import (
@@ -18,32 +18,6 @@ from api.services.semantic.v2.navigation.navigation_rules import (
 )
 
 
-# ==========================================================
-# COUNT
-# ==========================================================
-
-def calculate_product_count(
-
-    products,
-
-    group_slug,
-):
-
-    return len([
-
-        product
-
-        for product in products
-
-        if group_slug in
-
-        product.get(
-            "matched_groups",
-            []
-        )
-    ])
-
-
 # ==========================================================
 # SIDEBAR
 # ==========================================================
@@ -58,15 +32,10 @@ def build_sidebar_runtime():
         build_topology_runtime()
     )
 
-    traversal = (
-        build_traversal_runtime()
-    )
-
-    products = (
-
-        traversal.get(
-            "products",
-            []
+    # 掲載中製品の group 件数 (PCFacetCount / PC_FACETS generation cache)
+    group_counts = (
+        get_semantic_group_counts(
+            is_active=True
         )
     )
 
@@ -108,11 +77,9 @@ def build_sidebar_runtime():
 
         product_count = (
 
-            calculate_product_count(
-
-                products,
-
+            group_counts.get(
                 group_slug,
+                0
             )
         )
 
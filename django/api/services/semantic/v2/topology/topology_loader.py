@@ -1,5 +1,6 @@
-from api.services.semantic.v2.authority.tsv_loader import (
-    load_semantic_groups,
-    load_semantic_attributes,
-    load_semantic_group_mappings,
+from api.services.semantic.v2.authority.authority_registry import (
+    ATTRIBUTES_TABLE,
+    GROUP_MAPPINGS_TABLE,
+    GROUPS_TABLE,
+    get_authority_snapshot,
 )
\ No newline at end of file
@@ -7,10 +7,11 @@ from api.services.semantic.v2.authority.authority_runtime import (
     build_authority_runtime,
 )
 
-from api.services.semantic.v2.authority.tsv_loader import (
-    load_semantic_groups,
-    load_semantic_attributes,
-    load_semantic_group_mappings,
+from api.services.semantic.v2.authority.authority_registry import (
+    ATTRIBUTES_TABLE,
+    GROUP_MAPPINGS_TABLE,
+    GROUPS_TABLE,
+    get_authority_snapshot,
 )
 
 
@@ -44,8 +45,12 @@ def build_topology_runtime(
     # Raw Authority
     # ------------------------------------------------------
 
+    snapshot = (
+        get_authority_snapshot()
+    )
+
     groups = (
-        load_semantic_groups()
+        snapshot.table(GROUPS_TABLE)
     )
 
 
@@ -69,11 +74,11 @@ def build_topology_runtime(
 
 
     attributes = (
-        load_semantic_attributes()
+        snapshot.table(ATTRIBUTES_TABLE)
     )
 
     mappings = (
-        load_semantic_group_mappings()
+        snapshot.table(GROUP_MAPPINGS_TABLE)
     )
 
     # ------------------------------------------------------
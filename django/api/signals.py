@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# api/signals.py
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+
+from django.dispatch import receiver
+
+from api.models import (
+    PCAttribute,
+    PCProduct,
+)
+
+from api.utils.catalog_generation import (
+    PC_ATTRIBUTES,
+    schedule_catalog_generation_bump,
+)
+
+from api.services.facet_count_service import (
+    apply_link_changes,
+    apply_state_changes,
+)
+
+from api.services.semantic.runtime_builder import (
+    SOURCE_HASH_FIELDS,
+    build_source_hash,
+)
+
+
+# =========================================================
+# PC CATALOG GENERATION
+# =========================================================
+
+@receiver(post_save, sender=PCProduct)
+@receiver(post_delete, sender=PCProduct)
+def on_pc_product_changed(sender, **kwargs):
+
+    schedule_catalog_generation_bump()
+
+
+# =========================================================
+# ATTRIBUTE MASTER GENERATION (compiled tagger cache)
+# =========================================================
+
+@receiver(post_save, sender=PCAttribute)
+@receiver(post_delete, sender=PCAttribute)
+def on_pc_attribute_changed(sender, **kwargs):
+
+    schedule_catalog_generation_bump(
+        PC_ATTRIBUTES
+    )
+
+
+# =========================================================
+# SEMANTIC RUNTIME DIRTY QUEUE
+# =========================================================
+
+@receiver(post_save, sender=PCProduct)
+def on_pc_product_source_changed(sender, instance, update_fields=None, **kwargs):
+
+    deferred = instance.get_deferred_fields()
+
+    # 既に queue 済み (新規作成時は default=True)
+    if "semantic_runtime_dirty" not in deferred and instance.semantic_runtime_dirty:
+        return
+
+    # runtime 書き戻しなど source を触らない保存
+    # (.only() で読んだ instance の save も読み込み済み列が update_fields で来る)
+    if update_fields and not set(update_fields) & set(SOURCE_HASH_FIELDS):
+        return
+
+    # defer 中の source 列があれば hash は取らずに dirty にする (列ごとの追加 query を避ける)
+    hashable = not deferred.intersection(
+        (*SOURCE_HASH_FIELDS, "semantic_source_hash")
+    )
+
+    if hashable and instance.semantic_source_hash == build_source_hash(instance):
+        return
+
+    # updated_at を動かさない
+    PCProduct.objects.filter(
+        pk=instance.pk
+    ).update(
+        semantic_runtime_dirty=True
+    )
+
+    instance.semantic_runtime_dirty = True
+
+
+# =========================================================
+# SIDEBAR FACET COUNTS
+# =========================================================
+
+@receiver(m2m_changed, sender=PCProduct.attributes.through)
+def on_pc_product_attributes_changed(sender, instance, action, reverse, pk_set, **kwargs):
+
+    if action == "pre_clear":
+
+        # post_clear には pk_set が無いので消える前に拾う
+        if reverse:
+            pairs = [
+                (product_id, instance.pk)
+                for product_id in instance.products.values_list("id", flat=True)
+            ]
+        else:
+            pairs = [
+                (instance.pk, attribute_id)
+                for attribute_id in instance.attributes.values_list("id", flat=True)
+            ]
+
+        apply_link_changes(removed=pairs)
+
+        return
+
+    if action not in ("post_add", "post_remove") or not pk_set:
+        return
+
+    if reverse:
+        pairs = [(product_id, instance.pk) for product_id in pk_set]
+    else:
+        pairs = [(instance.pk, attribute_id) for attribute_id in pk_set]
+
+    if action == "post_add":
+        apply_link_changes(added=pairs)
+    else:
+        apply_link_changes(removed=pairs)
+
+
+@receiver(post_save, sender=PCProduct)
+def on_pc_product_facet_state_changed(sender, instance, created, **kwargs):
+
+    state = (
+        instance.unified_genre or "",
+        instance.is_active,
+    )
+
+    previous = getattr(instance, "_facet_state", None)
+
+    instance._facet_state = state
+
+    # 新規作成時はまだ link が無い / 読み込み時に field が defer されていた
+    if created or previous is None or None in previous:
+        return
+
+    apply_state_changes({
+        instance.pk: ((previous[0] or "", previous[1]), state),
+    })
+
+
+@receiver(pre_delete, sender=PCProduct)
+def on_pc_product_facet_deleted(sender, instance, **kwargs):
+
+    # through 行は CASCADE で消え m2m_changed は飛ばない
+    apply_state_changes({
+        instance.pk: (
+            (instance.unified_genre or "", instance.is_active),
+            None,
+        ),
+    })
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# api/tests/test_facet_counts.py
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import (
+    PCAttribute,
+    PCFacetCount,
+    PCProduct,
+)
+
+from api.services.facet_count_service import (
+    FACET_ATTRIBUTE,
+    count_attribute_facets,
+)
+
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def materialized_attribute_counts():
+
+    """
+    PCFacetCount の attribute facet (0 件行は除く)
+    """
+
+    return {
+
+        (FACET_ATTRIBUTE, int(key), genre, active): count
+
+        for key, genre, active, count in (
+
+            PCFacetCount.objects
+
+            .filter(
+                facet=FACET_ATTRIBUTE,
+                product_count__gt=0,
+            )
+
+            .values_list(
+                "key",
+                "unified_genre",
+                "is_active",
+                "product_count",
+            )
+        )
+    }
+
+
+def make_product(unique_id, **fields):
+
+    return PCProduct.objects.create(
+
+        unique_id=unique_id,
+
+        site_prefix="test",
+
+        name=unique_id,
+
+        price=100000,
+
+        url=f"https://example.com/{unique_id}",
+
+        unified_genre=fields.pop("unified_genre", "PC"),
+
+        **fields,
+    )
+
+
+# ==========================================================
+# FACET DELTA
+# ==========================================================
+
+class FacetCountDeltaTests(TestCase):
+
+    """
+    差分更新した PCFacetCount が through table からの全件集計と一致すること
+    """
+
+    def setUp(self):
+
+        self.gpu = PCAttribute.objects.create(
+            attr_type="gpu",
+            name="RTX 4060",
+            slug="gpu-rtx-4060",
+        )
+
+        self.usage = PCAttribute.objects.create(
+            attr_type="usage",
+            name="ゲーミング",
+            slug="usage-gaming",
+        )
+
+        self.first = make_product("facet-1")
+
+        self.second = make_product("facet-2")
+
+        self.first.attributes.add(
+            self.gpu,
+            self.usage,
+        )
+
+        self.second.attributes.add(
+            self.gpu,
+        )
+
+    def assertFacetsMatchRecount(self):
+
+        recount = {
+            dim: count
+            for dim, count in count_attribute_facets().items()
+            if count > 0
+        }
+
+        self.assertEqual(
+            materialized_attribute_counts(),
+            recount,
+        )
+
+    def active_count(self, attribute):
+
+        return materialized_attribute_counts().get(
+            (FACET_ATTRIBUTE, attribute.id, "PC", True),
+            0,
+        )
+
+    # ------------------------------------------------------
+    # link add / remove
+    # ------------------------------------------------------
+
+    def test_link_changes(self):
+
+        self.assertEqual(self.active_count(self.gpu), 2)
+
+        self.assertEqual(self.active_count(self.usage), 1)
+
+        self.second.attributes.remove(self.gpu)
+
+        self.assertEqual(self.active_count(self.gpu), 1)
+
+        self.first.attributes.clear()
+
+        self.assertEqual(self.active_count(self.gpu), 0)
+
+        self.assertEqual(self.active_count(self.usage), 0)
+
+        self.assertFacetsMatchRecount()
+
+    # ------------------------------------------------------
+    # deactivate / activate (save)
+    # ------------------------------------------------------
+
+    def test_deactivate_and_activate(self):
+
+        product = PCProduct.objects.get(pk=self.first.pk)
+
+        product.is_active = False
+
+        product.save()
+
+        self.assertEqual(self.active_count(self.gpu), 1)
+
+        self.assertEqual(self.active_count(self.usage), 0)
+
+        self.assertFacetsMatchRecount()
+
+        product.is_active = True
+
+        product.save()
+
+        self.assertEqual(self.active_count(self.gpu), 2)
+
+        self.assertEqual(self.active_count(self.usage), 1)
+
+        self.assertFacetsMatchRecount()
+
+    def test_delete(self):
+
+        PCProduct.objects.get(pk=self.second.pk).delete()
+
+        self.assertEqual(self.active_count(self.gpu), 1)
+
+        self.assertFacetsMatchRecount()
+
+    # ------------------------------------------------------
+    # bulk update (signal を通らない)
+    # ------------------------------------------------------
+
+    def test_cleanup_command_recounts_bulk_deactivation(self):
+
+        # queryset.update は auto_now を通らないので updated_at も古くできる
+        PCProduct.objects.filter(
+            pk=self.first.pk,
+        ).update(
+            stock_status="在庫切れ",
+            last_spec_parsed_at=None,
+            updated_at=timezone.now() - timedelta(days=60),
+        )
+
+        call_command(
+            "cleanup_pc_catalog",
+            stdout=StringIO(),
+        )
+
+        self.assertFalse(
+            PCProduct.objects.get(pk=self.first.pk).is_active
+        )
+
+        self.assertEqual(self.active_count(self.gpu), 1)
+
+        self.assertEqual(self.active_count(self.usage), 0)
+
+        self.assertFacetsMatchRecount()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# api/tests/test_feed_row_delta.py
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import (
+    LinkshareFeedRow,
+    PCProduct,
+)
+
+from api.services.feed.services.linkshare_stream_import import (
+    FeedRowDelta,
+    touch_pc_products,
+)
+
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+SITE_PREFIX = "test"
+
+
+def feed_row(sku, name):
+
+    row = [""] * 18
+
+    row[1] = name
+
+    row[2] = sku
+
+    return row
+
+
+def make_product(sku, updated_at):
+
+    product = PCProduct.objects.create(
+
+        unique_id=f"{SITE_PREFIX}_{sku}",
+
+        site_prefix=SITE_PREFIX,
+
+        name=sku,
+
+        price=100000,
+
+        url=f"https://example.com/{sku}",
+
+        unified_genre="PC",
+    )
+
+    # auto_now を避けて updated_at を過去にする
+    PCProduct.objects.filter(
+        pk=product.pk,
+    ).update(
+        updated_at=updated_at,
+    )
+
+    return product
+
+
+# ==========================================================
+# UNCHANGED ROWS
+# ==========================================================
+
+class FeedRowDeltaTouchTests(TestCase):
+
+    """
+    hash が前回と同じ行も updated_at は進み、cleanup_pc_catalog の対象から外れること
+    """
+
+    def setUp(self):
+
+        self.old = timezone.now() - timedelta(days=30)
+
+        self.unchanged = make_product("sku-1", self.old)
+
+        self.changed = make_product("sku-2", self.old)
+
+        self.dropped = make_product("sku-3", self.old)
+
+        first = FeedRowDelta(
+            LinkshareFeedRow.TARGET_PC_PRODUCT,
+            "9999",
+        )
+
+        first.split([
+            feed_row("sku-1", "A"),
+            feed_row("sku-2", "B"),
+            feed_row("sku-3", "C"),
+        ])
+
+        first.commit()
+
+    def updated_at(self, product):
+
+        return PCProduct.objects.values_list(
+            "updated_at",
+            flat=True,
+        ).get(pk=product.pk)
+
+    def test_unchanged_rows_are_touched(self):
+
+        delta = FeedRowDelta(
+
+            LinkshareFeedRow.TARGET_PC_PRODUCT,
+
+            "9999",
+
+            touch=lambda skus: touch_pc_products(SITE_PREFIX, skus=skus),
+        )
+
+        changed = delta.split([
+            feed_row("sku-1", "A"),
+            feed_row("sku-2", "B (new)"),
+        ])
+
+        self.assertEqual(
+            [row[2] for row in changed],
+            ["sku-2"],
+        )
+
+        self.assertEqual(delta.unchanged, 1)
+
+        delta.commit()
+
+        self.assertGreater(
+            self.updated_at(self.unchanged),
+            self.old,
+        )
+
+        # 変わった行は upsert 側で、フィードから消えた行は誰も触らない
+        self.assertEqual(
+            self.updated_at(self.dropped),
+            self.old,
+        )
+
+    def test_skipped_file_touches_rows_seen_last_run(self):
+
+        last_run = timezone.now() - timedelta(days=1)
+
+        PCProduct.objects.filter(
+            pk=self.unchanged.pk,
+        ).update(
+            updated_at=last_run + timedelta(minutes=5),
+        )
+
+        touched = touch_pc_products(
+            SITE_PREFIX,
+            seen_since=last_run,
+        )
+
+        self.assertEqual(touched, 1)
+
+        self.assertGreater(
+            self.updated_at(self.unchanged),
+            last_run + timedelta(minutes=5),
+        )
+
+        self.assertEqual(
+            self.updated_at(self.dropped),
+            self.old,
+        )
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# api/tests/test_intent_matcher.py
+
+from django.test import SimpleTestCase
+
+from api.services.semantic.v2.authority.authority_registry import (
+    INTENT_ALIASES_TABLE,
+    SLUG_METADATA_TABLE,
+    get_authority_snapshot,
+)
+
+from api.services.semantic.v2.intent.intent_matcher import (
+    IntentMatcher,
+)
+
+from api.services.semantic.v2.intent.intent_resolver import (
+    normalize_message,
+)
+
+
+# ==========================================================
+# BASELINE
+# ==========================================================
+
+def baseline_match(normalized, alias_rows):
+
+    """
+    automaton 化する前の resolve_intent (alias row ごとの substring 判定)
+    """
+
+    matched_groups = []
+
+    for alias in alias_rows:
+
+        slug = alias.get(
+            "slug"
+        )
+
+        if not slug:
+            continue
+
+        keyword = (
+            alias.get(
+                "alias",
+                ""
+            )
+            .lower()
+            .strip()
+        )
+
+        if (
+            keyword
+            and
+            keyword in normalized
+            and
+            slug not in matched_groups
+        ):
+
+            matched_groups.append(
+                slug
+            )
+
+    return matched_groups
+
+
+QUERIES = [
+
+    "",
+
+    "動画編集 open source",
+
+    "動画編集 spending",
+
+    "動画編集 expensive",
+
+    "ゲーミングPC RTX",
+
+    "軽いノートで Excel",
+
+    "ROG のペン付きタブレット",
+
+    "写真編集と配信をしたい",
+
+    "学生向け 安い ノートパソコン",
+]
+
+
+# ==========================================================
+# PARITY
+# ==========================================================
+
+class IntentMatcherParityTests(SimpleTestCase):
+
+    """
+    compiled matcher が旧 resolve_intent と同じ matched_groups (順序込み) を返すこと
+    """
+
+    @classmethod
+    def setUpClass(cls):
+
+        super().setUpClass()
+
+        snapshot = get_authority_snapshot()
+
+        cls.alias_rows = snapshot.table(
+            INTENT_ALIASES_TABLE
+        )
+
+        cls.matcher = IntentMatcher(
+            cls.alias_rows,
+            snapshot.table(
+                SLUG_METADATA_TABLE
+            ),
+        )
+
+    def corpus(self):
+
+        aliases = [
+            row.get("alias", "")
+            for row in self.alias_rows
+        ]
+
+        # 固定 query + alias 単体 + alias 2 つの組み合わせ
+        return (
+            QUERIES
+            + aliases
+            + [
+                f"{left} {right}"
+                for left, right in zip(
+                    aliases[::7],
+                    aliases[3::11],
+                )
+            ]
+        )
+
+    def test_matches_baseline(self):
+
+        for query in self.corpus():
+
+            normalized = normalize_message(
+                query
+            )
+
+            with self.subTest(query=query):
+
+                self.assertEqual(
+                    self.matcher.match(normalized),
+                    baseline_match(
+                        normalized,
+                        self.alias_rows,
+                    ),
+                )
+
+    def test_negative_aliases_do_not_veto(self):
+
+        # semantic_negative_aliases の語 (open / spending / expensive) で落とさない
+        for query in QUERIES[1:4]:
+
+            with self.subTest(query=query):
+
+                self.assertIn(
+                    "usage-creator",
+                    self.matcher.match(
+                        normalize_message(query)
+                    ),
+                )
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+# api/tests/test_keyset_pagination.py
+
+import base64
+import json
+
+from django.test import TestCase
+
+from api.models import (
+    PCProduct,
+)
+
+from api.utils.keyset_pagination import (
+    InvalidCursor,
+    StaleCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_ordering,
+    ordering_signature,
+    paginate_keyset,
+)
+
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def make_product(unique_id, price, semantic_score):
+
+    return PCProduct.objects.create(
+
+        unique_id=unique_id,
+
+        site_prefix="test",
+
+        name=unique_id,
+
+        price=price,
+
+        url=f"https://example.com/{unique_id}",
+
+        unified_genre="PC",
+
+        semantic_score=semantic_score,
+
+        semantic_runtime={},
+    )
+
+
+def forge_cursor(payload):
+
+    return base64.urlsafe_b64encode(
+        json.dumps(payload).encode("utf-8")
+    ).decode("ascii").rstrip("=")
+
+
+# ==========================================================
+# KEYSET
+# ==========================================================
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+
+        # semantic_score が重複するので id の tiebreak が効く
+        for index in range(7):
+
+            make_product(
+                f"keyset-{index}",
+                price=100000 + index,
+                semantic_score=index // 3,
+            )
+
+    def queryset(self):
+
+        return PCProduct.objects.order_by(
+            "-semantic_score",
+            "price",
+        )
+
+    def ordering(self):
+
+        return keyset_ordering(
+            self.queryset()
+        )
+
+    # ------------------------------------------------------
+    # round trip
+    # ------------------------------------------------------
+
+    def test_pages_cover_full_ordering(self):
+
+        expected = list(
+            self.queryset()
+            .order_by(*ordering_signature(self.ordering()))
+            .values_list("id", flat=True)
+        )
+
+        seen = []
+
+        cursor = None
+
+        while True:
+
+            page = paginate_keyset(
+                self.queryset(),
+                3,
+                cursor=cursor,
+            )
+
+            seen += [
+                product.id
+                for product in page["rows"]
+            ]
+
+            if not page["has_next"]:
+                break
+
+            cursor = page["next_cursor"]
+
+        self.assertEqual(seen, expected)
+
+    def test_cursor_round_trip(self):
+
+        ordering = self.ordering()
+
+        values = [2, 100003, 42]
+
+        self.assertEqual(
+            decode_cursor(
+                encode_cursor(ordering, values),
+                ordering,
+                queryset=self.queryset(),
+            ),
+            values,
+        )
+
+    # ------------------------------------------------------
+    # tampered / stale
+    # ------------------------------------------------------
+
+    def tampered(self, values):
+
+        return forge_cursor({
+            "v": 1,
+            "o": ordering_signature(self.ordering()),
+            "k": values,
+        })
+
+    def test_non_scalar_value_is_invalid(self):
+
+        for values in (
+            [[1], 100000, 1],
+            [{"x": 1}, 100000, 1],
+            [1, "not-a-price", 1],
+            [1, None, 1],
+            [1, 100000],
+            "1,100000,1",
+        ):
+
+            with self.subTest(values=values):
+
+                with self.assertRaises(InvalidCursor):
+
+                    paginate_keyset(
+                        self.queryset(),
+                        3,
+                        cursor=self.tampered(values),
+                    )
+
+    def test_malformed_cursor_is_invalid(self):
+
+        for cursor in (
+            "%%%",
+            forge_cursor([1, 2, 3]),
+            self.tampered([{"dt": "not-a-date"}, 100000, 1]),
+        ):
+
+            with self.subTest(cursor=cursor):
+
+                with self.assertRaises(InvalidCursor):
+
+                    decode_cursor(
+                        cursor,
+                        self.ordering(),
+                        queryset=self.queryset(),
+                    )
+
+    def test_changed_ordering_is_stale(self):
+
+        cursor = encode_cursor(
+            self.ordering(),
+            [1, 100000, 1],
+        )
+
+        with self.assertRaises(StaleCursor):
+
+            decode_cursor(
+                cursor,
+                keyset_ordering(
+                    PCProduct.objects.order_by("price")
+                ),
+            )
+
+    # ------------------------------------------------------
+    # API
+    # ------------------------------------------------------
+
+    def test_tampered_cursor_returns_400(self):
+
+        # 並びは一致 / キー値だけ list に差し替え
+        typed = forge_cursor({
+            "v": 1,
+            "o": ["-semantic_score", "-spec_score", "-created_at", "-id"],
+            "k": [[1], 0, None, 1],
+        })
+
+        malformed = forge_cursor([1])
+
+        for path, cursor in (
+            ("/api/pc/legacy/products/", typed),
+            ("/api/pc/legacy/products/", malformed),
+            ("/api/pc/products/", malformed),
+        ):
+
+            with self.subTest(path=path, cursor=cursor):
+
+                response = self.client.get(
+                    path,
+                    {"cursor": cursor},
+                )
+
+                self.assertEqual(
+                    response.status_code,
+                    400,
+                )
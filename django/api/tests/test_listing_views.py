@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# api/tests/test_listing_views.py
+
+from unittest import mock
+
+from django.test import TestCase
+
+from api.models import (
+    PCProduct,
+    PCProductRelation,
+)
+
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+CARD_KEYS = {
+    "id",
+    "unique_id",
+    "name",
+    "image_url",
+    "price",
+    "semantic_runtime",
+    "semantic_labels",
+    "render_hints",
+}
+
+
+def make_product(unique_id, semantic_score):
+
+    return PCProduct.objects.create(
+
+        unique_id=unique_id,
+
+        site_prefix="test",
+
+        name=unique_id,
+
+        price=100000,
+
+        url=f"https://example.com/{unique_id}",
+
+        unified_genre="PC",
+
+        description="long description " * 50,
+
+        semantic_score=semantic_score,
+
+        semantic_runtime={
+            "product_type": "gaming_pc",
+            "semantic_labels": ["ゲーミング"],
+        },
+    )
+
+
+# ==========================================================
+# LEGACY LIST / RANKING
+# ==========================================================
+
+class ListingViewTests(TestCase):
+
+    """
+    既定は card payload / ?view=full だけ serializer の全列
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+
+        cls.source = make_product("listing-1", 2)
+
+        cls.target = make_product("listing-2", 1)
+
+        cls.inactive = make_product("listing-3", 0)
+
+        PCProduct.objects.filter(
+            pk=cls.inactive.pk,
+        ).update(
+            is_active=False,
+        )
+
+        for rank, target in enumerate(
+            (cls.inactive, cls.target),
+            start=1,
+        ):
+
+            PCProductRelation.objects.create(
+                source=cls.source,
+                target=target,
+                rank=rank,
+                score=0.5,
+                edge_type="similar",
+            )
+
+    def test_default_returns_card_payload(self):
+
+        for path in (
+            "/api/pc/legacy/products/",
+            "/api/pc/legacy/ranking/",
+        ):
+
+            with self.subTest(path=path):
+
+                response = self.client.get(path)
+
+                self.assertEqual(response.status_code, 200)
+
+                results = response.json()["results"]
+
+                self.assertEqual(
+                    {row["unique_id"] for row in results},
+                    {"listing-1", "listing-2"},
+                )
+
+                for row in results:
+
+                    self.assertEqual(set(row), CARD_KEYS)
+
+    def test_full_view_reads_stored_relations(self):
+
+        # 一覧では graph index からの live 組み立てをしない
+        with mock.patch(
+            "api.services.semantic.semantic_api_service."
+            "build_semantic_related_products",
+            side_effect=AssertionError("live related lookup"),
+        ):
+
+            response = self.client.get(
+                "/api/pc/legacy/products/",
+                {"view": "full"},
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+        rows = {
+            row["unique_id"]: row
+            for row in response.json()["results"]
+        }
+
+        self.assertIn("ai_content", rows["listing-1"])
+
+        self.assertIn("attributes", rows["listing-1"])
+
+        self.assertEqual(
+            [
+                node["unique_id"]
+                for node in rows["listing-1"]["semantic_related"]
+            ],
+            ["listing-2"],
+        )
+
+        self.assertEqual(rows["listing-2"]["semantic_related"], [])
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# api/tests/test_ranking_snapshot.py
+
+from django.test import TestCase
+
+from api.models import (
+    PCProduct,
+    PCRankingSnapshot,
+)
+
+from api.services.ranking_snapshot_service import (
+    RANKING_ALL,
+    build_ranking_snapshot,
+    clear_ranking_cache,
+    get_active_ranking_snapshot,
+    get_ranking_entry,
+    load_ranking_page,
+)
+
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def make_product(unique_id, groups):
+
+    return PCProduct.objects.create(
+
+        unique_id=unique_id,
+
+        site_prefix="test",
+
+        name=unique_id,
+
+        price=100000,
+
+        url=f"https://example.com/{unique_id}",
+
+        unified_genre="PC",
+
+        semantic_runtime={
+            "semantic_groups": groups,
+        },
+    )
+
+
+def walk_pages(key, limit):
+
+    """
+    cursor を辿って全ページの unique_id を集める
+    """
+
+    unique_ids = []
+
+    cursor = None
+
+    while True:
+
+        page = load_ranking_page(
+            key,
+            limit,
+            cursor=cursor,
+        )
+
+        unique_ids += [
+            product["unique_id"]
+            for product in page["products"]
+        ]
+
+        if not page["next_cursor"]:
+            return unique_ids
+
+        # 非掲載を飛ばしても末尾ページ以外は limit 件埋まる
+        assert len(page["products"]) == limit
+
+        cursor = page["next_cursor"]
+
+
+# ==========================================================
+# SNAPSHOT PAGING
+# ==========================================================
+
+class RankingSnapshotPagingTests(TestCase):
+
+    def setUp(self):
+
+        clear_ranking_cache()
+
+        # score (所属 group 数) が違うので順位が決まる
+        for index in range(8):
+
+            make_product(
+                f"rank-{index}",
+                [f"group-{n}" for n in range(index + 1)],
+            )
+
+        self.snapshot = build_ranking_snapshot()
+
+        ids, _, _ = get_ranking_entry(
+            self.snapshot,
+            RANKING_ALL,
+        )
+
+        self.ranked = list(
+
+            PCProduct.objects
+
+            .in_bulk(ids)
+
+            .values()
+        )
+
+        self.ranked.sort(
+            key=lambda product: ids.index(product.id)
+        )
+
+    def test_snapshot_order(self):
+
+        self.assertEqual(
+            [product.unique_id for product in self.ranked],
+            [f"rank-{index}" for index in reversed(range(8))],
+        )
+
+    def test_inactive_products_are_skipped_and_backfilled(self):
+
+        # snapshot を作り直さずに 1 ページ目の製品を非掲載へ
+        hidden = {
+            self.ranked[0].unique_id,
+            self.ranked[2].unique_id,
+        }
+
+        PCProduct.objects.filter(
+            unique_id__in=hidden
+        ).update(
+            is_active=False
+        )
+
+        first = load_ranking_page(
+            RANKING_ALL,
+            3,
+        )
+
+        self.assertEqual(
+            len(first["products"]),
+            3,
+        )
+
+        self.assertFalse(
+            hidden
+            & {product["unique_id"] for product in first["products"]}
+        )
+
+        self.assertEqual(
+            walk_pages(RANKING_ALL, 3),
+            [
+                product.unique_id
+                for product in self.ranked
+                if product.unique_id not in hidden
+            ],
+        )
+
+    def test_missing_snapshot_is_built_once(self):
+
+        PCRankingSnapshot.objects.all().delete()
+
+        clear_ranking_cache()
+
+        snapshot = get_active_ranking_snapshot()
+
+        self.assertIsNotNone(snapshot)
+
+        self.assertEqual(
+            get_active_ranking_snapshot().id,
+            snapshot.id,
+        )
+
+        self.assertEqual(
+            PCRankingSnapshot.objects.count(),
+            1,
+        )
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# api/tests/test_search_document.py
+
+from django.test import TestCase
+
+from api.models import (
+    PCProduct,
+)
+
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def make_product(unique_id):
+
+    return PCProduct.objects.create(
+
+        unique_id=unique_id,
+
+        site_prefix="test",
+
+        name="ゲーミングノート",
+
+        maker="TEST",
+
+        price=100000,
+
+        url=f"https://example.com/{unique_id}",
+
+        unified_genre="PC",
+    )
+
+
+def stored(product, field):
+
+    return PCProduct.objects.values_list(
+        field,
+        flat=True,
+    ).get(pk=product.pk)
+
+
+# ==========================================================
+# DERIVED COLUMNS
+# ==========================================================
+
+class DerivedColumnSaveTests(TestCase):
+
+    """
+    update_fields 指定の save でも search_document / card_payload を書くこと
+    """
+
+    def setUp(self):
+
+        self.product = make_product("search-doc-1")
+
+    def test_update_fields_writes_search_document(self):
+
+        product = PCProduct.objects.get(pk=self.product.pk)
+
+        product.cpu_model = "Core i7-13700H"
+
+        product.save(update_fields=["cpu_model"])
+
+        self.assertIn(
+            "i7-13700h",
+            stored(product, "search_document").split(),
+        )
+
+    def test_update_fields_writes_card_payload(self):
+
+        product = PCProduct.objects.get(pk=self.product.pk)
+
+        product.semantic_runtime = {
+            "semantic_labels": ["ゲーミング"],
+        }
+
+        product.save(update_fields=["semantic_runtime"])
+
+        self.assertEqual(
+            stored(product, "card_payload")["semantic_labels"],
+            ["ゲーミング"],
+        )
+
+    def test_deferred_search_fields_are_not_loaded(self):
+
+        before = stored(self.product, "search_document")
+
+        product = PCProduct.objects.defer(
+            "cpu_model",
+            "gpu_model",
+        ).get(pk=self.product.pk)
+
+        product.price = 90000
+
+        product.save(update_fields=["price"])
+
+        # 組み直しのために defer 列を読み込まない
+        self.assertTrue(
+            {"cpu_model", "gpu_model"}
+            <= product.get_deferred_fields()
+        )
+
+        self.assertEqual(
+            stored(product, "search_document"),
+            before,
+        )
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# api/tests/test_semantic_dirty.py
+
+from django.test import TestCase
+
+from api.models import (
+    PCProduct,
+)
+
+from api.services.semantic.runtime_builder import (
+    build_source_hash,
+)
+
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def make_clean_product(unique_id):
+
+    product = PCProduct.objects.create(
+
+        unique_id=unique_id,
+
+        site_prefix="test",
+
+        name=unique_id,
+
+        price=100000,
+
+        url=f"https://example.com/{unique_id}",
+
+        unified_genre="PC",
+
+        ai_content="long ai content " * 50,
+    )
+
+    # runtime 構築済み (queue から外れた) 状態にする
+    PCProduct.objects.filter(
+        pk=product.pk,
+    ).update(
+        semantic_runtime_dirty=False,
+        semantic_source_hash=build_source_hash(product),
+    )
+
+    return product
+
+
+def stored_dirty(product):
+
+    return PCProduct.objects.values_list(
+        "semantic_runtime_dirty",
+        flat=True,
+    ).get(pk=product.pk)
+
+
+# ==========================================================
+# SOURCE CHANGE SIGNAL
+# ==========================================================
+
+class SourceChangedSignalTests(TestCase):
+
+    def setUp(self):
+
+        self.product = make_clean_product("dirty-1")
+
+    def test_unchanged_source_stays_clean(self):
+
+        product = PCProduct.objects.get(pk=self.product.pk)
+
+        product.save()
+
+        self.assertFalse(stored_dirty(product))
+
+    def test_source_change_marks_dirty(self):
+
+        product = PCProduct.objects.get(pk=self.product.pk)
+
+        product.cpu_model = "Core Ultra 7 155H"
+
+        product.save(update_fields=["cpu_model"])
+
+        self.assertTrue(stored_dirty(product))
+
+    def test_deferred_source_marks_dirty_without_loading(self):
+
+        product = PCProduct.objects.defer(
+            "ai_summary",
+            "ai_content",
+        ).get(pk=self.product.pk)
+
+        product.name = "dirty-1 (renamed)"
+
+        product.save()
+
+        self.assertTrue(stored_dirty(product))
+
+        # hash を取るために defer 列を読み込まない
+        self.assertTrue(
+            {"ai_summary", "ai_content"}
+            <= product.get_deferred_fields()
+        )
+
+    def test_deferred_save_without_source_fields_is_ignored(self):
+
+        product = PCProduct.objects.only(
+            "id",
+            "price",
+        ).get(pk=self.product.pk)
+
+        product.price = 90000
+
+        product.save(update_fields=["price"])
+
+        self.assertFalse(stored_dirty(product))
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# api/tests/test_semantic_graph_index.py
+
+from django.test import TestCase
+
+from api.models import (
+    PCProduct,
+)
+
+from api.utils.catalog_generation import (
+    bump_catalog_generation,
+)
+
+from api.services.semantic.semantic_graph_index import (
+    get_semantic_graph_index,
+    invalidate_semantic_graph_index,
+)
+
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def make_product(unique_id):
+
+    return PCProduct.objects.create(
+
+        unique_id=unique_id,
+
+        site_prefix="test",
+
+        name=unique_id,
+
+        price=100000,
+
+        url=f"https://example.com/{unique_id}",
+
+        unified_genre="PC",
+
+        semantic_runtime={
+            "product_type": "gaming_pc",
+            "semantic_labels": ["ゲーミング"],
+        },
+    )
+
+
+# ==========================================================
+# GENERATION FAST PATH
+# ==========================================================
+
+class SemanticGraphIndexTests(TestCase):
+
+    def setUp(self):
+
+        invalidate_semantic_graph_index()
+
+        self.addCleanup(
+            invalidate_semantic_graph_index
+        )
+
+        make_product("graph-1")
+
+    def test_current_generation_skips_signature_aggregate(self):
+
+        index = get_semantic_graph_index()
+
+        self.assertEqual(index.size(), 1)
+
+        # generation の 1 query だけ (COUNT / MAX は走らない)
+        with self.assertNumQueries(1):
+
+            self.assertIs(
+                get_semantic_graph_index(),
+                index,
+            )
+
+    def test_moved_generation_refreshes_index(self):
+
+        index = get_semantic_graph_index()
+
+        make_product("graph-2")
+
+        # TestCase 内では on_commit の bump が走らないので commit 相当を直接
+        bump_catalog_generation()
+
+        refreshed = get_semantic_graph_index()
+
+        self.assertIsNot(refreshed, index)
+
+        self.assertEqual(refreshed.size(), 2)
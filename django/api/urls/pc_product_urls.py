@@ -9,6 +9,7 @@ from api.views.general_views import (
 
 from api.views.pc_product_view import (
     pc_product_detail,
+    pc_product_price_history,
     get_related_pc_products,
 )
 
@@ -46,6 +47,17 @@ urlpatterns = [
         name="related_pc_products",
     ),
 
+    # ==========================================================
+    # PRICE CHART (月次ロールアップ)
+    # Must be above detail route
+    # ==========================================================
+
+    path(
+        "pc-products/<str:unique_id>/price-history/",
+        pc_product_price_history,
+        name="pc_product_price_history",
+    ),
+
     # ==========================================================
     # RELATED (V2)
     # ==========================================================
@@ -28,12 +28,12 @@ from api.views.catalog_options_view import ( CatalogOptionsView, )
 # =====================================================
 
 from api.views.general_views import ( PCProductListAPIView, )
-from api.views.pc_product_view import ( pc_product_detail, get_related_pc_products, )
+from api.views.pc_product_view import ( pc_product_detail, get_related_pc_products, pc_product_price_history, )
 from api.views.finder_v2_view import ( semantic_finder_v2, )
 from api.views.pc_product_view import ( semantic_discovery_runtime, semantic_shelves, semantic_workflow_runtime, )
 from api.views.general_views import ( PCProductRankingView, )
 from api.views.pc_stats_view import ( pc_sidebar_stats, )
-from api.views.finder_views import ( SemanticFinderView, )
+from api.views.finder_views import ( SemanticFinderView, finder_cache_stats, )
 
 
 app_name = "pc"
@@ -61,6 +61,7 @@ urlpatterns = [
 
     path("legacy/semantic/grouped-attributes/", pc_sidebar_stats, name="semantic_grouped_attributes"),
     path("legacy/finder/", SemanticFinderView.as_view(), name="semantic_finder"),
+    path("legacy/finder/cache-stats/", finder_cache_stats, name="semantic_finder_cache_stats"),
     path("legacy/semantic/finder/", semantic_finder_v2, name="semantic_finder_v2"),
 
     # ======================================================
@@ -125,5 +126,6 @@ urlpatterns = [
     path("products/", semantic_product_list_v2, name="product_list"),
     path("products/<str:unique_id>/", semantic_product_detail_v2, name="product_detail"),
     path("products/<str:unique_id>/related/", semantic_related_v2, name="related"),
+    path("products/<str:unique_id>/price-history/", pc_product_price_history, name="price_history"),
 
 ]
\ No newline at end of file
@@ -1,4 +1,6 @@
-from api.models import PCAttribute
+from api.utils.attribute_tagger import (
+    get_attribute_tagger,
+)
 
 
 # =========================================================
@@ -20,47 +22,15 @@ def match_attribute(text, attr_type):
     if not text:
         return None
 
-    # =====================================================
-    # Load Attributes
-    # =====================================================
-    attrs = (
-        PCAttribute.objects
-        .filter(
-            attr_type=attr_type,
-            # is_active=True
-        )
-        .order_by("-order")
-    )
-
     # =====================================================
     # Keyword Match
-    # =====================================================
-    for attr in attrs:
-
-        keywords = (
-            attr.search_keywords or ""
-        ).split(",")
-
-        for kw in keywords:
-
-            # ---------------------------------------------
-            # Normalize Keyword
-            # ---------------------------------------------
-            kw = (
-                kw.strip()
-                .lower()
-            )
-
-            if not kw:
-                continue
-
-            # ---------------------------------------------
-            # Match
-            # ---------------------------------------------
-            if kw in text:
-                return attr
-
-    # =====================================================
-    # No Match
-    # =====================================================
-    return None
\ No newline at end of file
+    # attr_type ごとの compiled tagger で 1 pass scan
+    # (search_keywords のみ / 複数ヒット時は order が最大の attribute)
+    # =====================================================
+    return get_attribute_tagger(
+        attr_type,
+        include_name=False,
+    ).first(
+        text,
+        attr_type=attr_type,
+    )
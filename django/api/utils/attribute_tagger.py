@@ -0,0 +1,724 @@
+# -*- coding: utf-8 -*-
+# api/utils/attribute_tagger.py
+
+"""
+Compiled attribute tagger
+
+PCAttribute (name + search_keywords)
+↓
+Aho-Corasick automaton (1 回だけ compile)
+↓
+product text を 1 pass scan
+↓
+既存 M2M link と差分
+↓
+through table へ bulk insert / delete
+"""
+
+import re
+
+from django.db import transaction
+
+from api.models import (
+    PCAttribute,
+    PCProduct,
+)
+
+from api.services.facet_count_service import (
+    apply_link_changes,
+)
+
+from api.utils.catalog_generation import (
+    PC_ATTRIBUTES,
+    get_catalog_generation,
+)
+
+from api.utils.keyword_automaton import (
+    KeywordAutomaton,
+)
+
+# =========================================================
+# CONSTANTS
+# =========================================================
+
+# search_keywords の区切り (tagging_attributes / attribute_matcher)
+KEYWORD_SEPARATORS = r","
+
+# product text に使う field (tagging_attributes / tagging_cpu)
+TAGGING_TEXT_FIELDS = [
+
+    "name",
+
+    "description",
+]
+
+TAGGING_CHUNK_SIZE = 1000
+
+# match kind (同じ keyword なら raw を優先)
+MATCH_RAW = "raw"
+
+MATCH_COMPACT = "compact"
+
+MATCH_KIND_RANK = {
+
+    MATCH_RAW:
+        0,
+
+    MATCH_COMPACT:
+        1,
+}
+
+
+# =========================================================
+# NORMALIZE
+# =========================================================
+
+def split_keywords(
+
+    raw,
+
+    separators=KEYWORD_SEPARATORS,
+
+    min_length=1,
+):
+
+    return [
+
+        keyword
+
+        for keyword in (
+
+            part.strip().lower()
+
+            for part in re.split(
+                separators,
+                raw or ""
+            )
+        )
+
+        if len(keyword) >= min_length
+    ]
+
+
+def compact_text(text):
+
+    """
+    空白 / ハイフンを落とした比較用テキスト
+    """
+
+    return (
+        text
+        .replace(" ", "")
+        .replace("-", "")
+        .lower()
+    )
+
+
+# =========================================================
+# TAGGER
+# =========================================================
+
+class AttributeTagger:
+
+    """
+    tagger = AttributeTagger(attributes)
+    tagger.scan(text) -> {attr_id: (keyword_index, kind, keyword)}
+
+    keyword_index は attribute ごとの keyword 順。
+    同じ attribute で複数ヒットした場合は先頭 keyword (同順位なら raw) を返す
+    """
+
+    def __init__(
+
+        self,
+
+        attributes,
+
+        separators=KEYWORD_SEPARATORS,
+
+        min_length=1,
+
+        include_name=True,
+
+        name_first=True,
+
+        compact=False,
+
+        keyword_filter=None,
+    ):
+
+        self.attributes = {}
+
+        self.keywords = {}
+
+        # 入力 queryset 上の並び (呼び出し側の優先順位用)
+        self.position = {}
+
+        self.raw = KeywordAutomaton()
+
+        self.compact = KeywordAutomaton()
+
+        for attr in attributes:
+
+            keywords = split_keywords(
+
+                attr.search_keywords,
+
+                separators=separators,
+
+                min_length=min_length,
+            )
+
+            name = (
+                attr.name or ""
+            ).strip().lower()
+
+            if name and include_name:
+
+                if name_first:
+
+                    keywords.insert(
+                        0,
+                        name
+                    )
+
+                else:
+
+                    keywords.append(
+                        name
+                    )
+
+            if keyword_filter:
+
+                keywords = [
+
+                    keyword
+
+                    for keyword in keywords
+
+                    if keyword_filter(
+                        attr,
+                        keyword
+                    )
+                ]
+
+            if not keywords:
+                continue
+
+            self.attributes[attr.id] = attr
+
+            self.keywords[attr.id] = keywords
+
+            self.position[attr.id] = len(self.position)
+
+            use_compact = (
+                compact(attr)
+                if callable(compact)
+                else compact
+            )
+
+            for index, keyword in enumerate(keywords):
+
+                self.raw.add(
+                    keyword,
+                    (attr.id, index, keyword),
+                )
+
+                if use_compact:
+
+                    self.compact.add(
+                        compact_text(keyword),
+                        (attr.id, index, keyword),
+                    )
+
+        self.raw.build()
+
+        self.compact.build()
+
+    # =====================================================
+    # SCAN
+    # =====================================================
+
+    def scan(self, text):
+
+        text = (
+            text or ""
+        ).lower()
+
+        hits = {}
+
+        passes = [
+            (self.raw, text, MATCH_RAW),
+        ]
+
+        if self.compact.size:
+
+            passes.append(
+                (self.compact, compact_text(text), MATCH_COMPACT)
+            )
+
+        for automaton, target, kind in passes:
+
+            for attr_id, index, keyword in automaton.scan(target):
+
+                rank = (
+                    index,
+                    MATCH_KIND_RANK[kind],
+                )
+
+                current = hits.get(
+                    attr_id
+                )
+
+                if current is None or rank < (
+                    current[0],
+                    MATCH_KIND_RANK[current[1]],
+                ):
+
+                    hits[attr_id] = (
+                        index,
+                        kind,
+                        keyword,
+                    )
+
+        return hits
+
+    def tag(self, text):
+
+        return set(
+            self.scan(text)
+        )
+
+    def first(
+
+        self,
+
+        text,
+
+        attr_type=None,
+    ):
+
+        """
+        ヒットした attribute のうち order が最大のもの
+        """
+
+        matched = [
+
+            self.attributes[attr_id]
+
+            for attr_id in self.scan(text)
+
+            if attr_type is None
+            or self.attributes[attr_id].attr_type == attr_type
+        ]
+
+        if not matched:
+            return None
+
+        return max(
+
+            matched,
+
+            key=lambda attr: (
+                attr.order or 0,
+                -attr.id,
+            ),
+        )
+
+
+# =========================================================
+# CACHE
+# =========================================================
+
+_TAGGER_CACHE = {}
+
+
+def get_attribute_tagger(
+
+    attr_type=None,
+
+    include_name=True,
+):
+
+    """
+    PCAttribute の compiled tagger (process 内 cache)
+
+    属性マスター変更で PC_ATTRIBUTES generation が進むと作り直す
+    """
+
+    generation = get_catalog_generation(
+        PC_ATTRIBUTES
+    )
+
+    key = (
+        attr_type,
+        include_name,
+    )
+
+    cached = _TAGGER_CACHE.get(
+        key
+    )
+
+    if cached and cached[0] == generation:
+
+        return cached[1]
+
+    attributes = PCAttribute.objects.all()
+
+    if attr_type:
+
+        attributes = attributes.filter(
+            attr_type=attr_type
+        )
+
+    tagger = AttributeTagger(
+        attributes,
+        include_name=include_name,
+    )
+
+    _TAGGER_CACHE[key] = (
+        generation,
+        tagger,
+    )
+
+    return tagger
+
+
+# =========================================================
+# LINKS
+# =========================================================
+
+def link_columns(
+
+    model=PCProduct,
+
+    field_name="attributes",
+):
+
+    """
+    return: (through, source column, target column)
+    """
+
+    field = model._meta.get_field(
+        field_name
+    )
+
+    return (
+
+        field.remote_field.through,
+
+        f"{field.m2m_field_name()}_id",
+
+        f"{field.m2m_reverse_field_name()}_id",
+    )
+
+
+def load_attribute_links(
+
+    source_ids,
+
+    model=PCProduct,
+
+    field_name="attributes",
+):
+
+    """
+    return: {source_id: {target_id: link_id}}
+    """
+
+    through, source_column, target_column = link_columns(
+        model,
+        field_name,
+    )
+
+    links = {}
+
+    for link_id, source_id, target_id in (
+
+        through.objects
+
+        .filter(
+            **{f"{source_column}__in": list(source_ids)}
+        )
+
+        .values_list(
+            "id",
+            source_column,
+            target_column,
+        )
+    ):
+
+        links.setdefault(
+            source_id,
+            {}
+        )[target_id] = link_id
+
+    return links
+
+
+def sync_attribute_links(
+
+    targets_map,
+
+    prune=True,
+
+    existing=None,
+
+    model=PCProduct,
+
+    field_name="attributes",
+
+    scope=None,
+):
+
+    """
+    targets_map: {source_id: 付けるべき target_id の set}
+    prune: False なら追加のみ
+    scope: prune 対象の target_id (None なら全 target)
+
+    return: (added, removed)
+    """
+
+    if not targets_map:
+
+        return 0, 0
+
+    through, source_column, target_column = link_columns(
+        model,
+        field_name,
+    )
+
+    if existing is None:
+
+        existing = load_attribute_links(
+
+            targets_map,
+
+            model=model,
+
+            field_name=field_name,
+        )
+
+    added = []
+
+    removed = []
+
+    for source_id, targets in targets_map.items():
+
+        current = existing.get(
+            source_id,
+            {}
+        )
+
+        added.extend(
+
+            through(
+                **{
+                    source_column: source_id,
+                    target_column: target_id,
+                }
+            )
+
+            for target_id in targets
+
+            if target_id not in current
+        )
+
+        if prune:
+
+            removed.extend(
+
+                (link_id, source_id, target_id)
+
+                for target_id, link_id in current.items()
+
+                if target_id not in targets
+                and (scope is None or target_id in scope)
+            )
+
+    with transaction.atomic():
+
+        if removed:
+
+            through.objects.filter(
+                id__in=[link_id for link_id, _, _ in removed]
+            ).delete()
+
+        if added:
+
+            through.objects.bulk_create(
+                added,
+                ignore_conflicts=True,
+            )
+
+        # bulk 書き込みは m2m_changed を通らないので facet 件数を直接補正
+        if model is PCProduct and field_name == "attributes":
+
+            apply_link_changes(
+
+                added=[
+                    (
+                        getattr(link, source_column),
+                        getattr(link, target_column),
+                    )
+                    for link in added
+                ],
+
+                removed=[
+                    (source_id, target_id)
+                    for _, source_id, target_id in removed
+                ],
+            )
+
+    return len(added), len(removed)
+
+
+# =========================================================
+# RETAG
+# =========================================================
+
+def product_text(
+
+    product,
+
+    fields=TAGGING_TEXT_FIELDS,
+):
+
+    return " ".join(
+
+        str(value)
+
+        for value in (
+            getattr(product, field, None)
+            for field in fields
+        )
+
+        if value
+    )
+
+
+def retag_products(
+
+    products,
+
+    tagger,
+
+    prune=False,
+
+    fields=TAGGING_TEXT_FIELDS,
+
+    chunk_size=TAGGING_CHUNK_SIZE,
+
+    on_match=None,
+):
+
+    """
+    products を chunk ごとに scan → through table 差分書き込み
+
+    prune=True なら tagger の attribute のうち
+    ヒットしなくなった link を外す (他の attribute は触らない)
+    """
+
+    stats = {
+
+        "products":
+            0,
+
+        "matched":
+            0,
+
+        "added":
+            0,
+
+        "removed":
+            0,
+    }
+
+    scope = set(
+        tagger.attributes
+    )
+
+    targets_map = {}
+
+    def flush():
+
+        added, removed = sync_attribute_links(
+
+            targets_map,
+
+            prune=prune,
+
+            scope=scope,
+        )
+
+        stats["added"] += added
+
+        stats["removed"] += removed
+
+        targets_map.clear()
+
+    for product in (
+
+        products
+
+        .order_by()
+
+        .only(
+            "id",
+            *fields
+        )
+
+        .iterator(
+            chunk_size=chunk_size
+        )
+    ):
+
+        hits = tagger.scan(
+            product_text(
+                product,
+                fields,
+            )
+        )
+
+        stats["products"] += 1
+
+        stats["matched"] += len(
+            hits
+        )
+
+        if on_match and hits:
+
+            on_match(
+                product,
+                hits,
+            )
+
+        targets_map[product.id] = set(
+            hits
+        )
+
+        if len(targets_map) >= chunk_size:
+
+            flush()
+
+    flush()
+
+    return stats
+
+
+def retag_pc_catalog(prune=False):
+
+    """
+    属性マスター (TSV) 取り込み後の全件再タグ付け
+    """
+
+    return retag_products(
+
+        PCProduct.objects.all(),
+
+        AttributeTagger(
+            PCAttribute.objects.all()
+        ),
+
+        prune=prune,
+    )
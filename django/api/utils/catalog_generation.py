@@ -0,0 +1,112 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.models import CatalogGeneration
+
+# =========================================
+# Generation Keys
+# =========================================
+PC_CATALOG = "pc_catalog"
+
+# 属性マスター (PCAttribute) 変更で bump
+PC_ATTRIBUTES = "pc_attributes"
+
+# サイドバー facet 件数 (PCFacetCount) 変更で bump
+PC_FACETS = "pc_facets"
+
+
+# =========================================
+# Read
+# =========================================
+def get_catalog_generation(
+    key=PC_CATALOG,
+):
+
+    generation = (
+        CatalogGeneration.objects
+        .filter(key=key)
+        .values_list(
+            "generation",
+            flat=True
+        )
+        .first()
+    )
+
+    return generation or 0
+
+
+# =========================================
+# Bump
+# =========================================
+def bump_catalog_generation(
+    key=PC_CATALOG,
+):
+
+    updated = (
+        CatalogGeneration.objects
+        .filter(key=key)
+        .update(
+            generation=F("generation") + 1,
+            updated_at=timezone.now(),
+        )
+    )
+
+    if not updated:
+
+        CatalogGeneration.objects.get_or_create(
+            key=key,
+            defaults={
+                "generation": 1,
+            },
+        )
+
+    return get_catalog_generation(key)
+
+
+# =========================================
+# Deferred Bump
+# =========================================
+def schedule_catalog_generation_bump(
+    key=PC_CATALOG,
+):
+    """
+    transaction commit 時に 1 回だけ bump する。
+
+    import の atomic ブロック内で大量の save が走っても
+    世代は commit ごとに 1 つしか進まない。
+    autocommit 中は即時 bump される。
+    """
+
+    connection = transaction.get_connection()
+
+    if not connection.in_atomic_block:
+
+        bump_catalog_generation(key)
+
+        return
+
+    # -------------------------------------
+    # already scheduled in this transaction
+    # rollback 時は Django 側で破棄される
+    # -------------------------------------
+    for _, callback, _ in connection.run_on_commit:
+
+        if getattr(
+            callback,
+            "catalog_generation_key",
+            None
+        ) == key:
+
+            return
+
+    callback = partial(
+        bump_catalog_generation,
+        key,
+    )
+
+    callback.catalog_generation_key = key
+
+    transaction.on_commit(callback)
@@ -0,0 +1,346 @@
+import hashlib
+import json
+import threading
+import time
+
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from api.utils.catalog_generation import (
+    get_catalog_generation,
+)
+
+# =========================================
+# Default Config
+# settings.FINDER_CACHE で上書き可能
+# =========================================
+FINDER_CACHE_DEFAULTS = {
+
+    # local / django
+    "BACKEND": "local",
+
+    "MAX_ENTRIES": 256,
+
+    # seconds
+    "TIMEOUT": 300,
+
+    # django backend 用 cache alias
+    "ALIAS": "default",
+
+    "KEY_PREFIX": "finder",
+}
+
+_MISSING = object()
+
+
+# =========================================
+# Local Backend (LRU + TTL)
+# =========================================
+class LocalLRUBackend:
+
+    name = "local"
+
+    def __init__(
+        self,
+        max_entries,
+        timeout,
+    ):
+
+        self.max_entries = max_entries
+
+        self.timeout = timeout
+
+        self.entries = OrderedDict()
+
+        self.evictions = 0
+
+        self.lock = threading.Lock()
+
+    def get(
+        self,
+        key,
+    ):
+
+        with self.lock:
+
+            entry = self.entries.get(key)
+
+            if entry is None:
+
+                return _MISSING
+
+            expires_at, value = entry
+
+            # -----------------------------
+            # TTL expired
+            # -----------------------------
+            if expires_at < time.monotonic():
+
+                del self.entries[key]
+
+                self.evictions += 1
+
+                return _MISSING
+
+            self.entries.move_to_end(key)
+
+            return value
+
+    def set(
+        self,
+        key,
+        value,
+    ):
+
+        with self.lock:
+
+            self.entries[key] = (
+                time.monotonic() + self.timeout,
+                value,
+            )
+
+            self.entries.move_to_end(key)
+
+            # -----------------------------
+            # LRU overflow
+            # -----------------------------
+            while len(self.entries) > self.max_entries:
+
+                self.entries.popitem(
+                    last=False
+                )
+
+                self.evictions += 1
+
+    def clear(self):
+
+        with self.lock:
+
+            self.entries.clear()
+
+    def size(self):
+
+        return len(self.entries)
+
+
+# =========================================
+# Django Cache Backend (shared)
+# =========================================
+class DjangoCacheBackend:
+
+    name = "django"
+
+    def __init__(
+        self,
+        alias,
+        timeout,
+    ):
+
+        self.alias = alias
+
+        self.timeout = timeout
+
+        # eviction は cache server 側で管理
+        self.evictions = 0
+
+    @property
+    def cache(self):
+
+        return caches[self.alias]
+
+    def get(
+        self,
+        key,
+    ):
+
+        return self.cache.get(
+            key,
+            _MISSING
+        )
+
+    def set(
+        self,
+        key,
+        value,
+    ):
+
+        self.cache.set(
+            key,
+            value,
+            timeout=self.timeout,
+        )
+
+    def clear(self):
+
+        # 世代キーで自然失効させる
+        pass
+
+    def size(self):
+
+        return None
+
+
+# =========================================
+# Finder Result Cache
+# =========================================
+class FinderResultCache:
+    """
+    finder 結果キャッシュ。
+
+    キーにカタログ世代を含めるため、
+    import / runtime 再コンパイル後は
+    古い ranking を返さない。
+    """
+
+    def __init__(
+        self,
+        backend,
+        key_prefix="finder",
+    ):
+
+        self.backend = backend
+
+        self.key_prefix = key_prefix
+
+        self.hits = 0
+
+        self.misses = 0
+
+        self.lock = threading.Lock()
+
+    def build_key(
+        self,
+        request_data,
+        limit,
+        generation,
+    ):
+
+        payload = json.dumps(
+            {
+                "request": request_data,
+                "limit": limit,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+
+        digest = hashlib.sha1(
+            payload.encode("utf-8")
+        ).hexdigest()
+
+        return (
+            f"{self.key_prefix}:"
+            f"{generation}:"
+            f"{digest}"
+        )
+
+    def get(
+        self,
+        request_data,
+        limit,
+    ):
+
+        generation = get_catalog_generation()
+
+        key = self.build_key(
+            request_data,
+            limit,
+            generation,
+        )
+
+        value = self.backend.get(key)
+
+        with self.lock:
+
+            if value is _MISSING:
+
+                self.misses += 1
+
+            else:
+
+                self.hits += 1
+
+        return key, (
+            None
+            if value is _MISSING
+            else value
+        )
+
+    def set(
+        self,
+        key,
+        value,
+    ):
+
+        self.backend.set(
+            key,
+            value,
+        )
+
+    def clear(self):
+
+        self.backend.clear()
+
+    def stats(self):
+
+        total = self.hits + self.misses
+
+        return {
+
+            "backend": self.backend.name,
+
+            "hits": self.hits,
+
+            "misses": self.misses,
+
+            "evictions": self.backend.evictions,
+
+            "hit_ratio": (
+                round(self.hits / total, 4)
+                if total
+                else 0.0
+            ),
+
+            "size": self.backend.size(),
+
+            "generation": get_catalog_generation(),
+        }
+
+
+# =========================================
+# Factory
+# =========================================
+def build_finder_cache():
+
+    config = {
+
+        **FINDER_CACHE_DEFAULTS,
+
+        **getattr(
+            settings,
+            "FINDER_CACHE",
+            {}
+        ),
+    }
+
+    if config["BACKEND"] == "django":
+
+        backend = DjangoCacheBackend(
+            alias=config["ALIAS"],
+            timeout=config["TIMEOUT"],
+        )
+
+    else:
+
+        backend = LocalLRUBackend(
+            max_entries=config["MAX_ENTRIES"],
+            timeout=config["TIMEOUT"],
+        )
+
+    return FinderResultCache(
+        backend,
+        key_prefix=config["KEY_PREFIX"],
+    )
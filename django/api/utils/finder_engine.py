@@ -1,9 +1,21 @@
+import numpy as np
+
 from api.models import PCProduct
+from api.utils.finder_cache import (
+    build_finder_cache,
+)
+from api.utils.finder_index import (
+    FLAG_CREATOR,
+    FLAG_GAMING,
+    FLAG_SERVER,
+    get_finder_index,
+)
 
 # =========================================
 # Semantic Cache
+# LRU + TTL / catalog generation versioned
 # =========================================
-SEMANTIC_FINDER_CACHE = {}
+SEMANTIC_FINDER_CACHE = build_finder_cache()
 
 # =========================================
 # Semantic Presets
@@ -699,156 +711,219 @@ def find_semantic_products(
     limit=10,
 ):
 
-    import json
-
-    cache_key = json.dumps(
+    cache_key, cached = SEMANTIC_FINDER_CACHE.get(
         request_data,
-        sort_keys=True,
-        ensure_ascii=False,
+        limit,
     )
 
     # =====================================
     # cache hit
     # =====================================
-    if cache_key in SEMANTIC_FINDER_CACHE:
-
-        return SEMANTIC_FINDER_CACHE[
-            cache_key
-        ]
+    if cached is not None:
 
-    products = (
-        PCProduct.objects
-        .filter(is_active=True)
-    )
+        return cached
 
-    ranked = []
+    index = get_finder_index()
 
-    for product in products:
+    usage_weights = (
+        normalize_usage_weights(
+            request_data
+        )
+    )
 
-        # -----------------------------
-        # semantic filter
-        # -----------------------------
-        if not passes_semantic_filter(
-            product,
-            request_data,
-        ):
-            continue
+    creator_weight = usage_weights.get(
+        "usage-creator",
+        0
+    )
 
-        # -----------------------------
-        # score
-        # -----------------------------
-        score = calculate_semantic_score(
-            product,
-            request_data,
-        )
+    gaming_weight = usage_weights.get(
+        "usage-gaming",
+        0
+    )
 
-        # =====================================
-        # budget penalty
-        # =====================================
-        budget_max = request_data.get(
-            "budget_max"
+    # =====================================
+    # semantic filter (vectorized)
+    # =====================================
+    mask = ~index.exclude_mask(
+        request_data.get(
+            "exclude_keywords",
+            []
         )
+    )
 
-        if budget_max:
+    if creator_weight > 0:
 
-            try:
+        mask &= index.memory_gb >= 16
 
-                budget_max = int(
-                    budget_max
-                )
+        mask &= index.score_cpu >= 40
 
-                product_price = (
-                    product.price or 0
-                )
+    # =====================================
+    # score (vectorized)
+    # =====================================
+    scores = np.zeros(
+        index.size,
+        dtype=np.float64,
+    )
 
-                # -------------------------
-                # over budget
-                # -------------------------
-                if product_price > budget_max:
+    if creator_weight > 0:
 
-                    over_ratio = (
-                        product_price / budget_max
-                    )
+        creator_config = (
+            SEMANTIC_WEIGHT_CONFIG[
+                "creator"
+            ]
+        )
 
-                    # -------------------------
-                    # soft penalty
-                    # -------------------------
-                    score /= over_ratio
+        scores += (
+            index.score_cpu
+            * creator_config["cpu"]
+        ) * creator_weight
 
-            except Exception:
+        scores += (
+            np.minimum(
+                index.memory_gb,
+                64
+            )
+            * creator_config["memory"]
+        ) * creator_weight
 
-                pass
+        scores += (
+            index.score_gpu
+            * creator_config["gpu"]
+        ) * creator_weight
 
-        # -----------------------------
-        # confidence
-        # -----------------------------
-        confidence = (
-            calculate_semantic_confidence(
-                score
-            )
+        scores = np.where(
+            index.has_flag(FLAG_SERVER),
+            scores * 0.2,
+            scores,
         )
 
-        # -----------------------------
-        # explanations
-        # -----------------------------
-        reasons = build_semantic_explanations(
-            product,
-            request_data,
+        scores += np.where(
+            index.has_flag(FLAG_CREATOR),
+            creator_config[
+                "creator_bonus"
+            ] * creator_weight,
+            0,
         )
 
-        # -----------------------------
-        # breakdown
-        # -----------------------------
-        breakdown = build_semantic_breakdown(
-            product,
-            request_data,
+    if gaming_weight > 0:
+
+        gaming_config = (
+            SEMANTIC_WEIGHT_CONFIG[
+                "gaming"
+            ]
         )
 
-        ranked.append({
+        scores += (
+            index.score_gpu
+            * gaming_config["gpu"]
+        ) * gaming_weight
 
-            "product": product,
+        scores += (
+            index.score_cpu
+            * gaming_config["cpu"]
+        ) * gaming_weight
 
-            "score": round(score, 2),
+        scores += np.where(
+            index.has_flag(FLAG_GAMING),
+            gaming_config[
+                "gaming_bonus"
+            ] * gaming_weight,
+            0,
+        )
 
-            "confidence": confidence,
+    # -------------------------------------
+    # freshness bonus
+    # -------------------------------------
+    from django.utils import timezone
+
+    days_old = np.floor(
+        (
+            timezone.now().timestamp()
+            - index.updated_ts
+        ) / 86400
+    )
 
-            "reasons": reasons,
+    scores += np.select(
+        [
+            days_old <= 7,
+            days_old <= 30,
+            days_old <= 90,
+        ],
+        [8, 5, 2],
+        default=0,
+    )
 
-            "breakdown": breakdown,
-        })
+    scores = np.round(scores, 2)
 
     # =====================================
-    # semantic ranking
+    # budget penalty
     # =====================================
-    ranked.sort(
+    budget_max = request_data.get(
+        "budget_max"
+    )
+
+    if budget_max:
+
+        try:
 
-        key=lambda x: (
+            budget_max = int(
+                budget_max
+            )
+
+        except Exception:
+
+            budget_max = 0
 
-            x["score"],
+        if budget_max:
 
-            x["confidence"]
-        ),
+            scores = np.where(
+                index.price > budget_max,
+                scores / (
+                    index.price / budget_max
+                ),
+                scores,
+            )
 
-        reverse=True
+    # =====================================
+    # confidence (vectorized)
+    # =====================================
+    confidences = np.select(
+        [
+            scores >= 80,
+            scores >= 60,
+            scores >= 40,
+        ],
+        [0.95, 0.85, 0.70],
+        default=0.50,
     )
 
+    # =====================================
+    # semantic ranking
+    # 同点時は index の行順 (-updated_at) を維持
+    # =====================================
+    candidates = np.flatnonzero(mask)
+
+    order = np.lexsort((
+        candidates,
+        -confidences[candidates],
+        -np.round(scores[candidates], 2),
+    ))
+
     # =====================================
     # semantic diversity
     # =====================================
     maker_counts = {}
 
-    final_results = []
-
-    for item in ranked:
+    selected = []
 
-        product = item["product"]
+    for position in candidates[order]:
 
-        maker = (
-            product.maker or "unknown"
-        )
+        maker_code = index.maker_codes[
+            position
+        ]
 
         current_count = maker_counts.get(
-            maker,
+            maker_code,
             0
         )
 
@@ -858,24 +933,64 @@ def find_semantic_products(
         if current_count >= 2:
             continue
 
-        final_results.append(item)
+        selected.append(position)
 
-        maker_counts[maker] = (
+        maker_counts[maker_code] = (
             current_count + 1
         )
 
         # -----------------------------
         # limit reached
         # -----------------------------
-        if len(final_results) >= limit:
+        if len(selected) >= limit:
             break
 
-    usage_weights = (
-        normalize_usage_weights(
-            request_data
-        )
+    # =====================================
+    # top-k hydrate
+    # explanations / breakdown は最終結果のみ
+    # =====================================
+    product_map = PCProduct.objects.in_bulk(
+        [
+            int(index.ids[position])
+            for position in selected
+        ]
     )
 
+    final_results = []
+
+    for position in selected:
+
+        product = product_map.get(
+            int(index.ids[position])
+        )
+
+        if product is None:
+            continue
+
+        final_results.append({
+
+            "product": product,
+
+            "score": round(
+                float(scores[position]),
+                2
+            ),
+
+            "confidence": float(
+                confidences[position]
+            ),
+
+            "reasons": build_semantic_explanations(
+                product,
+                request_data,
+            ),
+
+            "breakdown": build_semantic_breakdown(
+                product,
+                request_data,
+            ),
+        })
+
     # =====================================
     # fallback
     # =====================================
@@ -914,7 +1029,7 @@ def find_semantic_products(
 
         "meta": {
 
-            "total_products": products.count(),
+            "total_products": index.size,
 
             "returned_results": len(
                 final_results
@@ -935,8 +1050,9 @@ def find_semantic_products(
     # =====================================
     # cache save
     # =====================================
-    SEMANTIC_FINDER_CACHE[
-        cache_key
-    ] = response_payload
+    SEMANTIC_FINDER_CACHE.set(
+        cache_key,
+        response_payload,
+    )
 
     return response_payload
\ No newline at end of file
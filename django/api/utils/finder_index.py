@@ -0,0 +1,524 @@
+import threading
+
+import numpy as np
+
+from django.db.models import Count, Max, Q
+
+from api.models import PCProduct
+from api.utils.catalog_generation import (
+    get_catalog_generation,
+)
+
+# =========================================
+# Keyword Flags
+# =========================================
+SERVER_KEYWORDS = [
+
+    "poweredge",
+
+    "server",
+
+    "xeon",
+]
+
+CREATOR_KEYWORDS = [
+
+    "proart",
+
+    "creator",
+
+    "daiv",
+
+    "studio",
+]
+
+GAMING_KEYWORDS = [
+
+    "omen",
+
+    "alienware",
+
+    "rog",
+
+    "gaming",
+]
+
+FLAG_SERVER = 1
+
+FLAG_CREATOR = 2
+
+FLAG_GAMING = 4
+
+# =========================================
+# Index Columns
+# =========================================
+INDEX_FIELDS = [
+
+    "id",
+
+    "name",
+
+    "maker",
+
+    "price",
+
+    "score_cpu",
+
+    "score_gpu",
+
+    "memory_gb",
+
+    "updated_at",
+]
+
+
+# =========================================
+# Name Flags
+# =========================================
+def build_name_flags(
+    name,
+):
+
+    product_name = (
+        name or ""
+    ).lower()
+
+    flags = 0
+
+    if any(
+        kw in product_name
+        for kw in SERVER_KEYWORDS
+    ):
+
+        flags |= FLAG_SERVER
+
+    if any(
+        kw in product_name
+        for kw in CREATOR_KEYWORDS
+    ):
+
+        flags |= FLAG_CREATOR
+
+    if any(
+        kw in product_name
+        for kw in GAMING_KEYWORDS
+    ):
+
+        flags |= FLAG_GAMING
+
+    return flags
+
+
+# =========================================
+# Finder Scoring Index
+# =========================================
+class FinderScoringIndex:
+    """
+    active PCProduct の finder 用カラムを
+    NumPy 配列として保持する。
+
+    行順は queryset の既定順 (-updated_at) に揃え、
+    同点時の並びを従来の ORM ループと一致させる。
+    """
+
+    def __init__(self):
+
+        self.rows = {}
+
+        self.generation = None
+
+        self._pack()
+
+    # =====================================
+    # row
+    # =====================================
+    @staticmethod
+    def build_row(
+        values,
+    ):
+
+        updated_at = values["updated_at"]
+
+        return {
+
+            "id": values["id"],
+
+            "name": (
+                values["name"] or ""
+            ).lower(),
+
+            "maker": (
+                values["maker"] or "unknown"
+            ),
+
+            "price": (
+                values["price"] or 0
+            ),
+
+            "score_cpu": (
+                values["score_cpu"] or 0
+            ),
+
+            "score_gpu": (
+                values["score_gpu"] or 0
+            ),
+
+            "memory_gb": (
+                values["memory_gb"] or 0
+            ),
+
+            "updated_ts": (
+                updated_at.timestamp()
+                if updated_at
+                else np.nan
+            ),
+
+            "flags": build_name_flags(
+                values["name"]
+            ),
+        }
+
+    # =====================================
+    # copy
+    # =====================================
+    def copy(self):
+
+        index = FinderScoringIndex()
+
+        index.rows = dict(self.rows)
+
+        index.generation = self.generation
+
+        return index
+
+    # =====================================
+    # full build
+    # =====================================
+    def rebuild(self):
+
+        queryset = (
+            PCProduct.objects
+            .filter(is_active=True)
+            .values(*INDEX_FIELDS)
+        )
+
+        self.rows = {
+
+            values["id"]: self.build_row(
+                values
+            )
+
+            for values in queryset.iterator(
+                chunk_size=2000
+            )
+        }
+
+        self._pack()
+
+    # =====================================
+    # incremental refresh
+    # =====================================
+    def refresh(
+        self,
+        since,
+    ):
+        """
+        since 以降に更新された行だけを再取得し、
+        配列を組み直す。
+        """
+
+        queryset = (
+            PCProduct.objects
+            .filter(updated_at__gte=since)
+            .values(
+                "is_active",
+                *INDEX_FIELDS
+            )
+        )
+
+        for values in queryset.iterator(
+            chunk_size=2000
+        ):
+
+            if values["is_active"]:
+
+                self.rows[
+                    values["id"]
+                ] = self.build_row(values)
+
+            else:
+
+                self.rows.pop(
+                    values["id"],
+                    None
+                )
+
+        self._pack()
+
+    # =====================================
+    # columnar pack
+    # =====================================
+    def _pack(self):
+
+        rows = sorted(
+
+            self.rows.values(),
+
+            key=lambda r: (
+                np.nan_to_num(
+                    r["updated_ts"],
+                    nan=-np.inf,
+                )
+            ),
+
+            reverse=True,
+        )
+
+        self.size = len(rows)
+
+        self.ids = np.array(
+            [r["id"] for r in rows],
+            dtype=np.int64,
+        )
+
+        self.names = [
+            r["name"] for r in rows
+        ]
+
+        self.makers = [
+            r["maker"] for r in rows
+        ]
+
+        maker_lookup = {}
+
+        self.maker_codes = np.array(
+            [
+                maker_lookup.setdefault(
+                    maker,
+                    len(maker_lookup)
+                )
+                for maker in self.makers
+            ],
+            dtype=np.int32,
+        )
+
+        self.price = np.array(
+            [r["price"] for r in rows],
+            dtype=np.float64,
+        )
+
+        self.score_cpu = np.array(
+            [r["score_cpu"] for r in rows],
+            dtype=np.float64,
+        )
+
+        self.score_gpu = np.array(
+            [r["score_gpu"] for r in rows],
+            dtype=np.float64,
+        )
+
+        self.memory_gb = np.array(
+            [r["memory_gb"] for r in rows],
+            dtype=np.float64,
+        )
+
+        self.updated_ts = np.array(
+            [r["updated_ts"] for r in rows],
+            dtype=np.float64,
+        )
+
+        self.flags = np.array(
+            [r["flags"] for r in rows],
+            dtype=np.uint8,
+        )
+
+    # =====================================
+    # keyword flag mask
+    # =====================================
+    def has_flag(
+        self,
+        flag,
+    ):
+
+        return (
+            self.flags & flag
+        ) != 0
+
+    # =====================================
+    # exclude keyword mask
+    # =====================================
+    def exclude_mask(
+        self,
+        keywords,
+    ):
+
+        keywords = [
+            str(keyword).lower()
+            for keyword in keywords
+        ]
+
+        if not keywords:
+
+            return np.zeros(
+                self.size,
+                dtype=bool,
+            )
+
+        return np.array(
+            [
+                any(
+                    keyword in name
+                    for keyword in keywords
+                )
+                for name in self.names
+            ],
+            dtype=bool,
+        )
+
+
+# =========================================
+# Index Registry
+# =========================================
+_INDEX_LOCK = threading.Lock()
+
+_INDEX = None
+
+
+def catalog_signature():
+    """
+    COUNT / MAX の全件集計。
+    catalog generation が進んだときだけ呼ぶ (リクエストごとには走らせない)
+    """
+
+    signature = (
+        PCProduct.objects
+        .aggregate(
+            latest=Max("updated_at"),
+            total=Count("id"),
+            active=Count(
+                "id",
+                filter=Q(is_active=True),
+            ),
+        )
+    )
+
+    signature["generation"] = (
+        get_catalog_generation()
+    )
+
+    return signature
+
+
+def is_index_current(
+
+    index,
+
+    generation,
+):
+
+    return (
+        index.generation is not None
+        and index.generation.get("generation") == generation
+    )
+
+
+def get_finder_index():
+    """
+    プロセス内 finder index を返す。
+
+    catalog generation (save / delete の signal と bulk 経路で bump) が
+    前回と同じなら集計せずにそのまま返す。
+
+    世代が進んでいたら catalog_signature を取り、
+    updated_at の最新値が進んでいれば差分だけを取り込み、
+    差分適用後も active 件数が合わない (削除など) 場合や
+    updated_at を伴わずに世代だけ進んだ場合は全件再構築する。
+    """
+
+    global _INDEX
+
+    generation = get_catalog_generation()
+
+    index = _INDEX
+
+    if index is not None and is_index_current(
+        index,
+        generation,
+    ):
+
+        return index
+
+    with _INDEX_LOCK:
+
+        index = _INDEX
+
+        # 待っている間に他スレッドが更新済み
+        if index is not None and is_index_current(
+            index,
+            generation,
+        ):
+
+            return index
+
+        signature = catalog_signature()
+
+        if index is None:
+
+            index = FinderScoringIndex()
+
+            index.rebuild()
+
+            index.generation = signature
+
+            _INDEX = index
+
+            return index
+
+        if index.generation == signature:
+
+            return index
+
+        previous = index.generation or {}
+
+        # ---------------------------------
+        # copy-on-write
+        # 参照中のリクエストには旧配列を残す
+        # ---------------------------------
+        index = index.copy()
+
+        if previous.get("latest"):
+
+            index.refresh(
+                previous["latest"]
+            )
+
+        # ---------------------------------
+        # updated_at を伴わない更新
+        # (bulk_update / update_fields)
+        # ---------------------------------
+        bypassed_updated_at = (
+            previous.get("latest") == signature["latest"]
+            and previous.get("generation") != signature["generation"]
+        )
+
+        if (
+            bypassed_updated_at
+            or index.size != signature["active"]
+        ):
+
+            index.rebuild()
+
+        index.generation = signature
+
+        _INDEX = index
+
+        return index
+
+
+def invalidate_finder_index():
+
+    global _INDEX
+
+    with _INDEX_LOCK:
+
+        _INDEX = None
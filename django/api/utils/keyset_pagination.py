@@ -0,0 +1,612 @@
+# -*- coding: utf-8 -*-
+# api/utils/keyset_pagination.py
+
+"""
+Keyset (cursor) pagination
+
+queryset.order_by(...) の並びキー + id
+↓
+最後の行のキー値を cursor (base64 JSON) にして返す
+↓
+次ページは (key1, key2, ..., id) > cursor を WHERE で絞る (OFFSET なし)
+
+cursor のキー値は並びの field 型に変換してから WHERE に渡す
+(変換できない値は InvalidCursor、並びが変わった cursor は StaleCursor)
+
+深いページでも index を辿るだけで、前のページ分の行を読み捨てない。
+件数は catalog generation ごとに cache し、要求されたときだけ数える
+"""
+
+import base64
+import hashlib
+import json
+
+from datetime import (
+    date,
+    datetime,
+)
+
+from django.core.exceptions import (
+    FieldDoesNotExist,
+    ValidationError,
+)
+from django.db.models import Q
+from django.utils.dateparse import (
+    parse_date,
+    parse_datetime,
+)
+
+from api.utils.catalog_generation import (
+    get_catalog_generation,
+)
+
+from api.utils.finder_cache import (
+    LocalLRUBackend,
+)
+
+
+# =========================================================
+# CONSTANTS
+# =========================================================
+
+CURSOR_VERSION = 1
+
+# 並びが一意になるよう最後に足す
+TIEBREAK_FIELD = "id"
+
+COUNT_CACHE_MAX_ENTRIES = 512
+
+# seconds (generation が進めば TTL 前でも別キー)
+COUNT_CACHE_TIMEOUT = 600
+
+
+# cursor のキー値として受け付ける JSON 値 (dict は日付のみ)
+SCALAR_TYPES = (
+    str,
+    int,
+    float,
+    bool,
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class StaleCursor(InvalidCursor):
+
+    """
+    並び (sort) / version が変わった古い cursor (1 ページ目から出し直せる)
+    """
+
+
+# cursor ページの取得で 400 として返すもの
+# (StaleCursor は先に拾って 1 ページ目から出し直す)
+CURSOR_ERRORS = (
+    InvalidCursor,
+    TypeError,
+    ValueError,
+    ValidationError,
+)
+
+
+# =========================================================
+# ORDERING
+# =========================================================
+
+def keyset_ordering(queryset):
+
+    """
+    return: [(field, descending), ...] (末尾は必ず id)
+    related field / 式での並びは keyset にできないので None
+    """
+
+    ordering = []
+
+    for item in (
+        queryset.query.order_by
+        or queryset.model._meta.ordering
+    ):
+
+        if not isinstance(item, str):
+            return None
+
+        descending = item.startswith("-")
+
+        field = item.lstrip("-")
+
+        if field == "pk":
+            field = TIEBREAK_FIELD
+
+        if "__" in field or field == "?":
+            return None
+
+        ordering.append(
+            (field, descending)
+        )
+
+    if not any(
+        field == TIEBREAK_FIELD
+        for field, _ in ordering
+    ):
+
+        ordering.append(
+            (
+                TIEBREAK_FIELD,
+                ordering[-1][1] if ordering else False,
+            )
+        )
+
+    return ordering
+
+
+def ordering_signature(ordering):
+
+    return [
+
+        f"-{field}" if descending else field
+
+        for field, descending in ordering
+    ]
+
+
+# =========================================================
+# CURSOR
+# =========================================================
+
+def encode_value(value):
+
+    if isinstance(value, datetime):
+
+        return {"dt": value.isoformat()}
+
+    if isinstance(value, date):
+
+        return {"d": value.isoformat()}
+
+    return value
+
+
+def decode_value(value):
+
+    if isinstance(value, dict):
+
+        try:
+
+            if "dt" in value:
+                decoded = parse_datetime(value["dt"])
+
+            elif "d" in value:
+                decoded = parse_date(value["d"])
+
+            else:
+                decoded = None
+
+        except (TypeError, ValueError):
+
+            decoded = None
+
+        if decoded is None:
+
+            raise InvalidCursor("unknown cursor value")
+
+        return decoded
+
+    if value is not None and not isinstance(value, SCALAR_TYPES):
+
+        raise InvalidCursor("cursor value is not a scalar")
+
+    return value
+
+
+def coerce_value(
+
+    queryset,
+
+    field,
+
+    value,
+):
+
+    """
+    cursor のキー値を並び field の型に揃える (ORM に渡す前に検証)
+    """
+
+    if queryset is None:
+
+        return value
+
+    try:
+
+        model_field = queryset.model._meta.get_field(
+            field
+        )
+
+    except FieldDoesNotExist:
+
+        # annotation (search_rank 等) は数値のみ
+        if (
+            isinstance(value, bool)
+            or not isinstance(value, (int, float))
+        ):
+
+            raise InvalidCursor(f"invalid cursor value for {field}")
+
+        return value
+
+    if value is None:
+
+        if not model_field.null:
+
+            raise InvalidCursor(f"invalid cursor value for {field}")
+
+        return None
+
+    try:
+
+        return model_field.to_python(
+            value
+        )
+
+    except (TypeError, ValueError, ValidationError):
+
+        raise InvalidCursor(f"invalid cursor value for {field}")
+
+
+def encode_cursor(
+
+    ordering,
+
+    values,
+):
+
+    payload = json.dumps(
+
+        {
+            "v": CURSOR_VERSION,
+
+            "o": ordering_signature(ordering),
+
+            "k": [
+                encode_value(value)
+                for value in values
+            ],
+        },
+
+        separators=(",", ":"),
+
+        ensure_ascii=False,
+    )
+
+    return base64.urlsafe_b64encode(
+        payload.encode("utf-8")
+    ).decode("ascii").rstrip("=")
+
+
+def decode_cursor(
+
+    token,
+
+    ordering,
+
+    queryset=None,
+):
+
+    """
+    並び (sort) が変わった cursor は StaleCursor
+    壊れた / 型の合わない cursor は InvalidCursor
+    """
+
+    try:
+
+        padded = token + "=" * (-len(token) % 4)
+
+        payload = json.loads(
+            base64.urlsafe_b64decode(
+                padded.encode("ascii")
+            ).decode("utf-8")
+        )
+
+    except Exception:
+
+        raise InvalidCursor("malformed cursor")
+
+    if not isinstance(payload, dict):
+
+        raise InvalidCursor("malformed cursor")
+
+    if (
+        payload.get("v") != CURSOR_VERSION
+        or payload.get("o") != ordering_signature(ordering)
+    ):
+
+        raise StaleCursor("cursor does not match ordering")
+
+    values = payload.get("k")
+
+    if (
+        not isinstance(values, list)
+        or len(values) != len(ordering)
+    ):
+
+        raise InvalidCursor("cursor does not match ordering")
+
+    return [
+
+        coerce_value(
+            queryset,
+            field,
+            decode_value(value),
+        )
+
+        for (field, _), value in zip(ordering, values)
+    ]
+
+
+# =========================================================
+# FILTER
+# =========================================================
+
+def field_nullable(
+
+    queryset,
+
+    field,
+):
+
+    # annotation (search_rank 等) は NULL にならない前提
+    try:
+
+        return queryset.model._meta.get_field(
+            field
+        ).null
+
+    except Exception:
+
+        return False
+
+
+def after_condition(
+
+    field,
+
+    descending,
+
+    value,
+
+    nullable=False,
+):
+
+    """
+    (field) が value より後ろ (PostgreSQL: ASC は NULLS LAST / DESC は NULLS FIRST)
+    """
+
+    if value is None:
+
+        if descending:
+
+            return Q(**{f"{field}__isnull": False})
+
+        return None
+
+    lookup = "lt" if descending else "gt"
+
+    condition = Q(**{f"{field}__{lookup}": value})
+
+    if nullable and not descending:
+
+        condition |= Q(**{f"{field}__isnull": True})
+
+    return condition
+
+
+def equal_condition(
+
+    field,
+
+    value,
+):
+
+    if value is None:
+
+        return Q(**{f"{field}__isnull": True})
+
+    return Q(**{field: value})
+
+
+def keyset_filter(
+
+    queryset,
+
+    ordering,
+
+    values,
+):
+
+    """
+    (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+    """
+
+    condition = None
+
+    prefix = Q()
+
+    for (field, descending), value in zip(ordering, values):
+
+        after = after_condition(
+
+            field,
+
+            descending,
+
+            value,
+
+            nullable=field_nullable(
+                queryset,
+                field,
+            ),
+        )
+
+        if after is not None:
+
+            branch = prefix & after
+
+            condition = (
+                branch
+                if condition is None
+                else condition | branch
+            )
+
+        prefix &= equal_condition(
+            field,
+            value,
+        )
+
+    if condition is None:
+
+        return queryset.none()
+
+    return queryset.filter(
+        condition
+    )
+
+
+# =========================================================
+# PAGE
+# =========================================================
+
+def paginate_keyset(
+
+    queryset,
+
+    page_size,
+
+    cursor=None,
+):
+
+    """
+    return: {
+        "rows": [...],
+        "next_cursor": str / None,
+        "has_next": bool,
+    }
+
+    keyset にできない並びは ValueError
+    古い cursor は StaleCursor、不正な cursor は InvalidCursor
+    """
+
+    ordering = keyset_ordering(
+        queryset
+    )
+
+    if ordering is None:
+
+        raise ValueError("ordering is not keyset-compatible")
+
+    queryset = queryset.order_by(
+        *ordering_signature(ordering)
+    )
+
+    if cursor:
+
+        queryset = keyset_filter(
+
+            queryset,
+
+            ordering,
+
+            decode_cursor(
+                cursor,
+                ordering,
+                queryset=queryset,
+            ),
+        )
+
+    rows = list(
+        queryset[:page_size + 1]
+    )
+
+    has_next = len(rows) > page_size
+
+    rows = rows[:page_size]
+
+    next_cursor = None
+
+    if has_next and rows:
+
+        last = rows[-1]
+
+        next_cursor = encode_cursor(
+
+            ordering,
+
+            [
+                getattr(last, field)
+                for field, _ in ordering
+            ],
+        )
+
+    return {
+
+        "rows":
+            rows,
+
+        "next_cursor":
+            next_cursor,
+
+        "has_next":
+            has_next,
+    }
+
+
+# =========================================================
+# COUNT
+# =========================================================
+
+_COUNT_CACHE = LocalLRUBackend(
+
+    max_entries=COUNT_CACHE_MAX_ENTRIES,
+
+    timeout=COUNT_CACHE_TIMEOUT,
+)
+
+
+def cached_count(queryset):
+
+    """
+    COUNT(*) を (catalog generation, SQL) ごとに 1 回だけ数える
+    """
+
+    try:
+
+        sql = str(
+            queryset.order_by().query
+        )
+
+    except Exception:
+
+        return queryset.count()
+
+    key = (
+
+        f"{get_catalog_generation()}:"
+
+        + hashlib.sha1(
+            sql.encode("utf-8")
+        ).hexdigest()
+    )
+
+    count = _COUNT_CACHE.get(
+        key
+    )
+
+    if not isinstance(count, int):
+
+        count = queryset.count()
+
+        _COUNT_CACHE.set(
+            key,
+            count,
+        )
+
+    return count
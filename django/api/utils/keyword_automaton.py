@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# api/utils/keyword_automaton.py
+
+"""
+Keyword Automaton
+
+多数の keyword を 1 回だけ compile し、
+text を 1 pass で scan して出現した keyword の payload を返す。
+
+attribute_tagger (属性タグ付け) / intent_matcher (intent 解決) で共用
+"""
+
+from collections import deque
+
+
+# =========================================================
+# AUTOMATON
+# =========================================================
+
+class KeywordAutomaton:
+
+    """
+    Aho-Corasick
+
+    automaton.add(keyword, value)
+    automaton.build()
+    automaton.scan(text) -> 出現した keyword の value (重なりも全部)
+    """
+
+    def __init__(self):
+
+        self.goto = [{}]
+
+        self.fail = [0]
+
+        self.output = [[]]
+
+        self.size = 0
+
+    def add(
+
+        self,
+
+        keyword,
+
+        value,
+    ):
+
+        if not keyword:
+            return
+
+        node = 0
+
+        for char in keyword:
+
+            child = self.goto[node].get(
+                char
+            )
+
+            if child is None:
+
+                child = len(self.goto)
+
+                self.goto[node][char] = child
+
+                self.goto.append({})
+
+                self.fail.append(0)
+
+                self.output.append([])
+
+            node = child
+
+        self.output[node].append(
+            value
+        )
+
+        self.size += 1
+
+    def build(self):
+
+        queue = deque(
+            self.goto[0].values()
+        )
+
+        while queue:
+
+            node = queue.popleft()
+
+            for char, child in self.goto[node].items():
+
+                queue.append(
+                    child
+                )
+
+                fallback = self.fail[node]
+
+                while fallback and char not in self.goto[fallback]:
+
+                    fallback = self.fail[fallback]
+
+                target = self.goto[fallback].get(
+                    char,
+                    0
+                )
+
+                self.fail[child] = (
+                    target
+                    if target != child
+                    else 0
+                )
+
+                self.output[child] = (
+                    self.output[child]
+                    + self.output[self.fail[child]]
+                )
+
+        return self
+
+    def scan(self, text):
+
+        goto = self.goto
+
+        fail = self.fail
+
+        output = self.output
+
+        node = 0
+
+        for char in text:
+
+            while node and char not in goto[node]:
+
+                node = fail[node]
+
+            node = goto[node].get(
+                char,
+                0
+            )
+
+            if output[node]:
+
+                yield from output[node]
@@ -0,0 +1,536 @@
+# -*- coding: utf-8 -*-
+# api/utils/pc_projection.py
+
+"""
+PCProduct field projection
+
+"list"   : inventory 一覧 (spec 列のみ)
+"card"   : ranking / shelf カード (base 列 + card_payload)
+"detail" : 詳細 (raw_html / observation_runtime 等を defer)
+↓
+apply_projection(queryset, name) → .only() / .defer()
+serialize_product(product, name) → payload dict
+
+semantic_runtime / description / ai_content は一覧では読まない。
+カードの semantic 部分は compile 時に card_payload へ焼いておく (models 非依存)
+"""
+
+
+# =========================================================
+# CONSTANTS
+# =========================================================
+
+PROJECTION_LIST = "list"
+
+PROJECTION_CARD = "card"
+
+PROJECTION_DETAIL = "detail"
+
+# 一覧で読むと転送量が跳ねる列
+HEAVY_FIELDS = (
+
+    "raw_html",
+
+    "description",
+
+    "ai_content",
+
+    "semantic_runtime",
+
+    "observation_runtime",
+)
+
+LIST_FIELDS = (
+
+    "id",
+
+    "unique_id",
+
+    "name",
+
+    "maker",
+
+    "brand",
+
+    "series",
+
+    "cpu_model",
+
+    "gpu_model",
+
+    "memory_gb",
+
+    "storage_gb",
+
+    "price",
+
+    "image_url",
+
+    "url",
+
+    "updated_at",
+)
+
+CARD_FIELDS = (
+
+    "id",
+
+    "unique_id",
+
+    "name",
+
+    "image_url",
+
+    "price",
+
+    "maker",
+
+    "url",
+
+    "card_payload",
+)
+
+# detail でも返さない列
+DETAIL_DEFERRED_FIELDS = (
+
+    "raw_html",
+
+    "observation_runtime",
+
+    "search_document",
+)
+
+# {name: (only / defer, fields)}
+PROJECTIONS = {
+
+    PROJECTION_LIST:
+        ("only", LIST_FIELDS),
+
+    PROJECTION_CARD:
+        ("only", CARD_FIELDS),
+
+    PROJECTION_DETAIL:
+        ("defer", DETAIL_DEFERRED_FIELDS),
+}
+
+CARD_LABEL_LIMIT = 3
+
+
+# =========================================================
+# QUERYSET
+# =========================================================
+
+def apply_projection(
+
+    queryset,
+
+    projection,
+):
+
+    mode, fields = PROJECTIONS[projection]
+
+    if mode == "only":
+
+        return queryset.only(
+            *fields
+        )
+
+    return queryset.defer(
+        *fields
+    )
+
+
+# =========================================================
+# CARD RUNTIME
+# =========================================================
+
+def lightweight_runtime(runtime):
+
+    """
+    lightweight semantic payload
+    ranking / shelf / hover preview
+    """
+
+    return {
+
+        "product_type":
+            runtime.get(
+                "product_type"
+            ),
+
+        "semantic_score":
+            runtime.get(
+                "semantic_score",
+                0
+            ),
+
+        "workflow_score":
+            runtime.get(
+                "workflow_score",
+                0
+            ),
+
+        "semantic_labels":
+            runtime.get(
+                "semantic_labels",
+                []
+            )[:3],
+
+        "workflow_tags":
+            runtime.get(
+                "workflow_tags",
+                []
+            )[:3],
+
+        "adaptive_runtime":
+            runtime.get(
+                "adaptive_runtime",
+                {}
+            ),
+    }
+
+
+def frontend_render_hints(runtime):
+
+    """
+    backend-driven frontend UX authority
+    """
+
+    product_type = runtime.get(
+        "product_type",
+        "pc"
+    )
+
+    primary_workflow = runtime.get(
+        "primary_workflow"
+    )
+
+    # ======================================================
+    # Gaming
+    # ======================================================
+
+    if product_type == "gaming_pc":
+
+        return {
+
+            "ui_mode":
+                "immersive",
+
+            "card_style":
+                "gaming",
+
+            "render_priority": [
+
+                "gpu",
+
+                "refresh_rate",
+
+                "workflow",
+            ],
+
+            "animation_hint":
+                "competitive",
+
+            "focus":
+                "gaming",
+        }
+
+    # ======================================================
+    # Creator
+    # ======================================================
+
+    if product_type == "creator_pc":
+
+        return {
+
+            "ui_mode":
+                "workflow",
+
+            "card_style":
+                "creator",
+
+            "render_priority": [
+
+                "memory",
+
+                "storage",
+
+                "workflow",
+            ],
+
+            "animation_hint":
+                "creative",
+
+            "focus":
+                "creator",
+        }
+
+    # ======================================================
+    # AI
+    # ======================================================
+
+    if product_type == "ai_workstation":
+
+        return {
+
+            "ui_mode":
+                "intelligence",
+
+            "card_style":
+                "ai",
+
+            "render_priority": [
+
+                "gpu",
+
+                "memory",
+
+                "workflow",
+            ],
+
+            "animation_hint":
+                "generation",
+
+            "focus":
+                "ai",
+        }
+
+    # ======================================================
+    # Monitor
+    # ======================================================
+
+    if product_type in [
+
+        "immersive_monitor",
+
+        "creator_monitor",
+
+        "monitor",
+    ]:
+
+        return {
+
+            "ui_mode":
+                "cinematic",
+
+            "card_style":
+                "display",
+
+            "render_priority": [
+
+                "display",
+
+                "refresh_rate",
+
+                "workflow",
+            ],
+
+            "animation_hint":
+                "visual",
+
+            "focus":
+                "display",
+        }
+
+    # ======================================================
+    # Mobility
+    # ======================================================
+
+    if product_type == "mobility_pc":
+
+        return {
+
+            "ui_mode":
+                "lightweight",
+
+            "card_style":
+                "portable",
+
+            "render_priority": [
+
+                "mobility",
+
+                "battery",
+
+                "workflow",
+            ],
+
+            "animation_hint":
+                "mobility",
+
+            "focus":
+                "portable",
+        }
+
+    # ======================================================
+    # Fallback
+    # ======================================================
+
+    return {
+
+        "ui_mode":
+            "general",
+
+        "card_style":
+            "default",
+
+        "render_priority": [
+
+            "workflow",
+
+            "semantic",
+        ],
+
+        "animation_hint":
+            "exploration",
+
+        "focus":
+            primary_workflow or "general",
+    }
+
+
+def build_card_payload(runtime):
+
+    """
+    semantic_runtime → カード用の compact JSON (card_payload 列)
+    base 列 (name / price / image_url) は含めない (feed 更新で古くならないように)
+    """
+
+    if not isinstance(runtime, dict):
+
+        runtime = {}
+
+    return {
+
+        "semantic_runtime":
+            lightweight_runtime(
+                runtime
+            ),
+
+        "semantic_labels":
+            runtime.get(
+                "semantic_labels",
+                []
+            )[:CARD_LABEL_LIMIT],
+
+        "render_hints":
+            frontend_render_hints(
+                runtime
+            ),
+    }
+
+
+def product_card_payload(product):
+
+    """
+    card_payload が未生成なら読み込み済みの semantic_runtime から作る
+    (defer されていれば追加 query を出さずに空 runtime 扱い)
+    """
+
+    card = getattr(
+        product,
+        "card_payload",
+        None
+    )
+
+    if card:
+
+        return card
+
+    if "semantic_runtime" in product.get_deferred_fields():
+
+        return build_card_payload({})
+
+    return build_card_payload(
+        product.semantic_runtime
+    )
+
+
+# =========================================================
+# SERIALIZE
+# =========================================================
+
+def serialize_list_product(product):
+
+    return {
+
+        field: getattr(
+            product,
+            field
+        )
+
+        for field in LIST_FIELDS
+
+        if field != "id"
+    }
+
+
+def serialize_card_product(product):
+
+    card = product_card_payload(
+        product
+    )
+
+    return {
+
+        # ==================================================
+        # Product
+        # ==================================================
+        "id":
+            product.id,
+
+        "unique_id":
+            product.unique_id,
+
+        "name":
+            product.name,
+
+        "image_url":
+            product.image_url,
+
+        "price":
+            product.price,
+
+        # ==================================================
+        # Lightweight Runtime (card_payload)
+        # ==================================================
+        "semantic_runtime":
+            card.get(
+                "semantic_runtime",
+                {}
+            ),
+
+        "semantic_labels":
+            card.get(
+                "semantic_labels",
+                []
+            ),
+
+        "render_hints":
+            card.get(
+                "render_hints",
+                {}
+            ),
+    }
+
+
+SERIALIZERS = {
+
+    PROJECTION_LIST:
+        serialize_list_product,
+
+    PROJECTION_CARD:
+        serialize_card_product,
+}
+
+
+def serialize_product(
+
+    product,
+
+    projection,
+):
+
+    return SERIALIZERS[projection](
+        product
+    )
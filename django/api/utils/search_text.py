@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+# api/utils/search_text.py
+
+"""
+Search text normalizer
+
+PCProduct (name / maker / series / cpu_model ...)
+↓
+NFKC + lower + 文字種境界で分割
+↓
+search_document (DB に保持 / pg_trgm index)
+
+「ノートPC」「ﾉｰﾄＰＣ」「ノート pc」が同じ token 列になるようにする。
+model / migration / inventory search から共通で使う (models 非依存)
+"""
+
+import re
+import unicodedata
+
+
+# =========================================================
+# CONSTANTS
+# =========================================================
+
+SEARCH_DOCUMENT_FIELDS = (
+
+    "name",
+
+    "maker",
+
+    "brand",
+
+    "series",
+
+    "model",
+
+    "cpu_model",
+
+    "gpu_model",
+
+    "unified_genre",
+)
+
+NGRAM_SIZE = 2
+
+# 型番 (i7-13700h / rtx4070 / 16.0) は 1 token のまま
+_TOKEN = re.compile(
+    r"[a-z0-9][a-z0-9\-\.\+]*"
+    r"|[ぁ-ゟー]+"
+    r"|[゠-ヿー]+"
+    r"|[一-鿿々]+"
+)
+
+
+# =========================================================
+# NORMALIZE
+# =========================================================
+
+def normalize_search_text(text):
+
+    """
+    return: 空白区切りの token 列 (文字種が変わる所で区切る)
+    """
+
+    if not text:
+        return ""
+
+    text = unicodedata.normalize(
+        "NFKC",
+        str(text)
+    ).lower()
+
+    return " ".join(
+        _TOKEN.findall(text)
+    )
+
+
+def search_tokens(query):
+
+    """
+    query → 重複無しの token list (入力順)
+    """
+
+    tokens = []
+
+    for token in normalize_search_text(query).split():
+
+        token = token.strip("-.+")
+
+        if token and token not in tokens:
+
+            tokens.append(token)
+
+    return tokens
+
+
+def build_search_document(product):
+
+    """
+    product (model instance / dict) → search_document
+    """
+
+    get = (
+        product.get
+        if isinstance(product, dict)
+        else lambda field: getattr(product, field, None)
+    )
+
+    return " ".join(
+
+        normalized
+
+        for normalized in (
+            normalize_search_text(get(field))
+            for field in SEARCH_DOCUMENT_FIELDS
+        )
+
+        if normalized
+    )
+
+
+def text_ngrams(
+
+    text,
+
+    size=NGRAM_SIZE,
+):
+
+    """
+    token ごとの n-gram (token が n 未満ならそのまま)
+    """
+
+    grams = set()
+
+    for token in text.split():
+
+        if len(token) <= size:
+
+            grams.add(token)
+
+            continue
+
+        for start in range(len(token) - size + 1):
+
+            grams.add(
+                token[start:start + size]
+            )
+
+    return grams
@@ -6,6 +6,16 @@
 import re
 
 
+# =========================================================
+# VERSION
+# IMPORTANT:
+# normalization / alias / master TSV の解釈を変えたら上げる
+# (semantic_source_hash が変わり全件 dirty になる)
+# =========================================================
+
+SEMANTIC_NORMALIZER_VERSION = "n1"
+
+
 # =========================================================
 # CLEAN TOKEN
 # =========================================================
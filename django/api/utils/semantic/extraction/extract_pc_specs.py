@@ -20,6 +20,16 @@ from api.utils.semantic.extraction.extract_display import (
 )
 
 
+# =========================================================
+# VERSION
+# IMPORTANT:
+# extract_* の抽出ロジックを変えたら上げる
+# (semantic_source_hash が変わり全件 dirty になる)
+# =========================================================
+
+SEMANTIC_EXTRACTOR_VERSION = "e1"
+
+
 # =========================================================
 # EXTRACT PC SPECS
 # =========================================================
@@ -0,0 +1,329 @@
+# =========================================================
+# FILE:
+# api/utils/semantic/runtime/compile_pool.py
+# =========================================================
+
+"""
+process pool semantic compile
+
+parent: pk + source fields を chunk で worker へ流す
+worker: compile_semantic_runtime + project_runtime (DB 書き込みなし)
+parent: RuntimeBulkWriter で変わった field だけ bulk_update
+"""
+
+import multiprocessing
+import os
+import time
+
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    wait,
+)
+
+from django.db import connections
+
+from api.models import PCProduct
+
+from api.services.semantic.runtime_builder import (
+    SOURCE_HASH_FIELDS,
+)
+
+from api.utils.semantic.runtime.runtime_writer import (
+    RuntimeBulkWriter,
+)
+
+from api.utils.semantic.runtime.compile_worker import (
+    compile_source_chunk,
+    init_compile_worker,
+)
+
+
+# =========================================================
+# SOURCE FIELDS
+# =========================================================
+
+COMPILE_SOURCE_FIELDS = [
+
+    "id",
+
+    "semantic_source_hash",
+
+    "semantic_runtime_compiled",
+
+    *SOURCE_HASH_FIELDS,
+]
+
+DEFAULT_CHUNK_SIZE = 200
+
+
+# =========================================================
+# PARENT: QUEUE
+# =========================================================
+
+def clear_unchanged(ids):
+
+    if ids:
+
+        PCProduct.objects.filter(
+            id__in=ids
+        ).update(
+            semantic_runtime_dirty=False
+        )
+
+
+# =========================================================
+# PARENT: SOURCE STREAM
+# =========================================================
+
+def iter_source_chunks(
+
+    ids,
+
+    chunk_size,
+
+):
+
+    for offset in range(
+
+        0,
+
+        len(ids),
+
+        chunk_size,
+    ):
+
+        chunk_ids = ids[
+            offset:offset + chunk_size
+        ]
+
+        yield list(
+
+            PCProduct.objects
+
+            .filter(
+                id__in=chunk_ids
+            )
+
+            .order_by()
+
+            .values(
+                *COMPILE_SOURCE_FIELDS
+            )
+        )
+
+
+# =========================================================
+# RUN
+# =========================================================
+
+def run_compile_pool(
+
+    ids,
+
+    processes,
+
+    chunk_size=DEFAULT_CHUNK_SIZE,
+
+    skip_unchanged=False,
+
+    on_error=None,
+
+    writer=None,
+
+):
+
+    """
+    ids を process pool で compile し、
+    stats (compiled_ids / per-stage timings) を返す
+    """
+
+    ids = list(ids)
+
+    stats = {
+
+        "compiled_ids":
+            [],
+
+        "unchanged":
+            0,
+
+        "errors":
+            0,
+
+        "timings": {
+
+            "fetch":
+                0.0,
+
+            "compile_wait":
+                0.0,
+
+            "write":
+                0.0,
+        },
+
+        "worker_timings":
+            {},
+    }
+
+    timings = stats["timings"]
+
+    worker_timings = stats["worker_timings"]
+
+    if writer is None:
+
+        writer = RuntimeBulkWriter(
+            chunk_size=chunk_size,
+        )
+
+    stats["writer"] = writer.stats
+
+    # worker へ DB 接続を持ち込まない
+    connections.close_all()
+
+    def collect(future):
+
+        result = future.result()
+
+        for stage, seconds in result["timings"].items():
+
+            worker_timings[stage] = (
+                worker_timings.get(stage, 0.0)
+                + seconds
+            )
+
+        for product_id, message in result["errors"]:
+
+            stats["errors"] += 1
+
+            if on_error:
+
+                on_error(
+                    product_id,
+                    message,
+                )
+
+        started = time.perf_counter()
+
+        for product_id, fields, slugs in result["compiled"]:
+
+            writer.add(
+
+                product_id,
+
+                fields,
+
+                slugs,
+            )
+
+        clear_unchanged(
+            result["unchanged"]
+        )
+
+        timings["write"] += (
+            time.perf_counter() - started
+        )
+
+        stats["compiled_ids"].extend(
+
+            product_id
+
+            for product_id, _, _ in result["compiled"]
+        )
+
+        stats["unchanged"] += len(
+            result["unchanged"]
+        )
+
+    with ProcessPoolExecutor(
+
+        max_workers=processes,
+
+        mp_context=multiprocessing.get_context(
+            "spawn"
+        ),
+
+        initializer=init_compile_worker,
+
+        initargs=(
+            os.environ.get(
+                "DJANGO_SETTINGS_MODULE",
+                "tiper_api.settings",
+            ),
+        ),
+
+    ) as executor:
+
+        pending = set()
+
+        chunks = iter_source_chunks(
+            ids,
+            chunk_size,
+        )
+
+        while True:
+
+            # -------------------------------------------
+            # in-flight は processes * 2 まで
+            # -------------------------------------------
+
+            while len(pending) < processes * 2:
+
+                started = time.perf_counter()
+
+                rows = next(
+                    chunks,
+                    None
+                )
+
+                timings["fetch"] += (
+                    time.perf_counter() - started
+                )
+
+                if rows is None:
+                    break
+
+                pending.add(
+
+                    executor.submit(
+
+                        compile_source_chunk,
+
+                        rows,
+
+                        skip_unchanged,
+                    )
+                )
+
+            if not pending:
+                break
+
+            started = time.perf_counter()
+
+            done, pending = wait(
+
+                pending,
+
+                return_when=FIRST_COMPLETED,
+            )
+
+            timings["compile_wait"] += (
+                time.perf_counter() - started
+            )
+
+            for future in done:
+
+                collect(
+                    future
+                )
+
+    started = time.perf_counter()
+
+    writer.flush()
+
+    timings["write"] += (
+        time.perf_counter() - started
+    )
+
+    return stats
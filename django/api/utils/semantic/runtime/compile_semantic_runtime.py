@@ -3,6 +3,8 @@
 # api/utils/semantic/runtime/compile_semantic_runtime.py
 # =========================================================
 
+import time
+
 from api.utils.semantic.authority.loader import (
     load_semantic_master,
 )
@@ -44,6 +46,33 @@ from api.utils.semantic.runtime.runtime_log import (
 )
 
 
+# =========================================================
+# STAGE TIMINGS
+# =========================================================
+
+def mark_stage(
+
+    timings,
+
+    stage,
+
+    started,
+
+):
+
+    now = time.perf_counter()
+
+    if timings is not None:
+
+        timings[stage] = (
+            timings.get(stage, 0.0)
+            + now
+            - started
+        )
+
+    return now
+
+
 # =========================================================
 # COMPILE SEMANTIC RUNTIME
 # =========================================================
@@ -56,8 +85,13 @@ def compile_semantic_runtime(
 
     runtime_mode="production",
 
+    timings=None,
+
 ):
 
+    # timings: {stage: seconds} に加算される
+    started = time.perf_counter()
+
     # =====================================================
     # LOAD AUTHORITY
     # =====================================================
@@ -66,6 +100,12 @@ def compile_semantic_runtime(
         load_semantic_master()
     )
 
+    started = mark_stage(
+        timings,
+        "authority",
+        started,
+    )
+
     # =====================================================
     # EXTRACTION
     # =====================================================
@@ -80,6 +120,12 @@ def compile_semantic_runtime(
         specs,
     )
 
+    started = mark_stage(
+        timings,
+        "extraction",
+        started,
+    )
+
     # =====================================================
     # NORMALIZATION
     # =====================================================
@@ -100,6 +146,12 @@ def compile_semantic_runtime(
         normalized_tokens,
     )
 
+    started = mark_stage(
+        timings,
+        "normalization",
+        started,
+    )
+
     # =====================================================
     # ATTRIBUTE RESOLUTION
     # =====================================================
@@ -175,6 +227,12 @@ def compile_semantic_runtime(
         semantic_attributes,
     )
 
+    started = mark_stage(
+        timings,
+        "attributes",
+        started,
+    )
+
     # =====================================================
     # GROUP MAPPINGS
     # =====================================================
@@ -251,6 +309,12 @@ def compile_semantic_runtime(
         semantic_groups,
     )
 
+    started = mark_stage(
+        timings,
+        "groups",
+        started,
+    )
+
     # =====================================================
     # WORKFLOW COMPILE
     # =====================================================
@@ -292,6 +356,12 @@ def compile_semantic_runtime(
         workflow_runtime,
     )
 
+    started = mark_stage(
+        timings,
+        "workflow",
+        started,
+    )
+
     # =====================================================
     # SEMANTIC RUNTIME
     # =====================================================
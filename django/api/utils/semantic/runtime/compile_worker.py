@@ -0,0 +1,151 @@
+# =========================================================
+# FILE:
+# api/utils/semantic/runtime/compile_worker.py
+# =========================================================
+
+"""
+process pool worker
+
+spawn された process は Django 起動前にこの module を import するため
+top-level で api.models を import しない
+"""
+
+import os
+
+from types import SimpleNamespace
+
+
+# =========================================================
+# WORKER
+# =========================================================
+
+def init_compile_worker(settings_module):
+
+    """
+    spawn された worker で Django を起動する
+    """
+
+    os.environ.setdefault(
+        "DJANGO_SETTINGS_MODULE",
+        settings_module,
+    )
+
+    import django
+
+    django.setup()
+
+
+def compile_source_chunk(
+
+    rows,
+
+    skip_unchanged=False,
+
+):
+
+    """
+    rows: [{field: value}, ...]
+    """
+
+    from api.services.semantic.runtime_builder import (
+        build_source_hash,
+    )
+
+    from api.utils.semantic.runtime.compile_semantic_runtime import (
+        compile_semantic_runtime,
+    )
+
+    from api.utils.semantic.runtime.persist_runtime import (
+        build_persisted_fields,
+        project_runtime,
+    )
+
+    timings = {}
+
+    compiled = []
+
+    unchanged = []
+
+    errors = []
+
+    for row in rows:
+
+        product = SimpleNamespace(
+            **row
+        )
+
+        try:
+
+            source_hash = build_source_hash(
+                product
+            )
+
+            if (
+
+                skip_unchanged
+                and product.semantic_runtime_compiled
+                and product.semantic_source_hash == source_hash
+
+            ):
+
+                unchanged.append(
+                    product.id
+                )
+
+                continue
+
+            runtime_result = compile_semantic_runtime(
+
+                product=product,
+
+                timings=timings,
+            )
+
+            result = project_runtime(
+
+                product,
+
+                runtime_result,
+
+                source_hash=source_hash,
+            )
+
+            compiled.append(
+
+                (
+                    product.id,
+
+                    build_persisted_fields(
+                        product
+                    ),
+
+                    result[
+                        "semantic_attributes"
+                    ],
+                )
+            )
+
+        except Exception as e:
+
+            errors.append(
+
+                (
+                    product.id,
+                    str(e),
+                )
+            )
+
+    return {
+
+        "compiled":
+            compiled,
+
+        "unchanged":
+            unchanged,
+
+        "errors":
+            errors,
+
+        "timings":
+            timings,
+    }
@@ -6,21 +6,75 @@
 from django.utils import timezone
 from api.models import (  PCAttribute,)
 from api.utils.semantic.runtime.runtime_log import ( runtime_log,)
+from api.utils.pc_projection import ( build_card_payload,)
+from api.services.semantic.runtime_builder import ( build_source_hash,)
+
 
 # =========================================================
-# PERSIST RUNTIME
+# PERSISTED FIELDS
 # =========================================================
 
-def persist_runtime(
+PERSISTED_RUNTIME_FIELDS = [
+
+    # =============================================
+    # WORKFLOW
+    # =============================================
+
+    "workflow_tags",
+
+    "semantic_labels",
+
+    # =============================================
+    # RUNTIME
+    # =============================================
+
+    "semantic_runtime",
+
+    "semantic_score",
+
+    # =============================================
+    # PROJECTION
+    # =============================================
+
+    "card_payload",
+
+    # =============================================
+    # META
+    # =============================================
+
+    "semantic_schema_version",
+
+    "semantic_runtime_compiled",
+
+    "semantic_updated_at",
+
+    "product_type",
+
+    "semantic_source_hash",
+
+    "semantic_runtime_dirty",
+]
+
+
+# =========================================================
+# PROJECT RUNTIME
+# =========================================================
+
+def project_runtime(
 
     product,
 
     semantic_runtime,
 
-    trace_runtime=False,
+    source_hash=None,
 
 ):
 
+    """
+    compiled runtime を product の field へ投影する (DB 書き込みなし)
+    process worker からも呼ばれる
+    """
+
     # =====================================================
     # SAFETY
     # =====================================================
@@ -133,6 +187,12 @@ def persist_runtime(
         semantic_runtime
     )
 
+    product.card_payload = (
+        build_card_payload(
+            semantic_runtime
+        )
+    )
+
     # =====================================================
     # OPTIONAL SCORE
     # =====================================================
@@ -168,6 +228,99 @@ def persist_runtime(
         timezone.now()
     )
 
+    # =====================================================
+    # INCREMENTAL QUEUE
+    # =====================================================
+
+    if source_hash is None:
+
+        source_hash = build_source_hash(
+            product
+        )
+
+    product.semantic_source_hash = (
+        source_hash
+    )
+
+    product.semantic_runtime_dirty = (
+        False
+    )
+
+    # =====================================================
+    # RESULT
+    # =====================================================
+
+    return {
+
+        "workflow_tags":
+            workflow_tags,
+
+        "semantic_labels":
+            semantic_labels,
+
+        "semantic_groups":
+            semantic_groups,
+
+        "semantic_attributes":
+            semantic_attributes,
+
+        "normalized_tokens":
+            normalized_tokens,
+
+        "scores":
+            scores,
+
+        "semantic_score":
+            semantic_score,
+    }
+
+
+def build_persisted_fields(product):
+
+    """
+    project_runtime 後の field 値 (bulk writer 用)
+    """
+
+    return {
+
+        field: getattr(
+            product,
+            field
+        )
+
+        for field in PERSISTED_RUNTIME_FIELDS
+    }
+
+
+# =========================================================
+# PERSIST RUNTIME
+# =========================================================
+
+def persist_runtime(
+
+    product,
+
+    semantic_runtime,
+
+    trace_runtime=False,
+
+    source_hash=None,
+
+):
+
+    result = project_runtime(
+
+        product,
+
+        semantic_runtime,
+
+        source_hash=source_hash,
+    )
+
+    semantic_attributes = result[
+        "semantic_attributes"
+    ]
+
     # =========================================
     # ATTRIBUTE ATTACH
     # =========================================
@@ -214,62 +367,11 @@ def persist_runtime(
 
     product.save(
 
-        update_fields=[
-
-            # =============================================
-            # WORKFLOW
-            # =============================================
-
-            "workflow_tags",
-
-            "semantic_labels",
-
-            # =============================================
-            # RUNTIME
-            # =============================================
-
-            "semantic_runtime",
-
-            "semantic_score",
-
-            # =============================================
-            # META
-            # =============================================
-
-            "semantic_schema_version",
-
-            "semantic_runtime_compiled",
-
-            "semantic_updated_at",
-            
-            "product_type",
-        ]
+        update_fields=PERSISTED_RUNTIME_FIELDS
     )
 
     # =====================================================
     # RESULT
     # =====================================================
 
-    return {
-
-        "workflow_tags":
-            workflow_tags,
-
-        "semantic_labels":
-            semantic_labels,
-
-        "semantic_groups":
-            semantic_groups,
-
-        "semantic_attributes":
-            semantic_attributes,
-
-        "normalized_tokens":
-            normalized_tokens,
-
-        "scores":
-            scores,
-
-        "semantic_score":
-            semantic_score,
-    }
\ No newline at end of file
+    return result
@@ -0,0 +1,403 @@
+# =========================================================
+# FILE:
+# api/utils/semantic/runtime/runtime_writer.py
+# =========================================================
+
+"""
+semantic runtime bulk writer
+
+compiled field を溜めて chunk ごとに
+現在値と比較 → 変わった field だけ bulk_update
+attribute through も差分だけ追加 / 削除 (attribute_tagger と共通)
+"""
+
+import time
+
+from django.db import transaction
+
+from api.models import (
+    PCAttribute,
+    PCProduct,
+)
+
+from api.utils.attribute_tagger import (
+    sync_attribute_links,
+)
+
+
+# =========================================================
+# FIELD CLASSES
+# =========================================================
+
+# 内容が変わったときだけ書く
+RUNTIME_CONTENT_FIELDS = [
+
+    "semantic_runtime",
+
+    "semantic_labels",
+
+    "workflow_tags",
+
+    "runtime_profiles",
+
+    "product_type",
+
+    "semantic_score",
+
+    "card_payload",
+]
+
+# 毎回値が変わるため比較しない (内容変更時に一緒に書く)
+RUNTIME_VOLATILE_FIELDS = [
+
+    "semantic_updated_at",
+]
+
+# semantic_runtime 比較時に無視する key
+RUNTIME_VOLATILE_KEYS = [
+
+    "runtime_status",
+]
+
+DEFAULT_WRITE_CHUNK_SIZE = 500
+
+
+# =========================================================
+# COMPARE
+# =========================================================
+
+def strip_volatile_keys(runtime):
+
+    if not isinstance(runtime, dict):
+
+        return runtime
+
+    return {
+
+        key: value
+
+        for key, value in runtime.items()
+
+        if key not in RUNTIME_VOLATILE_KEYS
+    }
+
+
+def field_changed(
+
+    field,
+
+    old,
+
+    new,
+
+):
+
+    if field == "semantic_runtime":
+
+        return (
+            strip_volatile_keys(old)
+            != strip_volatile_keys(new)
+        )
+
+    return old != new
+
+
+def diff_runtime_fields(
+
+    current,
+
+    fields,
+
+):
+
+    """
+    current: DB の現在値
+    fields: compile 結果
+    return: 書き込む field の set
+    """
+
+    changed = set()
+
+    for field, value in fields.items():
+
+        if field in RUNTIME_VOLATILE_FIELDS:
+            continue
+
+        if field_changed(
+
+            field,
+
+            current.get(field),
+
+            value,
+        ):
+
+            changed.add(
+                field
+            )
+
+    if changed & set(RUNTIME_CONTENT_FIELDS):
+
+        changed |= (
+            set(RUNTIME_VOLATILE_FIELDS)
+            & set(fields)
+        )
+
+    return changed
+
+
+# =========================================================
+# WRITER
+# =========================================================
+
+class RuntimeBulkWriter:
+
+    """
+    writer.add(product_id, fields, semantic_attributes)
+    ...
+    writer.flush()
+    """
+
+    def __init__(
+
+        self,
+
+        chunk_size=DEFAULT_WRITE_CHUNK_SIZE,
+
+        attribute_ids=None,
+    ):
+
+        self.chunk_size = chunk_size
+
+        self.attribute_ids = attribute_ids
+
+        self.buffer = {}
+
+        self.stats = {
+
+            "rows":
+                0,
+
+            "written":
+                0,
+
+            "unchanged":
+                0,
+
+            "field_writes":
+                {},
+
+            "links_added":
+                0,
+
+            "links_removed":
+                0,
+
+            "flushes":
+                0,
+
+            "seconds":
+                0.0,
+        }
+
+    # =====================================================
+    # BUFFER
+    # =====================================================
+
+    def add(
+
+        self,
+
+        product_id,
+
+        fields,
+
+        semantic_attributes=None,
+    ):
+
+        self.buffer[product_id] = (
+            fields,
+            semantic_attributes,
+        )
+
+        if len(self.buffer) >= self.chunk_size:
+
+            self.flush()
+
+    # =====================================================
+    # FLUSH
+    # =====================================================
+
+    def flush(self):
+
+        if not self.buffer:
+
+            return
+
+        started = time.perf_counter()
+
+        buffer = self.buffer
+
+        self.buffer = {}
+
+        ids = list(buffer)
+
+        field_names = sorted({
+
+            field
+
+            for fields, _ in buffer.values()
+
+            for field in fields
+        })
+
+        current = {
+
+            row["id"]: row
+
+            for row in (
+
+                PCProduct.objects
+
+                .filter(
+                    id__in=ids
+                )
+
+                .order_by()
+
+                .values(
+                    "id",
+                    *field_names
+                )
+            )
+        }
+
+        # -------------------------------------------------
+        # group by changed field set
+        # -------------------------------------------------
+
+        groups = {}
+
+        for product_id, (fields, _) in buffer.items():
+
+            if product_id not in current:
+                continue
+
+            changed = diff_runtime_fields(
+
+                current[product_id],
+
+                fields,
+            )
+
+            if not changed:
+
+                self.stats["unchanged"] += 1
+
+                continue
+
+            groups.setdefault(
+
+                tuple(sorted(changed)),
+
+                []
+
+            ).append(
+
+                PCProduct(
+
+                    id=product_id,
+
+                    **{
+                        field: fields[field]
+                        for field in changed
+                    }
+                )
+            )
+
+        with transaction.atomic():
+
+            for changed, products in groups.items():
+
+                PCProduct.objects.bulk_update(
+
+                    products,
+
+                    list(changed),
+                )
+
+                self.stats["written"] += len(
+                    products
+                )
+
+                for field in changed:
+
+                    self.stats["field_writes"][field] = (
+                        self.stats["field_writes"].get(field, 0)
+                        + len(products)
+                    )
+
+            self.write_attribute_links(
+
+                {
+
+                    product_id: slugs
+
+                    for product_id, (_, slugs) in buffer.items()
+
+                    if slugs is not None
+                    and product_id in current
+                }
+            )
+
+        self.stats["rows"] += len(buffer)
+
+        self.stats["flushes"] += 1
+
+        self.stats["seconds"] += (
+            time.perf_counter() - started
+        )
+
+    # =====================================================
+    # ATTRIBUTES
+    # =====================================================
+
+    def write_attribute_links(
+
+        self,
+
+        slugs_map,
+
+    ):
+
+        if not slugs_map:
+
+            return
+
+        if self.attribute_ids is None:
+
+            self.attribute_ids = dict(
+
+                PCAttribute.objects.values_list(
+                    "slug",
+                    "id",
+                )
+            )
+
+        added, removed = sync_attribute_links({
+
+            product_id: {
+
+                self.attribute_ids[slug]
+
+                for slug in slugs
+
+                if slug in self.attribute_ids
+            }
+
+            for product_id, slugs in slugs_map.items()
+        })
+
+        self.stats["links_removed"] += removed
+
+        self.stats["links_added"] += added
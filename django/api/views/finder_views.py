@@ -1,8 +1,10 @@
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 
 from api.utils.finder_engine import (
+    SEMANTIC_FINDER_CACHE,
     find_semantic_products
 )
 
@@ -74,4 +76,15 @@ class SemanticFinderView(APIView):
             ],
 
             "results": response_data,
-        })
\ No newline at end of file
+        })
+
+# =========================================
+# Finder Cache Stats (ops scrape / admin only)
+# =========================================
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def finder_cache_stats(request):
+
+    return Response(
+        SEMANTIC_FINDER_CACHE.stats()
+    )
@@ -23,6 +23,10 @@ from rest_framework import (
     pagination,
 )
 
+from rest_framework.exceptions import (
+    ValidationError,
+)
+
 from rest_framework.decorators import (
     api_view,
     permission_classes,
@@ -36,6 +40,11 @@ from rest_framework.response import (
     Response,
 )
 
+from rest_framework.utils.urls import (
+    remove_query_param,
+    replace_query_param,
+)
+
 # ==========================================================
 # SEO
 # ==========================================================
@@ -76,6 +85,24 @@ from api.serializers.pc_product_serializer import (
     PCProductSerializer,
 )
 
+# ==========================================================
+# PROJECTION / PAGINATION
+# ==========================================================
+
+from api.utils.keyset_pagination import (
+    CURSOR_ERRORS,
+    StaleCursor,
+    cached_count,
+    keyset_ordering,
+    paginate_keyset,
+)
+
+from api.utils.pc_projection import (
+    PROJECTION_CARD,
+    PROJECTION_DETAIL,
+    apply_projection,
+)
+
 # ==========================================================
 # SEMANTIC API SERVICE
 # ==========================================================
@@ -91,6 +118,11 @@ from api.services.semantic.semantic_api_service import (
     build_semantic_discovery_payload,
 )
 
+from api.services.semantic.semantic_relation_store import (
+    build_relation_node,
+    load_relations_by_source,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -106,6 +138,234 @@ class PCProductLimitOffsetPagination(
 
     max_limit = 100
 
+    def get_count(self, queryset):
+
+        # catalog generation ごとに 1 回だけ COUNT(*)
+        return cached_count(
+            queryset
+        )
+
+
+class PCProductKeysetPagination(
+    PCProductLimitOffsetPagination
+):
+
+    """
+    ?cursor= (省略時も) keyset、?offset= 指定時のみ旧 OFFSET
+
+    count は cursor なしの 1 ページ目 / ?count=1 のときだけ返す
+    (cursor ページは None)
+    """
+
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(
+        self,
+        queryset,
+        request,
+        view=None,
+    ):
+
+        cursor = request.query_params.get(
+            self.cursor_query_param
+        )
+
+        # related field / 式での並びは OFFSET のまま
+        self.keyset = (
+            (
+                cursor
+                or self.offset_query_param not in request.query_params
+            )
+            and keyset_ordering(queryset) is not None
+        )
+
+        if not self.keyset:
+
+            return super().paginate_queryset(
+                queryset,
+                request,
+                view,
+            )
+
+        self.request = request
+
+        self.limit = self.get_limit(
+            request
+        )
+
+        self.offset = 0
+
+        with_count = request.query_params.get(
+            "count"
+        )
+
+        if with_count in (None, ""):
+
+            with_count = not cursor
+
+        else:
+
+            with_count = with_count.lower() in ("1", "true")
+
+        self.count = (
+            self.get_count(queryset)
+            if with_count
+            else None
+        )
+
+        try:
+
+            result = paginate_keyset(
+                queryset,
+                self.limit,
+                cursor=cursor,
+            )
+
+        except StaleCursor:
+
+            # 並び替え後の古い cursor は 1 ページ目から
+            result = paginate_keyset(
+                queryset,
+                self.limit,
+            )
+
+        except CURSOR_ERRORS:
+
+            raise ValidationError({
+                self.cursor_query_param: "invalid cursor",
+            })
+
+        self.next_cursor = result["next_cursor"]
+
+        return result["rows"]
+
+    def get_next_link(self):
+
+        if not self.keyset:
+
+            return super().get_next_link()
+
+        if not self.next_cursor:
+
+            return None
+
+        url = remove_query_param(
+            self.request.build_absolute_uri(),
+            self.offset_query_param,
+        )
+
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.next_cursor,
+        )
+
+    def get_previous_link(self):
+
+        # keyset は前方向のみ
+        if not self.keyset:
+
+            return super().get_previous_link()
+
+        return None
+
+
+# ==========================================================
+# LISTING VIEW (?view=full)
+# ==========================================================
+
+# 既定は card projection / card payload
+# ?view=full: PCProductSerializer の全列 (related は PCProductRelation から)
+FULL_VIEW = "full"
+
+
+def wants_full_view(request):
+
+    return (
+        request.query_params.get("view")
+        == FULL_VIEW
+    )
+
+
+def apply_listing_projection(
+
+    queryset,
+
+    request,
+):
+
+    if wants_full_view(request):
+
+        return apply_projection(
+
+            queryset.prefetch_related(
+                "attributes"
+            ),
+
+            PROJECTION_DETAIL,
+        )
+
+    # card projection: semantic_runtime / description 等の重い列は読まない
+    return apply_projection(
+        queryset,
+        PROJECTION_CARD,
+    )
+
+
+def build_listing_results(
+
+    products,
+
+    request,
+
+    serializer_class,
+):
+
+    """
+    既定: card payload (build_semantic_ranking_payload)
+    ?view=full: serializer の全列 (semantic_related は page 分を 1 query で)
+    """
+
+    if not wants_full_view(request):
+
+        return build_semantic_ranking_payload(
+            products
+        ).get(
+            "results",
+            []
+        )
+
+    products = list(
+        products
+    )
+
+    relations = load_relations_by_source(
+        product.pk
+        for product in products
+    )
+
+    return serializer_class(
+
+        products,
+
+        many=True,
+
+        context={
+
+            "request": request,
+
+            "semantic_related": {
+
+                source_id: [
+                    build_relation_node(relation)
+                    for relation in rows
+                ]
+
+                for source_id, rows in relations.items()
+            },
+        },
+    ).data
+
 
 # ==========================================================
 # UTIL
@@ -163,7 +423,7 @@ class PCProductRankingView(
         print("kwargs =", self.kwargs)
         print("=================================")
 
-        queryset = (
+        queryset = apply_listing_projection(
 
             PCProduct.objects
 
@@ -172,13 +432,11 @@ class PCProductRankingView(
                 unified_genre="PC",
             )
 
-            .prefetch_related(
-                "attributes"
-            )
-
             .exclude(
                 semantic_runtime__isnull=True
-            )
+            ),
+
+            self.request,
         )
 
         # ==================================================
@@ -336,10 +594,10 @@ class PCProductRankingView(
         # Semantic Ranking Payload
         # ==================================================
 
-        payload = (
-            build_semantic_ranking_payload(
-                queryset
-            )
+        results = build_listing_results(
+            queryset,
+            request,
+            self.get_serializer_class(),
         )
 
         return Response({
@@ -369,20 +627,14 @@ class PCProductRankingView(
             # Semantic Ranking Payload
             # ==============================================
             "results":
-                payload.get(
-                    "results",
-                    []
-                ),
+                results,
 
             # ==============================================
             # Count
             # ==============================================
             "count":
                 len(
-                    payload.get(
-                        "results",
-                        []
-                    )
+                    results
                 ),
 
             # ==============================================
@@ -415,7 +667,7 @@ class PCProductListAPIView(
     )
 
     pagination_class = (
-        PCProductLimitOffsetPagination
+        PCProductKeysetPagination
     )
 
     permission_classes = [
@@ -463,7 +715,7 @@ class PCProductListAPIView(
             "slug"
         )
 
-        queryset = (
+        queryset = apply_listing_projection(
 
             PCProduct.objects
 
@@ -472,15 +724,13 @@ class PCProductListAPIView(
                 unified_genre="PC",
             )
 
-            .prefetch_related(
-                "attributes"
-            )
-
             .exclude(
                 semantic_runtime__isnull=True
             )
 
-            .distinct()
+            .distinct(),
+
+            self.request,
         )
 
         # ==================================================
@@ -586,10 +836,10 @@ class PCProductListAPIView(
         # Semantic Payload
         # ==================================================
 
-        payload = (
-            build_semantic_ranking_payload(
-                page
-            )
+        results = build_listing_results(
+            page,
+            request,
+            self.get_serializer_class(),
         )
 
         return Response({
@@ -613,10 +863,7 @@ class PCProductListAPIView(
                 self.paginator.get_previous_link(),
 
             "results":
-                payload.get(
-                    "results",
-                    []
-                ),
+                results,
 
             # ==============================================
             # Discovery Runtime
@@ -749,8 +996,13 @@ def pc_product_detail(
 
     product = get_object_or_404(
 
-        PCProduct.objects.prefetch_related(
-            "attributes"
+        apply_projection(
+
+            PCProduct.objects.prefetch_related(
+                "attributes"
+            ),
+
+            PROJECTION_DETAIL,
         ),
 
         unique_id=unique_id,
@@ -982,8 +1234,13 @@ def get_related_pc_products(
 
     product = get_object_or_404(
 
-        PCProduct.objects.prefetch_related(
-            "attributes"
+        apply_projection(
+
+            PCProduct.objects.prefetch_related(
+                "attributes"
+            ),
+
+            PROJECTION_DETAIL,
         ),
 
         unique_id=unique_id,
@@ -3,11 +3,20 @@ from rest_framework.permissions import (  AllowAny  )
 from rest_framework.response import ( Response  )
 from api.models import (  PCProduct  )
 from api.serializers.pc_product_serializer import (  PCProductSerializer  )
+from api.utils.pc_projection import (
+    PROJECTION_DETAIL,
+    apply_projection,
+)
 from api.services.semantic.semantic_api_service import ( 
     build_semantic_related_products,
     build_semantic_shelf_payload,
     build_semantic_workflow_payload,
 )
+from api.services.price_history_service import (
+    PRICE_CHART_MAX_MONTHS,
+    PRICE_CHART_MONTHS,
+    load_price_chart,
+)
 # from api.services.semantic.v2.discovery_runtime_v2 import ( build_discovery_runtime_v2 )
 from api.services.semantic.v2.discover.discover_runtime import (build_discover_runtime,)
 
@@ -23,6 +32,7 @@ def pc_product_ranking(request):
         "score"
     )
 
+    # 並び替えは id + semantic_runtime だけで行う
     products = list(
 
         PCProduct.objects
@@ -30,6 +40,11 @@ def pc_product_ranking(request):
         .filter(
             is_active=True
         )
+
+        .only(
+            "id",
+            "semantic_runtime",
+        )
     )
 
     # =====================================
@@ -76,7 +91,40 @@ def pc_product_ranking(request):
         reverse=True
     )
 
-    products = products[:20]
+    top_ids = [
+
+        product.id
+
+        for product in products[:20]
+    ]
+
+    # 上位 20 件だけ detail projection で読み直す
+    product_map = (
+
+        apply_projection(
+
+            PCProduct.objects
+
+            .prefetch_related(
+                "attributes"
+            ),
+
+            PROJECTION_DETAIL,
+        )
+
+        .in_bulk(
+            top_ids
+        )
+    )
+
+    products = [
+
+        product_map[product_id]
+
+        for product_id in top_ids
+
+        if product_id in product_map
+    ]
 
     serializer = (
         PCProductSerializer(
@@ -103,7 +151,16 @@ def pc_product_detail(
 
         product = (
 
-            PCProduct.objects
+            apply_projection(
+
+                PCProduct.objects
+
+                .prefetch_related(
+                    "attributes"
+                ),
+
+                PROJECTION_DETAIL,
+            )
 
             .get(
                 unique_id=unique_id,
@@ -187,6 +244,71 @@ def pc_product_detail(
         data
     )
 
+# =========================================================
+# 📈 Price Chart API (月次ロールアップ)
+# =========================================================
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def pc_product_price_history(
+    request,
+    unique_id
+):
+    """
+    ?months= 直近何ヶ月分か (既定 PRICE_CHART_MONTHS = 12、1..60 に丸める)
+    """
+
+    product_id = (
+
+        PCProduct.objects
+
+        .filter(
+            unique_id=unique_id,
+            is_active=True
+        )
+
+        .values_list(
+            "id",
+            flat=True
+        )
+
+        .first()
+    )
+
+    if product_id is None:
+
+        return Response(
+            {
+                "error": "not found"
+            },
+            status=404
+        )
+
+    try:
+
+        months = min(
+            max(int(request.GET.get("months", PRICE_CHART_MONTHS)), 1),
+            PRICE_CHART_MAX_MONTHS
+        )
+
+    except ValueError:
+
+        months = PRICE_CHART_MONTHS
+
+    return Response({
+
+        "unique_id":
+            unique_id,
+
+        "months":
+            months,
+
+        "points":
+            load_price_chart(
+                product_id,
+                months=months
+            ),
+    })
+
 # =========================================================
 # 🔗 Semantic Related Products API
 # =========================================================
@@ -201,10 +323,15 @@ def get_related_pc_products(
 
         product = (
 
-            PCProduct.objects
+            apply_projection(
 
-            .prefetch_related(
-                "attributes"
+                PCProduct.objects
+
+                .prefetch_related(
+                    "attributes"
+                ),
+
+                PROJECTION_DETAIL,
             )
 
             .get(
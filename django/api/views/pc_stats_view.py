@@ -3,8 +3,6 @@
 from collections import defaultdict
 import re
 
-from django.db.models import Count
-
 from rest_framework.decorators import (
     api_view,
     permission_classes
@@ -19,10 +17,13 @@ from rest_framework.response import (
 )
 
 from api.models import (
-    PCProduct,
     PCAttribute
 )
 
+from api.services.facet_count_service import (
+    get_attribute_counts
+)
+
 
 # =========================================================
 # slug normalize
@@ -124,32 +125,28 @@ def pc_sidebar_stats(request):
 
     # =====================================================
     # semantic attributes
+    # (PCFacetCount: materialized / generation cache)
     # =====================================================
-    attrs = (
+    counts = get_attribute_counts(
+        unified_genre="PC",
+        is_active=True
+    )
 
-        PCAttribute.objects
+    attrs = sorted(
 
-        .filter(
-            pc_products__is_active=True,
-            pc_products__unified_genre="PC"
-        )
+        PCAttribute.objects.filter(
+            id__in=list(counts)
+        ),
 
-        .annotate(
-            product_count=Count(
-                "pc_products",
-                distinct=True
-            )
+        key=lambda attr: (
+            attr.attr_type,
+            -counts[attr.id]
         )
+    )
 
-        .filter(
-            product_count__gt=0
-        )
+    for attr in attrs:
 
-        .order_by(
-            "attr_type",
-            "-product_count"
-        )
-    )
+        attr.product_count = counts[attr.id]
 
     # =====================================================
     # grouped sidebar
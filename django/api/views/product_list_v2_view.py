@@ -4,7 +4,9 @@
 from rest_framework.decorators import (    api_view,    permission_classes,)
 from rest_framework.permissions import (     AllowAny,)
 from rest_framework.response import (     Response,)
+from rest_framework import (     status,)
 from api.services.semantic.v2.inventory.inventory_runtime import (     build_inventory_runtime,)
+from api.utils.keyset_pagination import (     InvalidCursor,)
 
 
 # ==========================================================
@@ -21,9 +23,18 @@ def semantic_product_list_v2(
     # PARAMETER
     # ------------------------------------------------------
 
+    # page 指定は OFFSET (旧 API)、省略時は cursor (keyset)
     page = request.GET.get(
         "page",
-        1,
+    )
+
+    cursor = request.GET.get(
+        "cursor",
+    )
+
+    # count=1 / count=0 で件数の要否を明示 (省略時は 1 ページ目のみ)
+    count = request.GET.get(
+        "count",
     )
 
     page_size = request.GET.get(
@@ -31,15 +42,16 @@ def semantic_product_list_v2(
         20,
     )
 
-    sort = request.GET.get(
-        "sort",
-        "new",
-    )
-
     search = request.GET.get(
         "search",
     )
 
+    # search 指定時の既定は関連度順
+    sort = request.GET.get(
+        "sort",
+        "relevance" if search else "new",
+    )
+
     # ------------------------------------------------------
     # FILTERS
     # ------------------------------------------------------
@@ -138,26 +150,49 @@ def semantic_product_list_v2(
     # RUNTIME
     # ------------------------------------------------------
 
-    payload = (
+    try:
+
+        payload = (
+
+            build_inventory_runtime(
 
-        build_inventory_runtime(
+                page=
+                    page,
 
-            page=
-                page,
+                page_size=
+                    page_size,
 
-            page_size=
-                page_size,
+                sort=
+                    sort,
 
-            sort=
-                sort,
+                search=
+                    search,
 
-            search=
-                search,
+                filters=
+                    filters,
 
-            filters=
-                filters,
+                cursor=
+                    cursor,
+
+                with_count=(
+                    None
+                    if count in (None, "")
+                    else count.lower() in ("1", "true")
+                ),
+            )
+        )
+
+    except InvalidCursor:
+
+        return Response(
+
+            {
+                "cursor":
+                    "invalid cursor",
+            },
+
+            status=status.HTTP_400_BAD_REQUEST,
         )
-    )
 
     return Response(
         payload
@@ -59,6 +59,12 @@ def semantic_ranking_v2(
 
             limit=
                 limit,
+
+            # 順位 cursor (snapshot 再 build を跨ぐと先頭から)
+            cursor=
+                request.GET.get(
+                    "cursor"
+                ),
         )
     )
 
@@ -363,10 +363,40 @@ SIMPLE_JWT = {
 }
 
 
+# ==============================================================================
+# 🔎 FINDER CACHE
+# ==============================================================================
+# BACKEND: local (process LRU + TTL) / django (CACHES[ALIAS] shared)
+
+FINDER_CACHE = {
+
+    'BACKEND': os.environ.get('FINDER_CACHE_BACKEND', 'local'),
+
+    'MAX_ENTRIES': int(os.environ.get('FINDER_CACHE_MAX_ENTRIES', 256)),
+
+    'TIMEOUT': int(os.environ.get('FINDER_CACHE_TIMEOUT', 300)),
+
+    'ALIAS': os.environ.get('FINDER_CACHE_ALIAS', 'default'),
+}
+
+
 # ==============================================================================
 # ⚙️ DJANGO DEFAULTS
 # ==============================================================================
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
\ No newline at end of file
+DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
+
+# ==============================================================================
+# 📚 SEMANTIC AUTHORITY
+# ==============================================================================
+# ARTIFACT: compile_authority_snapshot が書き出す pickle (空なら master_data/.compiled/)
+# CHECK_INTERVAL: TSV の mtime を見に行く間隔 (秒)
+
+SEMANTIC_AUTHORITY = {
+
+    'ARTIFACT': os.environ.get('SEMANTIC_AUTHORITY_ARTIFACT', ''),
+
+    'CHECK_INTERVAL': float(os.environ.get('SEMANTIC_AUTHORITY_CHECK_INTERVAL', 2)),
+}
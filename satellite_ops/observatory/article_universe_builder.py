@@ -2,6 +2,10 @@ from satellite_ops.observatory.rss_article_collector import (
     collect_rss_articles,
 )
 
+from satellite_ops.runtime.fetch.feed_fetcher import (
+    refresh_feeds,
+)
+
 
 def build_article_universe(
     rss_sources: list,
@@ -9,6 +13,26 @@ def build_article_universe(
 
     articles = []
 
+    # stale な feed を 1 sweep で並行に取り直す
+    # (以降の collect は cache を読むだけ)
+    try:
+
+        refresh_feeds(
+            [
+                rss.get(
+                    "rss_url",
+                    "",
+                )
+                for rss in rss_sources
+            ]
+        )
+
+    except Exception as e:
+
+        print(
+            f"⚠ RSS Sweep Error: {e}"
+        )
+
     for rss in rss_sources:
 
         try:
@@ -1,4 +1,6 @@
-import feedparser
+from satellite_ops.runtime.fetch.feed_fetcher import (
+    get_feed_entries,
+)
 
 
 # ============================================================================
@@ -14,6 +16,8 @@ import feedparser
 # No rewrite
 # No parser
 # No dispatch
+#
+# Reads the shared feed cache (runtime/fetch/feed_fetcher)
 # ============================================================================
 
 
@@ -22,28 +26,27 @@ def collect_rss_articles(
     limit: int = 5,
 ) -> list:
 
-    feed = feedparser.parse(
-        rss_url
+    entries = get_feed_entries(
+        rss_url,
+        limit=limit,
     )
 
     articles = []
 
-    for entry in feed.entries[:limit]:
+    for entry in entries:
 
         articles.append(
 
             {
 
                 "title":
-                    getattr(
-                        entry,
+                    entry.get(
                         "title",
                         "",
                     ),
 
                 "url":
-                    getattr(
-                        entry,
+                    entry.get(
                         "link",
                         "",
                     ),
@@ -0,0 +1,102 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/pipelines/refresh_feeds.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Feed Sweep Pipeline
+# ============================================================================
+# Purpose:
+# Refresh every RSS source into the feed cache
+# ============================================================================
+# Responsibilities:
+#
+# - bounded-concurrency conditional GET sweep
+# - master_rss_sources.csv → storage/cache/feeds
+# - fleet pre-warm (engines read the cache afterwards)
+#
+# ============================================================================
+
+import argparse
+import time
+
+from satellite_ops.runtime.fetch.feed_fetcher import (
+    FEED_CACHE_MAX_AGE,
+    FEED_CONCURRENCY,
+    FEED_PER_HOST_CONCURRENCY,
+    refresh_all_feeds,
+)
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+parser = argparse.ArgumentParser()
+
+parser.add_argument(
+
+"--max-age",
+type=float,
+default=FEED_CACHE_MAX_AGE,
+help="Skip feeds checked within N seconds (0 = check all)"
+
+)
+
+parser.add_argument(
+
+"--concurrency",
+type=int,
+default=FEED_CONCURRENCY,
+help="Concurrent requests"
+
+)
+
+parser.add_argument(
+
+"--per-host",
+type=int,
+default=FEED_PER_HOST_CONCURRENCY,
+help="Concurrent requests per host"
+
+)
+
+args = parser.parse_args()
+
+# ============================================================================
+# Runtime Boot
+# ============================================================================
+
+def main():
+
+    print("\n🛰 SHIN SATELLITE OPS\n")
+    print("\n📡 Feed Sweep\n")
+
+    started = time.perf_counter()
+
+    records = refresh_all_feeds(
+
+        max_age=args.max_age or None,
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+
+    )
+
+    failed = [
+        url
+        for url, record in records.items()
+        if record.get("error")
+    ]
+
+    print(f"Feeds   => {len(records)}")
+    print(f"Failed  => {len(failed)}")
+    print(f"Elapsed => {time.perf_counter() - started:.1f}s")
+
+    for url in failed:
+        print(f"⚠ {url} {records[url].get('error')}")
+
+    return records
+
+# ============================================================================
+# Entrypoint
+# ============================================================================
+
+if __name__ == "__main__":
+    main()
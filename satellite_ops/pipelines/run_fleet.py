@@ -0,0 +1,114 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/pipelines/run_fleet.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Fleet Pipeline
+# ============================================================================
+# Purpose:
+# Run all blogs of master_fleet.csv in one process
+# ============================================================================
+# Responsibilities:
+#
+# - fleet runtime boot
+# - blog / platform selection
+# - timing report
+#
+# ============================================================================
+
+import argparse
+
+from satellite_ops.runtime.engine.fleet_runner import (
+    FLEET_BLOG_WORKERS,
+    FleetRunner,
+    format_fleet_report,
+)
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+parser = argparse.ArgumentParser()
+
+parser.add_argument(
+
+"--blog",
+action="append",
+default=None,
+help="Target blog name (repeatable, default: all)"
+
+)
+
+parser.add_argument(
+
+"--platform",
+action="append",
+default=None,
+help="Target platform (repeatable, default: all)"
+
+)
+
+parser.add_argument(
+
+"--rss",
+type=str,
+default=None,
+help="RSS source filter"
+
+)
+
+parser.add_argument(
+
+"--workers",
+type=int,
+default=FLEET_BLOG_WORKERS,
+help="Concurrent blog pipelines"
+
+)
+
+parser.add_argument(
+
+"--dry-run",
+action="store_true",
+help="Skip real dispatch"
+
+)
+
+args = parser.parse_args()
+
+# ============================================================================
+# Runtime Boot
+# ============================================================================
+
+def main():
+
+    print("\n🛰 SHIN SATELLITE OPS\n")
+    print("\n🚀 Fleet Runtime\n")
+    print(f"Blogs     => {args.blog or 'ALL'}")
+    print(f"Platforms => {args.platform or 'ALL'}")
+    print(f"Workers   => {args.workers}")
+
+    runner = FleetRunner(
+        blog_workers=args.workers,
+    )
+
+    report = runner.run(
+
+        blog_names=args.blog,
+        platforms=args.platform,
+        enable_real_post=not args.dry_run,
+        rss_filter=args.rss,
+
+    )
+
+    print(
+        format_fleet_report(report)
+    )
+
+    return report
+
+# ============================================================================
+# Entrypoint
+# ============================================================================
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/runtime/cache/feed_cache.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Feed Cache
+# ============================================================================
+# Purpose:
+# On-disk RSS feed cache
+# ============================================================================
+# Responsibilities:
+#
+# - feed entries persistence (1 feed = 1 json)
+# - conditional GET validators (ETag / Last-Modified)
+# - freshness check
+#
+# ============================================================================
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from pathlib import Path
+
+
+# ============================================================================
+# Cache Directory
+# ============================================================================
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+FEED_CACHE_DIR = (
+    BASE_DIR
+    / "storage"
+    / "cache"
+    / "feeds"
+)
+
+# seconds
+# この秒数以内に確認済みの feed は再取得しない
+FEED_CACHE_MAX_AGE = 15 * 60
+
+
+# ============================================================================
+# Path
+# ============================================================================
+
+def feed_cache_path(
+    feed_url: str,
+) -> Path:
+
+    key = hashlib.sha1(
+        feed_url.encode("utf-8")
+    ).hexdigest()
+
+    return (
+        FEED_CACHE_DIR
+        / f"{key}.json"
+    )
+
+
+# ============================================================================
+# Load
+# ============================================================================
+
+def load_feed_cache(
+    feed_url: str,
+) -> dict:
+    """
+    Load cached feed record.
+
+    Record:
+
+        url
+        etag
+        last_modified
+        checked_at   (最後に問い合わせた時刻)
+        fetched_at   (最後に本文を受け取った時刻)
+        status
+        error
+        entries      [{title, summary, link}]
+
+    Missing / broken cache returns {}.
+    """
+
+    path = feed_cache_path(
+        feed_url
+    )
+
+    try:
+
+        with open(
+            path,
+            encoding="utf-8",
+        ) as f:
+
+            record = json.load(f)
+
+    except (OSError, ValueError):
+
+        return {}
+
+    if not isinstance(record, dict):
+
+        return {}
+
+    return record
+
+
+# ============================================================================
+# Save
+# ============================================================================
+
+def save_feed_cache(
+    feed_url: str,
+    record: dict,
+) -> Path:
+    """
+    Atomic write (tmp → rename).
+
+    並行する reader が書きかけの json を読まない。
+    """
+
+    FEED_CACHE_DIR.mkdir(
+        parents=True,
+        exist_ok=True,
+    )
+
+    path = feed_cache_path(
+        feed_url
+    )
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=FEED_CACHE_DIR,
+        prefix=".feed-",
+        suffix=".tmp",
+    )
+
+    try:
+
+        with os.fdopen(
+            fd,
+            "w",
+            encoding="utf-8",
+        ) as f:
+
+            json.dump(
+                record,
+                f,
+                ensure_ascii=False,
+            )
+
+        os.replace(
+            tmp_path,
+            path,
+        )
+
+    except Exception:
+
+        try:
+            os.unlink(tmp_path)
+
+        except OSError:
+            pass
+
+        raise
+
+    return path
+
+
+# ============================================================================
+# Freshness
+# ============================================================================
+
+def is_feed_fresh(
+    record: dict,
+    max_age: float = FEED_CACHE_MAX_AGE,
+) -> bool:
+
+    if not record:
+
+        return False
+
+    checked_at = record.get(
+        "checked_at",
+        0,
+    ) or 0
+
+    return (
+        time.time() - checked_at
+        < max_age
+    )
@@ -0,0 +1,664 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/runtime/engine/fleet_runner.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Fleet Runner
+# ============================================================================
+# Purpose:
+# Run every blog of master_fleet.csv in one process
+# ============================================================================
+# Responsibilities:
+#
+# - shared RSS sweep (same source is fetched once for the whole fleet)
+# - concurrent blog pipelines (RuntimeEngine per blog)
+# - per-stage worker pools (rss / rewrite / render / dispatch)
+# - per-platform dispatch rate limits
+# - per-run timing report
+#
+# ============================================================================
+
+import threading
+import time
+
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    as_completed,
+)
+from contextlib import (
+    contextmanager,
+    nullcontext,
+)
+
+from satellite_ops.registry.blogs.blog_loader import (load_all_blogs,)
+from satellite_ops.registry.rss.rss_loader import (load_rss_by_categories,)
+from satellite_ops.runtime.engine.runtime_engine import (RuntimeEngine,)
+from satellite_ops.runtime.fetch.feed_fetcher import (refresh_feeds,)
+from satellite_ops.runtime.rewrite.adapters.ollama_client import (OLLAMA_MAX_IN_FLIGHT,)
+
+# ============================================================================
+# Fleet Config
+# ============================================================================
+
+# 同時に走らせる blog pipeline 数
+FLEET_BLOG_WORKERS = 8
+
+# stage ごとの同時実行数
+STAGE_WORKERS = {
+
+    # article 本文 fetch / normalize
+    "rss": 8,
+
+    # LLM は GPU 側の上限に合わせる
+    "rewrite": OLLAMA_MAX_IN_FLIGHT,
+
+    "render": 4,
+
+    # dispatch は platform ごとの上限が別途かかる
+    "dispatch": 4,
+}
+
+# platform → (同時投稿数, 投稿開始の最短間隔 seconds)
+PLATFORM_LIMITS = {
+
+    "hatena": (1, 30.0),
+
+    "livedoor": (1, 10.0),
+
+    "seesaa": (1, 30.0),
+
+    "wordpress": (2, 5.0),
+
+    "blogger": (1, 20.0),
+
+    "fc2": (1, 30.0),
+}
+
+DEFAULT_PLATFORM_LIMIT = (1, 10.0)
+
+
+# ============================================================================
+# Platform Rate Limit
+# ============================================================================
+
+class PlatformRateLimiter:
+
+    # ------------------------------------------------------------------------
+    # Init
+    # ------------------------------------------------------------------------
+
+    def __init__(
+
+        self,
+
+        concurrency: int,
+
+        min_interval: float,
+
+    ):
+
+        self.slots = threading.BoundedSemaphore(
+            max(1, concurrency)
+        )
+
+        self.min_interval = min_interval
+
+        self._lock = threading.Lock()
+
+        self._next_start = 0.0
+
+    # ------------------------------------------------------------------------
+    # Acquire
+    # ------------------------------------------------------------------------
+
+    @contextmanager
+    def acquire(self):
+
+        with self.slots:
+
+            # 開始時刻を予約してから待つ (lock を持ったまま sleep しない)
+            with self._lock:
+
+                start_at = max(
+                    time.monotonic(),
+                    self._next_start,
+                )
+
+                self._next_start = (
+                    start_at
+                    + self.min_interval
+                )
+
+            delay = start_at - time.monotonic()
+
+            if delay > 0:
+
+                time.sleep(delay)
+
+            yield
+
+
+# ============================================================================
+# Fleet Stages
+# ============================================================================
+
+class FleetStages:
+    """
+    RuntimeEngine に渡す stage gate
+
+    - stage ごとの semaphore (worker pool)
+    - dispatch は platform limiter も通す
+    - blog ごとの stage 所要時間 / 待ち時間を記録
+    """
+
+    # ------------------------------------------------------------------------
+    # Init
+    # ------------------------------------------------------------------------
+
+    def __init__(
+
+        self,
+
+        stage_workers: dict | None = None,
+
+        platform_limits: dict | None = None,
+
+    ):
+
+        self.stage_slots = {
+
+            stage: threading.BoundedSemaphore(
+                max(1, workers)
+            )
+
+            for stage, workers in (
+                stage_workers
+                or STAGE_WORKERS
+            ).items()
+        }
+
+        self.platform_limits = (
+            platform_limits
+            or PLATFORM_LIMITS
+        )
+
+        self.platforms = {}
+
+        self.timings = {}
+
+        self._lock = threading.Lock()
+
+    def platform_limiter(
+        self,
+        platform: str,
+    ) -> PlatformRateLimiter:
+
+        with self._lock:
+
+            limiter = self.platforms.get(
+                platform
+            )
+
+            if limiter is None:
+
+                limiter = PlatformRateLimiter(
+
+                    *self.platform_limits.get(
+                        platform,
+                        DEFAULT_PLATFORM_LIMIT,
+                    )
+                )
+
+                self.platforms[platform] = limiter
+
+            return limiter
+
+    def _record(
+
+        self,
+
+        blog_name: str,
+
+        key: str,
+
+        seconds: float,
+
+    ):
+
+        with self._lock:
+
+            timings = self.timings.setdefault(
+                blog_name,
+                {},
+            )
+
+            timings[key] = (
+                timings.get(key, 0.0)
+                + seconds
+            )
+
+    # ------------------------------------------------------------------------
+    # Stage
+    # ------------------------------------------------------------------------
+
+    @contextmanager
+    def stage(
+
+        self,
+
+        name: str,
+
+        blog: dict | None = None,
+
+    ):
+
+        blog = blog or {}
+
+        blog_name = blog.get(
+            "blog_name",
+            "",
+        )
+
+        queued = time.perf_counter()
+
+        slots = self.stage_slots.get(
+            name
+        )
+
+        limiter = (
+
+            self.platform_limiter(
+
+                blog.get(
+                    "platform",
+                    "",
+                ).lower()
+            )
+
+            if name == "dispatch"
+
+            else None
+        )
+
+        # platform の順番待ちで他 platform の dispatch 枠を塞がない
+        with (limiter.acquire() if limiter else nullcontext()):
+
+            with (slots or nullcontext()):
+
+                with self._timed(
+                    name,
+                    blog_name,
+                    queued,
+                ):
+
+                    yield
+
+    @contextmanager
+    def _timed(
+
+        self,
+
+        name: str,
+
+        blog_name: str,
+
+        queued: float,
+
+    ):
+
+        started = time.perf_counter()
+
+        self._record(
+            blog_name,
+            f"{name}_wait",
+            started - queued,
+        )
+
+        try:
+
+            yield
+
+        finally:
+
+            self._record(
+                blog_name,
+                name,
+                time.perf_counter() - started,
+            )
+
+
+# ============================================================================
+# Fleet Runner
+# ============================================================================
+
+class FleetRunner:
+
+    # ------------------------------------------------------------------------
+    # Init
+    # ------------------------------------------------------------------------
+
+    def __init__(
+
+        self,
+
+        blog_workers: int = FLEET_BLOG_WORKERS,
+
+        stage_workers: dict | None = None,
+
+        platform_limits: dict | None = None,
+
+    ):
+
+        self.blog_workers = max(
+            1,
+            blog_workers,
+        )
+
+        self.stages = FleetStages(
+            stage_workers=stage_workers,
+            platform_limits=platform_limits,
+        )
+
+    # ------------------------------------------------------------------------
+    # Blogs
+    # ------------------------------------------------------------------------
+
+    def select_blogs(
+
+        self,
+
+        blog_names: list | None = None,
+
+        platforms: list | None = None,
+
+    ) -> list:
+
+        blogs = [
+
+            blog
+
+            for blog in load_all_blogs()
+
+            if blog.get("blog_name")
+        ]
+
+        if blog_names:
+
+            blogs = [
+                blog
+                for blog in blogs
+                if blog["blog_name"] in blog_names
+            ]
+
+        if platforms:
+
+            platforms = {
+                platform.lower()
+                for platform in platforms
+            }
+
+            blogs = [
+                blog
+                for blog in blogs
+                if blog.get("platform", "").lower() in platforms
+            ]
+
+        return blogs
+
+    # ------------------------------------------------------------------------
+    # Shared RSS Sweep
+    # ------------------------------------------------------------------------
+
+    def sweep_feeds(
+        self,
+        blogs: list,
+    ) -> dict:
+        """
+        fleet 全体の RSS を 1 sweep で取る
+        (blog 側の build_article_universe / RSS fetch は cache を読むだけ)
+        """
+
+        feed_urls = {
+
+            rss.get(
+                "rss_url",
+                "",
+            )
+
+            for blog in blogs
+
+            for rss in load_rss_by_categories(
+                blog.get(
+                    "allowed_categories",
+                    [],
+                )
+            )
+        }
+
+        return refresh_feeds(
+            sorted(feed_urls)
+        )
+
+    # ------------------------------------------------------------------------
+    # Run One
+    # ------------------------------------------------------------------------
+
+    def run_blog(
+
+        self,
+
+        blog: dict,
+
+        enable_real_post: bool,
+
+        rss_filter: str | None,
+
+    ) -> dict:
+
+        blog_name = blog["blog_name"]
+
+        started = time.perf_counter()
+
+        error = ""
+
+        try:
+
+            context = RuntimeEngine(
+                stages=self.stages,
+            ).execute(
+
+                blog_name=blog_name,
+                enable_real_post=enable_real_post,
+                rss_filter=rss_filter,
+
+            )
+
+            success = bool(
+                context
+                and getattr(context, "success", False)
+            )
+
+            if context:
+
+                error = getattr(
+                    context,
+                    "error",
+                    "",
+                )
+
+            elif not error:
+
+                error = "runtime_failed"
+
+        except Exception as e:
+
+            success = False
+
+            error = str(e)
+
+        return {
+
+            "blog_name": blog_name,
+
+            "platform": blog.get(
+                "platform",
+                "",
+            ),
+
+            "success": success,
+
+            "error": error,
+
+            "elapsed": time.perf_counter() - started,
+
+            "stages": dict(
+
+                self.stages.timings.get(
+                    blog_name,
+                    {},
+                )
+            ),
+        }
+
+    # ------------------------------------------------------------------------
+    # Run Fleet
+    # ------------------------------------------------------------------------
+
+    def run(
+
+        self,
+
+        blog_names: list | None = None,
+
+        platforms: list | None = None,
+
+        enable_real_post: bool = True,
+
+        rss_filter: str | None = None,
+
+    ) -> dict:
+
+        started = time.perf_counter()
+
+        blogs = self.select_blogs(
+            blog_names=blog_names,
+            platforms=platforms,
+        )
+
+        sweep_started = time.perf_counter()
+
+        feeds = self.sweep_feeds(
+            blogs
+        )
+
+        sweep_seconds = (
+            time.perf_counter()
+            - sweep_started
+        )
+
+        results = []
+
+        with ThreadPoolExecutor(
+            max_workers=self.blog_workers,
+        ) as executor:
+
+            futures = [
+
+                executor.submit(
+                    self.run_blog,
+                    blog,
+                    enable_real_post,
+                    rss_filter,
+                )
+
+                for blog in blogs
+            ]
+
+            for future in as_completed(futures):
+
+                results.append(
+                    future.result()
+                )
+
+        results.sort(
+            key=lambda result: result["blog_name"]
+        )
+
+        return {
+
+            "blogs": results,
+
+            "feed_count": len(feeds),
+
+            "sweep_seconds": sweep_seconds,
+
+            "wall_seconds": time.perf_counter() - started,
+
+            "blog_seconds": sum(
+                result["elapsed"]
+                for result in results
+            ),
+
+            "success_count": sum(
+                1
+                for result in results
+                if result["success"]
+            ),
+        }
+
+
+# ============================================================================
+# Report
+# ============================================================================
+
+def format_fleet_report(report: dict) -> str:
+
+    lines = [
+
+        "",
+
+        "🛰 Fleet Run Report",
+
+        "",
+
+        f"Blogs    => {len(report['blogs'])}"
+        f" ({report['success_count']} success)",
+
+        f"Feeds    => {report['feed_count']}"
+        f" ({report['sweep_seconds']:.1f}s sweep)",
+
+        f"Wall     => {report['wall_seconds']:.1f}s",
+
+        f"Sum      => {report['blog_seconds']:.1f}s (sequential estimate)",
+
+        "",
+    ]
+
+    for result in report["blogs"]:
+
+        stages = " ".join(
+
+            f"{stage}={seconds:.1f}s"
+
+            for stage, seconds in sorted(
+                result["stages"].items()
+            )
+        )
+
+        lines.append(
+
+            f"{'✅' if result['success'] else '❌'} "
+
+            f"{result['blog_name']} [{result['platform']}]"
+
+            f" {result['elapsed']:.1f}s"
+
+            f" {stages}"
+
+            + (
+                f" error={result['error']}"
+                if result["error"]
+                else ""
+            )
+        )
+
+    return "\n".join(lines)
@@ -10,6 +10,8 @@
 
 import random
 
+from contextlib import nullcontext
+
 from satellite_ops.registry.blogs.blog_loader import (load_blog,)
 from satellite_ops.registry.rss.rss_loader import (load_rss_by_categories,)
 from satellite_ops.runtime.models.runtime_context import (RuntimeContext,)
@@ -22,6 +24,33 @@ from satellite_ops.runtime.categories.category_map import (CATEGORY_LABELS,)
 from satellite_ops.observatory.article_universe import (save_article_universe,)
 from satellite_ops.observatory.article_universe_builder import (build_article_universe,)
 from satellite_ops.observatory.observation_summary import (save_observation_summary,)
+from satellite_ops.topics.saturation.post_history_store import (record_post,)
+
+# ============================================================================
+# Stage Gate
+# ============================================================================
+
+
+class SerialStages:
+    """
+    単体実行用 (制限なし)
+
+    fleet 実行では FleetRunner の FleetStages に差し替わり、
+    stage ごとの worker pool / platform rate limit がかかる
+    """
+
+    def stage(
+
+        self,
+
+        name: str,
+
+        blog: dict | None = None,
+
+    ):
+
+        return nullcontext()
+
 
 # ============================================================================
 # Runtime Engine
@@ -34,7 +63,15 @@ class RuntimeEngine:
     # Init
     # ------------------------------------------------------------------------
 
-    def __init__(self):
+    def __init__(
+
+        self,
+
+        stages=None,
+
+    ):
+
+        self.stages = stages or SerialStages()
 
         self.observer = RuntimeObserver()
 
@@ -184,11 +221,16 @@ class RuntimeEngine:
             return False
 
 
-        article_universe = (
-            build_article_universe(
-                rss_sources
+        with self.stages.stage(
+            "rss",
+            context.blog,
+        ):
+
+            article_universe = (
+                build_article_universe(
+                    rss_sources
+                )
             )
-        )
 
         self.observer.section(
             "🌌 Article Universe"
@@ -232,9 +274,14 @@ class RuntimeEngine:
         # RSS Runtime
         # --------------------------------------------------------------------
 
-        rss_runtime = self.rss.execute(
-            context.rss_source
-        )
+        with self.stages.stage(
+            "rss",
+            context.blog,
+        ):
+
+            rss_runtime = self.rss.execute(
+                context.rss_source
+            )
 
         if not rss_runtime.get(
             "success",
@@ -400,19 +447,24 @@ class RuntimeEngine:
 
         )
 
-        context.rewritten_text = (
+        with self.stages.stage(
+            "rewrite",
+            context.blog,
+        ):
 
-            self.rewrite.execute(
-                article_text[:4000],
-                context.blog.get(
-                    "persona",
-                    "",
-                ),
-                source_type=context.source_name.lower(),
-                overlay=rewrite_overlay,
-            )
+            context.rewritten_text = (
 
-        )
+                self.rewrite.execute(
+                    article_text[:4000],
+                    context.blog.get(
+                        "persona",
+                        "",
+                    ),
+                    source_type=context.source_name.lower(),
+                    overlay=rewrite_overlay,
+                )
+
+            )
 
         
         # --------------------------------------------------------------------
@@ -464,23 +516,28 @@ class RuntimeEngine:
         # Render Runtime
         # --------------------------------------------------------------------
 
-        render_result = self.render.execute(
+        with self.stages.stage(
+            "render",
+            context.blog,
+        ):
 
-            rewritten_text=context.rewritten_text,
+            render_result = self.render.execute(
 
-            title=context.satellite_title,
+                rewritten_text=context.rewritten_text,
 
-            persona=context.blog.get(
-                "persona",
-                "",
-            ),
+                title=context.satellite_title,
 
-            image_url=context.image_url,
+                persona=context.blog.get(
+                    "persona",
+                    "",
+                ),
 
-            source_url=context.source_url,
+                image_url=context.image_url,
 
-            source_name=context.source_name,
-        )
+                source_url=context.source_url,
+
+                source_name=context.source_name,
+            )
 
         # --------------------------------------------------------------------
         # Render Validation
@@ -552,21 +609,26 @@ class RuntimeEngine:
                 "🚀 Dispatch Runtime"
             )
 
-            context.dispatch_result = (
+            with self.stages.stage(
+                "dispatch",
+                context.blog,
+            ):
+
+                context.dispatch_result = (
 
-                self.dispatch.execute(
+                    self.dispatch.execute(
 
-                    blog=context.blog,
+                        blog=context.blog,
 
-                    title=context.satellite_title,
+                        title=context.satellite_title,
 
-                    html=context.html,
+                        html=context.html,
 
-                    image_url=None,
+                        image_url=None,
 
-                    category=category,
+                        category=category,
+                    )
                 )
-            )
 
             context.success = (
 
@@ -582,6 +644,30 @@ class RuntimeEngine:
                     "Dispatch Success"
                 )
 
+                # topic saturation 用の投稿履歴
+                try:
+
+                    record_post(
+
+                        context.satellite_title,
+
+                        blog=context.blog.get(
+                            "blog_name",
+                            blog_name,
+                        ),
+
+                        summary=context.topic.get(
+                            "summary",
+                            "",
+                        ),
+                    )
+
+                except Exception as e:
+
+                    self.observer.warning(
+                        f"Post history record failed: {e}"
+                    )
+
             else:
 
                 self.observer.error(
@@ -0,0 +1,479 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/runtime/fetch/feed_fetcher.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Feed Fetcher
+# ============================================================================
+# Purpose:
+# Concurrent conditional-GET RSS sweep
+# ============================================================================
+# Responsibilities:
+#
+# - shared HTTP connection pool
+# - conditional GET (If-None-Match / If-Modified-Since)
+# - bounded concurrency sweep (global + per host)
+# - feed cache update
+#
+# Engines / observatory collectors read entries from the feed cache.
+# Network access happens only for stale feeds.
+#
+# ============================================================================
+
+import asyncio
+import threading
+import time
+
+from urllib.parse import urlparse
+
+import feedparser
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from satellite_ops.registry.rss.rss_loader import (
+    load_all_rss_sources,
+)
+
+from satellite_ops.runtime.cache.feed_cache import (
+    FEED_CACHE_MAX_AGE,
+    is_feed_fresh,
+    load_feed_cache,
+    save_feed_cache,
+)
+
+
+# ============================================================================
+# Fetch Config
+# ============================================================================
+
+# (connect, read) seconds
+FEED_TIMEOUT = (5, 20)
+
+# sweep 全体の同時接続数
+FEED_CONCURRENCY = 16
+
+# 同一 host への同時接続数
+FEED_PER_HOST_CONCURRENCY = 2
+
+# cache に残す entry 数 (読み手は先頭 limit 件だけ使う)
+FEED_ENTRY_LIMIT = 50
+
+FEED_USER_AGENT = (
+    "Mozilla/5.0 (compatible; ShinSatelliteOps/1.0; +feed-sweep)"
+)
+
+
+# ============================================================================
+# Session
+# ============================================================================
+
+_SESSION = None
+
+_SESSION_LOCK = threading.Lock()
+
+
+def get_feed_session() -> requests.Session:
+    """
+    Shared session.
+
+    host ごとの keep-alive 接続を sweep 間で使い回す。
+    """
+
+    global _SESSION
+
+    if _SESSION is not None:
+
+        return _SESSION
+
+    with _SESSION_LOCK:
+
+        if _SESSION is None:
+
+            session = requests.Session()
+
+            adapter = HTTPAdapter(
+                pool_connections=FEED_CONCURRENCY,
+                pool_maxsize=FEED_CONCURRENCY,
+            )
+
+            session.mount(
+                "http://",
+                adapter,
+            )
+
+            session.mount(
+                "https://",
+                adapter,
+            )
+
+            session.headers.update({
+                "User-Agent": FEED_USER_AGENT,
+            })
+
+            _SESSION = session
+
+    return _SESSION
+
+
+# ============================================================================
+# Entry
+# ============================================================================
+
+def entry_payload(entry) -> dict:
+
+    return {
+
+        "title": getattr(
+            entry,
+            "title",
+            "",
+        ),
+
+        "summary": getattr(
+            entry,
+            "summary",
+            "",
+        ),
+
+        "link": getattr(
+            entry,
+            "link",
+            "",
+        ),
+    }
+
+
+# ============================================================================
+# Fetch One
+# ============================================================================
+
+def fetch_feed(
+    feed_url: str,
+    record: dict | None = None,
+) -> dict:
+    """
+    Conditional GET one feed and update the cache.
+
+    200 → parse + replace entries
+    304 → keep entries, update checked_at
+    error → keep previous entries, record error
+    """
+
+    if record is None:
+
+        record = load_feed_cache(
+            feed_url
+        )
+
+    previous_entries = record.get(
+        "entries",
+        [],
+    )
+
+    headers = {}
+
+    if record.get("etag"):
+
+        headers["If-None-Match"] = record["etag"]
+
+    if record.get("last_modified"):
+
+        headers["If-Modified-Since"] = record["last_modified"]
+
+    now = time.time()
+
+    try:
+
+        response = get_feed_session().get(
+            feed_url,
+            headers=headers,
+            timeout=FEED_TIMEOUT,
+        )
+
+    except requests.RequestException as e:
+
+        record = {
+            **record,
+            "url": feed_url,
+            "checked_at": now,
+            "error": str(e),
+        }
+
+        save_feed_cache(
+            feed_url,
+            record,
+        )
+
+        return record
+
+    # ------------------------------------------------------------------------
+    # Not Modified
+    # ------------------------------------------------------------------------
+
+    if response.status_code == 304:
+
+        record = {
+            **record,
+            "url": feed_url,
+            "checked_at": now,
+            "status": 304,
+            "error": "",
+        }
+
+    # ------------------------------------------------------------------------
+    # Updated
+    # ------------------------------------------------------------------------
+
+    elif response.ok:
+
+        feed = feedparser.parse(
+
+            response.content,
+
+            response_headers={
+                "content-location": feed_url,
+                "content-type": response.headers.get(
+                    "Content-Type",
+                    "",
+                ),
+            },
+        )
+
+        record = {
+
+            "url": feed_url,
+
+            "etag": response.headers.get(
+                "ETag",
+                "",
+            ),
+
+            "last_modified": response.headers.get(
+                "Last-Modified",
+                "",
+            ),
+
+            "checked_at": now,
+
+            "fetched_at": now,
+
+            "status": response.status_code,
+
+            "error": "",
+
+            "entries": [
+                entry_payload(entry)
+                for entry in feed.entries[:FEED_ENTRY_LIMIT]
+            ],
+        }
+
+        # 壊れた feed で前回の entries を消さない
+        if not record["entries"] and previous_entries:
+
+            record["entries"] = previous_entries
+
+            record["error"] = "empty_feed"
+
+            # 次回は validator なしで本文を取り直す
+            record["etag"] = ""
+
+            record["last_modified"] = ""
+
+    # ------------------------------------------------------------------------
+    # HTTP Error
+    # ------------------------------------------------------------------------
+
+    else:
+
+        record = {
+            **record,
+            "url": feed_url,
+            "checked_at": now,
+            "status": response.status_code,
+            "error": f"http_{response.status_code}",
+        }
+
+    save_feed_cache(
+        feed_url,
+        record,
+    )
+
+    return record
+
+
+# ============================================================================
+# Sweep
+# ============================================================================
+
+async def _sweep_feeds(
+    feed_urls: list,
+    concurrency: int,
+    per_host: int,
+) -> dict:
+
+    limit = asyncio.Semaphore(
+        concurrency
+    )
+
+    host_limits = {}
+
+    async def refresh(feed_url):
+
+        host_limit = host_limits.setdefault(
+
+            urlparse(feed_url).netloc,
+
+            asyncio.Semaphore(
+                per_host
+            ),
+        )
+
+        # host 枠を先に取る (他 host の待ちで全体枠を塞がない)
+        async with host_limit:
+
+            async with limit:
+
+                try:
+
+                    record = await asyncio.to_thread(
+                        fetch_feed,
+                        feed_url,
+                    )
+
+                except Exception as e:
+
+                    print(
+                        f"⚠ Feed Fetch Error: {feed_url} {e}"
+                    )
+
+                    record = load_feed_cache(
+                        feed_url
+                    )
+
+        return feed_url, record
+
+    results = await asyncio.gather(*(
+        refresh(feed_url)
+        for feed_url in feed_urls
+    ))
+
+    return dict(results)
+
+
+def refresh_feeds(
+    feed_urls: list,
+    max_age: float | None = FEED_CACHE_MAX_AGE,
+    concurrency: int = FEED_CONCURRENCY,
+    per_host: int = FEED_PER_HOST_CONCURRENCY,
+) -> dict:
+    """
+    Refresh stale feeds in one bounded-concurrency sweep.
+
+    max_age=None → 全 feed を問い合わせる (304 なら本文は来ない)
+
+    Returns:
+        {feed_url: record}
+    """
+
+    records = {}
+
+    stale = []
+
+    for feed_url in dict.fromkeys(
+        url
+        for url in feed_urls
+        if url
+    ):
+
+        record = load_feed_cache(
+            feed_url
+        )
+
+        if (
+            max_age is not None
+            and is_feed_fresh(record, max_age)
+        ):
+
+            records[feed_url] = record
+
+        else:
+
+            stale.append(
+                feed_url
+            )
+
+    if stale:
+
+        records.update(
+
+            asyncio.run(
+                _sweep_feeds(
+                    stale,
+                    concurrency,
+                    per_host,
+                )
+            )
+        )
+
+    return records
+
+
+def refresh_all_feeds(
+    max_age: float | None = FEED_CACHE_MAX_AGE,
+    concurrency: int = FEED_CONCURRENCY,
+    per_host: int = FEED_PER_HOST_CONCURRENCY,
+) -> dict:
+    """
+    Sweep every enabled source in master_rss_sources.csv.
+    """
+
+    return refresh_feeds(
+
+        [
+            rss.get(
+                "rss_url",
+                "",
+            )
+            for rss in load_all_rss_sources()
+        ],
+
+        max_age=max_age,
+
+        concurrency=concurrency,
+
+        per_host=per_host,
+    )
+
+
+# ============================================================================
+# Read
+# ============================================================================
+
+def get_feed_entries(
+    feed_url: str,
+    limit: int = 5,
+    max_age: float | None = FEED_CACHE_MAX_AGE,
+) -> list:
+    """
+    Cached entries (stale なら 1 件だけ取り直す).
+    """
+
+    if not feed_url:
+
+        return []
+
+    record = refresh_feeds(
+        [feed_url],
+        max_age=max_age,
+    ).get(
+        feed_url,
+        {},
+    )
+
+    return (
+        record.get(
+            "entries",
+            [],
+        )
+        or []
+    )[:limit]
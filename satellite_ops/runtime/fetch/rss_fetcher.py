@@ -2,28 +2,32 @@
 # SHIN SATELLITE OPS｜RSS Fetcher
 # ============================================================================
 
-import feedparser
+from satellite_ops.runtime.fetch.feed_fetcher import (
+    get_feed_entries,
+)
 
 def fetch_rss_titles(feed_url, limit=5):
 
-    feed = feedparser.parse(feed_url)
+    # feed cache から読む (stale なら conditional GET)
+    entries = get_feed_entries(
+        feed_url,
+        limit=limit,
+    )
+
     topics = []
 
-    for entry in feed.entries[:limit]:
-        # topics.append({
-        #     "title": entry.title,
-        #     "summary": getattr(entry, "summary", ""),
-        # })
-        
+    for entry in entries:
+
         topics.append({
-            "title": entry.title,
-            "summary": getattr(
-                entry,
+            "title": entry.get(
+                "title",
+                "",
+            ),
+            "summary": entry.get(
                 "summary",
                 "",
             ),
-            "link": getattr(
-                entry,
+            "link": entry.get(
                 "link",
                 "",
             ),
@@ -31,4 +35,3 @@ def fetch_rss_titles(feed_url, limit=5):
 
 
     return topics
-
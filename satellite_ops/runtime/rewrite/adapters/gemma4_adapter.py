@@ -11,25 +11,12 @@
 # - operational continuity first
 # ============================================================================
 
-import os
-import requests
+import threading
 
 from pathlib import Path
 
-# ============================================================================
-
-# Environment Runtime
-
-# ============================================================================
-
-OLLAMA_HOST = os.getenv(
-"OLLAMA_HOST",
-"http://localhost:11434"
-)
-
-OLLAMA_MODEL = os.getenv(
-"OLLAMA_MODEL",
-"gemma2:2b"
+from satellite_ops.runtime.rewrite.adapters.ollama_client import (
+    get_ollama_client,
 )
 
 # ============================================================================
@@ -47,6 +34,11 @@ OVERLAY_DIR = (
 BASE_DIR / "overlays"
 )
 
+# {source_type: (mtime, text)}
+_OVERLAY_CACHE = {}
+
+_OVERLAY_LOCK = threading.Lock()
+
 
 # ============================================================================
 # Base Prompt
@@ -91,17 +83,45 @@ source_type: str,
             f"{source_type}.txt"
         )
 
-        if not overlay_path.exists():
+        try:
+
+            mtime = overlay_path.stat().st_mtime
+
+        except FileNotFoundError:
+
+            mtime = None
+
+        cached = _OVERLAY_CACHE.get(
+            source_type
+        )
+
+        # file が変わるまでは memory から返す
+        if cached and cached[0] == mtime:
+
+            return cached[1]
+
+        if mtime is None:
 
             print(
                 f"⚠ overlay not found: {overlay_path}"
             )
 
-            return ""
+            text = ""
+
+        else:
+
+            text = overlay_path.read_text(
+                encoding="utf-8"
+            ).strip()
+
+        with _OVERLAY_LOCK:
+
+            _OVERLAY_CACHE[source_type] = (
+                mtime,
+                text,
+            )
 
-        return overlay_path.read_text(
-            encoding="utf-8"
-        ).strip()
+        return text
 
     except Exception as e:
 
@@ -113,10 +133,10 @@ source_type: str,
 
 
 # ============================================================================
-# Rewrite Runtime
+# Build Prompt
 # ============================================================================
 
-def rewrite_with_gemma4(
+def build_gemma4_prompt(
 
 article_text="",
 source_type="",
@@ -130,10 +150,6 @@ overlay="",
         .lower()
     )
 
-    if not article_text:
-
-        return ""
-
     # ========================================================================
     # System Overlay
     # ========================================================================
@@ -160,7 +176,7 @@ overlay="",
     # Final Prompt
     # ========================================================================
 
-    prompt = f"""
+    return f"""
 
 
     {PROMPT_TEMPLATE}
@@ -173,44 +189,63 @@ overlay="",
     """
 
 
-    # ========================================================================
-    # Payload
-    # ========================================================================
+def report_generation(result):
 
-    payload = {
+    print(
 
-        "model": OLLAMA_MODEL,
+        "🧪 Gemma Rewrite"
 
-        "prompt": prompt,
+        f" | model={result.get('model')}"
 
-        "stream": False,
-    }
+        f" | cached={result.get('cached')}"
 
-    try:
+        f" | first_byte={result.get('first_byte_seconds')}"
 
-        response = requests.post(
+        f" | elapsed={result.get('elapsed_seconds')}"
 
-            f"{OLLAMA_HOST}/api/generate",
+        f" | chars={len(result.get('response', ''))}"
+    )
 
-            json=payload,
 
-            timeout=120,
-        )
+# ============================================================================
+# Rewrite Runtime
+# ============================================================================
 
-        response.raise_for_status()
+def rewrite_with_gemma4(
 
-        data = response.json()
+article_text="",
+source_type="",
+overlay="",
 
-        print("\n🧪 Gemma RAW Response\n")
+):
 
-        print(data)
+    if not article_text:
+
+        return ""
 
-        rewritten = data.get(
+    prompt = build_gemma4_prompt(
+
+        article_text=article_text,
+
+        source_type=source_type,
+
+        overlay=overlay,
+    )
+
+    try:
+
+        result = get_ollama_client().generate(
+            prompt
+        )
+
+        report_generation(
+            result
+        )
+
+        return result.get(
             "response",
             ""
-        ).strip()
-
-        return rewritten
+        )
 
     except Exception as e:
 
@@ -218,4 +253,4 @@ overlay="",
             f"❌ Gemma Rewrite Error: {e}"
         )
 
-        return ""
\ No newline at end of file
+        return ""
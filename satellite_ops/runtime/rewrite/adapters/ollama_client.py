@@ -0,0 +1,441 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/runtime/rewrite/adapters/ollama_client.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Ollama Client
+# ============================================================================
+# Purpose:
+# Pooled, bounded, cached LLM generate client
+# ============================================================================
+# Responsibilities:
+#
+# - persistent HTTP session (keep-alive)
+# - bounded in-flight requests (process wide)
+# - streaming token responses (first-byte latency)
+# - content-addressed result cache (model, prompt hash)
+#
+# ============================================================================
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from pathlib import Path
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+
+# ============================================================================
+# Environment Runtime
+# ============================================================================
+
+OLLAMA_HOST = os.getenv(
+    "OLLAMA_HOST",
+    "http://localhost:11434",
+)
+
+OLLAMA_MODEL = os.getenv(
+    "OLLAMA_MODEL",
+    "gemma2:2b",
+)
+
+# 同時に Ollama へ投げる request 数 (GPU 1 枚なら 1〜2)
+OLLAMA_MAX_IN_FLIGHT = int(
+    os.getenv(
+        "OLLAMA_MAX_IN_FLIGHT",
+        "2",
+    )
+)
+
+OLLAMA_STREAM = os.getenv(
+    "OLLAMA_STREAM",
+    "1",
+) != "0"
+
+# (connect, read) seconds
+# streaming では read timeout は token 間の無通信時間
+OLLAMA_TIMEOUT = (
+    5,
+    float(
+        os.getenv(
+            "OLLAMA_TIMEOUT",
+            "120",
+        )
+    ),
+)
+
+BASE_DIR = Path(__file__).resolve().parents[3]
+
+REWRITE_CACHE_DIR = Path(
+    os.getenv(
+        "REWRITE_CACHE_DIR",
+        str(
+            BASE_DIR
+            / "storage"
+            / "cache"
+            / "rewrite"
+        ),
+    )
+)
+
+
+# ============================================================================
+# Result Cache
+# ============================================================================
+
+def prompt_cache_key(
+
+    model: str,
+
+    prompt: str,
+
+) -> str:
+
+    return hashlib.sha256(
+        f"{model}\0{prompt}".encode("utf-8")
+    ).hexdigest()
+
+
+class ResultCache:
+    """
+    content-addressed: 同じ (model, prompt) は再生成しない
+    """
+
+    def __init__(
+
+        self,
+
+        cache_dir: Path = REWRITE_CACHE_DIR,
+
+    ):
+
+        self.cache_dir = Path(cache_dir)
+
+    def path(self, key: str) -> Path:
+
+        return (
+            self.cache_dir
+            / key[:2]
+            / f"{key}.json"
+        )
+
+    def get(self, key: str) -> dict | None:
+
+        try:
+
+            with open(
+                self.path(key),
+                encoding="utf-8",
+            ) as f:
+
+                return json.load(f)
+
+        except (OSError, ValueError):
+
+            return None
+
+    def set(
+
+        self,
+
+        key: str,
+
+        record: dict,
+
+    ) -> None:
+
+        path = self.path(key)
+
+        path.parent.mkdir(
+            parents=True,
+            exist_ok=True,
+        )
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=path.parent,
+            suffix=".tmp",
+        )
+
+        try:
+
+            with os.fdopen(
+                fd,
+                "w",
+                encoding="utf-8",
+            ) as f:
+
+                json.dump(
+                    record,
+                    f,
+                    ensure_ascii=False,
+                )
+
+            os.replace(
+                tmp_path,
+                path,
+            )
+
+        except Exception:
+
+            try:
+                os.unlink(tmp_path)
+
+            except OSError:
+                pass
+
+            raise
+
+
+# ============================================================================
+# Ollama Client
+# ============================================================================
+
+class OllamaClient:
+
+    # ------------------------------------------------------------------------
+    # Init
+    # ------------------------------------------------------------------------
+
+    def __init__(
+
+        self,
+
+        host: str = OLLAMA_HOST,
+
+        model: str = OLLAMA_MODEL,
+
+        max_in_flight: int = OLLAMA_MAX_IN_FLIGHT,
+
+        stream: bool = OLLAMA_STREAM,
+
+        timeout: tuple = OLLAMA_TIMEOUT,
+
+        cache: ResultCache | None = None,
+
+    ):
+
+        self.host = host.rstrip("/")
+
+        self.model = model
+
+        self.max_in_flight = max(
+            1,
+            max_in_flight,
+        )
+
+        self.stream = stream
+
+        self.timeout = timeout
+
+        self.cache = cache or ResultCache()
+
+        self.session = requests.Session()
+
+        self.session.mount(
+
+            self.host,
+
+            HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=self.max_in_flight,
+            ),
+        )
+
+        self._in_flight = threading.BoundedSemaphore(
+            self.max_in_flight
+        )
+
+    # ------------------------------------------------------------------------
+    # Generate
+    # ------------------------------------------------------------------------
+
+    def generate(
+
+        self,
+
+        prompt: str,
+
+        model: str | None = None,
+
+        use_cache: bool = True,
+
+    ) -> dict:
+        """
+        Returns:
+            {
+                "response": str,
+                "model": str,
+                "cached": bool,
+                "first_byte_seconds": float | None,
+                "elapsed_seconds": float,
+                "eval_count": int | None,
+            }
+        """
+
+        model = model or self.model
+
+        key = prompt_cache_key(
+            model,
+            prompt,
+        )
+
+        if use_cache:
+
+            cached = self.cache.get(key)
+
+            if cached and cached.get("response"):
+
+                return {
+                    **cached,
+                    "cached": True,
+                }
+
+        with self._in_flight:
+
+            result = self._request(
+                prompt,
+                model,
+            )
+
+        # 空応答は cache しない (retry で取り直す)
+        if use_cache and result.get("response"):
+
+            self.cache.set(
+                key,
+                result,
+            )
+
+        return {
+            **result,
+            "cached": False,
+        }
+
+    def _request(
+
+        self,
+
+        prompt: str,
+
+        model: str,
+
+    ) -> dict:
+
+        started = time.perf_counter()
+
+        first_byte = None
+
+        chunks = []
+
+        final = {}
+
+        with self.session.post(
+
+            f"{self.host}/api/generate",
+
+            json={
+                "model": model,
+                "prompt": prompt,
+                "stream": self.stream,
+            },
+
+            timeout=self.timeout,
+
+            stream=self.stream,
+
+        ) as response:
+
+            response.raise_for_status()
+
+            if self.stream:
+
+                # NDJSON: 1 行 = 1 token chunk, 最終行は done=true
+                for line in response.iter_lines():
+
+                    if not line:
+                        continue
+
+                    data = json.loads(line)
+
+                    if first_byte is None:
+
+                        first_byte = (
+                            time.perf_counter() - started
+                        )
+
+                    if data.get("error"):
+
+                        raise RuntimeError(
+                            data["error"]
+                        )
+
+                    chunks.append(
+                        data.get(
+                            "response",
+                            "",
+                        )
+                    )
+
+                    if data.get("done"):
+
+                        final = data
+
+                        break
+
+            else:
+
+                final = response.json()
+
+                first_byte = (
+                    time.perf_counter() - started
+                )
+
+                chunks.append(
+                    final.get(
+                        "response",
+                        "",
+                    )
+                )
+
+        return {
+
+            "response": "".join(chunks).strip(),
+
+            "model": model,
+
+            "first_byte_seconds": first_byte,
+
+            "elapsed_seconds": time.perf_counter() - started,
+
+            "eval_count": final.get(
+                "eval_count"
+            ),
+        }
+
+
+# ============================================================================
+# Shared Client
+# ============================================================================
+
+_CLIENT = None
+
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_ollama_client() -> OllamaClient:
+
+    global _CLIENT
+
+    if _CLIENT is None:
+
+        with _CLIENT_LOCK:
+
+            if _CLIENT is None:
+
+                _CLIENT = OllamaClient()
+
+    return _CLIENT
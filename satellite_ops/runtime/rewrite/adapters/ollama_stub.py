@@ -0,0 +1,295 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/runtime/rewrite/adapters/ollama_stub.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Ollama Stub Server
+# ============================================================================
+# Purpose:
+# Local stand-in for Ollama /api/generate
+# ============================================================================
+# Responsibilities:
+#
+# - stream / non-stream response compatible with Ollama
+# - deterministic output (prompt から決まる)
+# - configurable latency (first byte / per token)
+#
+# Usage:
+#
+#   python -m satellite_ops.runtime.rewrite.adapters.ollama_stub --port 11435
+#   OLLAMA_HOST=http://127.0.0.1:11435 python -m satellite_ops.pipelines.run_single_blog
+#
+# ============================================================================
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+
+
+# ============================================================================
+# Stub Config
+# ============================================================================
+
+STUB_RESPONSE = (
+    "新しい話題がひとつ届いています。"
+    "気になるところだけ、さらっと見ておくのがよさそうです。"
+)
+
+
+def stub_response(prompt: str) -> str:
+
+    digest = hashlib.sha1(
+        prompt.encode("utf-8")
+    ).hexdigest()[:8]
+
+    return f"{STUB_RESPONSE} ({digest})"
+
+
+# ============================================================================
+# Handler
+# ============================================================================
+
+class OllamaStubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    # server 側で上書き
+    first_byte_delay = 0.0
+
+    token_delay = 0.0
+
+    def log_message(self, *args):
+
+        pass
+
+    def do_POST(self):
+
+        if self.path != "/api/generate":
+
+            self.send_error(404)
+
+            return
+
+        length = int(
+            self.headers.get(
+                "Content-Length",
+                0,
+            )
+        )
+
+        payload = json.loads(
+            self.rfile.read(length) or b"{}"
+        )
+
+        self.server.request_count += 1
+
+        model = payload.get(
+            "model",
+            "stub",
+        )
+
+        text = stub_response(
+            payload.get(
+                "prompt",
+                "",
+            )
+        )
+
+        time.sleep(
+            self.first_byte_delay
+        )
+
+        if payload.get("stream", True):
+
+            self.send_response(200)
+
+            self.send_header(
+                "Content-Type",
+                "application/x-ndjson",
+            )
+
+            self.send_header(
+                "Transfer-Encoding",
+                "chunked",
+            )
+
+            self.end_headers()
+
+            for token in text:
+
+                self._write_chunk({
+                    "model": model,
+                    "response": token,
+                    "done": False,
+                })
+
+                time.sleep(
+                    self.token_delay
+                )
+
+            self._write_chunk({
+                "model": model,
+                "response": "",
+                "done": True,
+                "eval_count": len(text),
+            })
+
+            self.wfile.write(b"0\r\n\r\n")
+
+            return
+
+        body = json.dumps({
+            "model": model,
+            "response": text,
+            "done": True,
+            "eval_count": len(text),
+        }).encode("utf-8")
+
+        self.send_response(200)
+
+        self.send_header(
+            "Content-Type",
+            "application/json",
+        )
+
+        self.send_header(
+            "Content-Length",
+            str(len(body)),
+        )
+
+        self.end_headers()
+
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: dict):
+
+        line = (
+            json.dumps(
+                data,
+                ensure_ascii=False,
+            )
+            + "\n"
+        ).encode("utf-8")
+
+        self.wfile.write(
+            f"{len(line):x}\r\n".encode("ascii")
+            + line
+            + b"\r\n"
+        )
+
+        self.wfile.flush()
+
+
+# ============================================================================
+# Server
+# ============================================================================
+
+def start_stub_server(
+
+    host: str = "127.0.0.1",
+
+    port: int = 0,
+
+    first_byte_delay: float = 0.0,
+
+    token_delay: float = 0.0,
+
+) -> ThreadingHTTPServer:
+    """
+    background thread で起動する (port=0 は空き port)
+
+    base url: f"http://{host}:{server.server_address[1]}"
+    停止: server.shutdown()
+    """
+
+    handler = type(
+
+        "ConfiguredOllamaStubHandler",
+
+        (OllamaStubHandler,),
+
+        {
+            "first_byte_delay": first_byte_delay,
+            "token_delay": token_delay,
+        },
+    )
+
+    server = ThreadingHTTPServer(
+        (host, port),
+        handler,
+    )
+
+    server.daemon_threads = True
+
+    server.request_count = 0
+
+    threading.Thread(
+        target=server.serve_forever,
+        daemon=True,
+    ).start()
+
+    return server
+
+
+# ============================================================================
+# Entrypoint
+# ============================================================================
+
+def main():
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+    )
+
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=11435,
+    )
+
+    parser.add_argument(
+        "--first-byte-delay",
+        type=float,
+        default=0.0,
+    )
+
+    parser.add_argument(
+        "--token-delay",
+        type=float,
+        default=0.0,
+    )
+
+    args = parser.parse_args()
+
+    server = start_stub_server(
+        host=args.host,
+        port=args.port,
+        first_byte_delay=args.first_byte_delay,
+        token_delay=args.token_delay,
+    )
+
+    print(
+        f"🧪 Ollama stub => http://{args.host}:{server.server_address[1]}"
+    )
+
+    try:
+
+        while True:
+            time.sleep(3600)
+
+    except KeyboardInterrupt:
+
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
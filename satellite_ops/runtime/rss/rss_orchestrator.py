@@ -33,6 +33,11 @@ from satellite_ops.runtime.rss.sanitation.noise_filter import (
     filter_noise,
 )
 
+from satellite_ops.topics.curiosity_balancer import (
+    fresh_topics,
+    select_underexposed_topic,
+)
+
 # ============================================================================
 # RSS Orchestrator
 # ============================================================================
@@ -68,7 +73,9 @@ class RSSOrchestrator:
             ↓
         RSS Fetch
             ↓
-        Topic Select
+        Near-Duplicate Filter
+            ↓
+        Topic Select (underexposed cluster)
             ↓
         Normalize
             ↓
@@ -117,11 +124,30 @@ class RSSOrchestrator:
                 "rss_source": rss_source,
             }
 
+        # --------------------------------------------------------------------
+        # Near-Duplicate Filter
+        # --------------------------------------------------------------------
+
+        rss_topics = fresh_topics(
+            rss_topics
+        )
+
+        if not rss_topics:
+
+            return {
+
+                "success": False,
+
+                "error": "rss_topics_saturated",
+
+                "rss_source": rss_source,
+            }
+
         # --------------------------------------------------------------------
         # Topic Select
         # --------------------------------------------------------------------
 
-        topic = random.choice(
+        topic = select_underexposed_topic(
             rss_topics
         )
 
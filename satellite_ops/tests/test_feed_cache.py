@@ -0,0 +1,271 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/tests/test_feed_cache.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Feed Cache Conditional-GET Tests
+# ============================================================================
+# Run:
+# python -m unittest discover -s satellite_ops/tests -t .
+# ============================================================================
+
+import tempfile
+import threading
+import unittest
+
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from pathlib import Path
+from unittest import mock
+
+from satellite_ops.runtime.cache import feed_cache
+from satellite_ops.runtime.fetch.feed_fetcher import (
+    fetch_feed,
+    refresh_feeds,
+)
+
+
+# ============================================================================
+# Stub Feed Server
+# ============================================================================
+
+ETAG = '"feed-v1"'
+
+LAST_MODIFIED = "Sat, 17 Oct 2026 00:00:00 GMT"
+
+RSS_BODY = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+<channel>
+<title>stub</title>
+<item>
+<title>RTX 4060 ノート入荷</title>
+<link>https://example.com/a</link>
+<description>summary a</description>
+</item>
+<item>
+<title>Core Ultra 7 モバイル</title>
+<link>https://example.com/b</link>
+<description>summary b</description>
+</item>
+</channel>
+</rss>
+""".encode("utf-8")
+
+EMPTY_BODY = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>stub</title></channel></rss>
+"""
+
+
+class StubFeedHandler(BaseHTTPRequestHandler):
+
+    # path -> body (None は 500)
+    bodies = {}
+
+    # [(path, If-None-Match, If-Modified-Since)]
+    requests = []
+
+    def do_GET(self):
+
+        etag = self.headers.get("If-None-Match")
+
+        since = self.headers.get("If-Modified-Since")
+
+        self.requests.append(
+            (self.path, etag, since)
+        )
+
+        body = self.bodies.get(self.path)
+
+        if body is None:
+
+            self.send_response(500)
+
+            self.end_headers()
+
+            return
+
+        if etag == ETAG:
+
+            self.send_response(304)
+
+            self.end_headers()
+
+            return
+
+        self.send_response(200)
+
+        self.send_header("Content-Type", "application/rss+xml")
+
+        self.send_header("ETag", ETAG)
+
+        self.send_header("Last-Modified", LAST_MODIFIED)
+
+        self.send_header("Content-Length", str(len(body)))
+
+        self.end_headers()
+
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+
+        pass
+
+
+# ============================================================================
+# Tests
+# ============================================================================
+
+class FeedCacheConditionalGetTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+
+        cls.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0),
+            StubFeedHandler,
+        )
+
+        cls.thread = threading.Thread(
+            target=cls.server.serve_forever,
+            daemon=True,
+        )
+
+        cls.thread.start()
+
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+
+        cls.server.shutdown()
+
+        cls.server.server_close()
+
+    def setUp(self):
+
+        self.tmp = tempfile.TemporaryDirectory()
+
+        patcher = mock.patch.object(
+            feed_cache,
+            "FEED_CACHE_DIR",
+            Path(self.tmp.name),
+        )
+
+        patcher.start()
+
+        self.addCleanup(patcher.stop)
+
+        self.addCleanup(self.tmp.cleanup)
+
+        StubFeedHandler.bodies = {
+            "/feed.xml": RSS_BODY,
+        }
+
+        StubFeedHandler.requests = []
+
+        self.url = f"{self.base_url}/feed.xml"
+
+    def test_200_stores_entries_and_validators(self):
+
+        record = fetch_feed(self.url)
+
+        self.assertEqual(record["status"], 200)
+
+        self.assertEqual(record["etag"], ETAG)
+
+        self.assertEqual(record["last_modified"], LAST_MODIFIED)
+
+        self.assertEqual(
+            [entry["title"] for entry in record["entries"]],
+            ["RTX 4060 ノート入荷", "Core Ultra 7 モバイル"],
+        )
+
+        self.assertEqual(
+            feed_cache.load_feed_cache(self.url),
+            record,
+        )
+
+        # 初回は validator を送らない
+        self.assertEqual(
+            StubFeedHandler.requests,
+            [("/feed.xml", None, None)],
+        )
+
+    def test_304_keeps_entries_and_updates_checked_at(self):
+
+        first = fetch_feed(self.url)
+
+        second = fetch_feed(self.url)
+
+        self.assertEqual(second["status"], 304)
+
+        self.assertEqual(second["entries"], first["entries"])
+
+        self.assertEqual(second["fetched_at"], first["fetched_at"])
+
+        self.assertGreaterEqual(second["checked_at"], first["checked_at"])
+
+        self.assertEqual(
+            StubFeedHandler.requests[-1],
+            ("/feed.xml", ETAG, LAST_MODIFIED),
+        )
+
+    def test_error_keeps_previous_entries(self):
+
+        first = fetch_feed(self.url)
+
+        StubFeedHandler.bodies["/feed.xml"] = None
+
+        record = fetch_feed(self.url)
+
+        self.assertEqual(record["status"], 500)
+
+        self.assertEqual(record["error"], "http_500")
+
+        self.assertEqual(record["entries"], first["entries"])
+
+    def test_empty_feed_keeps_entries_and_drops_validators(self):
+
+        first = fetch_feed(self.url)
+
+        StubFeedHandler.bodies["/feed.xml"] = EMPTY_BODY
+
+        # 304 にならないよう validator を外して取り直す
+        record = fetch_feed(
+            self.url,
+            record={
+                **first,
+                "etag": "",
+            },
+        )
+
+        self.assertEqual(record["error"], "empty_feed")
+
+        self.assertEqual(record["entries"], first["entries"])
+
+        self.assertEqual(record["etag"], "")
+
+        self.assertEqual(record["last_modified"], "")
+
+    def test_fresh_cache_skips_network(self):
+
+        fetch_feed(self.url)
+
+        records = refresh_feeds([self.url])
+
+        self.assertEqual(records[self.url]["status"], 200)
+
+        self.assertEqual(len(StubFeedHandler.requests), 1)
+
+        # max_age=None は全件問い合わせる (304)
+        records = refresh_feeds([self.url], max_age=None)
+
+        self.assertEqual(records[self.url]["status"], 304)
+
+        self.assertEqual(len(StubFeedHandler.requests), 2)
+
+
+if __name__ == "__main__":
+
+    unittest.main()
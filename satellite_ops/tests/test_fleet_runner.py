@@ -0,0 +1,262 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/tests/test_fleet_runner.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Fleet Stage / Rate Limit Tests
+# ============================================================================
+# Run:
+# python -m unittest discover -s satellite_ops/tests -t .
+# ============================================================================
+
+import threading
+import time
+import unittest
+
+from satellite_ops.runtime.engine.fleet_runner import (
+    FleetStages,
+    PlatformRateLimiter,
+)
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+# sleep / scheduler の揺れ
+TOLERANCE = 0.02
+
+
+class ConcurrencyProbe:
+    """
+    同時に中にいる thread 数の最大値と、各 thread の開始時刻
+    """
+
+    def __init__(self):
+
+        self._lock = threading.Lock()
+
+        self.active = 0
+
+        self.peak = 0
+
+        self.starts = {}
+
+    def enter(self, name):
+
+        with self._lock:
+
+            self.active += 1
+
+            self.peak = max(
+                self.peak,
+                self.active,
+            )
+
+            self.starts[name] = time.monotonic()
+
+    def leave(self):
+
+        with self._lock:
+
+            self.active -= 1
+
+
+def run_threads(targets):
+
+    threads = [
+        threading.Thread(target=target)
+        for target in targets
+    ]
+
+    for thread in threads:
+
+        thread.start()
+
+    for thread in threads:
+
+        thread.join(timeout=10)
+
+
+# ============================================================================
+# Platform Rate Limit
+# ============================================================================
+
+class PlatformRateLimiterTests(unittest.TestCase):
+
+    def test_starts_are_spaced_by_min_interval(self):
+
+        limiter = PlatformRateLimiter(1, 0.2)
+
+        probe = ConcurrencyProbe()
+
+        def post(name):
+
+            def target():
+
+                with limiter.acquire():
+
+                    probe.enter(name)
+
+                    probe.leave()
+
+            return target
+
+        run_threads([
+            post(name)
+            for name in range(3)
+        ])
+
+        starts = sorted(probe.starts.values())
+
+        for before, after in zip(starts, starts[1:]):
+
+            self.assertGreaterEqual(
+                after - before,
+                0.2 - TOLERANCE,
+            )
+
+    def test_concurrency_is_bounded(self):
+
+        limiter = PlatformRateLimiter(2, 0.0)
+
+        probe = ConcurrencyProbe()
+
+        def post(name):
+
+            def target():
+
+                with limiter.acquire():
+
+                    probe.enter(name)
+
+                    time.sleep(0.05)
+
+                    probe.leave()
+
+            return target
+
+        run_threads([
+            post(name)
+            for name in range(6)
+        ])
+
+        self.assertEqual(probe.peak, 2)
+
+
+# ============================================================================
+# Fleet Stages
+# ============================================================================
+
+class FleetStagesTests(unittest.TestCase):
+
+    def test_stage_workers_bound_concurrency_and_record_timings(self):
+
+        stages = FleetStages(
+            stage_workers={"render": 1},
+            platform_limits={},
+        )
+
+        probe = ConcurrencyProbe()
+
+        def render(name):
+
+            def target():
+
+                with stages.stage("render", {"blog_name": name}):
+
+                    probe.enter(name)
+
+                    time.sleep(0.05)
+
+                    probe.leave()
+
+            return target
+
+        run_threads([
+            render(f"blog-{index}")
+            for index in range(3)
+        ])
+
+        self.assertEqual(probe.peak, 1)
+
+        self.assertEqual(
+            set(stages.timings),
+            {"blog-0", "blog-1", "blog-2"},
+        )
+
+        for timings in stages.timings.values():
+
+            self.assertGreaterEqual(
+                timings["render"],
+                0.05 - TOLERANCE,
+            )
+
+        # 1 枠を 3 blog で回すので誰かは待つ
+        self.assertGreater(
+            max(
+                timings["render_wait"]
+                for timings in stages.timings.values()
+            ),
+            0.05 - TOLERANCE,
+        )
+
+    def test_dispatch_is_spaced_per_platform(self):
+
+        stages = FleetStages(
+
+            stage_workers={"dispatch": 1},
+
+            platform_limits={
+                "hatena": (1, 0.3),
+                "wordpress": (1, 0.0),
+            },
+        )
+
+        probe = ConcurrencyProbe()
+
+        def dispatch(name, platform):
+
+            def target():
+
+                blog = {
+                    "blog_name": name,
+                    "platform": platform,
+                }
+
+                with stages.stage("dispatch", blog):
+
+                    probe.enter(name)
+
+                    probe.leave()
+
+            return target
+
+        began = time.monotonic()
+
+        run_threads([dispatch("hatena-1", "Hatena")])
+
+        # hatena-2 は間隔待ち。待っている間も dispatch 枠は空いている
+        run_threads([
+            dispatch("hatena-2", "hatena"),
+            dispatch("wordpress-1", "wordpress"),
+        ])
+
+        self.assertGreaterEqual(
+            probe.starts["hatena-2"] - probe.starts["hatena-1"],
+            0.3 - TOLERANCE,
+        )
+
+        self.assertLess(
+            probe.starts["wordpress-1"] - began,
+            0.3 - TOLERANCE,
+        )
+
+        self.assertIs(
+            stages.platform_limiter("hatena"),
+            stages.platform_limiter("hatena"),
+        )
+
+
+if __name__ == "__main__":
+
+    unittest.main()
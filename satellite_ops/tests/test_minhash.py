@@ -0,0 +1,180 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/tests/test_minhash.py
+# ============================================================================
+# SHIN SATELLITE OPS｜MinHash Near-Duplicate Tests
+# ============================================================================
+# Run:
+# python -m unittest discover -s satellite_ops/tests -t .
+# ============================================================================
+
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from satellite_ops.topics.dedupe.minhash import (
+    NUM_PERM,
+    char_ngrams,
+    estimate_similarity,
+    lsh_buckets,
+    pack_signature,
+    topic_signature,
+    unpack_signature,
+)
+from satellite_ops.topics.saturation.post_history_store import (
+    CLUSTER_THRESHOLD,
+    NEAR_DUPLICATE_THRESHOLD,
+    PostHistoryStore,
+)
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+POSTED = "RTX 4060 搭載ゲーミングノート おすすめ 2026年版"
+
+# 語順 / 記号違いの同じ記事 (n-gram Jaccard ≈ 0.85)
+REWORDED = "【2026年版】RTX 4060 搭載ゲーミングノート おすすめ"
+
+# 同じ topic の別記事 (n-gram Jaccard ≈ 0.59)
+SAME_TOPIC = "RTX 4060搭載 ゲーミングノートPC おすすめ"
+
+UNRELATED = "Core Ultra 7 ビジネスモバイルPC 比較"
+
+
+def similarity(left: str, right: str) -> float:
+
+    return estimate_similarity(
+        topic_signature(left),
+        topic_signature(right),
+    )
+
+
+# ============================================================================
+# Signature
+# ============================================================================
+
+class MinHashSignatureTests(unittest.TestCase):
+
+    def test_signature_is_deterministic(self):
+
+        signature = topic_signature(POSTED)
+
+        self.assertEqual(len(signature), NUM_PERM)
+
+        self.assertEqual(signature, topic_signature(POSTED))
+
+        self.assertEqual(
+            unpack_signature(pack_signature(signature)),
+            signature,
+        )
+
+    def test_similarity_bands(self):
+
+        self.assertEqual(similarity(POSTED, POSTED), 1.0)
+
+        self.assertGreaterEqual(
+            similarity(POSTED, REWORDED),
+            NEAR_DUPLICATE_THRESHOLD,
+        )
+
+        self.assertGreaterEqual(
+            similarity(POSTED, SAME_TOPIC),
+            CLUSTER_THRESHOLD,
+        )
+
+        self.assertLess(
+            similarity(POSTED, SAME_TOPIC),
+            NEAR_DUPLICATE_THRESHOLD,
+        )
+
+        self.assertLess(
+            similarity(POSTED, UNRELATED),
+            CLUSTER_THRESHOLD,
+        )
+
+    def test_ngrams_ignore_spacing_and_symbols(self):
+
+        self.assertEqual(
+            char_ngrams("RTX-4060 搭載"),
+            char_ngrams("rtx 4060搭載"),
+        )
+
+    def test_empty_text(self):
+
+        self.assertEqual(topic_signature(""), [])
+
+        self.assertEqual(lsh_buckets([]), [])
+
+        self.assertEqual(estimate_similarity([], []), 0.0)
+
+
+# ============================================================================
+# Store Thresholds
+# ============================================================================
+
+class NearDuplicateThresholdTests(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmp = tempfile.TemporaryDirectory()
+
+        self.store = PostHistoryStore(
+            db_path=Path(self.tmp.name) / "post_history.sqlite3",
+            legacy_log_path=None,
+        )
+
+        self.store.record_post(POSTED, blog="test")
+
+    def tearDown(self):
+
+        self.store.connection().close()
+
+        self.tmp.cleanup()
+
+    def test_reworded_title_is_near_duplicate(self):
+
+        self.assertTrue(
+            self.store.is_near_duplicate(REWORDED)
+        )
+
+    def test_same_topic_joins_cluster_without_blocking(self):
+
+        self.assertFalse(
+            self.store.is_near_duplicate(SAME_TOPIC)
+        )
+
+        cluster = self.store.topic_cluster(POSTED)
+
+        self.assertIsNotNone(cluster)
+
+        self.assertEqual(
+            self.store.topic_cluster(SAME_TOPIC),
+            cluster,
+        )
+
+    def test_unrelated_title_starts_new_cluster(self):
+
+        self.assertFalse(
+            self.store.is_near_duplicate(UNRELATED)
+        )
+
+        self.assertIsNone(
+            self.store.topic_cluster(UNRELATED)
+        )
+
+    def test_explicit_threshold(self):
+
+        self.assertTrue(
+            self.store.is_near_duplicate(
+                SAME_TOPIC,
+                threshold=CLUSTER_THRESHOLD,
+            )
+        )
+
+
+if __name__ == "__main__":
+
+    unittest.main()
@@ -0,0 +1,107 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/topics/clustering/topic_clusters.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Topic Clusters
+# ============================================================================
+# Purpose:
+# Topic cluster lookup for curiosity balancing
+# ============================================================================
+# Responsibilities:
+#
+# - candidate topic → cluster (MinHash / LSH, post history store)
+# - cluster exposure (posts per cluster in the retention window)
+#
+# 新しい topic (近い投稿なし) は cluster None / exposure 0
+#
+# ============================================================================
+
+import time
+
+from satellite_ops.topics.saturation.post_history_store import (
+    get_post_history_store,
+)
+
+
+# ============================================================================
+# Cluster
+# ============================================================================
+
+def topic_cluster(
+    topic: dict,
+):
+
+    return get_post_history_store().topic_cluster(
+
+        topic.get(
+            "title",
+            "",
+        ),
+
+        topic.get(
+            "summary",
+            "",
+        ),
+    )
+
+
+# ============================================================================
+# Exposure
+# ============================================================================
+
+def cluster_exposure(
+    days: float | None = None,
+) -> dict:
+    """
+    Returns:
+        {cluster_id: post count}
+    """
+
+    store = get_post_history_store()
+
+    return store.cluster_exposure(
+
+        since=(
+            time.time() - days * 24 * 60 * 60
+            if days is not None
+            else None
+        ),
+    )
+
+
+def annotate_topic_clusters(
+    topics: list,
+    days: float | None = None,
+) -> list:
+    """
+    Returns:
+        [(topic, cluster_id, exposure)]
+    """
+
+    exposure = cluster_exposure(
+        days
+    )
+
+    annotated = []
+
+    for topic in topics:
+
+        cluster_id = topic_cluster(
+            topic
+        )
+
+        annotated.append((
+
+            topic,
+
+            cluster_id,
+
+            exposure.get(
+                cluster_id,
+                0,
+            )
+            if cluster_id is not None
+            else 0,
+        ))
+
+    return annotated
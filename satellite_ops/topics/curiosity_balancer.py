@@ -0,0 +1,91 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/topics/curiosity_balancer.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Curiosity Balancer
+# ============================================================================
+# Purpose:
+# Prefer underexposed topic clusters
+# ============================================================================
+# Responsibilities:
+#
+# - near-duplicate rejection (post history across the fleet)
+# - least-exposed cluster selection
+#
+# ============================================================================
+
+import random
+
+from satellite_ops.topics.clustering.topic_clusters import (
+    annotate_topic_clusters,
+)
+
+from satellite_ops.topics.saturation.topic_saturation import (
+    is_topic_saturated,
+)
+
+
+# ============================================================================
+# Filter
+# ============================================================================
+
+def fresh_topics(
+    topics: list,
+) -> list:
+    """
+    near-duplicate / 直近投稿済みの topic を除く
+    """
+
+    return [
+
+        topic
+
+        for topic in topics
+
+        if topic
+        and not is_topic_saturated(
+            topic.get(
+                "title",
+                "",
+            ),
+            summary=topic.get(
+                "summary",
+                "",
+            ),
+        )
+    ]
+
+
+# ============================================================================
+# Select
+# ============================================================================
+
+def select_underexposed_topic(
+    topics: list,
+) -> dict:
+    """
+    露出の最も少ない cluster の topic から random に 1 つ
+    (同数なら候補を均等に扱う)
+    """
+
+    if not topics:
+
+        return {}
+
+    annotated = annotate_topic_clusters(
+        topics
+    )
+
+    lowest = min(
+        exposure
+        for _, _, exposure in annotated
+    )
+
+    return random.choice([
+
+        topic
+
+        for topic, _, exposure in annotated
+
+        if exposure == lowest
+    ])
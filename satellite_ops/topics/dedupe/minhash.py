@@ -0,0 +1,257 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/topics/dedupe/minhash.py
+# ============================================================================
+# SHIN SATELLITE OPS｜MinHash Signatures
+# ============================================================================
+# Purpose:
+# Near-duplicate signatures for topic titles / summaries
+# ============================================================================
+# Responsibilities:
+#
+# - character n-gram shingles (日本語は空白で分かち書きされない)
+# - MinHash signature
+# - LSH band keys
+# - Jaccard estimate
+#
+# ============================================================================
+
+import hashlib
+import random
+import re
+
+from array import array
+
+
+# ============================================================================
+# Signature Config
+# ============================================================================
+
+NGRAM_SIZE = 3
+
+NUM_PERM = 64
+
+# NUM_PERM = LSH_BANDS * LSH_ROWS
+# candidate になる Jaccard の目安: (1 / 16) ** (1 / 4) ≈ 0.5
+LSH_BANDS = 16
+
+LSH_ROWS = 4
+
+# summary は冒頭だけ使う (本文差分で title の一致が薄まらない)
+SUMMARY_CHARS = 200
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+MAX_HASH = (1 << 32) - 1
+
+_PERMUTATIONS = [
+
+    (
+        rng.randrange(1, MERSENNE_PRIME),
+        rng.randrange(0, MERSENNE_PRIME),
+    )
+
+    for rng in [random.Random(20260101)]
+
+    for _ in range(NUM_PERM)
+]
+
+NOISE_PATTERN = re.compile(
+    r"[\s\W_]+"
+)
+
+
+# ============================================================================
+# Shingles
+# ============================================================================
+
+def topic_text(
+
+    title: str,
+
+    summary: str = "",
+
+) -> str:
+
+    return (
+        f"{title or ''} "
+        f"{(summary or '')[:SUMMARY_CHARS]}"
+    )
+
+
+def char_ngrams(
+
+    text: str,
+
+    n: int = NGRAM_SIZE,
+
+) -> set:
+    """
+    記号・空白を除いた文字列の n-gram
+    """
+
+    text = NOISE_PATTERN.sub(
+        "",
+        str(text or "").lower(),
+    )
+
+    if not text:
+
+        return set()
+
+    if len(text) <= n:
+
+        return {text}
+
+    return {
+        text[i:i + n]
+        for i in range(len(text) - n + 1)
+    }
+
+
+def _shingle_hash(shingle: str) -> int:
+
+    return int.from_bytes(
+
+        hashlib.blake2b(
+            shingle.encode("utf-8"),
+            digest_size=8,
+        ).digest(),
+
+        "big",
+    )
+
+
+# ============================================================================
+# Signature
+# ============================================================================
+
+def minhash_signature(shingles: set) -> list:
+    """
+    Returns:
+        [NUM_PERM 個の min hash] (shingle なしは [])
+    """
+
+    if not shingles:
+
+        return []
+
+    hashes = [
+        _shingle_hash(shingle)
+        for shingle in shingles
+    ]
+
+    return [
+
+        min(
+            ((a * h + b) % MERSENNE_PRIME) & MAX_HASH
+            for h in hashes
+        )
+
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def topic_signature(
+
+    title: str,
+
+    summary: str = "",
+
+) -> list:
+
+    return minhash_signature(
+
+        char_ngrams(
+            topic_text(
+                title,
+                summary,
+            )
+        )
+    )
+
+
+def estimate_similarity(
+
+    left: list,
+
+    right: list,
+
+) -> float:
+    """
+    Jaccard 推定値 (一致した slot の割合)
+    """
+
+    if not left or len(left) != len(right):
+
+        return 0.0
+
+    return sum(
+        1
+        for a, b in zip(left, right)
+        if a == b
+    ) / len(left)
+
+
+# ============================================================================
+# LSH
+# ============================================================================
+
+def lsh_buckets(signature: list) -> list:
+    """
+    Returns:
+        [(band, bucket)] (bucket は sqlite INTEGER に収まる符号付き 64bit)
+    """
+
+    if len(signature) != LSH_BANDS * LSH_ROWS:
+
+        return []
+
+    buckets = []
+
+    for band in range(LSH_BANDS):
+
+        rows = array(
+            "I",
+            signature[band * LSH_ROWS:(band + 1) * LSH_ROWS],
+        )
+
+        buckets.append((
+
+            band,
+
+            int.from_bytes(
+
+                hashlib.blake2b(
+                    rows.tobytes(),
+                    digest_size=8,
+                ).digest(),
+
+                "big",
+
+                signed=True,
+            ),
+        ))
+
+    return buckets
+
+
+# ============================================================================
+# Serialize
+# ============================================================================
+
+def pack_signature(signature: list) -> bytes:
+
+    return array(
+        "I",
+        signature,
+    ).tobytes()
+
+
+def unpack_signature(blob: bytes) -> list:
+
+    signature = array("I")
+
+    signature.frombytes(blob or b"")
+
+    return signature.tolist()
@@ -0,0 +1,859 @@
+# ============================================================================
+# FILE:
+# /home/maya/shin-vps/satellite_ops/topics/saturation/post_history_store.py
+# ============================================================================
+# SHIN SATELLITE OPS｜Post History Store
+# ============================================================================
+# Purpose:
+# Indexed post history for topic saturation
+# ============================================================================
+# Responsibilities:
+#
+# - post history persistence (SQLite / WAL)
+# - MinHash signatures + LSH buckets (near-duplicate / topic cluster)
+# - timestamp index (recency lookup)
+# - rolling retention window + automatic compaction
+# - legacy post_history.log incremental import
+#
+# ============================================================================
+
+import sqlite3
+import threading
+import time
+
+from datetime import datetime
+from pathlib import Path
+
+from satellite_ops.topics.dedupe.minhash import (
+    estimate_similarity,
+    lsh_buckets,
+    pack_signature,
+    topic_signature,
+    unpack_signature,
+)
+
+
+# ============================================================================
+# Store Config
+# ============================================================================
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+HISTORY_DB_PATH = (
+    BASE_DIR
+    / "storage"
+    / "history"
+    / "post_history.sqlite3"
+)
+
+# 既存 writer が追記している log (cwd 相対)
+LEGACY_LOG_PATH = "satellite_ops/logs/post_history.log"
+
+LEGACY_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# この期間より古い投稿は compaction で消える
+HISTORY_RETENTION_DAYS = 30
+
+# compaction の最短間隔 (seconds)
+COMPACTION_INTERVAL = 6 * 60 * 60
+
+# 推定 Jaccard がこれ以上なら near-duplicate (投稿しない)
+NEAR_DUPLICATE_THRESHOLD = 0.6
+
+# 推定 Jaccard がこれ以上なら同じ topic cluster
+CLUSTER_THRESHOLD = 0.35
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    posted_at INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    title_norm TEXT NOT NULL,
+    blog TEXT NOT NULL DEFAULT ''
+);
+
+CREATE INDEX IF NOT EXISTS posts_posted_at
+    ON posts (posted_at);
+
+CREATE INDEX IF NOT EXISTS posts_title_norm
+    ON posts (title_norm, posted_at);
+
+-- 旧 token 転置 index (near-duplicate は MinHash に移行済み)
+DROP TABLE IF EXISTS post_tokens;
+
+CREATE TABLE IF NOT EXISTS post_signatures (
+    post_id INTEGER PRIMARY KEY,
+    cluster_id INTEGER NOT NULL,
+    posted_at INTEGER NOT NULL,
+    signature BLOB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS post_signatures_cluster
+    ON post_signatures (cluster_id, posted_at);
+
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    post_id INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, post_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS lsh_buckets_post_id
+    ON lsh_buckets (post_id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+# ============================================================================
+# Normalize
+# ============================================================================
+
+def normalize_title(title: str) -> str:
+
+    return " ".join(
+        str(title or "").lower().split()
+    )
+
+
+def parse_legacy_line(line: str):
+    """
+    "[2026-01-01 12:00:00] title" → (epoch, title) / None
+    """
+
+    if not line.startswith("["):
+
+        return None
+
+    timestamp_str, _, title = line[1:].partition("]")
+
+    try:
+
+        posted_at = datetime.strptime(
+            timestamp_str.strip(),
+            LEGACY_TIMESTAMP_FORMAT,
+        )
+
+    except ValueError:
+
+        return None
+
+    title = title.strip()
+
+    if not title:
+
+        return None
+
+    return (
+        int(posted_at.timestamp()),
+        title,
+    )
+
+
+# ============================================================================
+# Store
+# ============================================================================
+
+class PostHistoryStore:
+
+    # ------------------------------------------------------------------------
+    # Init
+    # ------------------------------------------------------------------------
+
+    def __init__(
+
+        self,
+
+        db_path: Path = HISTORY_DB_PATH,
+
+        retention_days: int = HISTORY_RETENTION_DAYS,
+
+        legacy_log_path: str | None = LEGACY_LOG_PATH,
+
+    ):
+
+        self.db_path = Path(db_path)
+
+        self.retention = retention_days * 24 * 60 * 60
+
+        self.legacy_log_path = legacy_log_path
+
+        self._local = threading.local()
+
+        self._schema_lock = threading.Lock()
+
+        self._schema_ready = False
+
+    # ------------------------------------------------------------------------
+    # Connection
+    # ------------------------------------------------------------------------
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        thread ごとに 1 connection (WAL なので reader は writer を待たない)
+        """
+
+        conn = getattr(
+            self._local,
+            "conn",
+            None,
+        )
+
+        if conn is not None:
+
+            return conn
+
+        self.db_path.parent.mkdir(
+            parents=True,
+            exist_ok=True,
+        )
+
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            isolation_level=None,
+        )
+
+        conn.execute("PRAGMA journal_mode=WAL")
+
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        with self._schema_lock:
+
+            if not self._schema_ready:
+
+                conn.executescript(SCHEMA)
+
+                self._schema_ready = True
+
+        self._local.conn = conn
+
+        return conn
+
+    def _meta(
+
+        self,
+
+        key: str,
+
+        default: str = "",
+
+    ) -> str:
+
+        row = self.connection().execute(
+            "SELECT value FROM meta WHERE key = ?",
+            (key,),
+        ).fetchone()
+
+        return row[0] if row else default
+
+    def _set_meta(
+
+        self,
+
+        conn: sqlite3.Connection,
+
+        key: str,
+
+        value,
+
+    ) -> None:
+
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+    # ------------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------------
+
+    def _insert(
+
+        self,
+
+        conn: sqlite3.Connection,
+
+        posted_at: int,
+
+        title: str,
+
+        blog: str = "",
+
+        summary: str = "",
+
+    ) -> int:
+
+        post_id = conn.execute(
+            "INSERT INTO posts (posted_at, title, title_norm, blog) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                posted_at,
+                title,
+                normalize_title(title),
+                blog or "",
+            ),
+        ).lastrowid
+
+        self._index_signature(
+            conn,
+            post_id,
+            posted_at,
+            topic_signature(
+                title,
+                summary,
+            ),
+        )
+
+        return post_id
+
+    def _index_signature(
+
+        self,
+
+        conn: sqlite3.Connection,
+
+        post_id: int,
+
+        posted_at: int,
+
+        signature: list,
+
+    ) -> None:
+
+        if not signature:
+
+            return
+
+        buckets = lsh_buckets(
+            signature
+        )
+
+        # 最も近い既存投稿の cluster に入る (なければ自分が新 cluster)
+        nearest = self._nearest(
+            conn,
+            signature,
+            buckets,
+        )
+
+        cluster_id = (
+            nearest[1]
+            if nearest and nearest[2] >= CLUSTER_THRESHOLD
+            else post_id
+        )
+
+        conn.execute(
+            "INSERT INTO post_signatures "
+            "(post_id, cluster_id, posted_at, signature) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                post_id,
+                cluster_id,
+                posted_at,
+                pack_signature(signature),
+            ),
+        )
+
+        conn.executemany(
+            "INSERT OR IGNORE INTO lsh_buckets (band, bucket, post_id) "
+            "VALUES (?, ?, ?)",
+            [
+                (band, bucket, post_id)
+                for band, bucket in buckets
+            ],
+        )
+
+    def record_post(
+
+        self,
+
+        title: str,
+
+        blog: str = "",
+
+        posted_at: float | None = None,
+
+        summary: str = "",
+
+    ) -> int:
+
+        if not title:
+
+            return 0
+
+        conn = self.connection()
+
+        conn.execute("BEGIN IMMEDIATE")
+
+        try:
+
+            post_id = self._insert(
+
+                conn,
+
+                int(posted_at or time.time()),
+
+                title,
+
+                blog,
+
+                summary,
+            )
+
+            conn.execute("COMMIT")
+
+        except Exception:
+
+            conn.execute("ROLLBACK")
+
+            raise
+
+        self.compact_if_due()
+
+        return post_id
+
+    # ------------------------------------------------------------------------
+    # Legacy Log Import
+    # ------------------------------------------------------------------------
+
+    def sync_legacy_log(self) -> int:
+        """
+        post_history.log の前回位置以降だけ取り込む
+
+        log が切り詰められた (rotate) 場合は先頭から読み直す
+        """
+
+        if not self.legacy_log_path:
+
+            return 0
+
+        path = Path(
+            self.legacy_log_path
+        )
+
+        try:
+
+            size = path.stat().st_size
+
+        except OSError:
+
+            return 0
+
+        offset = int(
+            self._meta(
+                "legacy_log_offset",
+                "0",
+            )
+        )
+
+        if size == offset:
+
+            return 0
+
+        if size < offset:
+
+            offset = 0
+
+        with open(path, "rb") as f:
+
+            f.seek(offset)
+
+            chunk = f.read(size - offset)
+
+        # 書きかけの最終行は次回に回す
+        end = chunk.rfind(b"\n") + 1
+
+        if not end:
+
+            return 0
+
+        horizon = time.time() - self.retention
+
+        rows = []
+
+        for line in chunk[:end].decode(
+            "utf-8",
+            errors="replace",
+        ).splitlines():
+
+            parsed = parse_legacy_line(
+                line.strip()
+            )
+
+            if parsed and parsed[0] >= horizon:
+
+                rows.append(parsed)
+
+        conn = self.connection()
+
+        conn.execute("BEGIN IMMEDIATE")
+
+        try:
+
+            # 並行 process が先に取り込んでいたら何もしない
+            current = int(
+                self._meta(
+                    "legacy_log_offset",
+                    "0",
+                )
+            )
+
+            if current == offset or (offset == 0 and current > size):
+
+                for posted_at, title in rows:
+
+                    self._insert(
+                        conn,
+                        posted_at,
+                        title,
+                    )
+
+                self._set_meta(
+                    conn,
+                    "legacy_log_offset",
+                    offset + end,
+                )
+
+            else:
+
+                rows = []
+
+            conn.execute("COMMIT")
+
+        except Exception:
+
+            conn.execute("ROLLBACK")
+
+            raise
+
+        return len(rows)
+
+    # ------------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------------
+
+    def compact(self) -> int:
+
+        horizon = int(
+            time.time() - self.retention
+        )
+
+        conn = self.connection()
+
+        conn.execute("BEGIN IMMEDIATE")
+
+        try:
+
+            for table in (
+                "lsh_buckets",
+                "post_signatures",
+            ):
+
+                conn.execute(
+                    f"DELETE FROM {table} WHERE post_id IN "
+                    "(SELECT id FROM posts WHERE posted_at < ?)",
+                    (horizon,),
+                )
+
+            removed = conn.execute(
+                "DELETE FROM posts WHERE posted_at < ?",
+                (horizon,),
+            ).rowcount
+
+            self._set_meta(
+                conn,
+                "compacted_at",
+                int(time.time()),
+            )
+
+            conn.execute("COMMIT")
+
+        except Exception:
+
+            conn.execute("ROLLBACK")
+
+            raise
+
+        return removed
+
+    def compact_if_due(self) -> int:
+
+        compacted_at = int(
+            self._meta(
+                "compacted_at",
+                "0",
+            )
+        )
+
+        if time.time() - compacted_at < COMPACTION_INTERVAL:
+
+            return 0
+
+        return self.compact()
+
+    # ------------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------------
+
+    def posted_since(
+
+        self,
+
+        title: str,
+
+        since: float,
+
+    ) -> bool:
+        """
+        同じ title が since 以降に投稿されたか (title_norm, posted_at index)
+        """
+
+        row = self.connection().execute(
+            "SELECT 1 FROM posts "
+            "WHERE title_norm = ? AND posted_at >= ? LIMIT 1",
+            (
+                normalize_title(title),
+                int(since),
+            ),
+        ).fetchone()
+
+        return row is not None
+
+    # ------------------------------------------------------------------------
+    # Near Duplicate
+    # ------------------------------------------------------------------------
+
+    def _nearest(
+
+        self,
+
+        conn: sqlite3.Connection,
+
+        signature: list,
+
+        buckets: list,
+
+        since: float | None = None,
+
+    ):
+        """
+        LSH bucket を共有する投稿だけを signature で照合する
+
+        Returns:
+            (post_id, cluster_id, similarity) / None
+        """
+
+        if not buckets:
+
+            return None
+
+        where = " OR ".join(
+            "(b.band = ? AND b.bucket = ?)"
+            for _ in buckets
+        )
+
+        params = [
+            value
+            for bucket in buckets
+            for value in bucket
+        ]
+
+        sql = (
+            "SELECT DISTINCT s.post_id, s.cluster_id, s.signature "
+            "FROM lsh_buckets b "
+            "JOIN post_signatures s ON s.post_id = b.post_id "
+            f"WHERE ({where})"
+        )
+
+        if since is not None:
+
+            sql += " AND s.posted_at >= ?"
+
+            params.append(
+                int(since)
+            )
+
+        best = None
+
+        for post_id, cluster_id, blob in conn.execute(
+            sql,
+            params,
+        ):
+
+            similarity = estimate_similarity(
+                signature,
+                unpack_signature(blob),
+            )
+
+            if best is None or similarity > best[2]:
+
+                best = (
+                    post_id,
+                    cluster_id,
+                    similarity,
+                )
+
+        return best
+
+    def nearest_post(
+
+        self,
+
+        title: str,
+
+        summary: str = "",
+
+        since: float | None = None,
+
+    ):
+        """
+        Returns:
+            (post_id, cluster_id, similarity) / None
+        """
+
+        signature = topic_signature(
+            title,
+            summary,
+        )
+
+        return self._nearest(
+
+            self.connection(),
+
+            signature,
+
+            lsh_buckets(
+                signature
+            ),
+
+            since=since,
+        )
+
+    def is_near_duplicate(
+
+        self,
+
+        title: str,
+
+        summary: str = "",
+
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+
+        since: float | None = None,
+
+    ) -> bool:
+
+        nearest = self.nearest_post(
+            title,
+            summary,
+            since=since,
+        )
+
+        return bool(
+            nearest
+            and nearest[2] >= threshold
+        )
+
+    # ------------------------------------------------------------------------
+    # Clusters
+    # ------------------------------------------------------------------------
+
+    def topic_cluster(
+
+        self,
+
+        title: str,
+
+        summary: str = "",
+
+    ):
+        """
+        既存 cluster id / None (まだ投稿のない新しい topic)
+        """
+
+        nearest = self.nearest_post(
+            title,
+            summary,
+        )
+
+        if nearest and nearest[2] >= CLUSTER_THRESHOLD:
+
+            return nearest[1]
+
+        return None
+
+    def cluster_exposure(
+
+        self,
+
+        since: float | None = None,
+
+    ) -> dict:
+        """
+        Returns:
+            {cluster_id: 投稿数} (since 以降)
+        """
+
+        if since is None:
+
+            since = time.time() - self.retention
+
+        return dict(
+
+            self.connection().execute(
+                "SELECT cluster_id, COUNT(*) FROM post_signatures "
+                "WHERE posted_at >= ? GROUP BY cluster_id",
+                (int(since),),
+            ).fetchall()
+        )
+
+    def refresh(self) -> None:
+
+        self.sync_legacy_log()
+
+        self.compact_if_due()
+
+
+# ============================================================================
+# Default Store
+# ============================================================================
+
+_STORE = None
+
+_STORE_LOCK = threading.Lock()
+
+
+def get_post_history_store() -> PostHistoryStore:
+
+    global _STORE
+
+    if _STORE is None:
+
+        with _STORE_LOCK:
+
+            if _STORE is None:
+
+                _STORE = PostHistoryStore()
+
+    return _STORE
+
+
+def record_post(
+
+    title: str,
+
+    blog: str = "",
+
+    summary: str = "",
+
+) -> int:
+
+    return get_post_history_store().record_post(
+        title,
+        blog=blog,
+        summary=summary,
+    )
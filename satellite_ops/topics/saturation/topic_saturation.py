@@ -2,77 +2,39 @@
 # SHIN SATELLITE OPS｜Topic Saturation
 # ============================================================================
 
-from pathlib import Path
-from datetime import datetime, timedelta
+import time
 
-LOG_PATH = "satellite_ops/logs/post_history.log"
+from satellite_ops.topics.saturation.post_history_store import (
+    get_post_history_store,
+)
 
-def is_topic_saturated(topic_title,hours=24,):
+def is_topic_saturated(topic_title,hours=24,summary="",):
 
-    path = Path(LOG_PATH)
+    store = get_post_history_store()
 
-    if not path.exists():
-        return False
+    # 既存 log の追記分だけ取り込む / 古い履歴を compaction
+    store.refresh()
 
-    now = datetime.now()
-
-    with open(path, "r", encoding="utf-8") as f:
-
-        lines = f.readlines()
-    
     if is_semantically_similar(
         topic_title,
-        lines,
+        store,
+        summary=summary,
         ):
-        return True   
-
-    for line in reversed(lines):
-
-        if topic_title not in line:
-            continue
-
-        try:
-
-            timestamp_str = (
-                line.split("]")[0]
-                .replace("[", "")
-                .strip()
-            )
-
-            post_time = datetime.strptime(
-                timestamp_str,
-                "%Y-%m-%d %H:%M:%S"
-            )
-
-            delta = now - post_time
-
-            if delta < timedelta(hours=hours):
-                return True
+        return True
 
-        except Exception:
-            continue
-
-    return False
-
-
-def is_semantically_similar(topic_title,logs,):
-
-    keywords = set(
-        topic_title.lower().split()
+    return store.posted_since(
+        topic_title,
+        time.time() - hours * 60 * 60,
     )
 
-    for line in logs:
 
-        line_lower = line.lower()
+def is_semantically_similar(topic_title,store=None,summary="",):
 
-        overlap = sum(
-            1
-            for keyword in keywords
-            if keyword in line_lower
-        )
-
-        if overlap >= 2:
-            return True
-
-    return False
+    # retention window 内の near-duplicate (MinHash / LSH)
+    store = store or get_post_history_store()
 
+    return store.is_near_duplicate(
+        topic_title,
+        summary,
+        since=time.time() - store.retention,
+    )
@@ -557,6 +557,7 @@ run_django audit_semantic_universe
 log "🚀 (09/12) Build Unified Runtime"
 # run_django rebuild_semantic_runtime
 run_django rebuild_unified_runtime
+run_django build_ranking_snapshots --if-stale
 
 
 # ==========================================================